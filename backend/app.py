@@ -1,11 +1,20 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
 import os
+import json
 import logging
 from dotenv import load_dotenv
 import uuid
 from pathlib import Path
+from urllib.parse import quote
 from job_manager import job_manager
+from services.glossary import PROJECT_NAME_PATTERN, read_glossary_terms, save_glossary
+from services.translation_backends import TRANSLATION_BACKEND_NAMES
+from services.tts_backends import TTS_BACKEND_NAMES
+from services.asr_backends import ASR_BACKEND_NAMES
+from services.metrics import get_metrics, DirectorySizeCollector, CONTENT_TYPE
+from services.events import get_event_bus, TERMINAL_EVENTS
+from services.progressive import PLAYLIST_NAME, SEGMENT_NAME_PATTERN, hls_dir
 
 # Load environment variables
 load_dotenv()
@@ -27,11 +36,26 @@ app.config['UPLOAD_FOLDER'] = os.getenv('UPLOAD_FOLDER', 'uploads')
 app.config['OUTPUT_FOLDER'] = os.getenv('OUTPUT_FOLDER', 'outputs')
 app.config['TEMP_FOLDER'] = os.getenv('TEMP_FOLDER', 'temp')
 app.config['MAX_CONTENT_LENGTH'] = 500 * 1024 * 1024  # 500MB max file size
+# Behind nginx: hand output files to the proxy (location marked `internal`, aliased to OUTPUT_FOLDER)
+app.config['X_ACCEL_REDIRECT_PREFIX'] = os.getenv('X_ACCEL_REDIRECT_PREFIX')
+# Behind Apache/lighttpd: X-Sendfile header instead of streaming the body
+app.config['USE_X_SENDFILE'] = os.getenv('USE_X_SENDFILE', 'False') == 'True'
 
 # Ensure directories exist
 for folder in [app.config['UPLOAD_FOLDER'], app.config['OUTPUT_FOLDER'], app.config['TEMP_FOLDER']]:
     Path(folder).mkdir(parents=True, exist_ok=True)
 
+# Queue mode: job events come from worker processes through the job store
+job_manager.follow_events()
+
+# Disk usage of the working directories, reported on /metrics
+get_metrics().add_collector(DirectorySizeCollector({
+    'uploads': app.config['UPLOAD_FOLDER'],
+    'outputs': app.config['OUTPUT_FOLDER'],
+    'temp': app.config['TEMP_FOLDER'],
+    'cache': 'cache'
+}))
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -40,6 +64,11 @@ def health_check():
         'service': 'autodub-api'
     }), 200
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics (jobs, stage and API latency, caches, disk, workers)"""
+    return Response(get_metrics().render(), content_type=CONTENT_TYPE)
+
 @app.route('/api/dub', methods=['POST'])
 def create_dub_job():
     """
@@ -50,7 +79,13 @@ def create_dub_job():
         "target_language": "es",
         "source_language": "en",  (optional)
         "start_time": 20,  (optional, in seconds)
-        "end_time": 40  (optional, in seconds)
+        "end_time": 40,  (optional, in seconds)
+        "project": "my-channel",  (optional, selects the glossary)
+        "translation_backend": "openai",  (optional: openai, local or stub)
+        "tts_backend": "elevenlabs",  (optional: elevenlabs, piper or tone)
+        "asr_backend": "deepgram",  (optional: deepgram or local)
+        "profile": false,  (optional, keep a sampling profile of the job)
+        "progressive": false  (optional, watch the dub region by region over HLS while it runs)
     }
     """
     try:
@@ -67,6 +102,12 @@ def create_dub_job():
         start_time = data.get('start_time')  # Can be None
         end_time = data.get('end_time')  # Can be None
         use_voice_cloning = data.get('use_voice_cloning', False)
+        project = data.get('project')
+        translation_backend = data.get('translation_backend')
+        tts_backend = data.get('tts_backend')
+        asr_backend = data.get('asr_backend')
+        profile = data.get('profile', False)
+        progressive = data.get('progressive')
         
         logger.info(f"[API] Parsed - start_time: {start_time}, end_time: {end_time}")
         
@@ -77,6 +118,18 @@ def create_dub_job():
             return jsonify({'error': 'end_time must be a non-negative integer'}), 400
         if start_time is not None and end_time is not None and start_time >= end_time:
             return jsonify({'error': 'start_time must be less than end_time'}), 400
+        if project is not None and (not isinstance(project, str) or not PROJECT_NAME_PATTERN.match(project)):
+            return jsonify({'error': "project must be 1-64 characters of letters, digits, '-' or '_'"}), 400
+        if translation_backend is not None and translation_backend not in TRANSLATION_BACKEND_NAMES:
+            return jsonify({'error': f"translation_backend must be one of: {', '.join(TRANSLATION_BACKEND_NAMES)}"}), 400
+        if tts_backend is not None and tts_backend not in TTS_BACKEND_NAMES:
+            return jsonify({'error': f"tts_backend must be one of: {', '.join(TTS_BACKEND_NAMES)}"}), 400
+        if asr_backend is not None and asr_backend not in ASR_BACKEND_NAMES:
+            return jsonify({'error': f"asr_backend must be one of: {', '.join(ASR_BACKEND_NAMES)}"}), 400
+        if not isinstance(profile, bool):
+            return jsonify({'error': 'profile must be a boolean'}), 400
+        if progressive is not None and not isinstance(progressive, bool):
+            return jsonify({'error': 'progressive must be a boolean'}), 400
         
         # Generate unique job ID
         job_id = str(uuid.uuid4())
@@ -89,14 +142,24 @@ def create_dub_job():
             source_language=source_language,
             start_time=start_time,
             end_time=end_time,
-            use_voice_cloning=use_voice_cloning
+            use_voice_cloning=use_voice_cloning,
+            project=project,
+            translation_backend=translation_backend,
+            tts_backend=tts_backend,
+            asr_backend=asr_backend,
+            profile=profile,
+            progressive=progressive
         )
         
-        return jsonify({
+        response = {
             'job_id': job_id,
             'status': 'queued',
             'message': 'Dubbing job created successfully'
-        }), 202
+        }
+        if job.get('attached_to'):
+            # Same request as a job still running: this one shares its work
+            response['attached_to'] = job['attached_to']
+        return jsonify(response), 202
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -122,8 +185,214 @@ def get_dub_status(job_id):
     if job['status'] == 'completed' and 'output_file' in job:
         response['video_url'] = f'/api/download/{job_id}'
     
+    if job.get('trace_id'):
+        response['trace_id'] = job['trace_id']
+    
+    # Identical request submitted while another job was running it
+    if job.get('attached_to'):
+        response['attached_to'] = job['attached_to']
+    
+    # Progressive jobs are watchable as soon as the first region is dubbed
+    if job.get('regions_ready'):
+        response['playlist_url'] = f'/api/dub/{job_id}/hls/{PLAYLIST_NAME}'
+        response['regions_ready'] = job['regions_ready']
+        response['regions_total'] = job.get('regions_total')
+    
     return jsonify(response), 200
 
+def _event_payload(event, job_id=None):
+    """
+    Client view of a job event (adds the video URL to completion and region events)
+    
+    job_id names the job the client asked about when the event was
+    published by the identical job it is attached to.
+    """
+    job_id = job_id or event['job_id']
+    payload = dict(event['data'], job_id=job_id, event_id=event['id'])
+    if event['type'] == 'completed':
+        payload['video_url'] = f"/api/download/{job_id}"
+    elif event['type'] == 'region':
+        payload['playlist_url'] = f"/api/dub/{job_id}/hls/{PLAYLIST_NAME}"
+    return payload
+
+def _format_sse(event, job_id=None):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(_event_payload(event, job_id))}\n\n"
+
+@app.route('/api/dub/<job_id>/events', methods=['GET'])
+def stream_dub_events(job_id):
+    """
+    Push job progress as Server-Sent Events
+    
+    Events: progress (stage transitions), segment (synthesis progress),
+    region (a progressive region is playable), then completed or failed, after which the stream ends. Reconnecting
+    clients resume after their Last-Event-ID.
+    
+    With ?after=<event id> the endpoint long-polls instead and returns
+    {"events": [...], "last_event_id": N} as soon as there is a newer event,
+    or an empty list after ?timeout= seconds (default and max 25).
+    """
+    job = job_manager.get_job(job_id)
+    
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    bus = get_event_bus()
+    # Attached jobs follow the events of the job that runs for them
+    source_id = job.get('attached_to') or job_id
+    
+    if 'after' in request.args:
+        try:
+            after = int(request.args['after'])
+            timeout = min(max(float(request.args.get('timeout', 25)), 0), 25)
+        except ValueError:
+            return jsonify({'error': 'after and timeout must be numbers'}), 400
+        
+        events = bus.wait(source_id, after, timeout)
+        return jsonify({
+            'job_id': job_id,
+            'events': [dict(_event_payload(event, job_id), type=event['type']) for event in events],
+            'last_event_id': events[-1]['id'] if events else after
+        }), 200
+    
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    after = int(last_event_id) if last_event_id.isdigit() else None
+    
+    def stream():
+        nonlocal after
+        if after is None:
+            # New subscriber: start from the current state rather than the full history
+            last = bus.last_event(source_id)
+            if last is not None and last['type'] in TERMINAL_EVENTS:
+                yield _format_sse(last, job_id)
+                return
+            current = job_manager.get_job(job_id) or job
+            after = last['id'] if last else 0
+            yield _format_sse({
+                'id': after,
+                'type': current['status'] if current['status'] in TERMINAL_EVENTS else 'progress',
+                'job_id': job_id,
+                'data': {
+                    'status': current['status'],
+                    'progress': current.get('progress', 0),
+                    'message': current.get('message', ''),
+                    'stage': current.get('stage')
+                }
+            })
+            if current['status'] in TERMINAL_EVENTS:
+                return
+        
+        while True:
+            events = bus.wait(source_id, after, timeout=15)
+            if not events:
+                if job_manager.get_job(job_id) is None:
+                    return
+                # Comment line keeps proxies from closing an idle stream
+                yield ': keep-alive\n\n'
+                continue
+            for event in events:
+                after = event['id']
+                yield _format_sse(event, job_id)
+                if event['type'] in TERMINAL_EVENTS:
+                    return
+    
+    return Response(stream_with_context(stream()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/dub/<job_id>/hls/<name>', methods=['GET'])
+def get_dub_hls(job_id, name):
+    """
+    Serve a progressive job's HLS playlist and MPEG-TS segments
+    
+    The playlist is an EVENT playlist that grows while the job runs, so it
+    must not be cached; segments never change once listed.
+    """
+    job = job_manager.get_job(job_id)
+    
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    if name != PLAYLIST_NAME and not SEGMENT_NAME_PATTERN.match(name):
+        return jsonify({'error': 'Invalid HLS file name'}), 400
+    
+    path = os.path.join(hls_dir(job.get('attached_to') or job_id, app.config['OUTPUT_FOLDER']), name)
+    if not job.get('regions_ready') or not os.path.exists(path):
+        return jsonify({'error': 'Not available yet'}), 404
+    
+    if name == PLAYLIST_NAME:
+        response = send_file(os.path.abspath(path), mimetype='application/vnd.apple.mpegurl', max_age=0)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return _send_output_file(path, mimetype='video/mp2t', max_age=3600)
+
+@app.route('/api/dub/<job_id>/profile', methods=['GET'])
+def get_dub_profile(job_id):
+    """
+    Download a job's sampling profile (collapsed stacks for flamegraph.pl or speedscope)
+    """
+    job = job_manager.get_job(job_id)
+    
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    profile_file = job.get('profile_file')
+    if not profile_file or not os.path.exists(profile_file):
+        if job['status'] in ('queued', 'processing') and job.get('profile'):
+            return jsonify({'error': 'Profile not ready yet'}), 409
+        return jsonify({'error': 'No profile recorded for this job'}), 404
+    
+    return send_file(
+        os.path.abspath(profile_file),
+        mimetype='text/plain',
+        as_attachment=True,
+        download_name=f'{job_id}.folded'
+    )
+
+def _send_output_file(path, mimetype, as_attachment=False, download_name=None, max_age=None):
+    """
+    Serve a file from the output folder with Range and ETag support
+    
+    With X_ACCEL_REDIRECT_PREFIX set, only headers are returned and the
+    front proxy streams the file (ranges, conditional requests, sendfile),
+    so no worker is held for the transfer. Otherwise send_file answers
+    If-None-Match/If-Range/Range itself and passes the file to the WSGI
+    server's file wrapper, which uses sendfile(2) where the server supports it.
+    
+    Args:
+        path: File path
+        mimetype: Content type
+        as_attachment: Send Content-Disposition: attachment
+        download_name: File name for Content-Disposition
+        max_age: Cache lifetime in seconds (None for revalidation on every use)
+        
+    Returns:
+        Response: Flask response
+    """
+    path = os.path.abspath(path)
+    prefix = app.config['X_ACCEL_REDIRECT_PREFIX']
+    if prefix:
+        relative = os.path.relpath(path, os.path.abspath(app.config['OUTPUT_FOLDER']))
+        if not relative.startswith('..'):
+            response = Response(status=200, content_type=mimetype)
+            response.headers['X-Accel-Redirect'] = f"{prefix.rstrip('/')}/{quote(relative.replace(os.sep, '/'))}"
+            if download_name:
+                disposition = 'attachment' if as_attachment else 'inline'
+                response.headers['Content-Disposition'] = f'{disposition}; filename="{download_name}"'
+            if max_age is not None:
+                response.headers['Cache-Control'] = f'public, max-age={max_age}'
+            return response
+    
+    return send_file(
+        path,
+        mimetype=mimetype,
+        as_attachment=as_attachment,
+        download_name=download_name,
+        conditional=True,
+        etag=True,
+        max_age=max_age
+    )
+
 @app.route('/api/download/<job_id>', methods=['GET'])
 def download_video(job_id):
     """
@@ -145,7 +414,8 @@ def download_video(job_id):
     if not os.path.exists(output_path):
         return jsonify({'error': 'Output file does not exist'}), 404
     
-    return send_file(
+    # Players seek with Range requests; the ETag lets resumed downloads use If-Range
+    return _send_output_file(
         output_path,
         mimetype='video/mp4',
         as_attachment=True,
@@ -162,6 +432,60 @@ def list_jobs():
         'jobs': jobs
     }), 200
 
+@app.route('/api/workers', methods=['GET'])
+def list_workers():
+    """
+    List the pipeline workers that are alive (queue mode; empty when jobs run in-process)
+    """
+    return jsonify({
+        'workers': job_manager.get_workers()
+    }), 200
+
+@app.route('/api/glossary/<project>', methods=['GET'])
+def get_glossary(project):
+    """
+    Get a project's glossary
+    """
+    if not PROJECT_NAME_PATTERN.match(project):
+        return jsonify({'error': 'Invalid project name'}), 400
+    
+    terms = read_glossary_terms(project)
+    if terms is None:
+        return jsonify({'error': 'Glossary not found'}), 404
+    
+    return jsonify({
+        'project': project,
+        'terms': terms
+    }), 200
+
+@app.route('/api/glossary/<project>', methods=['PUT'])
+def put_glossary(project):
+    """
+    Create or replace a project's glossary
+    Expected JSON body:
+    {
+        "terms": [
+            {"source": "Acme Cloud", "translations": {"es": "Acme Cloud", "fr": "le cloud Acme"}}
+        ]
+    }
+    """
+    if not PROJECT_NAME_PATTERN.match(project):
+        return jsonify({'error': 'Invalid project name'}), 400
+    
+    data = request.get_json()
+    if not data or not isinstance(data.get('terms'), list):
+        return jsonify({'error': 'terms must be a list'}), 400
+    
+    try:
+        glossary = save_glossary(project, [term for term in data['terms'] if isinstance(term, dict)])
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    return jsonify({
+        'project': project,
+        'terms': len(glossary)
+    }), 200
+
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
     debug = os.getenv('FLASK_DEBUG', 'True') == 'True'
@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+Pipeline benchmark: runs DubbingPipeline over a corpus of clips offline
+
+External APIs are served from recorded fixtures (services/api_replay.py),
+translation uses the stub backend and speech the tone backend, so runs need
+no network and measure the pipeline itself: per-stage p50/p95, real-time
+factor, peak RSS, subprocess count and jobs/hour at several concurrency
+levels. Results are written as JSON and can be compared between commits.
+
+Corpus file:
+    {
+        "target_language": "es",
+        "clips": [
+            {"name": "interview-30s", "youtube_url": "https://www.youtube.com/watch?v=...",
+             "start_time": 0, "end_time": 30, "speakers": 2}
+        ]
+    }
+
+Usage:
+    python benchmark.py corpus.json --record                 # capture fixtures once (live APIs)
+    python benchmark.py corpus.json -o results.json          # replay at 1, 2, 4 and 8 concurrent jobs
+    python benchmark.py corpus.json --compare baseline.json  # show the change against earlier results
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+RESULTS_VERSION = 1
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of a list of numbers (None if empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(values):
+    """p50/p95/mean of a list of numbers"""
+    if not values:
+        return {'p50': None, 'p95': None, 'mean': None}
+    return {
+        'p50': round(percentile(values, 50), 4),
+        'p95': round(percentile(values, 95), 4),
+        'mean': round(sum(values) / len(values), 4)
+    }
+
+
+class SubprocessCounter:
+    """Counts every subprocess started in this process (ffmpeg, demucs, piper, ...)"""
+
+    def __init__(self):
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def install(self):
+        original_init = subprocess.Popen.__init__
+        counter = self
+
+        def counting_init(popen, *args, **kwargs):
+            with counter.lock:
+                counter.count += 1
+            original_init(popen, *args, **kwargs)
+
+        subprocess.Popen.__init__ = counting_init
+
+    def value(self):
+        with self.lock:
+            return self.count
+
+
+class RSSSampler:
+    """
+    Samples the resident memory of this process plus all its descendants
+
+    Subprocesses such as demucs are a large part of the footprint, so the
+    process's own peak RSS alone would understate it. Uses /proc; elsewhere
+    falls back to getrusage peaks.
+    """
+
+    PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak_bytes = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.available = os.path.exists('/proc/self/stat')
+
+    def _tree_rss(self):
+        processes = {}
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/stat', 'r') as f:
+                    fields = f.read().rsplit(')', 1)[1].split()
+            except (OSError, IndexError):
+                continue
+            processes[int(entry)] = (int(fields[1]), int(fields[21]) * self.PAGE_SIZE)
+
+        total = 0
+        pending = [os.getpid()]
+        while pending:
+            pid = pending.pop()
+            total += processes.get(pid, (0, 0))[1]
+            pending.extend(child for child, (ppid, _) in processes.items() if ppid == pid)
+        return total
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.peak_bytes = max(self.peak_bytes, self._tree_rss())
+
+    def start(self):
+        if self.available:
+            self.peak_bytes = self._tree_rss()
+            self.thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        """
+        Stop sampling
+
+        Returns:
+            float: Peak RSS in MB
+        """
+        if self.thread:
+            self.stop_event.set()
+            self.thread.join()
+            return round(self.peak_bytes / (1024 * 1024), 1)
+
+        # ru_maxrss is in KB on Linux and bytes on macOS
+        unit = 1 if sys.platform == 'darwin' else 1024
+        peak = max(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        )
+        return round(peak * unit / (1024 * 1024), 1)
+
+
+def load_corpus(path):
+    """
+    Read and validate a corpus file
+
+    Returns:
+        tuple: (clips, default target language)
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        corpus = json.load(f)
+
+    clips = corpus.get('clips', [])
+    if not clips:
+        raise ValueError(f"Corpus {path} has no clips")
+    for index, clip in enumerate(clips):
+        if 'youtube_url' not in clip:
+            raise ValueError(f"Clip {index} in {path} has no youtube_url")
+        clip.setdefault('name', f"clip-{index}")
+
+    return clips, corpus.get('target_language', 'es')
+
+
+def run_job(clip, target_language, args, job_id):
+    """
+    Run one pipeline job
+
+    Returns:
+        dict: Per-job record
+    """
+    from services.pipeline import DubbingPipeline
+
+    record = {
+        'clip': clip['name'],
+        'speakers': clip.get('speakers'),
+        'job_id': job_id,
+        'status': 'failed'
+    }
+    pipeline = None
+    try:
+        pipeline = DubbingPipeline(
+            job_id=job_id,
+            youtube_url=clip['youtube_url'],
+            target_language=clip.get('target_language', target_language),
+            source_language=clip.get('source_language', 'en'),
+            start_time=clip.get('start_time'),
+            end_time=clip.get('end_time'),
+            use_voice_cloning=clip.get('use_voice_cloning', False),
+            translation_backend=args.translation_backend,
+            tts_backend=args.tts_backend,
+            asr_backend=args.asr_backend,
+            use_cache=args.warm_cache
+        )
+        result = pipeline.run()
+
+        media_duration = result.get('media_duration') or 0
+        record.update({
+            'status': 'completed',
+            'total_time': round(result['total_time'], 4),
+            'media_duration': media_duration,
+            'rtf': round(result['total_time'] / media_duration, 4) if media_duration else None,
+            'segments': result['segments_count'],
+            'stage_timings': {stage: round(seconds, 4) for stage, seconds in result['stage_timings'].items()}
+        })
+    except Exception as e:
+        record['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        if pipeline is not None:
+            with contextlib.suppress(Exception):
+                pipeline.cleanup()
+                if pipeline.output_video_path and os.path.exists(pipeline.output_video_path):
+                    os.remove(pipeline.output_video_path)
+    return record
+
+
+def run_level(clips, target_language, args, concurrency, counter):
+    """
+    Run a batch of jobs at a fixed concurrency
+
+    Returns:
+        tuple: (level summary, per-job records)
+    """
+    job_count = args.jobs or max(len(clips), 2 * concurrency)
+    jobs = [clips[i % len(clips)] for i in range(job_count)]
+
+    sampler = RSSSampler()
+    subprocesses_before = counter.value()
+    sampler.start()
+    start = time.time()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [
+            executor.submit(run_job, clip, target_language, args, f"bench-c{concurrency}-{i}-{uuid.uuid4().hex[:8]}")
+            for i, clip in enumerate(jobs)
+        ]
+        records = [future.result() for future in futures]
+
+    wall_time = time.time() - start
+    peak_rss_mb = sampler.stop()
+    subprocesses = counter.value() - subprocesses_before
+
+    completed = [r for r in records if r['status'] == 'completed']
+    stages = sorted({stage for r in completed for stage in r['stage_timings']})
+    for record in records:
+        record['concurrency'] = concurrency
+
+    summary = {
+        'concurrency': concurrency,
+        'jobs': len(records),
+        'completed': len(completed),
+        'failed': len(records) - len(completed),
+        'wall_time': round(wall_time, 3),
+        'jobs_per_hour': round(len(completed) / wall_time * 3600, 2) if wall_time else None,
+        'total_time': summarize([r['total_time'] for r in completed]),
+        'rtf': summarize([r['rtf'] for r in completed if r['rtf'] is not None]),
+        'stages': {
+            stage: summarize([r['stage_timings'][stage] for r in completed if stage in r['stage_timings']])
+            for stage in stages
+        },
+        'peak_rss_mb': peak_rss_mb,
+        'subprocesses': subprocesses,
+        'subprocesses_per_job': round(subprocesses / len(records), 2) if records else None
+    }
+    return summary, records
+
+
+def git_commit():
+    """Current commit of the checkout, if any"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def print_report(results, out=sys.stdout):
+    """Human-readable summary of benchmark results"""
+    print(f"\nBenchmark {results.get('label') or ''} (commit {results.get('commit')})", file=out)
+    print(f"{'─'*80}", file=out)
+    print(f"{'jobs':>6} {'conc':>5} {'ok':>4} {'jobs/h':>9} {'p50 s':>8} {'p95 s':>8} {'RTF p50':>8} {'RSS MB':>8} {'procs':>6}", file=out)
+    for level in results['levels']:
+        print(
+            f"{level['jobs']:>6} {level['concurrency']:>5} {level['completed']:>4} "
+            f"{level['jobs_per_hour'] or 0:>9.1f} {level['total_time']['p50'] or 0:>8.2f} "
+            f"{level['total_time']['p95'] or 0:>8.2f} {level['rtf']['p50'] or 0:>8.2f} "
+            f"{level['peak_rss_mb']:>8.1f} {level['subprocesses']:>6}",
+            file=out
+        )
+
+    for level in results['levels']:
+        print(f"\nStages at concurrency {level['concurrency']} (p50 / p95 seconds):", file=out)
+        for stage, stats in level['stages'].items():
+            print(f"   {stage:<22} {stats['p50']:>8.2f} / {stats['p95']:>8.2f}", file=out)
+
+    errors = sorted({r['error'] for r in results['jobs'] if r.get('error')})
+    if errors:
+        print(f"\nErrors:", file=out)
+        for error in errors:
+            print(f"   ❌ {error}", file=out)
+
+
+def print_comparison(results, baseline, out=sys.stdout):
+    """Change of each level's throughput and latency against a baseline result file"""
+
+    def change(new, old):
+        if not new or not old:
+            return '     n/a'
+        return f"{(new - old) / old * 100:>+7.1f}%"
+
+    print(f"\nComparison with {baseline.get('label') or 'baseline'} (commit {baseline.get('commit')})", file=out)
+    print(f"{'─'*80}", file=out)
+    baseline_levels = {level['concurrency']: level for level in baseline.get('levels', [])}
+    for level in results['levels']:
+        old = baseline_levels.get(level['concurrency'])
+        if not old:
+            continue
+        print(
+            f"   concurrency {level['concurrency']}: jobs/h {change(level['jobs_per_hour'], old['jobs_per_hour'])}, "
+            f"p50 {change(level['total_time']['p50'], old['total_time']['p50'])}, "
+            f"p95 {change(level['total_time']['p95'], old['total_time']['p95'])}, "
+            f"RSS {change(level['peak_rss_mb'], old['peak_rss_mb'])}",
+            file=out
+        )
+        for stage, stats in level['stages'].items():
+            old_stats = old['stages'].get(stage)
+            if old_stats:
+                print(f"      {stage:<22} p50 {change(stats['p50'], old_stats['p50'])}", file=out)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dubbing pipeline offline over a corpus of clips")
+    parser.add_argument('corpus', help="Corpus JSON file")
+    parser.add_argument('-o', '--output', default='benchmark_results.json', help="Where to write the JSON results")
+    parser.add_argument('--label', help="Free-form label stored with the results")
+    parser.add_argument('--concurrency', default='1,2,4,8', help="Comma separated concurrency levels")
+    parser.add_argument('--jobs', type=int, help="Jobs per level (default: max(clips, 2 x concurrency))")
+    parser.add_argument('--record', action='store_true', help="Run each clip once against the live APIs and store fixtures")
+    parser.add_argument('--fixtures', default='fixtures', help="Fixture directory")
+    parser.add_argument('--latency', default=os.getenv('API_REPLAY_LATENCY', ''),
+                        help='Per-service latency models, e.g. "deepgram=fixed:4,download=none" (default: as recorded)')
+    parser.add_argument('--latency-scale', type=float, default=1.0, help="Multiplier for replayed latencies")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for sampled latencies")
+    parser.add_argument('--translation-backend', default='stub', help="Translation backend (default: stub)")
+    parser.add_argument('--tts-backend', default='tone', help="TTS backend (default: tone)")
+    parser.add_argument('--asr-backend', help="ASR backend (default: replayed Deepgram)")
+    parser.add_argument('--warm-cache', action='store_true', help="Keep the transcription/translation caches enabled")
+    parser.add_argument('--workdir', help="Scratch directory for temp files (default: a new temporary directory)")
+    parser.add_argument('--compare', help="Earlier results file to compare against")
+    parser.add_argument('--verbose', action='store_true', help="Show pipeline logs")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    load_dotenv()
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format='%(asctime)s [%(levelname)s] %(name)s: %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from services.api_replay import configure_api_replay, parse_latencies
+
+    clips, target_language = load_corpus(args.corpus)
+    levels = [int(level) for level in args.concurrency.split(',') if level.strip()]
+    output_path = os.path.abspath(args.output)
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    replay = configure_api_replay(
+        mode='record' if args.record else 'replay',
+        fixture_dir=os.path.abspath(args.fixtures),
+        latencies=parse_latencies(args.latency),
+        scale=args.latency_scale,
+        seed=args.seed
+    )
+
+    results = {
+        'version': RESULTS_VERSION,
+        'label': args.label,
+        'commit': git_commit(),
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'machine': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        },
+        'options': {
+            'translation_backend': args.translation_backend,
+            'tts_backend': args.tts_backend,
+            'asr_backend': args.asr_backend,
+            'latency': args.latency,
+            'latency_scale': args.latency_scale,
+            'seed': args.seed,
+            'warm_cache': args.warm_cache
+        },
+        'corpus': clips,
+        'levels': [],
+        'jobs': []
+    }
+
+    # Pipelines write temp/, cache/ and outputs/ relative to the working directory
+    workdir = args.workdir or tempfile.mkdtemp(prefix='autodub-bench-')
+    Path(workdir).mkdir(parents=True, exist_ok=True)
+    original_cwd = os.getcwd()
+    os.chdir(workdir)
+
+    counter = SubprocessCounter()
+    counter.install()
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, 'w'))
+
+    try:
+        with quiet:
+            if args.record:
+                for index, clip in enumerate(clips):
+                    record = run_job(clip, target_language, args, f"record-{index}-{uuid.uuid4().hex[:8]}")
+                    results['jobs'].append(record)
+                    print(f"{'✅' if record['status'] == 'completed' else '❌'} recorded {clip['name']}", file=sys.stderr)
+            else:
+                for concurrency in levels:
+                    print(f"⏱️  Running concurrency {concurrency}...", file=sys.stderr)
+                    summary, records = run_level(clips, target_language, args, concurrency, counter)
+                    results['levels'].append(summary)
+                    results['jobs'].extend(records)
+    finally:
+        os.chdir(original_cwd)
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    results['replay'] = replay.get_stats()
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.record:
+        failed = [r for r in results['jobs'] if r['status'] != 'completed']
+        print(f"\nRecorded {replay.get_stats()['recorded']} responses into {os.path.abspath(args.fixtures)}")
+        for record in failed:
+            print(f"   ❌ {record['clip']}: {record['error']}")
+        return 1 if failed else 0
+
+    print_report(results)
+    if baseline:
+        print_comparison(results, baseline)
+    print(f"\nResults written to {output_path}")
+    return 0 if all(level['failed'] == 0 for level in results['levels']) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,30 @@
+"""
+gunicorn settings for the production serving mode
+
+    gunicorn -c gunicorn.conf.py app:app     # HTTP API, enqueues only
+    python worker.py                         # pipeline worker processes
+
+API processes only validate requests, enqueue jobs in the shared job store
+and read status back, so several of them can serve one queue.
+"""
+
+import multiprocessing
+import os
+
+# Jobs must outlive any single API process: run them in worker.py processes
+os.environ.setdefault('JOB_EXECUTION', 'queue')
+
+bind = f"0.0.0.0:{os.getenv('PORT', 5000)}"
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+
+# SSE streams and long-polls hold a connection each: serve them from threads
+worker_class = 'gthread'
+threads = int(os.getenv('WEB_THREADS', 16))
+timeout = 120
+graceful_timeout = 30
+
+# Each API process starts its own job event follower thread after the fork
+preload_app = False
+
+accesslog = '-'
+errorlog = '-'
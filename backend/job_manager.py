@@ -1,17 +1,54 @@
+import json
+import os
+import shutil
+import socket
 import threading
+import time
+import logging
 from services.pipeline import DubbingPipeline
+from services.metrics import get_metrics, JOBS_CREATED, JOBS_DEDUPLICATED, JOBS_FINISHED, JOB_DURATION, STAGE_DURATION
+from services.profiler import get_profiler, JobThread
+from services.events import get_event_bus
+from services.job_store import get_job_store
+from services.single_flight import normalize_video_url
+
+logger = logging.getLogger(__name__)
 
 class JobManager:
     """
     Manages dubbing jobs and their execution
-    Uses threading for async processing
+    
+    JOB_EXECUTION=inline (default) runs each job on a thread of the API
+    process. JOB_EXECUTION=queue only enqueues jobs in the shared job store
+    (services/job_store.py); pipeline workers (worker.py, on any number of
+    hosts) claim them under a lease, and API nodes read status and events
+    back from the store.
+    
+    A job identical to one still queued or running (same video, languages,
+    range and settings) is not run again: it is attached to that job,
+    mirrors its progress and gets its own output file when it completes.
     """
     
     def __init__(self):
         self.jobs = {}
         self.lock = threading.Lock()
+        self.store = get_job_store() if os.getenv('JOB_EXECUTION', 'inline') == 'queue' else None
+        self.follower = None
+        
+        # Queue mode workers: lease on the running job, renewed by heartbeats
+        self.worker_id = None
+        self.lease_seconds = float(os.getenv('JOB_LEASE_SECONDS', 60))
+        self.max_attempts = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+        self.lost_jobs = set()
+        self.deduplicate = os.getenv('JOB_DEDUPLICATION', 'True') == 'True'
+        get_metrics().add_collector(self._collect_metrics)
+        if self.store is not None:
+            get_metrics().add_source(self._worker_metrics)
+        get_event_bus().subscribe(self._on_event)
     
-    def create_job(self, job_id, youtube_url, target_language, source_language='en', start_time=None, end_time=None, use_voice_cloning=False):
+    def create_job(self, job_id, youtube_url, target_language, source_language='en', start_time=None, end_time=None, use_voice_cloning=False,
+                   project=None, translation_backend=None, tts_backend=None, asr_backend=None, profile=False,
+                   progressive=None):
         """
         Create a new dubbing job
         
@@ -22,39 +59,79 @@ class JobManager:
             source_language: Source language code
             start_time: Optional start time in seconds
             end_time: Optional end time in seconds
+            project: Optional project name (selects the glossary)
+            translation_backend: Optional translation backend ('openai', 'local', 'stub')
+            tts_backend: Optional TTS backend ('elevenlabs', 'piper', 'tone')
+            asr_backend: Optional ASR backend ('deepgram', 'local')
+            profile: Sample the job with the profiler and keep its profile
+            progressive: Publish the dub region by region as HLS (default: PROGRESSIVE_OUTPUT env)
             
         Returns:
             dict: Job information
         """
-        import logging
-        logger = logging.getLogger(__name__)
         logger.info(f"[JOB_MANAGER] Creating job with start_time={start_time}, end_time={end_time}")
         
+        job = {
+            'job_id': job_id,
+            'youtube_url': youtube_url,
+            'target_language': target_language,
+            'source_language': source_language,
+            'start_time': start_time,
+            'end_time': end_time,
+            'use_voice_cloning': use_voice_cloning,
+            'project': project,
+            'translation_backend': translation_backend,
+            'tts_backend': tts_backend,
+            'asr_backend': asr_backend,
+            'profile': profile,
+            'progressive': progressive,
+            'dedupe_key': self._dedupe_key(youtube_url, target_language, source_language, start_time, end_time,
+                                           use_voice_cloning, project, translation_backend, tts_backend,
+                                           asr_backend, progressive),
+            'status': 'queued',
+            'progress': 0,
+            'message': 'Job queued for processing',
+            'output_file': None,
+            'error': None
+        }
+        
+        JOBS_CREATED.inc()
+        
+        # Identical request already queued or running: follow it instead of running again
+        primary = self._find_active(job['dedupe_key']) if self.deduplicate else None
+        if primary is not None:
+            job.update(
+                status='attached',
+                attached_to=primary['job_id'],
+                message=f"Attached to identical job {primary['job_id']}"
+            )
+            JOBS_DEDUPLICATED.inc()
+            logger.info(f"[JOB_MANAGER] Job {job_id} attached to identical job {primary['job_id']}")
+            if self.store is not None:
+                self.store.add(job)
+            else:
+                with self.lock:
+                    self.jobs[job_id] = job
+            return self._resolve_attached(job)
+        
+        # Queue mode: a worker process picks the job up
+        if self.store is not None:
+            self.store.add(job)
+            return job
+        
         with self.lock:
-            self.jobs[job_id] = {
-                'job_id': job_id,
-                'youtube_url': youtube_url,
-                'target_language': target_language,
-                'source_language': source_language,
-                'start_time': start_time,
-                'end_time': end_time,
-                'use_voice_cloning': use_voice_cloning,
-                'status': 'queued',
-                'progress': 0,
-                'message': 'Job queued for processing',
-                'output_file': None,
-                'error': None
-            }
+            self.jobs[job_id] = job
         
         # Start processing in background thread
         thread = threading.Thread(
             target=self._process_job,
-            args=(job_id, youtube_url, target_language, source_language, start_time, end_time, use_voice_cloning)
+            args=(job_id, youtube_url, target_language, source_language, start_time, end_time, use_voice_cloning, project, translation_backend,
+                  tts_backend, asr_backend, profile, progressive)
         )
         thread.daemon = True
         thread.start()
         
-        return self.jobs[job_id]
+        return job
     
     def get_job(self, job_id):
         """
@@ -66,8 +143,11 @@ class JobManager:
         Returns:
             dict: Job information or None
         """
+        if self.store is not None:
+            return self._resolve_attached(self.store.get(job_id))
         with self.lock:
-            return self.jobs.get(job_id)
+            job = self.jobs.get(job_id)
+        return self._resolve_attached(job)
     
     def get_all_jobs(self):
         """
@@ -76,10 +156,141 @@ class JobManager:
         Returns:
             list: List of all jobs
         """
+        if self.store is not None:
+            jobs = self.store.list()
+        else:
+            with self.lock:
+                jobs = list(self.jobs.values())
+        return [self._resolve_attached(job) for job in jobs]
+    
+    def _dedupe_key(self, youtube_url, target_language, source_language, start_time, end_time, use_voice_cloning,
+                    project, translation_backend, tts_backend, asr_backend, progressive):
+        """
+        Key of the request parameters that determine a job's output
+        
+        Returns:
+            str: Normalized request key (profiling does not change the output and is left out)
+        """
+        return json.dumps([
+            normalize_video_url(youtube_url), target_language, source_language, start_time, end_time,
+            bool(use_voice_cloning), project, translation_backend, tts_backend, asr_backend, progressive
+        ])
+    
+    def _find_active(self, dedupe_key):
+        """
+        Queued or processing job with the same request key
+        
+        Args:
+            dedupe_key: Key from _dedupe_key
+            
+        Returns:
+            dict or None: The oldest such job
+        """
+        if self.store is not None:
+            return self.store.find_active(dedupe_key)
         with self.lock:
-            return list(self.jobs.values())
+            for job in self.jobs.values():
+                if job.get('dedupe_key') == dedupe_key and job['status'] in ('queued', 'processing'):
+                    return job
+        return None
     
-    def _process_job(self, job_id, youtube_url, target_language, source_language, start_time=None, end_time=None, use_voice_cloning=False):
+    def _resolve_attached(self, job):
+        """
+        Current view of a job attached to an identical job
+        
+        While the primary job runs the attached job shows its status and
+        progress. Once it completes, the attached job gets a hard link to the
+        primary's output (its own download, independent of the primary's
+        deletion) and is completed; if the primary fails or disappears it fails.
+        
+        Args:
+            job: Job dict (returned unchanged unless it is attached)
+            
+        Returns:
+            dict: Job information
+        """
+        if job is None or job['status'] != 'attached':
+            return job
+        
+        primary_id = job['attached_to']
+        if self.store is not None:
+            primary = self.store.get(primary_id)
+        else:
+            with self.lock:
+                primary = self.jobs.get(primary_id)
+        
+        # The primary is only done once its output file is recorded
+        finished = primary is not None and (
+            primary['status'] == 'failed' or (primary['status'] == 'completed' and primary.get('output_file'))
+        )
+        if primary is not None and not finished:
+            view = {
+                field: primary.get(field)
+                for field in ('status', 'progress', 'message', 'stage', 'regions_ready', 'regions_total', 'trace_id')
+            }
+            if view['status'] == 'completed':
+                view['status'] = 'processing'
+            return dict(job, **view)
+        
+        if primary is None:
+            error = f'Job {primary_id} it was attached to was deleted'
+            fields = {'status': 'failed', 'message': f'Job failed: {error}', 'error': error}
+        elif primary['status'] == 'failed':
+            fields = {'status': 'failed', 'message': primary.get('message'), 'error': primary.get('error')}
+        else:
+            output_file = os.path.join(os.path.dirname(primary['output_file']), f"{job['job_id']}_dubbed.mp4")
+            try:
+                if not os.path.exists(output_file):
+                    try:
+                        os.link(primary['output_file'], output_file)
+                    except FileExistsError:
+                        pass
+                    except OSError:
+                        shutil.copyfile(primary['output_file'], output_file)
+                fields = {
+                    'status': 'completed',
+                    'progress': 100,
+                    'message': 'Dubbing completed successfully',
+                    'output_file': output_file,
+                    'trace_id': primary.get('trace_id'),
+                    'regions_ready': primary.get('regions_ready'),
+                    'regions_total': primary.get('regions_total')
+                }
+            except OSError as e:
+                error = f'Could not copy the output of job {primary_id}: {e}'
+                fields = {'status': 'failed', 'message': f'Job failed: {error}', 'error': error}
+        
+        if self.store is not None:
+            self.store.update(job['job_id'], fields)
+        else:
+            with self.lock:
+                if job['job_id'] in self.jobs:
+                    self.jobs[job['job_id']].update(fields)
+        logger.info(f"[JOB_MANAGER] Attached job {job['job_id']} {fields['status']} with job {primary_id}")
+        return dict(job, **fields)
+    
+    def _update_job(self, job_id, fields):
+        """
+        Update a job run by this process (and its row in the job store)
+        
+        Args:
+            job_id: Job identifier
+            fields: Dict of job fields to set
+        """
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            if job_id in self.lost_jobs:
+                return
+        # Ignored by the store if another worker has taken the job over
+        if self.store is not None and not self.store.update(job_id, fields, owner=self.worker_id):
+            logger.warning(f"[JOB_MANAGER] Update of job {job_id} rejected: lease lost")
+    
+    def _process_job(self, job_id, youtube_url, target_language, source_language, start_time=None, end_time=None, use_voice_cloning=False,
+                     project=None, translation_backend=None, tts_backend=None, asr_backend=None, profile=False,
+                     progressive=None):
         """
         Process a dubbing job in background
         
@@ -90,7 +301,19 @@ class JobManager:
             source_language: Source language code
             start_time: Optional start time in seconds
             end_time: Optional end time in seconds
+            project: Optional project name (selects the glossary)
+            translation_backend: Optional translation backend ('openai', 'local', 'stub')
+            tts_backend: Optional TTS backend ('elevenlabs', 'piper', 'tone')
+            asr_backend: Optional ASR backend ('deepgram', 'local')
+            profile: Sample the job with the profiler and keep its profile
+            progressive: Publish the dub region by region as HLS (default: PROGRESSIVE_OUTPUT env)
         """
+        job_start = time.time()
+        pipeline = None
+        profiler = get_profiler()
+        profiling = profiler.should_profile(profile)
+        if profiling:
+            profiler.start(job_id, forced=profile)
         try:
             # Create pipeline
             pipeline = DubbingPipeline(
@@ -100,53 +323,149 @@ class JobManager:
                 source_language=source_language,
                 start_time=start_time,
                 end_time=end_time,
-                use_voice_cloning=use_voice_cloning
+                use_voice_cloning=use_voice_cloning,
+                project=project,
+                translation_backend=translation_backend,
+                tts_backend=tts_backend,
+                asr_backend=asr_backend,
+                progressive=progressive
             )
             
-            # Update job status periodically
-            def update_callback():
-                with self.lock:
-                    if job_id in self.jobs:
-                        self.jobs[job_id]['status'] = pipeline.status
-                        self.jobs[job_id]['progress'] = pipeline.progress
-                        self.jobs[job_id]['message'] = pipeline.message
-            
-            # Monkey patch the update_progress method to update our job dict
-            original_update = pipeline.update_progress
-            
-            def wrapped_update(progress, status, message):
-                original_update(progress, status, message)
-                update_callback()
-            
-            pipeline.update_progress = wrapped_update
-            
-            # Run pipeline
-            result = pipeline.run()
+            # Run pipeline (worker threads inherit the job through tracing.bind)
+            with JobThread(job_id):
+                result = pipeline.run()
             
             # Update job with result
-            with self.lock:
-                if job_id in self.jobs:
-                    self.jobs[job_id].update({
-                        'status': 'completed',
-                        'progress': 100,
-                        'message': 'Dubbing completed successfully',
-                        'output_file': result['output_file']
-                    })
+            self._update_job(job_id, {
+                'status': 'completed',
+                'progress': 100,
+                'message': 'Dubbing completed successfully',
+                'output_file': result['output_file'],
+                'trace_id': result.get('trace_id')
+            })
+            
+            get_event_bus().publish(job_id, 'completed', {
+                'status': 'completed',
+                'progress': 100,
+                'message': 'Dubbing completed successfully',
+                'trace_id': result.get('trace_id')
+            })
             
             print(f"Job {job_id} completed successfully")
+            self._record_job_metrics(pipeline, 'completed', time.time() - job_start)
+            if profiling:
+                self._save_profile(job_id, time.time() - job_start)
             
         except Exception as e:
             error_msg = str(e)
             print(f"Job {job_id} failed: {error_msg}")
             
             # Update job with error
+            self._update_job(job_id, {
+                'status': 'failed',
+                'message': f'Job failed: {error_msg}',
+                'error': error_msg
+            })
+            
+            get_event_bus().publish(job_id, 'failed', {
+                'status': 'failed',
+                'message': f'Job failed: {error_msg}',
+                'error': error_msg
+            })
+            
+            self._record_job_metrics(pipeline, 'failed', time.time() - job_start)
+            if profiling:
+                self._save_profile(job_id, time.time() - job_start)
+    
+    def _on_event(self, event):
+        """
+        Keep the job table in step with pipeline progress and region events
+        
+        Args:
+            event: Event published on the job event bus
+        """
+        # Jobs of other processes (queue mode) are kept current by their worker
+        if event['type'] == 'region':
+            self._update_job(event['job_id'], {
+                'progressive': True,
+                'regions_ready': event['data']['index'] + 1,
+                'regions_total': event['data']['regions']
+            })
+        elif event['type'] == 'progress':
+            fields = {
+                'progress': event['data']['progress'],
+                'message': event['data']['message'],
+                'stage': event['data'].get('stage')
+            }
+            # Completed/failed are set by _process_job along with output_file or error
+            if event['data']['status'] not in ('completed', 'failed'):
+                fields['status'] = event['data']['status']
+            self._update_job(event['job_id'], fields)
+    
+    def _record_job_metrics(self, pipeline, status, duration):
+        """
+        Feed a finished job into the metrics registry
+        
+        Args:
+            pipeline: DubbingPipeline of the job (None if it could not be created)
+            status: 'completed' or 'failed'
+            duration: Job wall time in seconds
+        """
+        JOBS_FINISHED.inc(status=status)
+        JOB_DURATION.observe(duration, status=status)
+        if pipeline is not None:
+            for stage, seconds in pipeline.stage_timings.items():
+                STAGE_DURATION.observe(seconds, stage=stage)
+    
+    def _save_profile(self, job_id, duration):
+        """
+        Stop profiling a job and remember where its profile was saved
+        
+        Args:
+            job_id: Job identifier
+            duration: Job wall time in seconds
+        """
+        try:
+            profile_file = get_profiler().finish(job_id, duration)
+        except Exception as e:
+            print(f"Warning: Could not save profile of job {job_id}: {e}")
+            return
+        
+        if profile_file:
+            self._update_job(job_id, {'profile_file': profile_file})
+    
+    def _worker_metrics(self):
+        """
+        Metrics snapshots published by live pipeline workers (queue mode)
+        
+        Returns:
+            list: Registry snapshots, one per worker
+        """
+        # Skip this process: a worker's own registry is already rendered
+        return [
+            worker['metrics'] for worker in self.store.workers(2 * self.lease_seconds)
+            if worker.get('metrics') and worker['worker_id'] != self.worker_id
+        ]
+    
+    def _collect_metrics(self):
+        """
+        Scrape-time job gauges (queue depth and jobs per status)
+        
+        Returns:
+            list: Metric tuples for MetricsRegistry
+        """
+        counts = {'queued': 0, 'processing': 0, 'completed': 0, 'failed': 0}
+        if self.store is not None:
+            counts.update(self.store.status_counts())
+        else:
             with self.lock:
-                if job_id in self.jobs:
-                    self.jobs[job_id].update({
-                        'status': 'failed',
-                        'message': f'Job failed: {error_msg}',
-                        'error': error_msg
-                    })
+                for job in self.jobs.values():
+                    counts[job['status']] = counts.get(job['status'], 0) + 1
+        return [
+            ('autodub_jobs', 'Jobs known to this process, by status', 'gauge',
+             [({'status': status}, count) for status, count in counts.items()]),
+            ('autodub_queue_depth', 'Jobs waiting to start', 'gauge', [({}, counts['queued'])])
+        ]
     
     def delete_job(self, job_id):
         """
@@ -158,11 +477,166 @@ class JobManager:
         Returns:
             bool: True if deleted, False if not found
         """
+        if self.store is not None:
+            deleted = self.store.delete(job_id)
+            get_event_bus().discard(job_id)
+            return deleted
+        
         with self.lock:
             if job_id in self.jobs:
                 del self.jobs[job_id]
+                get_event_bus().discard(job_id)
                 return True
             return False
+    
+    def follow_events(self, interval=0.2):
+        """
+        Feed job events written by workers into this process's event bus
+        
+        Called once by API processes in queue mode, so SSE streams and
+        long-polls work as with in-process jobs, on any API node.
+        
+        Args:
+            interval: Seconds between polls of the job store
+        """
+        if self.store is None or self.follower is not None:
+            return
+        
+        def follow():
+            bus = get_event_bus()
+            cursor = None
+            while True:
+                try:
+                    events, cursor = self.store.events_after(cursor)
+                except Exception as e:
+                    logger.warning(f"[JOB_MANAGER] Could not read job events: {e}")
+                    events = []
+                for event in events:
+                    bus.ingest(event)
+                if not events:
+                    time.sleep(interval)
+        
+        self.follower = threading.Thread(target=follow, name='job-event-follower', daemon=True)
+        self.follower.start()
+    
+    def get_workers(self):
+        """
+        Workers that sent a heartbeat within the last two leases (queue mode)
+        
+        Returns:
+            list: Worker dicts (worker_id, host, pid, job_id, heartbeat_at)
+        """
+        if self.store is None:
+            return []
+        return [
+            {key: value for key, value in worker.items() if key != 'metrics'}
+            for worker in self.store.workers(2 * self.lease_seconds)
+        ]
+    
+    def run_worker(self, poll_interval=1.0):
+        """
+        Claim and run queued jobs from the job store, one at a time (worker processes)
+        
+        A heartbeat thread renews the lease of the running job every third
+        of JOB_LEASE_SECONDS and requeues jobs whose worker stopped renewing.
+        
+        Args:
+            poll_interval: Seconds to wait when the queue is empty
+        """
+        if self.store is None:
+            raise ValueError("run_worker requires JOB_EXECUTION=queue")
+        
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        bus = get_event_bus()
+        bus.subscribe(self._persist_event)
+        threading.Thread(target=self._heartbeat_loop, name='job-heartbeat', daemon=True).start()
+        logger.info(f"[JOB_MANAGER] Worker {self.worker_id} waiting for jobs")
+        
+        while True:
+            job = self.store.claim(self.worker_id, self.lease_seconds)
+            if job is None:
+                time.sleep(poll_interval)
+                continue
+            
+            job_id = job['job_id']
+            logger.info(f"[JOB_MANAGER] Worker {self.worker_id} claimed job {job_id} (attempt {job['attempts']})")
+            # A requeued job continues the event ids its previous worker published
+            bus.start_after(job_id, self.store.last_event_id(job_id))
+            with self.lock:
+                self.jobs[job_id] = job
+            try:
+                self._process_job(
+                    job_id, job['youtube_url'], job['target_language'], job['source_language'],
+                    job.get('start_time'), job.get('end_time'), job.get('use_voice_cloning', False),
+                    job.get('project'), job.get('translation_backend'), job.get('tts_backend'),
+                    job.get('asr_backend'), job.get('profile', False), job.get('progressive')
+                )
+            finally:
+                with self.lock:
+                    self.jobs.pop(job_id, None)
+                    lost = job_id in self.lost_jobs
+                    self.lost_jobs.discard(job_id)
+                bus.discard(job_id)
+                if not lost:
+                    self.store.compact_events(job_id)
+    
+    def _heartbeat_loop(self):
+        """Renew the leases of this worker's jobs, report the worker and recover expired jobs"""
+        while True:
+            with self.lock:
+                job_ids = [job_id for job_id in self.jobs if job_id not in self.lost_jobs]
+            try:
+                for job_id in job_ids:
+                    if not self.store.heartbeat(job_id, self.worker_id, self.lease_seconds):
+                        # Requeued or deleted meanwhile: stop writing to the store for this job
+                        logger.warning(f"[JOB_MANAGER] Worker {self.worker_id} lost the lease on job {job_id}")
+                        with self.lock:
+                            self.lost_jobs.add(job_id)
+                self.store.register_worker(self.worker_id, {
+                    'host': socket.gethostname(),
+                    'pid': os.getpid(),
+                    'job_id': job_ids[0] if job_ids else None,
+                    # Job, stage and API metrics of this process, summed into the API's /metrics
+                    'metrics': get_metrics().snapshot()
+                })
+                for job in self.store.requeue_expired(self.max_attempts):
+                    self._announce_recovered(job)
+            except Exception as e:
+                logger.warning(f"[JOB_MANAGER] Heartbeat failed: {e}")
+            time.sleep(self.lease_seconds / 3)
+    
+    def _announce_recovered(self, job):
+        """
+        Log the event of a job taken from a dead worker, for SSE clients on every API node
+        
+        Args:
+            job: The job as requeued or failed by the job store
+        """
+        job_id = job['job_id']
+        status = job['status']
+        logger.warning(f"[JOB_MANAGER] Job {job_id}: {job['message']}")
+        data = {'status': status, 'message': job['message']}
+        if status == 'failed':
+            data['error'] = job['error']
+        else:
+            data.update(progress=0, stage=None)
+        self.store.add_event({
+            'id': self.store.last_event_id(job_id) + 1,
+            'type': status if status == 'failed' else 'progress',
+            'job_id': job_id,
+            'time': time.time(),
+            'data': data
+        })
+        if status == 'failed':
+            self.store.compact_events(job_id)
+            JOBS_FINISHED.inc(status='failed')
+    
+    def _persist_event(self, event):
+        """Append an event of a job run by this worker to the job store"""
+        with self.lock:
+            owned = event['job_id'] in self.jobs and event['job_id'] not in self.lost_jobs
+        if owned:
+            self.store.add_event(event)
 
 # Global job manager instance
 job_manager = JobManager()
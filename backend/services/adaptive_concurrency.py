@@ -0,0 +1,78 @@
+import threading
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+class AdaptiveConcurrency:
+    """
+    Concurrency limiter that tunes its own limit from observed latency
+    and provider rate-limit headers (additive increase, multiplicative decrease)
+    """
+
+    def __init__(self, name, initial=3, minimum=1, maximum=8, window=20):
+        self.name = name
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.in_flight = 0
+        self.latencies = deque(maxlen=window)
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        """Block until a slot is available under the current limit"""
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+
+    def release(self, latency=None, headers=None, rate_limited=False):
+        """
+        Release a slot and adapt the limit
+
+        Args:
+            latency: Duration of the finished request in seconds
+            headers: Response headers (used for x-ratelimit-* hints)
+            rate_limited: True if the request was rejected with HTTP 429
+        """
+        with self.condition:
+            self.in_flight -= 1
+            previous = int(self.limit)
+
+            if rate_limited:
+                self.limit = max(self.minimum, self.limit / 2)
+            elif headers is not None and self._near_rate_limit(headers):
+                self.limit = max(self.minimum, self.limit - 1)
+            elif latency is not None:
+                baseline = self._baseline_latency()
+                self.latencies.append(latency)
+                if baseline is None or latency <= baseline * 1.5:
+                    # Roughly +1 per "round trip" of the whole window
+                    self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+                elif latency > baseline * 2:
+                    self.limit = max(self.minimum, self.limit * 0.9)
+
+            if int(self.limit) != previous:
+                logger.info(f"[CONCURRENCY] {self.name}: limit {previous} → {int(self.limit)}")
+
+            self.condition.notify_all()
+
+    def _baseline_latency(self):
+        """Median latency over the observation window"""
+        if len(self.latencies) < 3:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[len(ordered) // 2]
+
+    @staticmethod
+    def _near_rate_limit(headers, threshold=0.1):
+        """Check x-ratelimit-* headers for less than `threshold` of the quota remaining"""
+        for kind in ('requests', 'tokens'):
+            try:
+                remaining = float(headers.get(f'x-ratelimit-remaining-{kind}'))
+                limit = float(headers.get(f'x-ratelimit-limit-{kind}'))
+            except (TypeError, ValueError):
+                continue
+            if limit > 0 and remaining / limit < threshold:
+                return True
+        return False
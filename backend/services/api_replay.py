@@ -0,0 +1,384 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import shutil
+import threading
+import time
+import logging
+from pathlib import Path
+from .metrics import record_api_call
+
+logger = logging.getLogger(__name__)
+
+# off: call the real APIs; record: call them and store every response;
+# replay: serve stored responses only (no network, no API keys needed)
+REPLAY_MODES = ('off', 'record', 'replay')
+
+# Services routed through the replay layer
+REPLAY_SERVICES = ('deepgram', 'openai', 'elevenlabs', 'download')
+
+# Stand-in key so SDK clients can be constructed when replaying without credentials
+PLACEHOLDER_API_KEY = 'replay-placeholder'
+
+
+class FixtureMissing(Exception):
+    """No recorded response for a request in replay mode"""
+
+    # Not retryable (see retry.is_retryable): replaying again cannot succeed
+    status_code = 404
+
+
+class LatencyModel:
+    """
+    Latency distribution for replayed calls
+
+    Specs: "recorded" (the latency measured while recording), "none",
+    "fixed:S", "uniform:LOW:HIGH", "normal:MEAN:STD" or "lognormal:MEDIAN:SIGMA",
+    all in seconds.
+    """
+
+    KINDS = {'recorded': 0, 'none': 0, 'fixed': 1, 'uniform': 2, 'normal': 2, 'lognormal': 2}
+
+    def __init__(self, spec='recorded'):
+        kind, *params = spec.strip().split(':')
+        if kind not in self.KINDS or len(params) != self.KINDS[kind]:
+            raise ValueError(f"Invalid latency spec: {spec}")
+        self.spec = spec
+        self.kind = kind
+        self.params = [float(p) for p in params]
+
+    def sample(self, rng, recorded=0.0):
+        """
+        Draw one latency
+
+        Args:
+            rng: random.Random instance
+            recorded: Latency measured when the fixture was recorded
+
+        Returns:
+            float: Latency in seconds
+        """
+        if self.kind == 'recorded':
+            value = recorded
+        elif self.kind == 'none':
+            value = 0.0
+        elif self.kind == 'fixed':
+            value = self.params[0]
+        elif self.kind == 'uniform':
+            value = rng.uniform(*self.params)
+        elif self.kind == 'normal':
+            value = rng.gauss(*self.params)
+        else:
+            median, sigma = self.params
+            value = median * rng.lognormvariate(0, sigma)
+        return max(0.0, value)
+
+
+def parse_latencies(spec):
+    """
+    Parse per-service latency models, e.g. "openai=normal:1.2:0.3,download=fixed:5"
+
+    Args:
+        spec: Comma separated service=latency-spec pairs ("*" sets the default)
+
+    Returns:
+        dict: {service: LatencyModel}
+    """
+    latencies = {}
+    for rule in (spec or '').split(','):
+        if '=' in rule:
+            service, model = rule.split('=', 1)
+            latencies[service.strip()] = LatencyModel(model)
+    return latencies
+
+
+class ReplayedResponse:
+    """Stand-in for an SDK raw response: headers plus parse()"""
+
+    def __init__(self, headers, parsed):
+        self.headers = headers
+        self._parsed = parsed
+
+    def parse(self):
+        return self._parsed
+
+
+def encode_raw_chat_completion(raw_response):
+    """Storable form of an OpenAI with_raw_response chat completion"""
+    headers = {
+        name.lower(): value for name, value in raw_response.headers.items()
+        if name.lower().startswith('x-ratelimit-')
+    }
+    return {'headers': headers, 'body': raw_response.parse().model_dump(mode='json')}
+
+
+def decode_raw_chat_completion(payload):
+    """Rebuild a raw chat completion response from its stored form"""
+    from openai.types.chat import ChatCompletion
+
+    return ReplayedResponse(payload['headers'], ChatCompletion.model_validate(payload['body']))
+
+
+class APIReplay:
+    """
+    Record/replay layer for external API calls
+
+    In record mode every response (Deepgram JSON, chat completions, TTS MP3
+    bytes, yt-dlp downloads) is stored under the fixture directory, keyed by
+    a hash of the request. In replay mode those responses are served after a
+    simulated latency, so DubbingPipeline.run can be benchmarked end to end
+    on a machine without network access.
+    """
+
+    def __init__(self, mode='off', fixture_dir='fixtures', latencies=None, scale=1.0, seed=None):
+        if mode not in REPLAY_MODES:
+            raise ValueError(f"Unknown API replay mode: {mode}")
+        self.mode = mode
+        self.fixture_dir = Path(fixture_dir)
+        self.latencies = latencies or {}
+        self.scale = scale
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {'recorded': 0, 'replayed': 0, 'missing': 0}
+
+        if mode != 'off':
+            logger.info(f"[API_REPLAY] Mode '{mode}' with fixtures in {self.fixture_dir}")
+
+    def fixture_key(self, service, request):
+        """
+        Stable key of a request
+
+        Args:
+            service: Service name
+            request: JSON-serializable description of the request
+
+        Returns:
+            str: Hex key
+        """
+        canonical = json.dumps([service, request], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32]
+
+    def _meta_path(self, service, key):
+        return self.fixture_dir / service / f"{key}.json"
+
+    def _data_path(self, service, key):
+        return self.fixture_dir / service / f"{key}.bin"
+
+    def _delay(self, service, recorded):
+        model = self.latencies.get(service) or self.latencies.get('*') or LatencyModel()
+        with self.lock:
+            return model.sample(self.rng, recorded) * self.scale
+
+    def _count(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+    def _load(self, service, request):
+        key = self.fixture_key(service, request)
+        meta_path = self._meta_path(service, key)
+        if not meta_path.exists():
+            self._count('missing')
+            raise FixtureMissing(
+                f"No recorded {service} response for request {key}; record it first with API_REPLAY_MODE=record"
+            )
+
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('binary'):
+            with open(self._data_path(service, key), 'rb') as f:
+                payload = f.read()
+        else:
+            payload = meta['payload']
+
+        self._count('replayed')
+        return meta, payload
+
+    def _save(self, service, request, payload, latency, details=None):
+        key = self.fixture_key(service, request)
+        meta_path = self._meta_path(service, key)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+
+        binary = isinstance(payload, (bytes, bytearray))
+        meta = {
+            'service': service,
+            'request': request,
+            'details': details,
+            'latency': round(latency, 4),
+            'binary': binary,
+            'payload': None if binary else payload
+        }
+        if binary:
+            self._write_atomic(self._data_path(service, key), bytes(payload))
+        self._write_atomic(meta_path, json.dumps(meta, ensure_ascii=False, default=str).encode('utf-8'))
+
+        self._count('recorded')
+        logger.debug(f"[API_REPLAY] Recorded {service} response {key} ({latency:.2f}s)")
+
+    def _write_atomic(self, path, data):
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def call(self, service, request, fn, encode=None, decode=None, details=None):
+        """
+        Run a blocking API call through the replay layer
+
+        Args:
+            service: Service name (selects the latency model)
+            request: JSON-serializable description of the request (the fixture key)
+            fn: Performs the real call
+            encode: Optional result → storable payload (bytes or JSON-serializable)
+            decode: Optional stored payload → result
+            details: Optional request inputs stored with the fixture but left out of
+                     its key: settings learned from earlier calls (e.g. TTS speed from
+                     the voice-rate stats) differ on every run and would never match
+
+        Returns:
+            The real or replayed result
+        """
+        # Every external call passes through here, which makes it the place to count them
+        start = time.time()
+        try:
+            result = self._call(service, request, fn, encode, decode, details)
+        except Exception as e:
+            record_api_call(service, time.time() - start, e)
+            raise
+        record_api_call(service, time.time() - start)
+        return result
+
+    def _call(self, service, request, fn, encode, decode, details=None):
+        if self.mode == 'off':
+            return fn()
+
+        if self.mode == 'replay':
+            meta, payload = self._load(service, request)
+            time.sleep(self._delay(service, meta.get('latency', 0.0)))
+            return decode(payload) if decode else payload
+
+        start = time.time()
+        result = fn()
+        self._save(service, request, encode(result) if encode else result, time.time() - start, details)
+        return result
+
+    async def call_async(self, service, request, factory, encode=None, decode=None, details=None):
+        """
+        Async variant of call()
+
+        Args:
+            service: Service name (selects the latency model)
+            request: JSON-serializable description of the request (the fixture key)
+            factory: Zero-argument callable returning the coroutine of the real call
+            encode: Optional result → storable payload
+            decode: Optional stored payload → result
+            details: Optional request inputs stored with the fixture but left out of its key
+
+        Returns:
+            The real or replayed result
+        """
+        start = time.time()
+        try:
+            result = await self._call_async(service, request, factory, encode, decode, details)
+        except Exception as e:
+            record_api_call(service, time.time() - start, e)
+            raise
+        record_api_call(service, time.time() - start)
+        return result
+
+    async def _call_async(self, service, request, factory, encode, decode, details=None):
+        if self.mode == 'off':
+            return await factory()
+
+        if self.mode == 'replay':
+            meta, payload = self._load(service, request)
+            await asyncio.sleep(self._delay(service, meta.get('latency', 0.0)))
+            return decode(payload) if decode else payload
+
+        start = time.time()
+        result = await factory()
+        self._save(service, request, encode(result) if encode else result, time.time() - start, details)
+        return result
+
+    def store_file(self, service, request, path):
+        """
+        Keep a copy of a file produced by a recorded call (e.g. a download)
+
+        Args:
+            service: Service name
+            request: Request description (same as passed to call())
+            path: File to copy into the fixture directory
+        """
+        key = self.fixture_key(service, request)
+        target = self.fixture_dir / service / f"{key}.file"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(path, target)
+
+    def restore_file(self, service, request, path):
+        """
+        Copy a stored file back into place
+
+        Args:
+            service: Service name
+            request: Request description (same as passed to call())
+            path: Destination path
+        """
+        key = self.fixture_key(service, request)
+        source = self.fixture_dir / service / f"{key}.file"
+        if not source.exists():
+            raise FixtureMissing(f"No recorded {service} file for request {key}")
+        shutil.copyfile(source, path)
+
+    def api_key(self):
+        """Placeholder credential when replaying, None otherwise"""
+        return PLACEHOLDER_API_KEY if self.mode == 'replay' else None
+
+    def get_stats(self):
+        with self.lock:
+            return dict(self.stats, mode=self.mode)
+
+
+_api_replay = None
+_api_replay_lock = threading.Lock()
+
+def get_api_replay():
+    """
+    Get the process-wide replay layer
+
+    Configured from API_REPLAY_MODE (off, record or replay; default off),
+    API_REPLAY_DIR (default fixtures), API_REPLAY_LATENCY (per-service latency
+    models, e.g. "deepgram=lognormal:4:0.3,openai=normal:1.2:0.3,*=recorded"),
+    API_REPLAY_LATENCY_SCALE (default 1.0) and API_REPLAY_SEED.
+
+    Returns:
+        APIReplay: Shared instance
+    """
+    global _api_replay
+    with _api_replay_lock:
+        if _api_replay is None:
+            seed = os.getenv('API_REPLAY_SEED')
+            _api_replay = APIReplay(
+                mode=os.getenv('API_REPLAY_MODE', 'off'),
+                fixture_dir=os.getenv('API_REPLAY_DIR', 'fixtures'),
+                latencies=parse_latencies(os.getenv('API_REPLAY_LATENCY', '')),
+                scale=float(os.getenv('API_REPLAY_LATENCY_SCALE', 1.0)),
+                seed=int(seed) if seed else None
+            )
+        return _api_replay
+
+
+def configure_api_replay(**kwargs):
+    """
+    Replace the process-wide replay layer (for benchmark drivers)
+
+    Args:
+        **kwargs: APIReplay constructor arguments
+
+    Returns:
+        APIReplay: The new shared instance
+    """
+    global _api_replay
+    with _api_replay_lock:
+        _api_replay = APIReplay(**kwargs)
+        return _api_replay
@@ -0,0 +1,329 @@
+import os
+import re
+import threading
+import logging
+from abc import ABC, abstractmethod
+from .tracing import run_subprocess
+
+logger = logging.getLogger(__name__)
+
+# 'deepgram' is Transcriber's built-in path; the others implement ASRBackend
+ASR_BACKEND_NAMES = ('deepgram', 'local')
+
+# Sample rate the local engine and diarizer work at
+SAMPLE_RATE = 16000
+
+
+def load_audio(audio_path, sample_rate=SAMPLE_RATE):
+    """
+    Decode any audio file to mono float32 samples with ffmpeg
+
+    Args:
+        audio_path: Path to the audio file
+        sample_rate: Output sample rate
+
+    Returns:
+        numpy.ndarray: Samples in [-1, 1]
+    """
+    import numpy as np
+
+    result = run_subprocess(
+        [
+            'ffmpeg', '-hide_banner', '-loglevel', 'error', '-i', audio_path,
+            '-f', 's16le', '-ac', '1', '-ar', str(sample_rate), 'pipe:1'
+        ],
+        capture_output=True,
+        check=True
+    )
+    return np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+class ASRBackend(ABC):
+    """Interface for speech recognition engines"""
+
+    name = None
+
+    @abstractmethod
+    def transcribe(self, audio_path, language='en'):
+        """
+        Transcribe an audio file
+
+        The reply mimics Deepgram's prerecorded response (results → channels →
+        alternatives with transcript, words and paragraphs), so
+        Transcriber._parse_transcription produces the same segments, words
+        and speaker_count for every backend.
+
+        Args:
+            audio_path: Path to the audio file
+            language: Source language code
+
+        Returns:
+            dict: Deepgram-shaped response
+        """
+        raise NotImplementedError
+
+
+class EnergyDiarizer:
+    """
+    Lightweight speaker clustering on log-mel statistics
+
+    Each sentence gets an embedding (mean and standard deviation of its
+    log-mel bands) and joins the closest existing speaker when the cosine
+    similarity clears the threshold, otherwise it opens a new speaker.
+    Good enough to tell apart voices in interviews; no neural model needed.
+    """
+
+    def __init__(self, threshold=None, max_speakers=None, n_mels=32):
+        self.threshold = threshold or float(os.getenv('LOCAL_DIARIZATION_THRESHOLD', 0.95))
+        self.max_speakers = max_speakers or int(os.getenv('LOCAL_DIARIZATION_MAX_SPEAKERS', 4))
+        self.n_mels = n_mels
+        self._filterbank = None
+
+    def _mel_filterbank(self, n_fft):
+        import numpy as np
+
+        if self._filterbank is not None:
+            return self._filterbank
+
+        def hz_to_mel(hz):
+            return 2595 * np.log10(1 + hz / 700)
+
+        def mel_to_hz(mel):
+            return 700 * (10 ** (mel / 2595) - 1)
+
+        mel_points = np.linspace(hz_to_mel(60), hz_to_mel(SAMPLE_RATE / 2), self.n_mels + 2)
+        bins = np.floor((n_fft + 1) * mel_to_hz(mel_points) / SAMPLE_RATE).astype(int)
+
+        filterbank = np.zeros((self.n_mels, n_fft // 2 + 1))
+        for m in range(1, self.n_mels + 1):
+            left, center, right = bins[m - 1], bins[m], bins[m + 1]
+            for k in range(left, center):
+                filterbank[m - 1, k] = (k - left) / max(1, center - left)
+            for k in range(center, right):
+                filterbank[m - 1, k] = (right - k) / max(1, right - center)
+
+        self._filterbank = filterbank
+        return filterbank
+
+    def embed(self, samples):
+        """
+        Embedding of an audio span
+
+        Args:
+            samples: Mono float32 samples at SAMPLE_RATE
+
+        Returns:
+            numpy.ndarray or None: Normalized embedding, None for spans under 0.3s
+        """
+        import numpy as np
+
+        frame, hop = 400, 160  # 25ms / 10ms
+        if len(samples) < SAMPLE_RATE * 0.3:
+            return None
+
+        count = 1 + (len(samples) - frame) // hop
+        frames = np.stack([samples[i * hop:i * hop + frame] for i in range(count)]) * np.hanning(frame)
+        power = np.abs(np.fft.rfft(frames, n=512)) ** 2
+        log_mel = np.log(power @ self._mel_filterbank(512).T + 1e-10)
+
+        # Drop near-silent frames so pauses do not dominate the statistics
+        energy = log_mel.mean(axis=1)
+        voiced = log_mel[energy > np.percentile(energy, 30)]
+        if len(voiced) < 10:
+            voiced = log_mel
+
+        embedding = np.concatenate([voiced.mean(axis=0), voiced.std(axis=0)])
+        embedding -= embedding.mean()
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm else None
+
+    def assign(self, samples, spans):
+        """
+        Assign a speaker to each time span
+
+        Args:
+            samples: Mono float32 samples at SAMPLE_RATE
+            spans: List of (start, end) in seconds
+
+        Returns:
+            list: Speaker index per span
+        """
+        import numpy as np
+
+        centroids = []
+        speakers = []
+        previous = 0
+
+        for start, end in spans:
+            embedding = self.embed(samples[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)])
+            if embedding is None:
+                # Too short to judge: assume the speaker did not change
+                speakers.append(previous)
+                continue
+
+            similarities = [float(np.dot(embedding, c / np.linalg.norm(c))) for c in centroids]
+            best = int(np.argmax(similarities)) if similarities else None
+
+            if best is not None and (similarities[best] >= self.threshold or len(centroids) >= self.max_speakers):
+                centroids[best] = centroids[best] + embedding
+                speaker = best
+            else:
+                centroids.append(embedding.copy())
+                speaker = len(centroids) - 1
+
+            speakers.append(speaker)
+            previous = speaker
+
+        return speakers
+
+
+class FasterWhisperASRBackend(ASRBackend):
+    """
+    Local CPU transcription with faster-whisper (CTranslate2, int8)
+
+    Requires the optional faster-whisper package. The model is loaded once
+    and shared by all jobs; calls are serialized because CTranslate2 already
+    uses every CPU core for one transcription.
+    """
+
+    name = 'local'
+
+    def __init__(self, model_size=None, compute_type=None):
+        self.model_size = model_size or os.getenv('LOCAL_ASR_MODEL', 'small')
+        self.compute_type = compute_type or os.getenv('LOCAL_ASR_COMPUTE_TYPE', 'int8')
+        self.model = None
+        self.lock = threading.Lock()
+        self.diarizer = EnergyDiarizer()
+
+    def _load(self):
+        if self.model is None:
+            from faster_whisper import WhisperModel
+
+            logger.info(f"[ASR_BACKEND] Loading faster-whisper '{self.model_size}' ({self.compute_type})")
+            self.model = WhisperModel(self.model_size, device='cpu', compute_type=self.compute_type)
+        return self.model
+
+    def transcribe(self, audio_path, language='en'):
+        samples = load_audio(audio_path)
+
+        with self.lock:
+            model = self._load()
+            segments, _ = model.transcribe(
+                samples,
+                language=language,
+                word_timestamps=True,
+                vad_filter=True,
+                beam_size=1
+            )
+            # The segment generator does the decoding lazily: consume it under the lock
+            sentences = [
+                {
+                    'text': segment.text.strip(),
+                    'start': round(segment.start, 3),
+                    'end': round(segment.end, 3),
+                    'words': list(segment.words or [])
+                }
+                for segment in segments
+                if segment.text.strip()
+            ]
+
+        speakers = self.diarizer.assign(samples, [(s['start'], s['end']) for s in sentences])
+        return self._to_deepgram_response(sentences, speakers)
+
+    def _to_deepgram_response(self, sentences, speakers):
+        """Shape whisper output like a Deepgram prerecorded response"""
+        words = []
+        paragraphs = []
+
+        for sentence, speaker in zip(sentences, speakers):
+            for word in sentence['words']:
+                punctuated = word.word.strip()
+                if not punctuated:
+                    continue
+                words.append({
+                    'word': re.sub(r"[^\w']", '', punctuated).lower() or punctuated,
+                    'punctuated_word': punctuated,
+                    'start': round(word.start, 3),
+                    'end': round(word.end, 3),
+                    'confidence': round(word.probability, 3),
+                    'speaker': speaker
+                })
+
+            # A new paragraph starts on every speaker turn
+            entry = {'text': sentence['text'], 'start': sentence['start'], 'end': sentence['end']}
+            if paragraphs and paragraphs[-1]['speaker'] == speaker:
+                paragraphs[-1]['sentences'].append(entry)
+                paragraphs[-1]['end'] = sentence['end']
+            else:
+                paragraphs.append({
+                    'sentences': [entry],
+                    'speaker': speaker,
+                    'start': sentence['start'],
+                    'end': sentence['end']
+                })
+
+        transcript = ' '.join(sentence['text'] for sentence in sentences)
+        return {
+            'results': {
+                'channels': [{
+                    'alternatives': [{
+                        'transcript': transcript,
+                        'words': words,
+                        'paragraphs': {'transcript': transcript, 'paragraphs': paragraphs}
+                    }]
+                }]
+            }
+        }
+
+
+_BACKEND_CLASSES = {
+    'local': FasterWhisperASRBackend
+}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+def get_asr_backend(name):
+    """
+    Get the process-wide instance of an ASR backend
+
+    Args:
+        name: Backend name ('local')
+
+    Returns:
+        ASRBackend: Shared backend instance
+    """
+    if name not in _BACKEND_CLASSES:
+        raise ValueError(f"Unknown ASR backend: {name}")
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = _BACKEND_CLASSES[name]()
+        return _backends[name]
+
+
+def select_asr_backend(requested=None, start_time=None, end_time=None):
+    """
+    Pick the ASR backend for a job
+
+    A backend requested by the job wins. Otherwise clips no longer than
+    LOCAL_ASR_MAX_SECONDS (default 0 = disabled) are transcribed locally,
+    and everything else uses ASR_BACKEND (default: deepgram).
+
+    Args:
+        requested: Optional backend name from the job request
+        start_time: Optional clip start in seconds
+        end_time: Optional clip end in seconds
+
+    Returns:
+        str: Backend name
+    """
+    if requested:
+        if requested not in ASR_BACKEND_NAMES:
+            raise ValueError(f"Unknown ASR backend: {requested}")
+        return requested
+
+    local_max_seconds = float(os.getenv('LOCAL_ASR_MAX_SECONDS', 0))
+    if local_max_seconds and end_time is not None and end_time - (start_time or 0) <= local_max_seconds:
+        return 'local'
+
+    return os.getenv('ASR_BACKEND', 'deepgram')
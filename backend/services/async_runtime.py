@@ -0,0 +1,129 @@
+import asyncio
+import threading
+import logging
+import os
+import httpx
+from .tracing import bind_coroutine
+
+logger = logging.getLogger(__name__)
+
+# Default cap on concurrent in-flight requests per provider, across all jobs
+DEFAULT_MAX_IN_FLIGHT = {
+    'openai': 128,
+    'elevenlabs': 64
+}
+
+class AsyncRuntime:
+    """
+    Process-wide asyncio event loop running in a background thread
+
+    All jobs submit their API coroutines here, so a single loop and a single
+    pooled HTTP session drive every in-flight request instead of one blocking
+    thread per request. Client, session and semaphore accessors must only be
+    called from coroutines running on this loop.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get(cls):
+        """
+        Get (and lazily start) the shared runtime
+
+        Returns:
+            AsyncRuntime: Process-wide runtime instance
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run_loop, name='async-runtime', daemon=True)
+        self.thread.start()
+
+        self._http_client = None
+        self._clients = {}
+        self._semaphores = {}
+        logger.info(f"[ASYNC_RUNTIME] Event loop started")
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run(self, coro, timeout=None):
+        """
+        Run a coroutine on the shared loop and block the calling thread for its result
+
+        Args:
+            coro: Coroutine to execute
+            timeout: Optional timeout in seconds
+
+        Returns:
+            Result of the coroutine
+        """
+        # The caller's current span follows the coroutine onto the loop thread
+        return asyncio.run_coroutine_threadsafe(bind_coroutine(coro), self.loop).result(timeout)
+
+    def http_client(self):
+        """Shared pooled HTTP session (keep-alive connections are reused across jobs)"""
+        if self._http_client is None:
+            max_connections = int(os.getenv('HTTP_MAX_CONNECTIONS', 200))
+            self._http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections
+                ),
+                timeout=httpx.Timeout(60.0)
+            )
+        return self._http_client
+
+    def semaphore(self, provider):
+        """
+        Semaphore bounding in-flight requests to a provider across all jobs
+
+        Args:
+            provider: Provider name ('openai', 'elevenlabs')
+
+        Returns:
+            asyncio.Semaphore: Provider semaphore
+        """
+        if provider not in self._semaphores:
+            limit = int(os.getenv(
+                f'{provider.upper()}_MAX_IN_FLIGHT',
+                DEFAULT_MAX_IN_FLIGHT.get(provider, 32)
+            ))
+            self._semaphores[provider] = asyncio.Semaphore(limit)
+            logger.info(f"[ASYNC_RUNTIME] {provider}: max {limit} requests in flight")
+        return self._semaphores[provider]
+
+    def openai_client(self, api_key):
+        """Async OpenAI client bound to the shared HTTP session"""
+        key = ('openai', api_key)
+        if key not in self._clients:
+            from openai import AsyncOpenAI
+            self._clients[key] = AsyncOpenAI(
+                api_key=api_key,
+                max_retries=2,
+                timeout=60.0,
+                http_client=self.http_client()
+            )
+        return self._clients[key]
+
+    def elevenlabs_client(self, api_key):
+        """Async ElevenLabs client bound to the shared HTTP session"""
+        key = ('elevenlabs', api_key)
+        if key not in self._clients:
+            from elevenlabs.client import AsyncElevenLabs
+            self._clients[key] = AsyncElevenLabs(
+                api_key=api_key,
+                httpx_client=self.http_client()
+            )
+        return self._clients[key]
+
+
+def async_io_enabled():
+    """Check whether the asyncio client path is enabled (ASYNC_IO, default: True)"""
+    return os.getenv('ASYNC_IO', 'True') == 'True'
@@ -1,6 +1,7 @@
 import subprocess
 import os
 from pathlib import Path
+from .tracing import run_subprocess
 
 class AudioProcessor:
     """Service for processing and aligning audio using ffmpeg"""
@@ -38,12 +39,46 @@ class AudioProcessor:
                 output_path
             ]
             
-            subprocess.run(cmd, check=True, capture_output=True)
+            run_subprocess(cmd, check=True, capture_output=True)
             return output_path
             
         except subprocess.CalledProcessError as e:
             raise Exception(f"Failed to extract audio: {e.stderr.decode()}")
     
+    def trim_media(self, input_path, start, duration, output_path):
+        """
+        Cut a time range out of a video or WAV file
+
+        Video is re-encoded so the cut is frame-accurate (stream copy would
+        start at the previous keyframe and shift the timeline); WAV audio is
+        cut sample-accurately.
+
+        Args:
+            input_path: Path to the video or WAV file
+            start: Start of the range in seconds
+            duration: Length of the range in seconds (None: to the end)
+            output_path: Path to save the cut file
+
+        Returns:
+            str: Path to the cut file
+        """
+        cmd = ['ffmpeg', '-ss', f'{start:.3f}']
+        if duration is not None:
+            cmd += ['-t', f'{duration:.3f}']
+        cmd += ['-i', input_path]
+        if Path(input_path).suffix.lower() == '.wav':
+            cmd += ['-c:a', 'pcm_s16le']
+        else:
+            cmd += ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '18', '-c:a', 'aac', '-b:a', '192k']
+        cmd += ['-y', output_path]
+
+        try:
+            run_subprocess(cmd, check=True, capture_output=True)
+            return output_path
+
+        except subprocess.CalledProcessError as e:
+            raise Exception(f"Failed to trim media: {e.stderr.decode()}")
+
     def adjust_audio_speed(self, audio_path, speed_factor, output_path=None):
         """
         Adjust audio speed while preserving pitch
@@ -92,7 +127,7 @@ class AudioProcessor:
                 output_path
             ]
             
-            subprocess.run(cmd, check=True, capture_output=True)
+            run_subprocess(cmd, check=True, capture_output=True)
             return output_path
             
         except subprocess.CalledProcessError as e:
@@ -145,7 +180,7 @@ class AudioProcessor:
                 output_path
             ]
             
-            subprocess.run(cmd, check=True, capture_output=True)
+            run_subprocess(cmd, check=True, capture_output=True)
             return output_path
             
         except subprocess.CalledProcessError as e:
@@ -180,7 +215,7 @@ class AudioProcessor:
             silence_path
         ]
         
-        subprocess.run(cmd, check=True, capture_output=True)
+        run_subprocess(cmd, check=True, capture_output=True)
         return silence_path
     
     def merge_audio_with_video(self, video_path, audio_path, output_path):
@@ -208,7 +243,7 @@ class AudioProcessor:
                 output_path
             ]
             
-            subprocess.run(cmd, check=True, capture_output=True)
+            run_subprocess(cmd, check=True, capture_output=True)
             return output_path
             
         except subprocess.CalledProcessError as e:
@@ -233,7 +268,7 @@ class AudioProcessor:
                 audio_path
             ]
             
-            result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+            result = run_subprocess(cmd, check=True, capture_output=True, text=True)
             duration = float(result.stdout.strip())
             return duration
             
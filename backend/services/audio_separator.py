@@ -1,6 +1,7 @@
 import subprocess
 import os
 from pathlib import Path
+from .tracing import run_subprocess
 import logging
 import torch
 
@@ -47,7 +48,7 @@ class AudioSeparator:
             
             logger.info(f"[SEPARATOR] Running Demucs separation...")
             
-            result = subprocess.run(
+            result = run_subprocess(
                 cmd,
                 check=True,
                 capture_output=True,
@@ -117,7 +118,7 @@ class AudioSeparator:
                 output_path
             ]
             
-            subprocess.run(cmd, check=True, capture_output=True)
+            run_subprocess(cmd, check=True, capture_output=True)
             
             logger.info(f"[SEPARATOR] ✅ Mixed audio saved: {output_path}")
             return output_path
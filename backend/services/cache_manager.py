@@ -3,6 +3,7 @@ import json
 import os
 import logging
 from pathlib import Path
+from .metrics import record_cache_lookup
 
 logger = logging.getLogger(__name__)
 
@@ -47,7 +48,29 @@ class CacheManager:
     
     # ==================== TRANSCRIPTION CACHE ====================
     
-    def get_cached_transcription(self, audio_path, language, video_url=None, start_time=None, end_time=None):
+    def _transcription_cache_key(self, audio_path, language, video_url, start_time, end_time, backend):
+        # Use video URL + time range for cache key if provided (job-agnostic)
+        if video_url:
+            key_data = {
+                'video_url': video_url,
+                'start_time': start_time,
+                'end_time': end_time,
+                'language': language,
+                'type': 'transcription'
+            }
+        else:
+            # Fallback to audio file hash
+            key_data = {
+                'audio_hash': self._file_hash(audio_path),
+                'language': language,
+                'type': 'transcription'
+            }
+        # Deepgram keeps the original keys so existing cache entries stay valid
+        if backend and backend != 'deepgram':
+            key_data['backend'] = backend
+        return self.get_cache_key(key_data)
+    
+    def get_cached_transcription(self, audio_path, language, video_url=None, start_time=None, end_time=None, backend=None):
         """
         Check if transcription is cached
         
@@ -57,43 +80,30 @@ class CacheManager:
             video_url: Optional YouTube URL for job-agnostic caching
             start_time: Optional start time for time-range specific caching
             end_time: Optional end time for time-range specific caching
+            backend: Optional ASR backend name (results of different engines are kept apart)
             
         Returns:
             dict or None: Cached transcription or None if not found
         """
         try:
-            # Use video URL + time range for cache key if provided (job-agnostic)
-            if video_url:
-                cache_key = self.get_cache_key({
-                    'video_url': video_url,
-                    'start_time': start_time,
-                    'end_time': end_time,
-                    'language': language,
-                    'type': 'transcription'
-                })
-            else:
-                # Fallback to audio file hash
-                audio_hash = self._file_hash(audio_path)
-                cache_key = self.get_cache_key({
-                    'audio_hash': audio_hash,
-                    'language': language,
-                    'type': 'transcription'
-                })
+            cache_key = self._transcription_cache_key(audio_path, language, video_url, start_time, end_time, backend)
             
             cache_file = self.cache_dir / f"transcription_{cache_key}.json"
             
             if cache_file.exists():
+                record_cache_lookup('transcription', True)
                 logger.info(f"[CACHE] ✅ Transcription cache HIT: {cache_key[:8]}...")
                 with open(cache_file, 'r', encoding='utf-8') as f:
                     return json.load(f)
             else:
+                record_cache_lookup('transcription', False)
                 logger.info(f"[CACHE] ❌ Transcription cache MISS: {cache_key[:8]}...")
                 return None
         except Exception as e:
             logger.warning(f"[CACHE] Failed to read transcription cache: {e}")
             return None
     
-    def cache_transcription(self, audio_path, language, transcription, video_url=None, start_time=None, end_time=None):
+    def cache_transcription(self, audio_path, language, transcription, video_url=None, start_time=None, end_time=None, backend=None):
         """
         Cache transcription result
         
@@ -104,25 +114,10 @@ class CacheManager:
             video_url: Optional YouTube URL for job-agnostic caching
             start_time: Optional start time for time-range specific caching
             end_time: Optional end time for time-range specific caching
+            backend: Optional ASR backend name (results of different engines are kept apart)
         """
         try:
-            # Use video URL + time range for cache key if provided (job-agnostic)
-            if video_url:
-                cache_key = self.get_cache_key({
-                    'video_url': video_url,
-                    'start_time': start_time,
-                    'end_time': end_time,
-                    'language': language,
-                    'type': 'transcription'
-                })
-            else:
-                # Fallback to audio file hash
-                audio_hash = self._file_hash(audio_path)
-                cache_key = self.get_cache_key({
-                    'audio_hash': audio_hash,
-                    'language': language,
-                    'type': 'transcription'
-                })
+            cache_key = self._transcription_cache_key(audio_path, language, video_url, start_time, end_time, backend)
             
             cache_file = self.cache_dir / f"transcription_{cache_key}.json"
             
@@ -157,10 +152,12 @@ class CacheManager:
             cache_file = self.cache_dir / f"translation_{cache_key}.txt"
             
             if cache_file.exists():
+                record_cache_lookup('translation', True)
                 logger.debug(f"[CACHE] ✅ Translation cache HIT: {text[:30]}...")
                 with open(cache_file, 'r', encoding='utf-8') as f:
                     return f.read()
             else:
+                record_cache_lookup('translation', False)
                 logger.debug(f"[CACHE] ❌ Translation cache MISS: {text[:30]}...")
                 return None
         except Exception as e:
@@ -193,6 +190,68 @@ class CacheManager:
         except Exception as e:
             logger.warning(f"[CACHE] Failed to cache translation: {e}")
     
+    # ==================== TRANSLATION CONTEXT CACHE ====================
+    
+    def get_cached_translation_context(self, text, source_lang, target_lang):
+        """
+        Check if a job-level translation context (summary + glossary) is cached
+        
+        Args:
+            text: Transcript the context was built from
+            source_lang: Source language code
+            target_lang: Target language code
+            
+        Returns:
+            dict or None: Cached context or None if not found
+        """
+        try:
+            cache_key = self.get_cache_key({
+                'text': text,
+                'source': source_lang,
+                'target': target_lang,
+                'type': 'translation_context'
+            })
+            cache_file = self.cache_dir / f"context_{cache_key}.json"
+            
+            if cache_file.exists():
+                record_cache_lookup('translation_context', True)
+                logger.info(f"[CACHE] ✅ Translation context cache HIT: {cache_key[:8]}...")
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            else:
+                record_cache_lookup('translation_context', False)
+                logger.info(f"[CACHE] ❌ Translation context cache MISS: {cache_key[:8]}...")
+                return None
+        except Exception as e:
+            logger.warning(f"[CACHE] Failed to read translation context cache: {e}")
+            return None
+    
+    def cache_translation_context(self, text, source_lang, target_lang, context):
+        """
+        Cache a job-level translation context
+        
+        Args:
+            text: Transcript the context was built from
+            source_lang: Source language code
+            target_lang: Target language code
+            context: Context dict (summary and glossary)
+        """
+        try:
+            cache_key = self.get_cache_key({
+                'text': text,
+                'source': source_lang,
+                'target': target_lang,
+                'type': 'translation_context'
+            })
+            cache_file = self.cache_dir / f"context_{cache_key}.json"
+            
+            with open(cache_file, 'w', encoding='utf-8') as f:
+                json.dump(context, f, ensure_ascii=False, indent=2)
+            
+            logger.info(f"[CACHE] 💾 Translation context cached: {cache_key[:8]}...")
+        except Exception as e:
+            logger.warning(f"[CACHE] Failed to cache translation context: {e}")
+    
     # ==================== VOICE CLONING CACHE ====================
     
     def get_cached_voice(self, audio_path, voice_name, video_url=None, speaker_id=None):
@@ -230,10 +289,12 @@ class CacheManager:
             cache_file = self.cache_dir / f"voice_{cache_key}.txt"
             
             if cache_file.exists():
+                record_cache_lookup('voice', True)
                 logger.info(f"[CACHE] ✅ Voice clone cache HIT: {log_name}")
                 with open(cache_file, 'r') as f:
                     return f.read().strip()
             else:
+                record_cache_lookup('voice', False)
                 logger.info(f"[CACHE] ❌ Voice clone cache MISS: {log_name}")
                 return None
         except Exception as e:
@@ -286,11 +347,11 @@ class CacheManager:
         Clear cache files
         
         Args:
-            cache_type: Type of cache to clear ('transcription', 'translation', 'voice_clone', or None for all)
+            cache_type: Type of cache to clear ('transcription', 'translation', 'context', 'voice_clone', or None for all)
         """
         try:
             if cache_type:
-                pattern = f"{cache_type}_*.json" if cache_type == 'transcription' else f"{cache_type}_*.txt"
+                pattern = f"{cache_type}_*.json" if cache_type in ('transcription', 'context') else f"{cache_type}_*.txt"
                 files = list(self.cache_dir.glob(pattern))
             else:
                 files = list(self.cache_dir.glob("*"))
@@ -313,6 +374,7 @@ class CacheManager:
             transcription_files = list(self.cache_dir.glob("transcription_*.json"))
             translation_files = list(self.cache_dir.glob("translation_*.txt"))
             voice_files = list(self.cache_dir.glob("voice_*.txt"))
+            context_files = list(self.cache_dir.glob("context_*.json"))
             
             total_size = sum(f.stat().st_size for f in self.cache_dir.glob("*") if f.is_file())
             
@@ -320,7 +382,8 @@ class CacheManager:
                 'transcriptions': len(transcription_files),
                 'translations': len(translation_files),
                 'voices': len(voice_files),
-                'total_files': len(transcription_files) + len(translation_files) + len(voice_files),
+                'translation_contexts': len(context_files),
+                'total_files': len(transcription_files) + len(translation_files) + len(voice_files) + len(context_files),
                 'total_size_mb': total_size / (1024 * 1024)
             }
         except Exception as e:
@@ -2,6 +2,7 @@ import yt_dlp
 import os
 from pathlib import Path
 import logging
+from .api_replay import get_api_replay
 
 
 # Configure logging
@@ -27,6 +28,39 @@ class VideoDownloader:
         Returns:
             dict: Paths to downloaded video and audio files
         """
+        # Recorded/replayed when API_REPLAY_MODE is set: the clip itself is kept as a fixture
+        replay = get_api_replay()
+        request = {'url': youtube_url, 'start_time': start_time, 'end_time': end_time}
+        
+        def encode(result):
+            replay.store_file('download', request, result['video_path'])
+            return {
+                # File name without the job prefix, so replays can restore it for any job
+                'filename': os.path.basename(result['video_path'])[len(job_id) + 1:],
+                'title': result['title'],
+                'duration': result['duration']
+            }
+        
+        def decode(payload):
+            video_path = os.path.join(self.output_dir, f"{job_id}_{payload['filename']}")
+            replay.restore_file('download', request, video_path)
+            logger.info(f"[DOWNLOADER] ✅ Replayed download: {video_path}")
+            return {
+                'video_path': video_path,
+                'title': payload['title'],
+                'duration': payload['duration']
+            }
+        
+        return replay.call(
+            'download',
+            request,
+            lambda: self._download_video(youtube_url, job_id, start_time, end_time),
+            encode=encode,
+            decode=decode
+        )
+    
+    def _download_video(self, youtube_url, job_id, start_time=None, end_time=None):
+        """Download video from YouTube with yt-dlp (see download_video)"""
         import os
         
         # Clear proxy environment variables
@@ -0,0 +1,158 @@
+import threading
+import time
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Events after which a job publishes nothing more
+TERMINAL_EVENTS = ('completed', 'failed')
+
+
+class JobEventBus:
+    """
+    In-process publish/subscribe channel for job progress
+
+    Every event gets a per-job sequence number (the SSE event id) and is
+    kept in a bounded per-job history, so a client that connects late or
+    reconnects with Last-Event-ID catches up without missing a transition.
+    Readers block on a condition variable instead of polling the job table.
+
+    Listeners registered with subscribe() are called synchronously on
+    publish (JobManager keeps its job table current this way).
+    """
+
+    def __init__(self, history=500):
+        self.history = history
+        self.events = {}
+        self.sequences = {}
+        self.listeners = []
+        self.condition = threading.Condition()
+
+    def subscribe(self, listener):
+        """
+        Call a function for every published event
+
+        Args:
+            listener: Callable taking the event dict
+        """
+        with self.condition:
+            self.listeners.append(listener)
+
+    def publish(self, job_id, event_type, data=None):
+        """
+        Publish an event
+
+        Args:
+            job_id: Job identifier
+            event_type: 'progress', 'segment', 'region', 'completed' or 'failed'
+            data: JSON-serializable payload
+
+        Returns:
+            dict: The published event
+        """
+        with self.condition:
+            seq = self.sequences.get(job_id, 0) + 1
+            self.sequences[job_id] = seq
+            event = {
+                'id': seq,
+                'type': event_type,
+                'job_id': job_id,
+                'time': time.time(),
+                'data': data or {}
+            }
+            self.events.setdefault(job_id, deque(maxlen=self.history)).append(event)
+            listeners = list(self.listeners)
+            self.condition.notify_all()
+
+        self._notify(listeners, event)
+        return event
+
+    def ingest(self, event):
+        """
+        Add an event published by another process, keeping its sequence number
+
+        Args:
+            event: Event dict as returned by publish()
+        """
+        job_id = event['job_id']
+        with self.condition:
+            if event['id'] <= self.sequences.get(job_id, 0):
+                return
+            self.sequences[job_id] = event['id']
+            self.events.setdefault(job_id, deque(maxlen=self.history)).append(event)
+            listeners = list(self.listeners)
+            self.condition.notify_all()
+
+        self._notify(listeners, event)
+
+    def start_after(self, job_id, event_id):
+        """
+        Continue a job's sequence numbers after events published by another process
+
+        Args:
+            job_id: Job identifier
+            event_id: Last sequence number already used for the job
+        """
+        with self.condition:
+            self.sequences[job_id] = max(self.sequences.get(job_id, 0), event_id)
+
+    def _notify(self, listeners, event):
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.warning(f"[EVENTS] Listener failed on {event['type']} event of job {event['job_id']}: {e}")
+
+    def _since(self, job_id, after):
+        return [event for event in self.events.get(job_id, ()) if event['id'] > after]
+
+    def wait(self, job_id, after=0, timeout=25.0):
+        """
+        Events of a job newer than a sequence number, blocking until one arrives
+
+        Args:
+            job_id: Job identifier
+            after: Last sequence number the reader has seen
+            timeout: Seconds to wait when there is nothing new
+
+        Returns:
+            list: Events in order (empty on timeout)
+        """
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while True:
+                events = self._since(job_id, after)
+                remaining = deadline - time.monotonic()
+                if events or remaining <= 0:
+                    return events
+                self.condition.wait(remaining)
+
+    def last_event(self, job_id):
+        """Most recent event of a job, or None"""
+        with self.condition:
+            history = self.events.get(job_id)
+            return history[-1] if history else None
+
+    def discard(self, job_id):
+        """Forget a job's history (job deleted)"""
+        with self.condition:
+            self.events.pop(job_id, None)
+            self.sequences.pop(job_id, None)
+
+
+_event_bus = None
+_event_bus_lock = threading.Lock()
+
+def get_event_bus():
+    """
+    Get the process-wide job event bus
+
+    Returns:
+        JobEventBus: Shared instance
+    """
+    global _event_bus
+    with _event_bus_lock:
+        if _event_bus is None:
+            _event_bus = JobEventBus()
+        return _event_bus
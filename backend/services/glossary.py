@@ -0,0 +1,252 @@
+import json
+import logging
+import os
+import re
+import threading
+from collections import deque
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Project names become file names, so keep them to a safe alphabet
+PROJECT_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton over lowercased patterns
+
+    Finds every pattern occurrence in a text in a single pass, independent of
+    the number of patterns, so large glossaries cost nothing extra per segment.
+    """
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        for index, pattern in enumerate(patterns):
+            self._insert(pattern.lower(), index)
+        self._build_failure_links()
+
+    def _insert(self, pattern, index):
+        state = 0
+        for ch in pattern:
+            if ch not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[state][ch] = len(self.goto) - 1
+            state = self.goto[state][ch]
+        self.output[state].append((index, len(pattern)))
+
+    def _build_failure_links(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(ch, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def find_all(self, text):
+        """
+        Find all pattern occurrences that start and end on word boundaries
+
+        Args:
+            text: Text to search
+
+        Returns:
+            list: (start, end, pattern index) tuples
+        """
+        text = text.lower()
+        matches = []
+        state = 0
+        for position, ch in enumerate(text):
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            for index, length in self.output[state]:
+                start = position - length + 1
+                end = position + 1
+                # "Acme" must not match inside "Acmetron"
+                if (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum()):
+                    matches.append((start, end, index))
+        return matches
+
+
+class Glossary:
+    """
+    Project terminology with per-language renderings
+
+    Entries look like {"source": "Acme Cloud", "translations": {"es": "Acme Cloud"}}.
+    """
+
+    def __init__(self, entries):
+        self.entries = [
+            entry for entry in entries
+            if isinstance(entry.get('source'), str) and entry['source'].strip()
+            and isinstance(entry.get('translations'), dict)
+        ]
+        self.matcher = AhoCorasick([entry['source'].strip() for entry in self.entries])
+
+    def __len__(self):
+        return len(self.entries)
+
+    def match(self, text):
+        """
+        Glossary entries that occur in a text
+
+        Overlapping matches resolve leftmost-longest, so "cloud" is not
+        required separately inside "Acme Cloud".
+
+        Args:
+            text: Source text
+
+        Returns:
+            list: Matching entry indices in order of first occurrence
+        """
+        seen = []
+        covered_until = 0
+        for start, end, index in sorted(self.matcher.find_all(text), key=lambda m: (m[0], -m[1])):
+            if start < covered_until:
+                continue
+            covered_until = end
+            if index not in seen:
+                seen.append(index)
+        return seen
+
+    def terms_for(self, texts, target_language):
+        """
+        Prompt glossary for a batch: only the terms its texts contain
+
+        Args:
+            texts: Source texts of the batch
+            target_language: Target language code
+
+        Returns:
+            list: [{'source', 'target'}] for matched terms with a rendering in the target language
+        """
+        terms = []
+        seen = set()
+        for text in texts:
+            for index in self.match(text):
+                entry = self.entries[index]
+                target = entry['translations'].get(target_language.lower())
+                if index not in seen and target:
+                    seen.add(index)
+                    terms.append({'source': entry['source'], 'target': target})
+        return terms
+
+    def missing_terms(self, source_text, translation, target_language):
+        """
+        Required renderings absent from a translation
+
+        Args:
+            source_text: Source text
+            translation: Translated text
+            target_language: Target language code
+
+        Returns:
+            list: [{'source', 'target'}] whose target rendering does not appear in the translation
+        """
+        translation = translation.lower()
+        missing = []
+        for index in self.match(source_text):
+            entry = self.entries[index]
+            target = entry['translations'].get(target_language.lower())
+            if target and target.lower() not in translation:
+                missing.append({'source': entry['source'], 'target': target})
+        return missing
+
+
+def _glossary_dir():
+    return Path(os.getenv('GLOSSARY_DIR', 'glossaries'))
+
+
+def _glossary_path(project):
+    if not PROJECT_NAME_PATTERN.match(project or ''):
+        raise ValueError("project must be 1-64 characters of letters, digits, '-' or '_'")
+    return _glossary_dir() / f"{project}.json"
+
+
+_glossaries = {}
+_glossaries_lock = threading.Lock()
+
+def load_glossary(project):
+    """
+    Load a project's glossary (reloaded when the file changes)
+
+    Args:
+        project: Project name
+
+    Returns:
+        Glossary or None: The project glossary, or None if there is none
+    """
+    if not project:
+        return None
+
+    path = _glossary_path(project)
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        logger.info(f"[GLOSSARY] No glossary for project '{project}'")
+        return None
+
+    with _glossaries_lock:
+        cached = _glossaries.get(project)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            glossary = Glossary(json.load(f).get('terms', []))
+    except Exception as e:
+        logger.warning(f"[GLOSSARY] Failed to load glossary for project '{project}': {e}")
+        return None
+
+    with _glossaries_lock:
+        _glossaries[project] = (mtime, glossary)
+    logger.info(f"[GLOSSARY] Loaded {len(glossary)} terms for project '{project}'")
+    return glossary
+
+
+def save_glossary(project, terms):
+    """
+    Store a project's glossary
+
+    Args:
+        project: Project name
+        terms: List of {"source": str, "translations": {language: str}} entries
+
+    Returns:
+        Glossary: The stored glossary
+    """
+    path = _glossary_path(project)
+    glossary = Glossary(terms)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'terms': glossary.entries}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+    logger.info(f"[GLOSSARY] Saved {len(glossary)} terms for project '{project}'")
+    return glossary
+
+
+def read_glossary_terms(project):
+    """
+    Raw glossary entries of a project
+
+    Args:
+        project: Project name
+
+    Returns:
+        list or None: Entries, or None if the project has no glossary
+    """
+    glossary = load_glossary(project)
+    return glossary.entries if glossary is not None else None
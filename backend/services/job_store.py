@@ -0,0 +1,805 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+from abc import ABC, abstractmethod
+
+logger = logging.getLogger(__name__)
+
+JOB_STORE_NAMES = ('sqlite', 'redis')
+
+
+class JobStore(ABC):
+    """
+    Interface for the job queue shared by API nodes and pipeline workers
+
+    API nodes insert queued jobs and read status; workers claim queued jobs
+    under a lease, renew it with heartbeats while the pipeline runs and write
+    status changes back. A job whose lease expires (worker crashed or lost
+    its connection) is queued again for another worker, up to a maximum
+    number of attempts. Updates from a worker that no longer holds the lease
+    are ignored, so a stalled worker cannot overwrite its successor.
+
+    Job events are kept in an append-only log that API nodes tail to feed
+    SSE clients; readers keep an opaque cursor.
+    """
+
+    name = None
+
+    @abstractmethod
+    def add(self, job):
+        """
+        Insert a new queued job
+
+        Args:
+            job: Job dict (job_id, status and request parameters)
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def claim(self, worker_id, lease_seconds):
+        """
+        Take the oldest queued job, mark it processing and lease it to a worker
+
+        Args:
+            worker_id: Identifier of the claiming worker
+            lease_seconds: Lease length
+
+        Returns:
+            dict or None: The claimed job
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def heartbeat(self, job_id, worker_id, lease_seconds):
+        """
+        Extend a worker's lease on a job
+
+        Args:
+            job_id: Job identifier
+            worker_id: Worker holding the lease
+            lease_seconds: New lease length from now
+
+        Returns:
+            bool: False if the worker no longer holds the lease
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def requeue_expired(self, max_attempts):
+        """
+        Queue jobs with an expired lease again, or fail them after max_attempts claims
+
+        Args:
+            max_attempts: Claims allowed per job
+
+        Returns:
+            list: The jobs that were requeued or failed
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def update(self, job_id, fields, owner=None):
+        """
+        Merge fields into a job
+
+        Args:
+            job_id: Job identifier
+            fields: Dict of job fields to set
+            owner: Worker that must hold the job's lease (None to skip the check)
+
+        Returns:
+            bool: True if the job was updated
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, job_id):
+        """Job dict, or None"""
+        raise NotImplementedError
+
+    def find_active(self, dedupe_key):
+        """
+        Oldest queued or processing job with a request key (JobManager deduplication)
+
+        Args:
+            dedupe_key: Normalized request key stored in the job
+
+        Returns:
+            dict or None: The job
+        """
+        for job in self.list():
+            if job.get('dedupe_key') == dedupe_key and job['status'] in ('queued', 'processing'):
+                return job
+        return None
+
+    @abstractmethod
+    def list(self):
+        """All jobs, oldest first"""
+        raise NotImplementedError
+
+    def status_counts(self):
+        """Number of jobs per status"""
+        counts = {}
+        for job in self.list():
+            counts[job['status']] = counts.get(job['status'], 0) + 1
+        return counts
+
+    @abstractmethod
+    def delete(self, job_id):
+        """
+        Delete a job and its events
+
+        Returns:
+            bool: True if the job existed
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_event(self, event):
+        """
+        Append a job event (as published on the worker's JobEventBus)
+
+        Args:
+            event: Event dict (id, type, job_id, time, data)
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def events_after(self, cursor=None, limit=500):
+        """
+        Events appended after a log position
+
+        Args:
+            cursor: Cursor returned by the previous call (None for the start of the log)
+            limit: Maximum number of events
+
+        Returns:
+            tuple: (events in log order, cursor to continue from)
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def last_event_id(self, job_id):
+        """Highest event id logged for a job (0 if none)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def compact_events(self, job_id):
+        """Keep only the last event of a finished job (API nodes replay the log on start)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def take_tokens(self, buckets):
+        """
+        Take tokens from shared rate-limit buckets, all or nothing
+
+        Buckets hold one minute of quota and refill continuously; a bucket
+        seen for the first time starts full. Every process using the store
+        draws from the same buckets, so the provider quota is shared by all
+        workers instead of granted to each.
+
+        Args:
+            buckets: Dict of bucket name -> (tokens to take, refill rate per minute)
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise seconds until they are available
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def limit_tokens(self, name, remaining, per_minute):
+        """
+        Clamp a shared bucket to what the provider says is left
+
+        Args:
+            name: Bucket name
+            remaining: Tokens the provider still allows
+            per_minute: Refill rate of the bucket
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def register_worker(self, worker_id, info):
+        """
+        Record a worker heartbeat
+
+        Args:
+            worker_id: Worker identifier
+            info: JSON-serializable worker details (host, pid, current job)
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def workers(self, max_age):
+        """
+        Workers that sent a heartbeat recently
+
+        Args:
+            max_age: Seconds after which a silent worker is considered gone
+
+        Returns:
+            list: Worker dicts with 'worker_id' and 'heartbeat_at'
+        """
+        raise NotImplementedError
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Job store in one SQLite file (WAL mode)
+
+    The local stand-in broker: every process on a host shares it through
+    JOB_STORE_PATH. Claims and lease changes run in BEGIN IMMEDIATE
+    transactions, so concurrent workers never claim the same job. Do not
+    put the file on a network filesystem: use the Redis store for workers
+    on several machines.
+    """
+
+    name = 'sqlite'
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        job_id TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL,
+        data TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+    CREATE TABLE IF NOT EXISTS job_events (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id TEXT NOT NULL,
+        event_id INTEGER NOT NULL,
+        type TEXT NOT NULL,
+        time REAL NOT NULL,
+        data TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS job_events_job ON job_events (job_id, event_id);
+    CREATE TABLE IF NOT EXISTS workers (
+        worker_id TEXT PRIMARY KEY,
+        heartbeat_at REAL NOT NULL,
+        data TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS rate_buckets (
+        name TEXT PRIMARY KEY,
+        tokens REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    """
+
+    # Lease columns, added to job tables created before leases existed
+    LEASE_COLUMNS = {'worker_id': 'TEXT', 'lease_expires': 'REAL'}
+
+    def __init__(self, path='jobs.db'):
+        self.path = path
+        self.local = threading.local()
+        self._connection().executescript(self.SCHEMA)
+        with self._transaction() as conn:
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(jobs)')}
+            for column, column_type in self.LEASE_COLUMNS.items():
+                if column not in columns:
+                    conn.execute(f'ALTER TABLE jobs ADD COLUMN {column} {column_type}')
+
+    def _connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            # Autocommit; multi-statement changes use explicit transactions
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.local.conn = conn
+        return conn
+
+    def _transaction(self):
+        return _Transaction(self._connection())
+
+    def _write(self, conn, job, worker_id=None, lease_expires=None):
+        conn.execute(
+            'UPDATE jobs SET status = ?, updated_at = ?, data = ?, worker_id = ?, lease_expires = ? WHERE job_id = ?',
+            (job['status'], time.time(), json.dumps(job), worker_id, lease_expires, job['job_id'])
+        )
+
+    def add(self, job):
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                'INSERT INTO jobs (job_id, status, created_at, updated_at, data) VALUES (?, ?, ?, ?, ?)',
+                (job['job_id'], job['status'], now, now, json.dumps(job))
+            )
+
+    def claim(self, worker_id, lease_seconds):
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT data FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            job = json.loads(row[0])
+            job.update(
+                status='processing',
+                message='Job picked up by a worker',
+                worker_id=worker_id,
+                attempts=job.get('attempts', 0) + 1
+            )
+            self._write(conn, job, worker_id, time.time() + lease_seconds)
+            return job
+
+    def heartbeat(self, job_id, worker_id, lease_seconds):
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE job_id = ? AND worker_id = ? AND status = 'processing'",
+                (time.time() + lease_seconds, job_id, worker_id)
+            ).rowcount
+        return updated > 0
+
+    def requeue_expired(self, max_attempts):
+        recovered = []
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT data FROM jobs WHERE status = 'processing' AND lease_expires < ?", (time.time(),)
+            ).fetchall()
+            for row in rows:
+                job = _recover(json.loads(row[0]), max_attempts)
+                self._write(conn, job)
+                recovered.append(job)
+        return recovered
+
+    def update(self, job_id, fields, owner=None):
+        with self._transaction() as conn:
+            row = conn.execute(
+                'SELECT data, worker_id, lease_expires FROM jobs WHERE job_id = ?', (job_id,)
+            ).fetchone()
+            if row is None or (owner is not None and row[1] != owner):
+                return False
+            job = json.loads(row[0])
+            job.update(fields)
+            # The lease ends with the job; the worker keeps ownership for late updates (profile)
+            self._write(conn, job, row[1], row[2] if job['status'] == 'processing' else None)
+        return True
+
+    def get(self, job_id):
+        row = self._connection().execute('SELECT data FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list(self):
+        rows = self._connection().execute('SELECT data FROM jobs ORDER BY created_at').fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def find_active(self, dedupe_key):
+        row = self._connection().execute(
+            "SELECT data FROM jobs WHERE status IN ('queued', 'processing') AND json_extract(data, '$.dedupe_key') = ? "
+            "ORDER BY created_at LIMIT 1",
+            (dedupe_key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def status_counts(self):
+        return dict(self._connection().execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+
+    def delete(self, job_id):
+        with self._transaction() as conn:
+            deleted = conn.execute('DELETE FROM jobs WHERE job_id = ?', (job_id,)).rowcount
+            conn.execute('DELETE FROM job_events WHERE job_id = ?', (job_id,))
+        return deleted > 0
+
+    def add_event(self, event):
+        self._connection().execute(
+            'INSERT INTO job_events (job_id, event_id, type, time, data) VALUES (?, ?, ?, ?, ?)',
+            (event['job_id'], event['id'], event['type'], event['time'], json.dumps(event['data']))
+        )
+
+    def events_after(self, cursor=None, limit=500):
+        rows = self._connection().execute(
+            'SELECT seq, job_id, event_id, type, time, data FROM job_events WHERE seq > ? ORDER BY seq LIMIT ?',
+            (cursor or 0, limit)
+        ).fetchall()
+        events = [
+            {'id': row[2], 'type': row[3], 'job_id': row[1], 'time': row[4], 'data': json.loads(row[5])}
+            for row in rows
+        ]
+        return events, (rows[-1][0] if rows else cursor)
+
+    def last_event_id(self, job_id):
+        row = self._connection().execute(
+            'SELECT MAX(event_id) FROM job_events WHERE job_id = ?', (job_id,)
+        ).fetchone()
+        return row[0] or 0
+
+    def compact_events(self, job_id):
+        with self._transaction() as conn:
+            conn.execute(
+                'DELETE FROM job_events WHERE job_id = ? AND seq < (SELECT MAX(seq) FROM job_events WHERE job_id = ?)',
+                (job_id, job_id)
+            )
+
+    def _bucket_tokens(self, conn, name, per_minute, now):
+        row = conn.execute('SELECT tokens, updated_at FROM rate_buckets WHERE name = ?', (name,)).fetchone()
+        return _refill(row, per_minute, now)
+
+    def take_tokens(self, buckets):
+        now = time.time()
+        with self._transaction() as conn:
+            wait = 0.0
+            levels = {}
+            for name, (amount, per_minute) in buckets.items():
+                tokens = self._bucket_tokens(conn, name, per_minute, now)
+                amount = min(amount, max(1.0, per_minute))
+                if tokens < amount:
+                    wait = max(wait, (amount - tokens) * 60.0 / per_minute)
+                levels[name] = (tokens, amount)
+            for name, (tokens, amount) in levels.items():
+                conn.execute(
+                    'INSERT OR REPLACE INTO rate_buckets (name, tokens, updated_at) VALUES (?, ?, ?)',
+                    (name, tokens if wait > 0 else tokens - amount, now)
+                )
+        return wait
+
+    def limit_tokens(self, name, remaining, per_minute):
+        now = time.time()
+        with self._transaction() as conn:
+            tokens = self._bucket_tokens(conn, name, per_minute, now)
+            conn.execute(
+                'INSERT OR REPLACE INTO rate_buckets (name, tokens, updated_at) VALUES (?, ?, ?)',
+                (name, min(tokens, float(remaining)), now)
+            )
+
+    def register_worker(self, worker_id, info):
+        self._connection().execute(
+            'INSERT OR REPLACE INTO workers (worker_id, heartbeat_at, data) VALUES (?, ?, ?)',
+            (worker_id, time.time(), json.dumps(info))
+        )
+
+    def workers(self, max_age):
+        conn = self._connection()
+        # Forget workers that have been silent for long
+        conn.execute('DELETE FROM workers WHERE heartbeat_at < ?', (time.time() - 10 * max_age,))
+        rows = conn.execute(
+            'SELECT worker_id, heartbeat_at, data FROM workers WHERE heartbeat_at >= ? ORDER BY worker_id',
+            (time.time() - max_age,)
+        ).fetchall()
+        return [dict(json.loads(row[2]), worker_id=row[0], heartbeat_at=row[1]) for row in rows]
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK around a block (takes the write lock up front)"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return False
+
+
+def _refill(row, per_minute, now):
+    """Tokens of a stored (tokens, updated_at) bucket refilled up to now (full if new)"""
+    capacity = max(1.0, float(per_minute))
+    if row is None:
+        return capacity
+    tokens, updated_at = row
+    return min(capacity, tokens + max(0.0, now - updated_at) * per_minute / 60.0)
+
+
+def _recover(job, max_attempts):
+    """Requeue or fail a job whose worker stopped renewing its lease"""
+    worker_id = job.get('worker_id')
+    attempts = job.get('attempts', 0)
+    if attempts >= max_attempts:
+        error = f"Worker {worker_id} stopped responding ({attempts} attempts)"
+        job.update(status='failed', message=f'Job failed: {error}', error=error, worker_id=None)
+    else:
+        job.update(status='queued', progress=0, message=f'Requeued: worker {worker_id} stopped responding',
+                   worker_id=None)
+    return job
+
+
+# Pops the head of the queue and leases it (KEYS: queue, jobs, leases; ARGV: worker, lease seconds)
+_REDIS_CLAIM = """
+while true do
+    local job_id = redis.call('LPOP', KEYS[1])
+    if not job_id then return false end
+    local data = redis.call('HGET', KEYS[2], job_id)
+    if data then
+        local job = cjson.decode(data)
+        local now = redis.call('TIME')
+        job['status'] = 'processing'
+        job['message'] = 'Job picked up by a worker'
+        job['worker_id'] = ARGV[1]
+        job['attempts'] = (tonumber(job['attempts']) or 0) + 1
+        data = cjson.encode(job)
+        redis.call('HSET', KEYS[2], job_id, data)
+        redis.call('ZADD', KEYS[3], tonumber(now[1]) + tonumber(ARGV[2]), job_id)
+        return data
+    end
+end
+"""
+
+# Extends a lease held by the worker (KEYS: jobs, leases; ARGV: job, worker, lease seconds)
+_REDIS_HEARTBEAT = """
+local data = redis.call('HGET', KEYS[1], ARGV[1])
+if not data or not redis.call('ZSCORE', KEYS[2], ARGV[1]) then return 0 end
+if cjson.decode(data)['worker_id'] ~= ARGV[2] then return 0 end
+local now = redis.call('TIME')
+redis.call('ZADD', KEYS[2], tonumber(now[1]) + tonumber(ARGV[3]), ARGV[1])
+return 1
+"""
+
+# Removes and returns the expired leases (KEYS: leases)
+_REDIS_EXPIRED = """
+local now = redis.call('TIME')
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', tonumber(now[1]))
+for _, job_id in ipairs(expired) do
+    redis.call('ZREM', KEYS[1], job_id)
+end
+return expired
+"""
+
+# Merges fields into a job if the owner still holds it (KEYS: jobs, leases; ARGV: job, fields, owner)
+_REDIS_UPDATE = """
+local data = redis.call('HGET', KEYS[1], ARGV[1])
+if not data then return 0 end
+local job = cjson.decode(data)
+if ARGV[3] ~= '' then
+    if job['worker_id'] ~= ARGV[3] then return 0 end
+    -- A running job whose lease was taken away is being requeued
+    if job['status'] == 'processing' and not redis.call('ZSCORE', KEYS[2], ARGV[1]) then return 0 end
+end
+for key, value in pairs(cjson.decode(ARGV[2])) do
+    job[key] = value
+end
+redis.call('HSET', KEYS[1], ARGV[1], cjson.encode(job))
+if job['status'] ~= 'processing' then
+    redis.call('ZREM', KEYS[2], ARGV[1])
+end
+return 1
+"""
+
+
+# Refills rate buckets and takes tokens from all of them or none
+# (KEYS: buckets; ARGV: name, tokens, per minute for each bucket; returns the wait as a string)
+_REDIS_TAKE_TOKENS = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local wait = 0
+local levels = {}
+for i = 1, #ARGV, 3 do
+    local per_minute = tonumber(ARGV[i + 2])
+    local capacity = math.max(1, per_minute)
+    local tokens = capacity
+    local data = redis.call('HGET', KEYS[1], ARGV[i])
+    if data then
+        local bucket = cjson.decode(data)
+        tokens = math.min(capacity, bucket[1] + math.max(0, now - bucket[2]) * per_minute / 60)
+    end
+    local amount = math.min(tonumber(ARGV[i + 1]), capacity)
+    if tokens < amount then
+        wait = math.max(wait, (amount - tokens) * 60 / per_minute)
+    end
+    levels[#levels + 1] = {ARGV[i], tokens, amount}
+end
+for _, level in ipairs(levels) do
+    local tokens = level[2]
+    if wait == 0 then tokens = tokens - level[3] end
+    redis.call('HSET', KEYS[1], level[1], cjson.encode({tokens, now}))
+end
+return tostring(wait)
+"""
+
+# Clamps a rate bucket to the provider's remaining quota (KEYS: buckets; ARGV: name, remaining, per minute)
+_REDIS_LIMIT_TOKENS = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local per_minute = tonumber(ARGV[3])
+local tokens = math.max(1, per_minute)
+local data = redis.call('HGET', KEYS[1], ARGV[1])
+if data then
+    local bucket = cjson.decode(data)
+    tokens = math.min(tokens, bucket[1] + math.max(0, now - bucket[2]) * per_minute / 60)
+end
+redis.call('HSET', KEYS[1], ARGV[1], cjson.encode({math.min(tokens, tonumber(ARGV[2])), now}))
+return 1
+"""
+
+
+class RedisJobStore(JobStore):
+    """
+    Job store on a Redis server (or any server speaking the Redis protocol)
+
+    For API nodes and workers on several machines. Requires the optional
+    redis package. Jobs are a hash of JSON documents, the queue a list,
+    leases a sorted set of expiry times taken from the server clock (worker
+    clock skew does not matter), events a stream and shared rate-limit
+    buckets a hash. Claims, lease renewals, fenced updates and token takes
+    are Lua scripts, atomic on the server.
+    """
+
+    name = 'redis'
+
+    def __init__(self, url=None, prefix=None, max_events=100000):
+        import redis
+
+        self.client = redis.Redis.from_url(url or os.getenv('JOB_REDIS_URL', 'redis://localhost:6379/0'),
+                                           decode_responses=True)
+        self.prefix = prefix or os.getenv('JOB_REDIS_PREFIX', 'autodub')
+        self.max_events = max_events
+        self.claim_script = self.client.register_script(_REDIS_CLAIM)
+        self.heartbeat_script = self.client.register_script(_REDIS_HEARTBEAT)
+        self.expired_script = self.client.register_script(_REDIS_EXPIRED)
+        self.update_script = self.client.register_script(_REDIS_UPDATE)
+        self.take_tokens_script = self.client.register_script(_REDIS_TAKE_TOKENS)
+        self.limit_tokens_script = self.client.register_script(_REDIS_LIMIT_TOKENS)
+
+    def _key(self, *parts):
+        return ':'.join((self.prefix,) + parts)
+
+    def add(self, job):
+        job = dict(job, created_at=time.time())
+        pipe = self.client.pipeline()
+        pipe.hset(self._key('jobs'), job['job_id'], json.dumps(job))
+        # Jobs attached to an identical job are never run themselves
+        if job['status'] == 'queued':
+            pipe.rpush(self._key('queue'), job['job_id'])
+            if job.get('dedupe_key'):
+                pipe.hset(self._key('active'), job['dedupe_key'], job['job_id'])
+        pipe.execute()
+
+    def claim(self, worker_id, lease_seconds):
+        data = self.claim_script(keys=[self._key('queue'), self._key('jobs'), self._key('leases')],
+                                 args=[worker_id, int(lease_seconds)])
+        return json.loads(data) if data else None
+
+    def heartbeat(self, job_id, worker_id, lease_seconds):
+        return bool(self.heartbeat_script(keys=[self._key('jobs'), self._key('leases')],
+                                          args=[job_id, worker_id, int(lease_seconds)]))
+
+    def requeue_expired(self, max_attempts):
+        recovered = []
+        # Once out of the lease set, updates from the old owner are rejected
+        for job_id in self.expired_script(keys=[self._key('leases')]):
+            data = self.client.hget(self._key('jobs'), job_id)
+            if not data:
+                continue
+            job = json.loads(data)
+            if job['status'] != 'processing':
+                continue
+            job = _recover(job, max_attempts)
+            pipe = self.client.pipeline()
+            pipe.hset(self._key('jobs'), job_id, json.dumps(job))
+            if job['status'] == 'queued':
+                # Back to the head of the queue: it has waited long enough
+                pipe.lpush(self._key('queue'), job_id)
+            pipe.execute()
+            recovered.append(job)
+        return recovered
+
+    def update(self, job_id, fields, owner=None):
+        return bool(self.update_script(keys=[self._key('jobs'), self._key('leases')],
+                                       args=[job_id, json.dumps(fields), owner or '']))
+
+    def get(self, job_id):
+        data = self.client.hget(self._key('jobs'), job_id)
+        return json.loads(data) if data else None
+
+    def list(self):
+        jobs = [json.loads(data) for data in self.client.hvals(self._key('jobs'))]
+        return sorted(jobs, key=lambda job: job.get('created_at', 0))
+
+    def find_active(self, dedupe_key):
+        # Latest job queued per key; stale once it finishes, hence the status check
+        job_id = self.client.hget(self._key('active'), dedupe_key)
+        job = self.get(job_id) if job_id else None
+        if job is None or job['status'] not in ('queued', 'processing'):
+            return None
+        return job
+
+    def delete(self, job_id):
+        event_ids = self.client.lrange(self._key('events', job_id), 0, -1)
+        pipe = self.client.pipeline()
+        pipe.hdel(self._key('jobs'), job_id)
+        pipe.lrem(self._key('queue'), 0, job_id)
+        pipe.zrem(self._key('leases'), job_id)
+        if event_ids:
+            pipe.xdel(self._key('events'), *event_ids)
+        pipe.delete(self._key('events', job_id))
+        pipe.hdel(self._key('last_event'), job_id)
+        return bool(pipe.execute()[0])
+
+    def add_event(self, event):
+        stream_id = self.client.xadd(self._key('events'), {
+            'job_id': event['job_id'],
+            'event_id': event['id'],
+            'type': event['type'],
+            'time': event['time'],
+            'data': json.dumps(event['data'])
+        }, maxlen=self.max_events, approximate=True)
+        pipe = self.client.pipeline()
+        pipe.rpush(self._key('events', event['job_id']), stream_id)
+        pipe.hset(self._key('last_event'), event['job_id'], event['id'])
+        pipe.execute()
+
+    def events_after(self, cursor=None, limit=500):
+        response = self.client.xread({self._key('events'): cursor or '0-0'}, count=limit)
+        events = []
+        for _, entries in response:
+            for stream_id, fields in entries:
+                cursor = stream_id
+                events.append({
+                    'id': int(fields['event_id']),
+                    'type': fields['type'],
+                    'job_id': fields['job_id'],
+                    'time': float(fields['time']),
+                    'data': json.loads(fields['data'])
+                })
+        return events, cursor
+
+    def last_event_id(self, job_id):
+        return int(self.client.hget(self._key('last_event'), job_id) or 0)
+
+    def compact_events(self, job_id):
+        key = self._key('events', job_id)
+        event_ids = self.client.lrange(key, 0, -2)
+        if event_ids:
+            pipe = self.client.pipeline()
+            pipe.xdel(self._key('events'), *event_ids)
+            pipe.ltrim(key, -1, -1)
+            pipe.execute()
+
+    def take_tokens(self, buckets):
+        args = []
+        for name, (amount, per_minute) in buckets.items():
+            args += [name, amount, per_minute]
+        return float(self.take_tokens_script(keys=[self._key('rate_buckets')], args=args))
+
+    def limit_tokens(self, name, remaining, per_minute):
+        self.limit_tokens_script(keys=[self._key('rate_buckets')], args=[name, remaining, per_minute])
+
+    def register_worker(self, worker_id, info):
+        self.client.hset(self._key('workers'), worker_id, json.dumps(dict(info, heartbeat_at=time.time())))
+
+    def workers(self, max_age):
+        now = time.time()
+        workers = []
+        for worker_id, data in sorted(self.client.hgetall(self._key('workers')).items()):
+            worker = json.loads(data)
+            age = now - worker['heartbeat_at']
+            # Forget workers that have been silent for long
+            if age > 10 * max_age:
+                self.client.hdel(self._key('workers'), worker_id)
+            elif age <= max_age:
+                workers.append(dict(worker, worker_id=worker_id))
+        return workers
+
+
+_STORE_CLASSES = {
+    'sqlite': lambda: SQLiteJobStore(os.getenv('JOB_STORE_PATH', 'jobs.db')),
+    'redis': RedisJobStore
+}
+
+_job_store = None
+_job_store_lock = threading.Lock()
+
+def get_job_store():
+    """
+    Get the process-wide job store
+
+    JOB_STORE selects the broker: 'sqlite' (default, file JOB_STORE_PATH, one
+    host) or 'redis' (JOB_REDIS_URL, several hosts). Every API node and
+    worker of a deployment must use the same one.
+
+    Returns:
+        JobStore: Shared instance
+    """
+    global _job_store
+    with _job_store_lock:
+        if _job_store is None:
+            name = os.getenv('JOB_STORE', 'sqlite')
+            if name not in JOB_STORE_NAMES:
+                raise ValueError(f"Unknown job store: {name}")
+            _job_store = _STORE_CLASSES[name]()
+        return _job_store
@@ -0,0 +1,447 @@
+import math
+import os
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Buckets (seconds) for API calls and pipeline stages
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+# Buckets (seconds) for whole jobs
+JOB_BUCKETS = (30, 60, 120, 300, 600, 900, 1800, 3600, 7200)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels) + '}'
+
+
+class _Metric:
+    """Base for metric families with a fixed set of label names"""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    def samples(self):
+        """
+        Current samples of the family
+
+        Returns:
+            list: (suffix, label pairs, value) tuples
+        """
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self.values = {} if self.labelnames else {(): 0}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            return [('', key, value) for key, value in self.values.items()]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down per label set"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self.values = {} if self.labelnames else {(): 0}
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self):
+        with self.lock:
+            return [('', key, value) for key, value in self.values.items()]
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts, sum and count per label set"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self.values = {}
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            counts, total = self.values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self.values[key] = (counts, total + value)
+
+    def samples(self):
+        samples = []
+        with self.lock:
+            for key, (counts, total) in self.values.items():
+                for bound, count in zip(self.buckets, counts):
+                    samples.append(('_bucket', key + (('le', _format_value(bound)),), count))
+                samples.append(('_sum', key, total))
+                samples.append(('_count', key, counts[-1]))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Metric families plus collectors evaluated at scrape time
+
+    Collectors return (name, documentation, kind, [(label dict, value)])
+    tuples for values that are cheaper to read on demand than to track
+    (job queue, disk usage, rate limiter state).
+
+    Sources return snapshots of other processes' registries (pipeline
+    workers in queue mode); their samples are added to the local families
+    of the same name, so counters, histograms and busy gauges cover every
+    process.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+        self.sources = []
+        self.lock = threading.Lock()
+
+    def _register(self, metric):
+        with self.lock:
+            existing = self.metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self.metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector):
+        """
+        Register a scrape-time collector
+
+        Args:
+            collector: Zero-argument callable returning metric tuples
+        """
+        with self.lock:
+            self.collectors.append(collector)
+
+    def add_source(self, source):
+        """
+        Register a scrape-time source of other processes' metrics
+
+        Args:
+            source: Zero-argument callable returning a list of snapshot() results
+        """
+        with self.lock:
+            self.sources.append(source)
+
+    def snapshot(self):
+        """
+        Current samples of every metric family, JSON-serializable
+
+        Returns:
+            list: Family dicts (name, documentation, kind, samples as [suffix, label pairs, value])
+        """
+        with self.lock:
+            metrics = list(self.metrics.values())
+        return [{
+            'name': metric.name,
+            'documentation': metric.documentation,
+            'kind': metric.kind,
+            'samples': [[suffix, [list(pair) for pair in labels], value] for suffix, labels, value in metric.samples()]
+        } for metric in metrics]
+
+    def render(self):
+        """
+        Render every metric in the Prometheus text exposition format
+
+        Returns:
+            str: Exposition body
+        """
+        with self.lock:
+            sources = list(self.sources)
+            collectors = list(self.collectors)
+
+        # name -> [documentation, kind, {(suffix, label pairs): value}]
+        families = {}
+        snapshots = [self.snapshot()]
+        for source in sources:
+            try:
+                snapshots.extend(source())
+            except Exception as e:
+                logger.warning(f"[METRICS] Source {getattr(source, '__name__', source)} failed: {e}")
+        for snapshot in snapshots:
+            for family in snapshot:
+                _, _, values = families.setdefault(family['name'], [family['documentation'], family['kind'], {}])
+                for suffix, labels, value in family['samples']:
+                    key = (suffix, tuple(tuple(pair) for pair in labels))
+                    values[key] = values.get(key, 0) + value
+
+        lines = []
+        for name, (documentation, kind, values) in families.items():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (suffix, labels), value in values.items():
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+
+        for collector in collectors:
+            try:
+                families = collector()
+            except Exception as e:
+                logger.warning(f"[METRICS] Collector {getattr(collector, '__name__', collector)} failed: {e}")
+                continue
+            for name, documentation, kind, samples in families:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}")
+
+        return '\n'.join(lines) + '\n'
+
+
+_registry = MetricsRegistry()
+
+JOBS_CREATED = _registry.counter(
+    'autodub_jobs_created_total', 'Dubbing jobs accepted'
+)
+JOBS_DEDUPLICATED = _registry.counter(
+    'autodub_jobs_deduplicated_total', 'Jobs attached to an identical job already queued or running'
+)
+JOBS_FINISHED = _registry.counter(
+    'autodub_jobs_finished_total', 'Dubbing jobs finished, by outcome', ('status',)
+)
+JOB_DURATION = _registry.histogram(
+    'autodub_job_duration_seconds', 'Wall time of dubbing jobs', ('status',), JOB_BUCKETS
+)
+STAGE_DURATION = _registry.histogram(
+    'autodub_stage_duration_seconds', 'Wall time of pipeline stages', ('stage',)
+)
+API_REQUESTS = _registry.counter(
+    'autodub_api_requests_total', 'External API calls, by outcome (ok, rate_limited, error)', ('service', 'outcome')
+)
+API_LATENCY = _registry.histogram(
+    'autodub_api_request_duration_seconds', 'Latency of external API calls', ('service',)
+)
+STAGES_SHARED = _registry.counter(
+    'autodub_stages_shared_total', 'Pipeline stages that joined the identical stage of another job', ('stage',)
+)
+CACHE_LOOKUPS = _registry.counter(
+    'autodub_cache_lookups_total', 'CacheManager lookups, by result (hit, miss)', ('cache', 'result')
+)
+WORKERS_BUSY = _registry.gauge(
+    'autodub_workers_busy', 'Worker threads currently running a task', ('pool',)
+)
+WORKERS_CAPACITY = _registry.gauge(
+    'autodub_workers_capacity', 'Worker threads of the pools currently open', ('pool',)
+)
+
+
+def get_metrics():
+    """
+    Get the process-wide metrics registry
+
+    Returns:
+        MetricsRegistry: Shared registry
+    """
+    return _registry
+
+
+def record_api_call(service, duration, error=None):
+    """
+    Count one external API call
+
+    Args:
+        service: Service name ('deepgram', 'openai', 'elevenlabs', 'download')
+        duration: Call latency in seconds
+        error: Exception raised by the call, if any
+    """
+    if error is None:
+        outcome = 'ok'
+    elif getattr(error, 'status_code', None) == 429:
+        outcome = 'rate_limited'
+    else:
+        outcome = 'error'
+    API_REQUESTS.inc(service=service, outcome=outcome)
+    API_LATENCY.observe(duration, service=service)
+
+
+def record_cache_lookup(cache, hit):
+    """
+    Count one cache lookup
+
+    Args:
+        cache: Cache name ('transcription', 'translation', 'translation_context', 'voice', 'range_media', ...)
+        hit: True if the entry was found
+    """
+    CACHE_LOOKUPS.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+class WorkerPool:
+    """
+    Utilization gauges for a thread pool
+
+    Counts the pool's size into autodub_workers_capacity while open and
+    wrapped tasks into autodub_workers_busy while they run, so
+    busy / capacity is the utilization of every pool with that name.
+    """
+
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+
+    def __enter__(self):
+        WORKERS_CAPACITY.inc(self.size, pool=self.name)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        WORKERS_CAPACITY.dec(self.size, pool=self.name)
+        return False
+
+    def wrap(self, fn):
+        """
+        Count fn as busy while it runs
+
+        Args:
+            fn: Task submitted to the pool
+
+        Returns:
+            callable: Wrapped task
+        """
+        def task(*args, **kwargs):
+            WORKERS_BUSY.inc(pool=self.name)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                WORKERS_BUSY.dec(pool=self.name)
+
+        return task
+
+
+class DirectorySizeCollector:
+    """
+    Scrape-time disk usage of working directories
+
+    Walking large temp trees on every scrape is wasteful, so sizes are
+    cached for a few seconds.
+    """
+
+    def __init__(self, directories, max_age=15.0):
+        self.directories = directories
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.cached = None
+        self.cached_at = 0.0
+
+    def _size(self, path):
+        total = 0
+        for root, _, files in os.walk(path):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass  # Removed while walking
+        return total
+
+    def __call__(self):
+        with self.lock:
+            if self.cached is None or time.monotonic() - self.cached_at > self.max_age:
+                self.cached = [
+                    ({'directory': name}, self._size(path))
+                    for name, path in self.directories.items()
+                ]
+                self.cached_at = time.monotonic()
+            samples = list(self.cached)
+        return [('autodub_disk_usage_bytes', 'Bytes used by working directories', 'gauge', samples)]
+
+
+def collect_rate_limiters():
+    """Scrape-time state of the provider rate limiters"""
+    from .rate_limiter import get_all_rate_limiter_stats
+
+    stats = get_all_rate_limiter_stats()
+    return [
+        ('autodub_rate_limiter_queued', 'Requests waiting for provider quota', 'gauge',
+         [({'provider': s['provider']}, s['queued']) for s in stats]),
+        ('autodub_rate_limiter_granted_total', 'Requests granted by the provider rate limiter', 'counter',
+         [({'provider': s['provider']}, s['granted']) for s in stats]),
+        ('autodub_rate_limiter_throttled_total', 'HTTP 429 responses seen by the provider rate limiter', 'counter',
+         [({'provider': s['provider']}, s['rate_limited']) for s in stats])
+    ]
+
+
+def collect_translation_memory():
+    """Scrape-time translation memory lookup outcomes (once a job has loaded it)"""
+    from . import translation_memory
+
+    memory = translation_memory._translation_memory
+    if memory is None:
+        return []
+    stats = memory.get_stats()
+    return [
+        ('autodub_translation_memory_entries', 'Entries in the translation memory', 'gauge',
+         [({}, stats['entries'])]),
+        ('autodub_translation_memory_lookups_total', 'Translation memory lookups, by result', 'counter',
+         [({'result': result}, stats[result]) for result in ('reused', 'edits', 'misses')])
+    ]
+
+
+_registry.add_collector(collect_rate_limiters)
+_registry.add_collector(collect_translation_memory)
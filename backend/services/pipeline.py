@@ -1,7 +1,11 @@
 import os
+import copy
+import hashlib
+import json
 import time
 import logging
 import concurrent.futures
+import shutil
 from pathlib import Path
 from .downloader import VideoDownloader
 from .transcriber import Transcriber
@@ -11,6 +15,16 @@ from .audio_processor import AudioProcessor
 from .audio_separator import AudioSeparator
 from .speaker_extractor import SpeakerExtractor
 from .voice_cloner import VoiceCloner
+from .glossary import load_glossary
+from .translation_backends import select_translation_backend
+from .tts_backends import select_tts_backend
+from .asr_backends import select_asr_backend
+from .tracing import start_trace, end_trace, start_span, bind
+from .events import get_event_bus
+from .progressive import HLSWriter, get_keyframe_times, plan_regions, hls_dir
+from .single_flight import get_single_flight, normalize_video_url
+from .range_cache import get_range_cache
+from .metrics import STAGES_SHARED
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -21,7 +35,9 @@ class DubbingPipeline:
     Download → Transcribe → Translate → Synthesize → Align → Merge
     """
     
-    def __init__(self, job_id, youtube_url, target_language, source_language='en', start_time=None, end_time=None, use_voice_cloning=False):
+    def __init__(self, job_id, youtube_url, target_language, source_language='en', start_time=None, end_time=None, use_voice_cloning=False,
+                 project=None, translation_backend=None, tts_backend=None, asr_backend=None, use_cache=True,
+                 progressive=None):
         self.job_id = job_id
         self.youtube_url = youtube_url
         self.target_language = target_language
@@ -29,19 +45,31 @@ class DubbingPipeline:
         self.use_voice_cloning = use_voice_cloning
         self.start_time = start_time
         self.end_time = end_time
+        self.project = project
+        self.translation_backend = select_translation_backend(source_language, target_language, translation_backend)
+        self.tts_backend = select_tts_backend(tts_backend)
+        self.asr_backend = select_asr_backend(asr_backend, start_time, end_time)
         
         # Initialize services (pass youtube_url and time ranges for job-agnostic caching)
         self.downloader = VideoDownloader(output_dir='temp')
         self.transcriber = Transcriber(
             video_url=youtube_url,
             start_time=start_time,
-            end_time=end_time
+            end_time=end_time,
+            backend=self.asr_backend,
+            use_cache=use_cache
         )
-        self.translator = Translator()  # Already job-agnostic (text-based)
-        self.synthesizer = SpeechSynthesizer(output_dir='temp')
+        # job_id is only the fairness key for the process-wide API rate limiters
+        self.translator = Translator(  # Already job-agnostic (text-based)
+            job_id=job_id,
+            use_cache=use_cache,
+            glossary=load_glossary(project),
+            backend=self.translation_backend
+        )
+        self.synthesizer = SpeechSynthesizer(output_dir='temp', job_id=job_id, backend=self.tts_backend)
         self.audio_separator = AudioSeparator(temp_dir='temp')
         self.speaker_extractor = SpeakerExtractor(temp_dir='temp')
-        self.voice_cloner = VoiceCloner(video_url=youtube_url)
+        self.voice_cloner = VoiceCloner(video_url=youtube_url, job_id=job_id, backend=self.tts_backend, use_cache=use_cache)
         self.cloned_voices = {}
         self.audio_processor = AudioProcessor(temp_dir='temp')
         
@@ -60,17 +88,45 @@ class DubbingPipeline:
         self.progress = 0
         self.status = 'queued'
         self.message = 'Job queued'
+        self.stage = None
         
         # Performance tracking
         self.stage_timings = {}
         self.total_start_time = None
+        self.media_duration = None
+        self.trace_id = None
+        
+        # Progressive output: dub and publish the video region by region (HLS)
+        if progressive is None:
+            progressive = os.getenv('PROGRESSIVE_OUTPUT', 'False') == 'True'
+        self.progressive = progressive
+        self.playlist_path = None
+        self.region_dir = None
+        
+        # Stages of identical concurrent jobs run once (only with caching: cold benchmarks stay cold)
+        self.single_flight = use_cache and os.getenv('SINGLE_FLIGHT', 'True') == 'True'
+        self.media_key = (normalize_video_url(youtube_url), start_time, end_time)
+        self.transcription_key = self.media_key + (source_language, self.asr_backend)
+        
+        # Range-aware reuse: media, word timings and dubbed segments of earlier runs on other ranges of the video
+        self.range_reuse = use_cache and os.getenv('RANGE_REUSE', 'True') == 'True'
+        self.range_cache = get_range_cache() if self.range_reuse else None
+        self.range_start = start_time or 0
     
-    def update_progress(self, progress, status, message):
-        """Update job progress"""
+    def update_progress(self, progress, status, message, stage=None):
+        """Update job progress and publish it on the job event bus"""
         self.progress = progress
         self.status = status
         self.message = message
+        if stage:
+            self.stage = stage
         print(f"[{self.job_id}] {progress}% - {status}: {message}")
+        get_event_bus().publish(self.job_id, 'progress', {
+            'status': status,
+            'progress': progress,
+            'message': message,
+            'stage': self.stage
+        })
     
     def run(self):
         """
@@ -82,6 +138,20 @@ class DubbingPipeline:
         # Start total timer
         self.total_start_time = time.time()
         
+        # One trace per job, a span per stage (see services/tracing.py)
+        self.trace_id = start_trace(self.job_id, attributes={
+            'job.id': self.job_id,
+            'job.url': self.youtube_url,
+            'job.source_language': self.source_language,
+            'job.target_language': self.target_language,
+            'job.start_time': self.start_time,
+            'job.end_time': self.end_time,
+            'job.voice_cloning': self.use_voice_cloning,
+            'backend.asr': self.asr_backend,
+            'backend.translation': self.translation_backend,
+            'backend.tts': self.tts_backend
+        }).trace_id
+        
         try:
             # Step 1: Download video and extract audio
             logger.info(f"\n{'='*80}")
@@ -94,60 +164,14 @@ class DubbingPipeline:
             logger.info(f"Start Time: {self.start_time}")
             logger.info(f"End Time: {self.end_time}")
             
-            stage_start = time.time()
-            
-            self.update_progress(10, 'processing', 'Downloading video from YouTube...')
-            video_info = self.downloader.download_video(
-                self.youtube_url, 
-                self.job_id,
-                start_time=self.start_time,
-                end_time=self.end_time
-            )
-            self.video_path = video_info['video_path']
-            
-            self.stage_timings['download'] = time.time() - stage_start
-            logger.info(f"✅ STAGE 1 COMPLETE: Video downloaded successfully")
-            logger.info(f"   Video Path: {self.video_path}")
-            logger.info(f"   Video Title: {video_info.get('title', 'Unknown')}")
-            logger.info(f"   ⏱️  Duration: {self.stage_timings['download']:.2f}s")
-            
-            logger.info(f"\n{'='*80}")
-            logger.info(f"[STAGE 2/6] EXTRACTING AUDIO")
-            logger.info(f"{'='*80}")
-            
-            stage_start = time.time()
-            self.update_progress(20, 'processing', 'Extracting audio from video...')
-            self.audio_path = self.audio_processor.extract_audio_from_video(
-                self.video_path,
-                os.path.join('temp', f'{self.job_id}_original_audio.wav')
-            )
-            
-            self.stage_timings['audio_extraction'] = time.time() - stage_start
-            logger.info(f"✅ STAGE 2 COMPLETE: Audio extracted successfully")
-            logger.info(f"   Audio Path: {self.audio_path}")
-            logger.info(f"   ⏱️  Duration: {self.stage_timings['audio_extraction']:.2f}s")
-
-            # Step 2.5: Separate vocals from background
-            logger.info(f"\n{'='*80}")
-            logger.info(f"[STAGE 2.5/7] SEPARATING VOCALS FROM BACKGROUND")
-            logger.info(f"{'='*80}")
-
-            stage_start = time.time()
-            self.update_progress(22, 'processing', 'Separating vocals from background music...')
-
-            separated_audio = self.audio_separator.separate_audio(
-                self.audio_path,
-                self.job_id
-            )
-
-            self.vocals_path = separated_audio['vocals']
-            self.background_audio_path = separated_audio['background']
-
-            self.stage_timings['audio_separation'] = time.time() - stage_start
-            logger.info(f"✅ STAGE 2.5 COMPLETE: Audio separation successful")
-            logger.info(f"   Vocals: {self.vocals_path}")
-            logger.info(f"   Background: {self.background_audio_path}")
-            logger.info(f"   ⏱️  Duration: {self.stage_timings['audio_separation']:.2f}s")
+            # A kept span of an earlier run containing this range replaces stages 1-2.5
+            media_span = self.range_cache.find_span(self.youtube_url, self.start_time, self.end_time) if self.range_reuse else None
+            if media_span is not None:
+                self._slice_span(media_span)
+            else:
+                self._prepare_media()
+                if self.range_reuse:
+                    self._keep_span()
             
             # Step 2: Transcribe audio
             logger.info(f"\n{'='*80}")
@@ -156,22 +180,41 @@ class DubbingPipeline:
             logger.info(f"Language: {self.source_language}")
             
             stage_start = time.time()
-            self.update_progress(30, 'processing', 'Transcribing audio...')
-            self.transcription = self.transcriber.transcribe_audio(
-                self.vocals_path,  # Use vocals instead of full audio
-                language=self.source_language
-            )
+            span = start_span('transcription', self.job_id)
+            self.update_progress(30, 'processing', 'Transcribing audio...', stage='transcription')
+            if self.range_reuse:
+                self.transcription = self.range_cache.find_transcription(
+                    self.youtube_url, self.source_language, self.asr_backend, self.start_time, self.end_time
+                )
+            if not self.transcription:
+                self.transcription, _ = self._single_flight('transcription', self.transcription_key, lambda: self.transcriber.transcribe_audio(
+                    self.vocals_path,  # Use vocals instead of full audio
+                    language=self.source_language
+                ), copy_result=True)
+                if self.range_reuse and self.transcription and self.transcription.get('segments'):
+                    self._keep_transcription()
             
             if not self.transcription or not self.transcription.get('segments'):
                 raise Exception("Transcription failed or returned no segments")
             
             self.stage_timings['transcription'] = time.time() - stage_start
+            span.end({
+                'segments': len(self.transcription['segments']),
+                'speakers': self.transcription.get('speaker_count', 1)
+            })
             logger.info(f"✅ STAGE 3 COMPLETE: Transcription successful")
             logger.info(f"   Segments: {len(self.transcription['segments'])}")
             logger.info(f"   Speakers: {self.transcription.get('speaker_count', 1)}")
             logger.info(f"   Full Text Preview: {self.transcription.get('full_text', '')[:100]}...")
             logger.info(f"   ⏱️  Duration: {self.stage_timings['transcription']:.2f}s")
 
+            if self.progressive:
+                self._run_progressive()
+                return self._complete_run()
+
+            # Segments dubbed by an earlier run on an overlapping range are not translated or synthesized again
+            reused_segments, segments = self._split_reusable(self.transcription['segments'])
+            
             # PARALLEL EXECUTION: Translation + Voice Cloning
             if self.use_voice_cloning:
                 logger.info(f"\n{'='*80}")
@@ -184,12 +227,12 @@ class DubbingPipeline:
                 with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
                     # Submit both tasks
                     translation_future = executor.submit(
-                        self._run_translation,
-                        self.transcription['segments']
+                        bind(self._run_translation),
+                        segments
                     )
                     
                     voice_cloning_future = executor.submit(
-                        self._run_voice_cloning,
+                        bind(self._run_voice_cloning),
                         self.vocals_path,
                         self.transcription['segments']
                     )
@@ -210,9 +253,7 @@ class DubbingPipeline:
                 logger.info(f"[STAGE 4/6] TRANSLATING TEXT")
                 logger.info(f"{'='*80}")
                 
-                self.translated_segments = self._run_translation(
-                    self.transcription['segments']
-                )
+                self.translated_segments = self._run_translation(segments)
             
             # Step 4: Synthesize speech
             logger.info(f"\n{'='*80}")
@@ -220,9 +261,12 @@ class DubbingPipeline:
             logger.info(f"{'='*80}")
             
             stage_start = time.time()
-            self.update_progress(60, 'processing', 'Synthesizing speech...')
+            span = start_span('synthesis', self.job_id)
+            self.update_progress(60, 'processing', 'Synthesizing speech...', stage='synthesis')
             
-            if self.use_voice_cloning and self.cloned_voices:
+            if not self.translated_segments:
+                self.synthesized_segments = []
+            elif self.use_voice_cloning and self.cloned_voices:
                 logger.info(f"[PIPELINE] Using cloned voices for synthesis")
                 logger.info(f"[PIPELINE] Cloned voices: {self.cloned_voices}")
                 self.synthesized_segments = self.synthesizer.synthesize_segments_with_cloned_voices(
@@ -242,13 +286,19 @@ class DubbingPipeline:
                     voice_id=voice_id,
                     job_id=self.job_id,
                     language_code=self.target_language,
-                    multi_speaker=True
+                    multi_speaker=True,
+                    speakers=self._speakers()
                 )
             
+            self._keep_dubbed_segments(self.synthesized_segments)
+            self.translated_segments = self._merge_reused(self.translated_segments, reused_segments)
+            self.synthesized_segments = self._merge_reused(self.synthesized_segments, reused_segments)
+            
             self.stage_timings['synthesis'] = time.time() - stage_start
             logger.info(f"✅ STAGE 5 COMPLETE: Speech synthesis successful")
             logger.info(f"   Synthesized Segments: {len(self.synthesized_segments)}")
             segments_with_audio = sum(1 for s in self.synthesized_segments if 'audio_path' in s)
+            span.end({'segments': len(self.synthesized_segments), 'segments.with_audio': segments_with_audio})
             logger.info(f"   Segments with audio: {segments_with_audio}/{len(self.synthesized_segments)}")
             logger.info(f"   ⏱️  Duration: {self.stage_timings['synthesis']:.2f}s")
             
@@ -258,10 +308,12 @@ class DubbingPipeline:
             logger.info(f"{'='*80}")
             
             stage_start = time.time()
-            self.update_progress(75, 'processing', 'Aligning audio segments...')
+            span = start_span('alignment', self.job_id)
+            self.update_progress(75, 'processing', 'Aligning audio segments...', stage='alignment')
             self.dubbed_audio_path = self._align_and_merge_audio()
             
             self.stage_timings['alignment'] = time.time() - stage_start
+            span.end({'file.bytes': self._file_size(self.dubbed_audio_path)})
             logger.info(f"✅ Audio alignment complete")
             logger.info(f"   Dubbed Audio Path: {self.dubbed_audio_path}")
             logger.info(f"   ⏱️  Duration: {self.stage_timings['alignment']:.2f}s")
@@ -272,7 +324,8 @@ class DubbingPipeline:
             logger.info(f"{'='*80}")
 
             stage_start = time.time()
-            self.update_progress(85, 'processing', 'Mixing dubbed vocals with background music...')
+            span = start_span('mixing', self.job_id)
+            self.update_progress(85, 'processing', 'Mixing dubbed vocals with background music...', stage='mixing')
 
             final_dubbed_audio = os.path.join('temp', f'{self.job_id}_final_dubbed_audio.mp3')
             self.audio_separator.mix_vocals_with_background(
@@ -287,6 +340,7 @@ class DubbingPipeline:
             self.dubbed_audio_path = final_dubbed_audio
 
             self.stage_timings['mixing'] = time.time() - stage_start
+            span.end({'file.bytes': self._file_size(self.dubbed_audio_path)})
             logger.info(f"✅ STAGE 6.5 COMPLETE: Audio mixing successful")
             logger.info(f"   Final Audio: {self.dubbed_audio_path}")
             logger.info(f"   ⏱️  Duration: {self.stage_timings['mixing']:.2f}s")
@@ -294,7 +348,8 @@ class DubbingPipeline:
             # Step 6: Merge dubbed audio with video
             logger.info(f"\n📹 Merging dubbed audio with original video...")
             stage_start = time.time()
-            self.update_progress(90, 'processing', 'Merging audio with video...')
+            span = start_span('video_merge', self.job_id)
+            self.update_progress(90, 'processing', 'Merging audio with video...', stage='video_merge')
             self.output_video_path = os.path.join(
                 'outputs',
                 f'{self.job_id}_dubbed.mp4'
@@ -309,49 +364,13 @@ class DubbingPipeline:
             )
             
             self.stage_timings['video_merge'] = time.time() - stage_start
+            span.end({'file.bytes': self._file_size(self.output_video_path)})
             logger.info(f"✅ STAGE 6 COMPLETE: Video merging successful")
             logger.info(f"   Output Video: {self.output_video_path}")
             logger.info(f"   ⏱️  Duration: {self.stage_timings['video_merge']:.2f}s")
             
             # Step 7: Complete - Calculate and log total time
-            total_time = time.time() - self.total_start_time
-            
-            logger.info(f"\n{'='*80}")
-            logger.info(f"🎉 DUBBING PIPELINE COMPLETE!")
-            logger.info(f"{'='*80}")
-            logger.info(f"Job ID: {self.job_id}")
-            logger.info(f"Output File: {self.output_video_path}")
-            logger.info(f"Total Segments: {len(self.synthesized_segments)}")
-            logger.info(f"")
-            logger.info(f"⏱️  PERFORMANCE SUMMARY:")
-            logger.info(f"{'─'*80}")
-            logger.info(f"   Download:           {self.stage_timings.get('download', 0):>8.2f}s")
-            logger.info(f"   Audio Extraction:   {self.stage_timings.get('audio_extraction', 0):>8.2f}s")
-            logger.info(f"   Audio Separation:   {self.stage_timings.get('audio_separation', 0):>8.2f}s")
-            logger.info(f"   Transcription:      {self.stage_timings.get('transcription', 0):>8.2f}s")
-            if 'speaker_extraction' in self.stage_timings:
-                logger.info(f"   Speaker Extraction: {self.stage_timings.get('speaker_extraction', 0):>8.2f}s")
-            if 'voice_cloning' in self.stage_timings:
-                logger.info(f"   Voice Cloning:      {self.stage_timings.get('voice_cloning', 0):>8.2f}s")
-            logger.info(f"   Translation:        {self.stage_timings.get('translation', 0):>8.2f}s")
-            logger.info(f"   Synthesis:          {self.stage_timings.get('synthesis', 0):>8.2f}s")
-            logger.info(f"   Alignment:          {self.stage_timings.get('alignment', 0):>8.2f}s")
-            logger.info(f"   Mixing:             {self.stage_timings.get('mixing', 0):>8.2f}s")
-            logger.info(f"   Video Merge:        {self.stage_timings.get('video_merge', 0):>8.2f}s")
-            logger.info(f"{'─'*80}")
-            logger.info(f"   🏁 TOTAL TIME:      {total_time:>8.2f}s ({total_time/60:.2f} minutes)")
-            logger.info(f"{'='*80}\n")
-            
-            self.update_progress(100, 'completed', 'Dubbing completed successfully!')
-            
-            return {
-                'status': 'completed',
-                'output_file': self.output_video_path,
-                'job_id': self.job_id,
-                'segments_count': len(self.synthesized_segments),
-                'total_time': total_time,
-                'stage_timings': self.stage_timings
-            }
+            return self._complete_run()
             
         except Exception as e:
             error_type = type(e).__name__
@@ -362,18 +381,151 @@ class DubbingPipeline:
             logger.error(f"[PIPELINE ERROR] Full exception: {repr(e)}")
             
             self.update_progress(self.progress, 'failed', f'Error: {error_msg}')
+            end_trace(self.job_id, error=e)
             raise
     
-    def _align_and_merge_audio(self):
+    def _prepare_media(self):
+        """
+        Download the video, extract its audio and separate vocals from background
+        """
+        stage_start = time.time()
+        span = start_span('download', self.job_id)
+        
+        self.update_progress(10, 'processing', 'Downloading video from YouTube...', stage='download')
+        video_info, shared = self._single_flight('download', self.media_key, lambda: self.downloader.download_video(
+            self.youtube_url, 
+            self.job_id,
+            start_time=self.start_time,
+            end_time=self.end_time
+        ))
+        if shared:
+            video_info = dict(video_info, video_path=self._adopt(video_info['video_path']))
+        self.video_path = video_info['video_path']
+        self.media_duration = video_info.get('duration')
+        
+        self.stage_timings['download'] = time.time() - stage_start
+        span.end({'media.duration': self.media_duration, 'file.bytes': self._file_size(self.video_path)})
+        logger.info(f"✅ STAGE 1 COMPLETE: Video downloaded successfully")
+        logger.info(f"   Video Path: {self.video_path}")
+        logger.info(f"   Video Title: {video_info.get('title', 'Unknown')}")
+        logger.info(f"   ⏱️  Duration: {self.stage_timings['download']:.2f}s")
+        
+        logger.info(f"\n{'='*80}")
+        logger.info(f"[STAGE 2/6] EXTRACTING AUDIO")
+        logger.info(f"{'='*80}")
+        
+        stage_start = time.time()
+        span = start_span('audio_extraction', self.job_id)
+        self.update_progress(20, 'processing', 'Extracting audio from video...', stage='audio_extraction')
+        self.audio_path, shared = self._single_flight('audio_extraction', self.media_key, lambda: self.audio_processor.extract_audio_from_video(
+            self.video_path,
+            os.path.join('temp', f'{self.job_id}_original_audio.wav')
+        ))
+        if shared:
+            self.audio_path = self._adopt(self.audio_path)
+        
+        self.stage_timings['audio_extraction'] = time.time() - stage_start
+        span.end({'file.bytes': self._file_size(self.audio_path)})
+        logger.info(f"✅ STAGE 2 COMPLETE: Audio extracted successfully")
+        logger.info(f"   Audio Path: {self.audio_path}")
+        logger.info(f"   ⏱️  Duration: {self.stage_timings['audio_extraction']:.2f}s")
+
+        # Step 2.5: Separate vocals from background
+        logger.info(f"\n{'='*80}")
+        logger.info(f"[STAGE 2.5/7] SEPARATING VOCALS FROM BACKGROUND")
+        logger.info(f"{'='*80}")
+
+        stage_start = time.time()
+        span = start_span('audio_separation', self.job_id)
+        self.update_progress(22, 'processing', 'Separating vocals from background music...', stage='audio_separation')
+
+        separated_audio, shared = self._single_flight('audio_separation', self.media_key, lambda: self.audio_separator.separate_audio(
+            self.audio_path,
+            self.job_id
+        ))
+        if shared:
+            separated_audio = {name: self._adopt(path) for name, path in separated_audio.items()}
+
+        self.vocals_path = separated_audio['vocals']
+        self.background_audio_path = separated_audio['background']
+
+        self.stage_timings['audio_separation'] = time.time() - stage_start
+        span.end({'vocals.bytes': self._file_size(self.vocals_path), 'background.bytes': self._file_size(self.background_audio_path)})
+        logger.info(f"✅ STAGE 2.5 COMPLETE: Audio separation successful")
+        logger.info(f"   Vocals: {self.vocals_path}")
+        logger.info(f"   Background: {self.background_audio_path}")
+        logger.info(f"   ⏱️  Duration: {self.stage_timings['audio_separation']:.2f}s")
+    
+    def _complete_run(self):
+        """
+        Log the performance summary and build the job result
+        
+        Returns:
+            dict: Job result with output video path
+        """
+        total_time = time.time() - self.total_start_time
+        
+        logger.info(f"\n{'='*80}")
+        logger.info(f"🎉 DUBBING PIPELINE COMPLETE!")
+        logger.info(f"{'='*80}")
+        logger.info(f"Job ID: {self.job_id}")
+        logger.info(f"Output File: {self.output_video_path}")
+        logger.info(f"Total Segments: {len(self.synthesized_segments)}")
+        logger.info(f"")
+        logger.info(f"⏱️  PERFORMANCE SUMMARY:")
+        logger.info(f"{'─'*80}")
+        logger.info(f"   Download:           {self.stage_timings.get('download', 0):>8.2f}s")
+        logger.info(f"   Audio Extraction:   {self.stage_timings.get('audio_extraction', 0):>8.2f}s")
+        logger.info(f"   Audio Separation:   {self.stage_timings.get('audio_separation', 0):>8.2f}s")
+        logger.info(f"   Transcription:      {self.stage_timings.get('transcription', 0):>8.2f}s")
+        if 'speaker_extraction' in self.stage_timings:
+            logger.info(f"   Speaker Extraction: {self.stage_timings.get('speaker_extraction', 0):>8.2f}s")
+        if 'voice_cloning' in self.stage_timings:
+            logger.info(f"   Voice Cloning:      {self.stage_timings.get('voice_cloning', 0):>8.2f}s")
+        logger.info(f"   Translation:        {self.stage_timings.get('translation', 0):>8.2f}s")
+        logger.info(f"   Synthesis:          {self.stage_timings.get('synthesis', 0):>8.2f}s")
+        logger.info(f"   Alignment:          {self.stage_timings.get('alignment', 0):>8.2f}s")
+        logger.info(f"   Mixing:             {self.stage_timings.get('mixing', 0):>8.2f}s")
+        logger.info(f"   Video Merge:        {self.stage_timings.get('video_merge', 0):>8.2f}s")
+        if 'range_reuse' in self.stage_timings:
+            logger.info(f"   Range Reuse:        {self.stage_timings['range_reuse']:>8.2f}s")
+        if 'first_output' in self.stage_timings:
+            logger.info(f"   First Region Ready: {self.stage_timings['first_output']:>8.2f}s")
+        logger.info(f"{'─'*80}")
+        logger.info(f"   🏁 TOTAL TIME:      {total_time:>8.2f}s ({total_time/60:.2f} minutes)")
+        logger.info(f"{'='*80}\n")
+        
+        self.update_progress(100, 'completed', 'Dubbing completed successfully!')
+        end_trace(self.job_id)
+        
+        return {
+            'status': 'completed',
+            'output_file': self.output_video_path,
+            'job_id': self.job_id,
+            'segments_count': len(self.synthesized_segments),
+            'total_time': total_time,
+            'media_duration': self.media_duration,
+            'stage_timings': self.stage_timings,
+            'trace_id': self.trace_id,
+            'playlist_file': self.playlist_path
+        }
+    
+    def _align_and_merge_audio(self, segments=None, output_path=None):
         """
         Align synthesized audio segments to match original timing
         
+        Args:
+            segments: Optional segments to align (default: all synthesized segments)
+            output_path: Optional path of the merged audio
+        
         Returns:
-            str: Path to final dubbed audio file
+            str: Path to final dubbed audio file (None if a region has no segment with audio)
         """
         aligned_segments = []
+        # Speed adjustment tolerance (1% for precise timing)
+        tolerance = float(os.getenv('ALIGNMENT_TOLERANCE', 0.01))
         
-        for segment in self.synthesized_segments:
+        for segment in (self.synthesized_segments if segments is None else segments):
             if 'audio_path' not in segment or not os.path.exists(segment['audio_path']):
                 print(f"Warning: Skipping segment without audio: {segment.get('translated_text', '')[:50]}")
                 continue
@@ -394,8 +546,8 @@ class DubbingPipeline:
                 logger.info(f"[ALIGNMENT]   Synthesized duration: {synth_duration:.2f}s")
                 logger.info(f"[ALIGNMENT]   Speed factor: {speed_factor:.2f}x")
                 
-                # If speed adjustment is needed (tolerance: 1% for precise timing)
-                if abs(speed_factor - 1.0) > 0.01:
+                # If speed adjustment is needed
+                if abs(speed_factor - 1.0) > tolerance:
                     logger.info(f"[ALIGNMENT] Adjusting segment speed to {speed_factor:.2f}x")
                     
                     # Adjust speed to fit original duration
@@ -415,12 +567,15 @@ class DubbingPipeline:
                     except Exception as e:
                         logger.warning(f"[ALIGNMENT] ⚠️ Could not adjust speed: {e}")
                 else:
-                    logger.info(f"[ALIGNMENT] ✅ No adjustment needed (within 1% tolerance)")
+                    logger.info(f"[ALIGNMENT] ✅ No adjustment needed (within {tolerance:.0%} tolerance)")
             
             aligned_segments.append(segment)
         
+        if not aligned_segments and segments is not None:
+            return None
+        
         # Concatenate all segments
-        output_path = os.path.join('temp', f'{self.job_id}_dubbed_audio.mp3')
+        output_path = output_path or os.path.join('temp', f'{self.job_id}_dubbed_audio.mp3')
         
         self.audio_processor.concatenate_audio_segments(
             aligned_segments,
@@ -429,6 +584,175 @@ class DubbingPipeline:
         
         return output_path
     
+    def _run_progressive(self):
+        """
+        Dub the video region by region, publishing each region to an HLS playlist
+        
+        Regions are translated, synthesized, aligned and muxed one at a time, so
+        the first minutes are watchable while the rest is still being dubbed.
+        The final MP4 is the stream-copied concatenation of the regions.
+        """
+        logger.info(f"\n{'='*80}")
+        logger.info(f"[STAGE 4-6] PROGRESSIVE: DUBBING REGION BY REGION")
+        logger.info(f"{'='*80}")
+        
+        if self.use_voice_cloning:
+            self.cloned_voices = self._run_voice_cloning(self.vocals_path, self.transcription['segments'])
+        
+        segments = self.transcription['segments']
+        duration = self.audio_processor.get_audio_duration(self.audio_path)
+        keyframes = get_keyframe_times(self.video_path)
+        regions = plan_regions(
+            segments,
+            duration,
+            keyframes=keyframes,
+            target_seconds=float(os.getenv('PROGRESSIVE_REGION_SECONDS', 20)),
+            first_seconds=float(os.getenv('PROGRESSIVE_FIRST_REGION_SECONDS', 8))
+        )
+        logger.info(f"[PROGRESSIVE] {len(regions)} regions, {len(keyframes)} keyframes "
+                    f"({'stream copy' if keyframes else 're-encode'})")
+        
+        writer = HLSWriter(hls_dir(self.job_id), regions)
+        self.playlist_path = writer.playlist_path
+        self.region_dir = os.path.join('temp', f'{self.job_id}_regions')
+        Path(self.region_dir).mkdir(parents=True, exist_ok=True)
+        speakers = self._speakers()
+        
+        self.translated_segments = []
+        self.synthesized_segments = []
+        for region in regions:
+            index = region['index']
+            span = start_span('region', self.job_id)
+            self.update_progress(
+                45 + int(50 * index / len(regions)),
+                'processing',
+                f'Dubbing region {index + 1}/{len(regions)}...',
+                stage='region'
+            )
+            
+            reused, pending = self._split_reusable(region['segments'])
+            stage_start = time.time()
+            translated = self.translator.batch_translate_segments(
+                pending,
+                self.target_language,
+                self.source_language
+            ) if pending else []
+            self.stage_timings['translation'] = self.stage_timings.get('translation', 0) + time.time() - stage_start
+            
+            stage_start = time.time()
+            synthesized = self._synthesize_region(translated, index, speakers)
+            self._keep_dubbed_segments(synthesized)
+            translated = self._merge_reused(translated, reused)
+            synthesized = self._merge_reused(synthesized, reused)
+            self.stage_timings['synthesis'] = self.stage_timings.get('synthesis', 0) + time.time() - stage_start
+            
+            stage_start = time.time()
+            vocals_path = self._align_and_merge_audio(
+                synthesized,
+                os.path.join(self.region_dir, f'region_{index:03d}_vocals.mp3')
+            ) if synthesized else None
+            self.stage_timings['alignment'] = self.stage_timings.get('alignment', 0) + time.time() - stage_start
+            
+            # Region vocals start with the first voiced segment
+            voiced = [s for s in synthesized if 'audio_path' in s]
+            vocals_offset = voiced[0]['start'] - region['start'] if voiced else 0.0
+            
+            stage_start = time.time()
+            writer.write_region(
+                region,
+                self.video_path,
+                vocals_path=vocals_path,
+                vocals_offset=vocals_offset,
+                background_path=self.background_audio_path,
+                vocals_volume=1.0,
+                background_volume=0.7,
+                copy_video=bool(keyframes)
+            )
+            self.stage_timings['video_merge'] = self.stage_timings.get('video_merge', 0) + time.time() - stage_start
+            if index == 0:
+                self.stage_timings['first_output'] = time.time() - self.total_start_time
+            
+            span.end({'region.index': index, 'segments': len(synthesized), 'segments.with_audio': len(voiced)})
+            get_event_bus().publish(self.job_id, 'region', {
+                'index': index,
+                'start': region['start'],
+                'end': region['end'],
+                'regions': len(regions)
+            })
+            self.translated_segments.extend(translated)
+            self.synthesized_segments.extend(synthesized)
+        
+        writer.finish()
+        
+        stage_start = time.time()
+        span = start_span('video_merge', self.job_id)
+        self.update_progress(95, 'processing', 'Joining dubbed regions...', stage='video_merge')
+        Path('outputs').mkdir(parents=True, exist_ok=True)
+        self.output_video_path = os.path.join('outputs', f'{self.job_id}_dubbed.mp4')
+        writer.concat_to_mp4(self.output_video_path)
+        self.stage_timings['video_merge'] = self.stage_timings.get('video_merge', 0) + time.time() - stage_start
+        span.end({'file.bytes': self._file_size(self.output_video_path)})
+        logger.info(f"✅ PROGRESSIVE DUBBING COMPLETE: {len(regions)} regions")
+        logger.info(f"   Playlist: {self.playlist_path}")
+        logger.info(f"   Output Video: {self.output_video_path}")
+    
+    def _synthesize_region(self, segments, index, speakers):
+        """
+        Synthesize the segments of one region into their own directory
+        
+        Args:
+            segments: Translated segments of the region
+            index: Region index
+            speakers: Speaker IDs of the whole video (stable voice assignment)
+            
+        Returns:
+            list: Segments with audio_path added
+        """
+        if not segments:
+            return []
+        
+        # Segment files are named by their index in the list: keep regions apart
+        output_dir = os.path.join(self.region_dir, f'region_{index:03d}')
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        previous_dir = self.synthesizer.output_dir
+        self.synthesizer.output_dir = output_dir
+        try:
+            if self.use_voice_cloning and self.cloned_voices:
+                return self.synthesizer.synthesize_segments_with_cloned_voices(
+                    segments,
+                    self.cloned_voices,
+                    language_code=self.target_language
+                )
+            return self.synthesizer.synthesize_segments(
+                segments,
+                voice_id=self.synthesizer.get_voice_for_language(self.target_language),
+                job_id=self.job_id,
+                language_code=self.target_language,
+                multi_speaker=True,
+                speakers=speakers
+            )
+        finally:
+            self.synthesizer.output_dir = previous_dir
+    
+    def _translation_key(self, segments):
+        """
+        Single-flight key of a translation stage
+        
+        Jobs on the same transcription may translate different subsets of it
+        (range reuse, progressive regions), so the key covers each segment's
+        text and timing, not just how many there are.
+        
+        Args:
+            segments: List of segments to translate
+            
+        Returns:
+            tuple: Hashable key
+        """
+        digest = hashlib.sha256(json.dumps(
+            [(segment['text'], segment['start'], segment['end']) for segment in segments], ensure_ascii=False
+        ).encode('utf-8')).hexdigest()
+        return self.transcription_key + (self.target_language, self.translation_backend, self.project, digest)
+    
     def _run_translation(self, segments):
         """
         Run translation (can be called in parallel)
@@ -439,19 +763,25 @@ class DubbingPipeline:
         Returns:
             list: Translated segments
         """
+        if not segments:
+            logger.info(f"[TRANSLATION] Nothing to translate: every segment was reused")
+            return []
+        
         logger.info(f"[TRANSLATION] Starting translation of {len(segments)} segments")
         logger.info(f"[TRANSLATION] From: {self.source_language} → To: {self.target_language}")
         
         stage_start = time.time()
-        self.update_progress(45, 'processing', 'Translating text...')
+        span = start_span('translation', self.job_id)
+        self.update_progress(45, 'processing', 'Translating text...', stage='translation')
         
-        translated_segments = self.translator.batch_translate_segments(
+        translated_segments, _ = self._single_flight('translation', self._translation_key(segments), lambda: self.translator.batch_translate_segments(
             segments,
             self.target_language,
             self.source_language
-        )
+        ), copy_result=True)
         
         self.stage_timings['translation'] = time.time() - stage_start
+        span.end({'segments': len(translated_segments)})
         logger.info(f"[TRANSLATION] ✅ Complete: {len(translated_segments)} segments")
         if translated_segments:
             logger.info(f"[TRANSLATION] Sample: '{translated_segments[0].get('original_text', '')[:50]}' → '{translated_segments[0].get('translated_text', '')[:50]}'")
@@ -476,7 +806,8 @@ class DubbingPipeline:
         logger.info(f"[VOICE_CLONING] Extracting speaker audio samples")
         
         extraction_start = time.time()
-        self.update_progress(35, 'processing', 'Extracting speaker audio samples...')
+        span = start_span('speaker_extraction', self.job_id)
+        self.update_progress(35, 'processing', 'Extracting speaker audio samples...', stage='speaker_extraction')
         
         speaker_samples = self.speaker_extractor.extract_speaker_samples(
             vocals_path,
@@ -487,6 +818,7 @@ class DubbingPipeline:
         )
         
         self.stage_timings['speaker_extraction'] = time.time() - extraction_start
+        span.end({'speakers': len(speaker_samples)})
         logger.info(f"[VOICE_CLONING] ✅ Extracted samples for {len(speaker_samples)} speaker(s)")
         for speaker_id, path in speaker_samples.items():
             logger.info(f"[VOICE_CLONING]    Speaker {speaker_id}: {path}")
@@ -496,7 +828,8 @@ class DubbingPipeline:
         logger.info(f"[VOICE_CLONING] Cloning voices")
         
         cloning_stage_start = time.time()
-        self.update_progress(38, 'processing', 'Cloning voices...')
+        span = start_span('voice_cloning', self.job_id)
+        self.update_progress(38, 'processing', 'Cloning voices...', stage='voice_cloning')
         
         cloned_voices = {}
         for speaker_id, audio_path in speaker_samples.items():
@@ -520,6 +853,7 @@ class DubbingPipeline:
                 logger.warning(f"[VOICE_CLONING] Will use stock voice for speaker {speaker_id}")
         
         self.stage_timings['voice_cloning'] = time.time() - cloning_stage_start
+        span.end({'speakers': len(speaker_samples), 'voices.cloned': len(cloned_voices)})
         self.stage_timings['voice_cloning_total'] = time.time() - cloning_start
         
         logger.info(f"[VOICE_CLONING] ✅ Cloned {len(cloned_voices)} voice(s)")
@@ -528,6 +862,193 @@ class DubbingPipeline:
         
         return cloned_voices
     
+    def _single_flight(self, stage, key, fn, copy_result=False):
+        """
+        Run a stage once for all concurrent jobs of this process with the same input
+        
+        A job that reaches a stage while an identical job is running it waits
+        for that run instead of repeating the download, separation or API calls.
+        
+        Args:
+            stage: Stage name (logs and metrics)
+            key: Tuple identifying the stage input and settings
+            fn: Callable running the stage
+            copy_result: Give each job its own deep copy of the result (it is mutated downstream)
+            
+        Returns:
+            tuple: (result, shared) - shared is True if another job ran the stage
+        """
+        if not self.single_flight:
+            return fn(), False
+        result, shared = get_single_flight().do((stage,) + key, fn)
+        if shared:
+            STAGES_SHARED.inc(stage=stage)
+            logger.info(f"[PIPELINE] ♻️  Joined in-flight {stage} of an identical job")
+        if copy_result:
+            result = copy.deepcopy(result)
+        return result, shared
+    
+    def _adopt(self, path):
+        """
+        Give this job its own name for a file another job's stage produced
+        
+        Hard links (copies across filesystems), so cleaning up either job
+        leaves the other's file in place.
+        
+        Args:
+            path: File produced by the other job
+            
+        Returns:
+            str: This job's path to the same content
+        """
+        adopted = os.path.join('temp', f'{self.job_id}_{os.path.basename(path)}')
+        if not os.path.exists(adopted):
+            try:
+                os.link(path, adopted)
+            except OSError:
+                shutil.copyfile(path, adopted)
+        return adopted
+    
+    def _slice_span(self, media_span):
+        """
+        Cut this job's range out of the media kept from an earlier run (replaces stages 1-2.5)
+        
+        Args:
+            media_span: Span from RangeCache.find_span
+        """
+        logger.info(f"\n{'='*80}")
+        logger.info(f"[STAGE 1-2.5] REUSING MEDIA OF AN EARLIER RUN")
+        logger.info(f"{'='*80}")
+        
+        stage_start = time.time()
+        span = start_span('range_reuse', self.job_id)
+        self.update_progress(20, 'processing', 'Reusing video and audio of an earlier run...', stage='range_reuse')
+        
+        offset = self.range_start - media_span['start']
+        end = media_span['end'] if self.end_time is None else min(self.end_time, media_span['end'])
+        self.media_duration = end - self.range_start
+        whole = offset < 0.01 and media_span['end'] - end < 0.01
+        
+        paths = {}
+        for name, path in media_span['files'].items():
+            if whole:
+                paths[name] = self._adopt(path)
+            else:
+                paths[name] = self.audio_processor.trim_media(
+                    path,
+                    offset,
+                    None if end == media_span['end'] else self.media_duration,
+                    os.path.join('temp', f'{self.job_id}_{name}{Path(path).suffix}')
+                )
+        self.video_path = paths['video']
+        self.audio_path = paths['audio']
+        self.vocals_path = paths['vocals']
+        self.background_audio_path = paths['background']
+        
+        self.stage_timings['range_reuse'] = time.time() - stage_start
+        span.end({'media.duration': self.media_duration, 'range.sliced': not whole})
+        logger.info(f"✅ STAGES 1-2.5 SKIPPED: {'Linked' if whole else 'Sliced'} media of "
+                    f"{media_span['start']:.1f}s-{media_span['end']:.1f}s")
+        logger.info(f"   Video Path: {self.video_path}")
+        logger.info(f"   ⏱️  Duration: {self.stage_timings['range_reuse']:.2f}s")
+    
+    def _keep_span(self):
+        """Keep this job's media in the range cache for later runs on ranges inside it"""
+        try:
+            duration = self.media_duration or self.audio_processor.get_audio_duration(self.audio_path)
+            self.range_cache.add_span(
+                self.youtube_url,
+                self.range_start,
+                self.range_start + duration,
+                self.end_time is None,
+                {
+                    'video': self.video_path,
+                    'audio': self.audio_path,
+                    'vocals': self.vocals_path,
+                    'background': self.background_audio_path
+                }
+            )
+        except Exception as e:
+            logger.warning(f"[PIPELINE] Could not keep media for range reuse: {e}")
+    
+    def _keep_transcription(self):
+        """Keep this job's transcription (word timings) in the range cache"""
+        try:
+            duration = self.media_duration or self.audio_processor.get_audio_duration(self.audio_path)
+            self.range_cache.add_transcription(
+                self.youtube_url,
+                self.source_language,
+                self.asr_backend,
+                self.range_start,
+                self.range_start + duration,
+                self.end_time is None,
+                dict(self.transcription, speakers=sorted(self._speakers()))
+            )
+        except Exception as e:
+            logger.warning(f"[PIPELINE] Could not keep transcription for range reuse: {e}")
+    
+    def _speakers(self):
+        """
+        Speaker IDs that voices are assigned over
+        
+        A transcription sliced from a longer range keeps the speakers of that
+        range, so every sub-range gets the same voice per speaker.
+        
+        Returns:
+            set: Speaker IDs
+        """
+        return set(self.transcription.get('speakers') or
+                   (segment.get('speaker', 0) for segment in self.transcription['segments']))
+    
+    def _dub_key(self):
+        """Settings a dubbed segment depends on besides its text and timing"""
+        voices = 'cloned' if self.use_voice_cloning else sorted(self._speakers())
+        return [self.source_language, self.target_language, self.asr_backend, self.translation_backend,
+                self.tts_backend, self.project, voices]
+    
+    def _split_reusable(self, segments):
+        """
+        Split segments into ones dubbed by an earlier run on an overlapping range and new ones
+        
+        Args:
+            segments: Transcription segments of this job
+            
+        Returns:
+            tuple: (reused synthesized segments, segments to translate and synthesize)
+        """
+        if not self.range_reuse or not segments:
+            return [], segments
+        try:
+            reused, pending = self.range_cache.match_dubbed_segments(
+                self.youtube_url, self._dub_key(), segments, self.range_start, 'temp', self.job_id
+            )
+        except Exception as e:
+            logger.warning(f"[PIPELINE] Could not look up dubbed segments for reuse: {e}")
+            return [], segments
+        if reused:
+            logger.info(f"[PIPELINE] ♻️  Reusing {len(reused)}/{len(segments)} dubbed segments of an earlier run")
+        return reused, pending
+    
+    def _keep_dubbed_segments(self, segments):
+        """Keep newly synthesized segments (before alignment) in the range cache"""
+        if not self.range_reuse or not segments:
+            return
+        try:
+            self.range_cache.add_dubbed_segments(self.youtube_url, self._dub_key(), segments, self.range_start,
+                                                 backend=self.tts_backend)
+        except Exception as e:
+            logger.warning(f"[PIPELINE] Could not keep dubbed segments for range reuse: {e}")
+    
+    def _merge_reused(self, segments, reused):
+        """New and reused segments in timeline order"""
+        if not reused:
+            return segments
+        return sorted(segments + reused, key=lambda segment: segment['start'])
+    
+    def _file_size(self, path):
+        """Size of a stage output for span attributes (None if missing)"""
+        return os.path.getsize(path) if path and os.path.exists(path) else None
+    
     def cleanup(self):
         """Clean up temporary files"""
         temp_files = [
@@ -551,3 +1072,7 @@ class DubbingPipeline:
                     print(f"Cleaned up: {file_path}")
                 except Exception as e:
                     print(f"Warning: Could not delete {file_path}: {e}")
+        
+        # Per-region synthesis and vocals of a progressive run
+        if self.region_dir:
+            shutil.rmtree(self.region_dir, ignore_errors=True)
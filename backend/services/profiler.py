@@ -0,0 +1,247 @@
+import contextvars
+import os
+import re
+import sys
+import threading
+import time
+import logging
+from collections import deque
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Job whose work the calling context is doing (carried to worker threads by tracing.bind)
+_job = contextvars.ContextVar('profiled_job', default=None)
+
+# Thread ident → job id, read by the sampler thread
+_thread_jobs = {}
+_thread_jobs_lock = threading.Lock()
+
+
+def current_job():
+    """Job id of the calling context, or None"""
+    return _job.get()
+
+
+class JobThread:
+    """
+    Marks the calling thread as working for a job while the block runs
+
+    The sampler attributes the thread's stacks to that job. Restores the
+    previous owner on exit, so it nests in pool threads shared by jobs.
+    """
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+
+    def __enter__(self):
+        self.ident = threading.get_ident()
+        self.token = _job.set(self.job_id)
+        with _thread_jobs_lock:
+            self.previous = _thread_jobs.get(self.ident)
+            _thread_jobs[self.ident] = self.job_id
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        with _thread_jobs_lock:
+            if self.previous is None:
+                _thread_jobs.pop(self.ident, None)
+            else:
+                _thread_jobs[self.ident] = self.previous
+        _job.reset(self.token)
+        return False
+
+
+def _thread_label(name):
+    # "ThreadPoolExecutor-3_1" and "ThreadPoolExecutor-7_0" aggregate as one root
+    return re.sub(r'-\d+(_\d+)?', '', name).replace(';', ':')
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(';', ':')
+
+
+class ProfileSession:
+    """
+    Stack samples of one job
+
+    The sampler thread may still hold the session after finish() removed it,
+    so samples are added under a lock and dropped once the session is closed.
+    """
+
+    def __init__(self, job_id, forced=False):
+        self.job_id = job_id
+        self.forced = forced
+        self.started = time.time()
+        self.samples = 0
+        self.counts = {}
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def add(self, thread_name, frame):
+        # Keyed by code objects; labels are only formatted when the profile is saved
+        codes = []
+        while frame is not None:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        key = (thread_name, tuple(reversed(codes)))
+        with self.lock:
+            if self.closed:
+                return
+            self.counts[key] = self.counts.get(key, 0) + 1
+            self.samples += 1
+
+    def close(self):
+        """Stop accepting samples"""
+        with self.lock:
+            self.closed = True
+
+    def folded(self):
+        """
+        Collapsed stacks ("thread;outer;...;inner count"), the input format of
+        flamegraph.pl, speedscope and inferno
+
+        Returns:
+            str: One line per distinct stack
+        """
+        with self.lock:
+            counts = list(self.counts.items())
+        lines = {}
+        for (thread_name, codes), count in counts:
+            line = ';'.join([_thread_label(thread_name)] + [_frame_label(code) for code in codes])
+            lines[line] = lines.get(line, 0) + count
+        return ''.join(f"{line} {count}\n" for line, count in sorted(lines.items()))
+
+
+class SamplingProfiler:
+    """
+    Low-overhead wall-clock sampling profiler for dubbing jobs
+
+    One background thread wakes every interval, snapshots the stacks of all
+    threads (sys._current_frames) and files each stack under the job that
+    owns the thread. Threads waiting on locks, HTTP responses or
+    subprocesses are sampled like running ones, so the profile shows where
+    a job spends wall time rather than CPU time. Coroutines on the shared
+    event loop are not attributed to jobs.
+
+    Jobs are profiled when the request asks for it, or, with
+    PROFILE_SLOWEST_PERCENT set, always: the profile is then kept only if the
+    job turns out to be among the slowest N% of recent jobs.
+    """
+
+    def __init__(self, interval=0.01, slowest_percent=0.0, output_dir='outputs', history=200):
+        self.interval = interval
+        self.slowest_percent = slowest_percent
+        self.output_dir = Path(output_dir)
+        self.durations = deque(maxlen=history)
+        self.sessions = {}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def should_profile(self, requested=False):
+        """
+        Whether a new job is sampled
+
+        Args:
+            requested: True if the job request set the profile flag
+
+        Returns:
+            bool: True to sample the job
+        """
+        return bool(requested) or self.slowest_percent > 0
+
+    def start(self, job_id, forced=False):
+        """
+        Start sampling a job's threads
+
+        Args:
+            job_id: Job identifier
+            forced: True if the profile must be kept regardless of duration
+        """
+        with self.lock:
+            self.sessions[job_id] = ProfileSession(job_id, forced)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='job-profiler', daemon=True)
+                self.thread.start()
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        while True:
+            with self.lock:
+                if not self.sessions:
+                    self.thread = None
+                    return
+                sessions = dict(self.sessions)
+
+            with _thread_jobs_lock:
+                owners = dict(_thread_jobs)
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+
+            for ident, frame in sys._current_frames().items():
+                session = sessions.get(owners.get(ident))
+                if session is not None and ident != own_ident:
+                    session.add(names.get(ident, 'thread'), frame)
+
+            time.sleep(self.interval)
+
+    def _is_slow(self, duration):
+        """True if duration is within the slowest N% of recent jobs"""
+        if self.slowest_percent <= 0 or len(self.durations) < 5:
+            return False
+        ordered = sorted(self.durations)
+        threshold = ordered[min(len(ordered) - 1, int(len(ordered) * (1 - self.slowest_percent / 100)))]
+        return duration >= threshold
+
+    def finish(self, job_id, duration):
+        """
+        Stop sampling a job and save its profile if it is wanted
+
+        Args:
+            job_id: Job identifier
+            duration: Job wall time in seconds
+
+        Returns:
+            str or None: Path of the saved profile
+        """
+        with self.lock:
+            session = self.sessions.pop(job_id, None)
+            self.durations.append(duration)
+            slow = self._is_slow(duration)
+        if session is None:
+            return None
+        session.close()
+        if not (session.forced or slow):
+            return None
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / f'{job_id}_profile.folded'
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(session.folded())
+
+        reason = 'requested' if session.forced else f'slowest {self.slowest_percent:g}%'
+        logger.info(f"[PROFILER] Saved profile of job {job_id} ({reason}, {session.samples} samples): {path}")
+        return str(path)
+
+
+_profiler = None
+_profiler_lock = threading.Lock()
+
+def get_profiler():
+    """
+    Get the process-wide job profiler
+
+    Configured from PROFILE_INTERVAL_MS (default 10), PROFILE_SLOWEST_PERCENT
+    (default 0 = only jobs that request it) and OUTPUT_FOLDER (default outputs).
+
+    Returns:
+        SamplingProfiler: Shared instance
+    """
+    global _profiler
+    with _profiler_lock:
+        if _profiler is None:
+            _profiler = SamplingProfiler(
+                interval=float(os.getenv('PROFILE_INTERVAL_MS', 10)) / 1000,
+                slowest_percent=float(os.getenv('PROFILE_SLOWEST_PERCENT', 0)),
+                output_dir=os.getenv('OUTPUT_FOLDER', 'outputs')
+            )
+        return _profiler
@@ -0,0 +1,273 @@
+import math
+import os
+import re
+import subprocess
+import logging
+from pathlib import Path
+from .tracing import run_subprocess
+
+logger = logging.getLogger(__name__)
+
+# File names served by the playlist endpoint
+PLAYLIST_NAME = 'playlist.m3u8'
+SEGMENT_NAME_PATTERN = re.compile(r'^segment_\d{5}\.ts$')
+
+
+def hls_dir(job_id, output_dir='outputs'):
+    """
+    Directory holding a job's HLS playlist and segments
+
+    Args:
+        job_id: Job identifier
+        output_dir: Root output directory
+
+    Returns:
+        str: Directory path
+    """
+    return os.path.join(output_dir, f'{job_id}_hls')
+
+
+def get_keyframe_times(video_path):
+    """
+    Timestamps of the video keyframes (packet flags only, nothing is decoded)
+
+    Args:
+        video_path: Path to the video
+
+    Returns:
+        list: Sorted keyframe times in seconds (empty if probing fails)
+    """
+    cmd = [
+        'ffprobe', '-v', 'error',
+        '-select_streams', 'v:0',
+        '-show_entries', 'packet=pts_time,flags',
+        '-of', 'csv=p=0',
+        video_path
+    ]
+    try:
+        result = run_subprocess(cmd, check=True, capture_output=True, text=True)
+    except subprocess.CalledProcessError as e:
+        logger.warning(f"[PROGRESSIVE] Could not probe keyframes: {e.stderr}")
+        return []
+
+    times = []
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.partition(',')
+        if flags.startswith('K'):
+            try:
+                times.append(float(pts_time))
+            except ValueError:
+                continue
+    return sorted(times)
+
+
+def plan_regions(segments, duration, keyframes=None, target_seconds=20.0, first_seconds=8.0):
+    """
+    Split a video into regions that can be dubbed and delivered one by one
+
+    Region boundaries fall on keyframes (so the video stream can be copied,
+    not re-encoded) that do not cut through a speech segment. The first
+    region is shorter so playback can start early.
+
+    Args:
+        segments: Transcription segments (start, end in seconds)
+        duration: Media duration in seconds
+        keyframes: Keyframe times; any time is a valid boundary if None/empty
+        target_seconds: Desired region length
+        first_seconds: Desired length of the first region
+
+    Returns:
+        list: Regions {'index', 'start', 'end', 'segments'}
+    """
+    def inside_speech(t):
+        return any(s['start'] < t < s['end'] for s in segments)
+
+    candidates = [t for t in (keyframes or []) if 0 < t < duration]
+    boundaries = [0.0]
+    target = first_seconds
+
+    while True:
+        desired = boundaries[-1] + target
+        if desired >= duration - target / 2:
+            break
+        if candidates:
+            boundary = next((t for t in candidates if t >= desired and not inside_speech(t)), None)
+        else:
+            boundary = desired
+            while inside_speech(boundary):
+                boundary = max(s['end'] for s in segments if s['start'] < boundary < s['end'])
+        if boundary is None or boundary >= duration:
+            break
+        boundaries.append(boundary)
+        target = target_seconds
+
+    boundaries.append(duration)
+
+    regions = []
+    last = len(boundaries) - 2
+    for index, (start, end) in enumerate(zip(boundaries, boundaries[1:])):
+        regions.append({
+            'index': index,
+            'start': start,
+            'end': end,
+            # A segment belongs to the region where it starts
+            'segments': [s for s in segments if start <= s['start'] and (s['start'] < end or index == last)]
+        })
+    return regions
+
+
+class HLSWriter:
+    """
+    Event playlist that grows one MPEG-TS segment per dubbed region
+
+    Players poll the playlist and start as soon as the first segment is
+    listed; EXT-X-ENDLIST is added when the last region is written.
+    """
+
+    def __init__(self, directory, regions):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.regions = regions
+        self.target_duration = max(1, math.ceil(max(r['end'] - r['start'] for r in regions)))
+        self.written = []
+        self.finished = False
+        self._write_playlist()
+
+    @property
+    def playlist_path(self):
+        return str(self.directory / PLAYLIST_NAME)
+
+    def _segment_path(self, index):
+        return self.directory / f'segment_{index:05d}.ts'
+
+    def _write_playlist(self):
+        lines = [
+            '#EXTM3U',
+            '#EXT-X-VERSION:3',
+            '#EXT-X-PLAYLIST-TYPE:EVENT',
+            f'#EXT-X-TARGETDURATION:{self.target_duration}',
+            '#EXT-X-MEDIA-SEQUENCE:0'
+        ]
+        for region in self.written:
+            lines.append(f"#EXTINF:{region['end'] - region['start']:.3f},")
+            lines.append(self._segment_path(region['index']).name)
+        if self.finished:
+            lines.append('#EXT-X-ENDLIST')
+
+        # Players may fetch the playlist at any moment: replace it atomically
+        tmp_path = self.directory / f'{PLAYLIST_NAME}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, self.directory / PLAYLIST_NAME)
+
+    def write_region(self, region, video_path, vocals_path=None, vocals_offset=0.0, background_path=None,
+                     vocals_volume=1.0, background_volume=0.7, copy_video=True):
+        """
+        Mux a region's video with its dubbed vocals and background into the next segment
+
+        Args:
+            region: Region from plan_regions
+            video_path: Original video
+            vocals_path: Dubbed vocals of the region (None if it has no speech)
+            vocals_offset: Seconds between the region start and the first vocal
+            background_path: Separated background audio of the whole video
+            vocals_volume: Volume multiplier for vocals
+            background_volume: Volume multiplier for background
+            copy_video: Copy the video stream (boundaries are keyframes) instead of re-encoding
+
+        Returns:
+            str: Segment path
+        """
+        start = region['start']
+        duration = region['end'] - start
+        output_path = self._segment_path(region['index'])
+
+        cmd = ['ffmpeg', '-ss', f'{start:.3f}', '-t', f'{duration:.3f}', '-i', video_path]
+        filters = []
+        labels = []
+        if vocals_path:
+            cmd += ['-i', vocals_path]
+            delay = int(round(max(0.0, vocals_offset) * 1000))
+            filters.append(f'[{len(labels) + 1}:a]adelay={delay}:all=1,volume={vocals_volume}[vocals]')
+            labels.append('[vocals]')
+        if background_path:
+            cmd += ['-ss', f'{start:.3f}', '-t', f'{duration:.3f}', '-i', background_path]
+            filters.append(f'[{len(labels) + 1}:a]volume={background_volume}[bg]')
+            labels.append('[bg]')
+        if not labels:
+            cmd += ['-f', 'lavfi', '-t', f'{duration:.3f}', '-i', 'anullsrc=r=44100:cl=stereo']
+            labels.append('[1:a]')
+
+        if len(labels) > 1:
+            audio = f"{''.join(labels)}amix=inputs={len(labels)}:duration=longest:dropout_transition=2"
+        else:
+            audio = f"{labels[0]}anull"
+        # Pad or trim the audio to exactly the region length
+        filters.append(f"{audio},apad,atrim=0:{duration:.3f}[aout]")
+
+        cmd += [
+            '-filter_complex', ';'.join(filters),
+            '-map', '0:v:0',
+            '-map', '[aout]',
+            '-c:v', 'copy' if copy_video else 'libx264',
+        ]
+        if not copy_video:
+            cmd += ['-preset', 'veryfast', '-force_key_frames', 'expr:eq(n,0)']
+        cmd += [
+            '-c:a', 'aac', '-b:a', '128k', '-ar', '44100',
+            # Keep timestamps continuous across segments
+            '-output_ts_offset', f'{start:.3f}',
+            '-muxdelay', '0',
+            '-f', 'mpegts',
+            '-y', str(output_path)
+        ]
+
+        try:
+            run_subprocess(cmd, check=True, capture_output=True)
+        except subprocess.CalledProcessError as e:
+            raise Exception(f"Failed to mux region {region['index']}: {e.stderr.decode()}")
+
+        self.written.append(region)
+        self._write_playlist()
+        logger.info(f"[PROGRESSIVE] ✅ Region {region['index'] + 1}/{len(self.regions)} ready "
+                    f"({start:.1f}s-{region['end']:.1f}s)")
+        return str(output_path)
+
+    def finish(self):
+        """Close the playlist (EXT-X-ENDLIST)"""
+        self.finished = True
+        self._write_playlist()
+
+    def concat_to_mp4(self, output_path):
+        """
+        Join the written segments into the final MP4 without re-encoding
+
+        Args:
+            output_path: Path of the MP4 to write
+
+        Returns:
+            str: output_path
+        """
+        list_path = self.directory / 'concat_list.txt'
+        with open(list_path, 'w') as f:
+            for region in self.written:
+                f.write(f"file '{os.path.abspath(self._segment_path(region['index']))}'\n")
+
+        cmd = [
+            'ffmpeg',
+            '-f', 'concat',
+            '-safe', '0',
+            '-i', str(list_path),
+            '-c', 'copy',
+            '-bsf:a', 'aac_adtstoasc',
+            '-movflags', '+faststart',
+            '-y',
+            output_path
+        ]
+        try:
+            run_subprocess(cmd, check=True, capture_output=True)
+        except subprocess.CalledProcessError as e:
+            raise Exception(f"Failed to join progressive segments: {e.stderr.decode()}")
+        finally:
+            list_path.unlink(missing_ok=True)
+        return output_path
@@ -0,0 +1,428 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import logging
+from pathlib import Path
+from .single_flight import normalize_video_url
+from .metrics import record_cache_lookup, CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+# Two transcriptions of the same speech from different ranges differ this much at most (seconds)
+SEGMENT_TOLERANCE = 0.25
+# Slack for range boundaries given in whole seconds vs. float media durations
+_EPSILON = 0.01
+
+
+def _covers(record, start, end):
+    """True if a stored range [start, end] (video time) contains the requested one (end None: to the end)"""
+    if record['start'] > start + _EPSILON:
+        return False
+    if end is None:
+        return record['to_end']
+    return record['to_end'] or record['end'] >= end - _EPSILON
+
+
+def _describe(record):
+    """Log form of a stored range"""
+    end = 'end' if record['to_end'] else f"{record['end']:.1f}s"
+    return f"{record['start']:.1f}s-{end}"
+
+
+def _link(source, destination):
+    """Hard link a file (copy across filesystems)"""
+    try:
+        os.link(source, destination)
+    except FileExistsError:
+        pass
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+def slice_transcription(transcription, start, end):
+    """
+    Cut a transcription in video time down to a range and shift it to range time
+
+    Segments inside the range are kept as they are; segments that cross a
+    boundary are rebuilt from their words inside the range.
+
+    Args:
+        transcription: Transcription dict (segments, words, speaker_count) in video time
+        start: Range start in video seconds
+        end: Range end in video seconds (None: to the end)
+
+    Returns:
+        dict: Transcription of the range, times relative to its start
+    """
+    end = float('inf') if end is None else end
+    words = [w for w in transcription.get('words', []) if w.get('start', 0) >= start and w.get('end', 0) <= end]
+
+    segments = []
+    for segment in transcription['segments']:
+        if segment['end'] <= start or segment['start'] >= end:
+            continue
+        segment = dict(segment)
+        if segment['start'] < start or segment['end'] > end:
+            inside = [w for w in words if segment['start'] <= w['start'] and w['end'] <= segment['end']]
+            if not inside:
+                continue
+            segment.update(
+                text=' '.join(w.get('punctuated_word') or w.get('word', '') for w in inside),
+                start=inside[0]['start'],
+                end=inside[-1]['end']
+            )
+        segment['start'] = round(segment['start'] - start, 3)
+        segment['end'] = round(segment['end'] - start, 3)
+        segments.append(segment)
+
+    return dict(
+        transcription,
+        segments=segments,
+        words=[dict(w, start=round(w['start'] - start, 3), end=round(w['end'] - start, 3)) for w in words],
+        full_text=' '.join(segment['text'] for segment in segments)
+    )
+
+
+def shift_transcription(transcription, offset):
+    """
+    Move a transcription in range time to video time
+
+    Args:
+        transcription: Transcription dict
+        offset: Range start in video seconds
+
+    Returns:
+        dict: Shifted copy
+    """
+    return dict(
+        transcription,
+        segments=[dict(s, start=round(s['start'] + offset, 3), end=round(s['end'] + offset, 3))
+                  for s in transcription['segments']],
+        words=[dict(w, start=round(w.get('start', 0) + offset, 3), end=round(w.get('end', 0) + offset, 3))
+               for w in transcription.get('words', [])]
+    )
+
+
+class RangeCache:
+    """
+    Artifacts of the time ranges already processed for each video, reusable for any sub-range
+
+    The transcription cache (CacheManager) is keyed on the exact range, so
+    moving start_time or end_time by a second used to redo everything. Per
+    video (normalized URL) this keeps, in video time:
+
+    - media spans: the downloaded video, extracted audio and separated
+      vocals and background of a processed range (the whole video for jobs
+      without a range); a job inside a span slices them instead of
+      downloading and separating again
+    - transcriptions with word timings, sliced for any range they contain
+    - dubbed segments (translation and synthesized audio) per language and
+      voice settings, matched by text and time, so only the segments new at
+      the edges of a range are translated and synthesized
+
+    Files live under RANGE_CACHE_DIR; the oldest spans are evicted beyond
+    RANGE_CACHE_SPANS per video, the oldest dubbed segments beyond
+    RANGE_CACHE_SEGMENTS per settings key and the least recently extended
+    settings keys beyond max_dubs per video.
+    """
+
+    def __init__(self, cache_dir='cache/ranges', max_spans=3, max_transcriptions=8, max_segments=2000, max_dubs=8):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_spans = max_spans
+        self.max_transcriptions = max_transcriptions
+        self.max_segments = max_segments
+        self.max_dubs = max_dubs
+        self.lock = threading.Lock()
+
+    def _video_dir(self, url):
+        directory = self.cache_dir / hashlib.md5(normalize_video_url(url).encode()).hexdigest()
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory
+
+    def _load_index(self, directory):
+        try:
+            with open(directory / 'index.json', 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'spans': [], 'transcriptions': [], 'dubs': []}
+
+    def _save_index(self, directory, index):
+        # Other worker processes may read it at any moment: replace atomically
+        tmp_path = directory / f'index.json.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(tmp_path, directory / 'index.json')
+
+    # ==================== MEDIA SPANS ====================
+
+    def find_span(self, url, start, end):
+        """
+        Kept media span containing a range
+
+        Args:
+            url: Video URL
+            start: Range start in seconds (None: 0)
+            end: Range end in seconds (None: to the end)
+
+        Returns:
+            dict or None: Span {'start', 'end', 'to_end', 'files': {name: absolute path}}
+        """
+        directory = self._video_dir(url)
+        with self.lock:
+            index = self._load_index(directory)
+        for span in sorted(index['spans'], key=lambda s: s['end'] - s['start']):
+            files = {name: str(directory / file) for name, file in span['files'].items()}
+            if _covers(span, start or 0, end) and all(os.path.exists(path) for path in files.values()):
+                record_cache_lookup('range_media', True)
+                return dict(span, files=files)
+        record_cache_lookup('range_media', False)
+        return None
+
+    def add_span(self, url, start, end, to_end, files):
+        """
+        Keep the media files of a processed range
+
+        Args:
+            url: Video URL
+            start: Range start in video seconds
+            end: Range end in video seconds
+            to_end: The range runs to the end of the video
+            files: {'video', 'audio', 'vocals', 'background': path}
+        """
+        directory = self._video_dir(url)
+        span_id = hashlib.md5(f'{start}:{end}:{time.time()}'.encode()).hexdigest()[:12]
+        kept = {}
+        for name, path in files.items():
+            kept[name] = f'span_{span_id}_{name}{Path(path).suffix}'
+            _link(path, directory / kept[name])
+
+        with self.lock:
+            index = self._load_index(directory)
+            # A new span makes the spans it contains redundant
+            span = {'start': start, 'end': end, 'to_end': to_end, 'files': kept, 'created_at': time.time()}
+            stale = [s for s in index['spans'] if _covers(span, s['start'], None if s['to_end'] else s['end'])]
+            index['spans'] = [s for s in index['spans'] if s not in stale] + [span]
+            while len(index['spans']) > self.max_spans:
+                stale.append(index['spans'].pop(0))
+            self._save_index(directory, index)
+
+        for old in stale:
+            for file in old['files'].values():
+                (directory / file).unlink(missing_ok=True)
+        logger.info(f"[RANGE_CACHE] 💾 Media span {_describe(span)} kept")
+
+    # ==================== TRANSCRIPTIONS ====================
+
+    def find_transcription(self, url, language, backend, start, end):
+        """
+        Kept transcription containing a range, sliced to it
+
+        Args:
+            url: Video URL
+            language: Source language code
+            backend: ASR backend name
+            start: Range start in seconds (None: 0)
+            end: Range end in seconds (None: to the end)
+
+        Returns:
+            dict or None: Transcription of the range in range time
+        """
+        start = start or 0
+        directory = self._video_dir(url)
+        with self.lock:
+            index = self._load_index(directory)
+        for record in index['transcriptions']:
+            if record['language'] != language or record['backend'] != backend or not _covers(record, start, end):
+                continue
+            try:
+                with open(directory / record['file'], 'r', encoding='utf-8') as f:
+                    transcription = json.load(f)
+            except (OSError, ValueError):
+                continue
+            record_cache_lookup('range_transcription', True)
+            logger.info(f"[RANGE_CACHE] ✅ Slicing transcription of {_describe(record)}")
+            return slice_transcription(transcription, start, end)
+        record_cache_lookup('range_transcription', False)
+        return None
+
+    def add_transcription(self, url, language, backend, start, end, to_end, transcription):
+        """
+        Keep the transcription of a processed range
+
+        Args:
+            url: Video URL
+            language: Source language code
+            backend: ASR backend name
+            start: Range start in video seconds
+            end: Range end in video seconds
+            to_end: The range runs to the end of the video
+            transcription: Transcription in range time
+        """
+        directory = self._video_dir(url)
+        file = f"transcription_{hashlib.md5(f'{language}:{backend}:{start}:{end}'.encode()).hexdigest()[:12]}.json"
+        with open(directory / file, 'w', encoding='utf-8') as f:
+            json.dump(shift_transcription(transcription, start), f, ensure_ascii=False)
+
+        with self.lock:
+            index = self._load_index(directory)
+            record = {'start': start, 'end': end, 'to_end': to_end, 'language': language, 'backend': backend,
+                      'file': file}
+            index['transcriptions'] = [r for r in index['transcriptions'] if r['file'] != file] + [record]
+            stale = index['transcriptions'][:-self.max_transcriptions]
+            index['transcriptions'] = index['transcriptions'][-self.max_transcriptions:]
+            self._save_index(directory, index)
+        for old in stale:
+            (directory / old['file']).unlink(missing_ok=True)
+
+    # ==================== DUBBED SEGMENTS ====================
+
+    def _dub_file(self, directory, dub_key):
+        return directory / f"dubs_{hashlib.md5(json.dumps(dub_key).encode()).hexdigest()[:12]}.json"
+
+    def _load_dubs(self, dub_file):
+        try:
+            with open(dub_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def match_dubbed_segments(self, url, dub_key, segments, offset, output_dir, job_id):
+        """
+        Split a job's segments into already dubbed and new ones
+
+        A segment is reused if a kept dubbed segment has the same speaker and
+        text and starts and ends within SEGMENT_TOLERANCE of it.
+
+        Args:
+            url: Video URL
+            dub_key: JSON-serializable settings the dub depends on (languages, backends, voices)
+            segments: Transcription segments in range time
+            offset: Range start in video seconds
+            output_dir: Directory for this job's copies of the reused audio
+            job_id: Job identifier (file names)
+
+        Returns:
+            tuple: (reused synthesized segments, segments still to translate and synthesize)
+        """
+        directory = self._video_dir(url)
+        records = self._load_dubs(self._dub_file(directory, dub_key))
+
+        by_text = {}
+        for record in records:
+            by_text.setdefault((record['speaker'], record['text']), []).append(record)
+
+        reused = []
+        pending = []
+        for segment in segments:
+            start = segment['start'] + offset
+            end = segment['end'] + offset
+            match = next((
+                record for record in by_text.get((segment.get('speaker', 0), segment['text']), [])
+                if abs(record['start'] - start) <= SEGMENT_TOLERANCE and abs(record['end'] - end) <= SEGMENT_TOLERANCE
+                and os.path.exists(directory / record['audio'])
+            ), None)
+            if match is None:
+                pending.append(segment)
+                continue
+            audio_path = os.path.join(output_dir, f"{job_id}_reused_{segment['start']:.2f}{Path(match['audio']).suffix}")
+            _link(directory / match['audio'], audio_path)
+            reused.append({
+                'original_text': segment['text'],
+                'translated_text': match['translated_text'],
+                'start': segment['start'],
+                'end': segment['end'],
+                'speaker': segment.get('speaker', 0),
+                'audio_path': audio_path
+            })
+
+        CACHE_LOOKUPS.inc(len(reused), cache='range_segment', result='hit')
+        CACHE_LOOKUPS.inc(len(pending), cache='range_segment', result='miss')
+        return reused, pending
+
+    def add_dubbed_segments(self, url, dub_key, segments, offset, backend=None):
+        """
+        Keep the translation and synthesized audio of a job's new segments
+
+        Args:
+            url: Video URL
+            dub_key: Settings key, as for match_dubbed_segments
+            segments: Synthesized segments in range time (before alignment)
+            offset: Range start in video seconds
+            backend: TTS backend of dub_key; segments another backend synthesized
+                (failover, 'tts_backend' field) are not kept
+        """
+        directory = self._video_dir(url)
+        (directory / 'audio').mkdir(exist_ok=True)
+        added = []
+        for segment in segments:
+            if 'audio_path' not in segment or not os.path.exists(segment['audio_path']):
+                continue
+            if backend is not None and segment.get('tts_backend', backend) != backend:
+                continue
+            start = segment['start'] + offset
+            text = segment['original_text']
+            audio = f"audio/{hashlib.md5(json.dumps([dub_key, round(start, 2), text]).encode()).hexdigest()}" \
+                    f"{Path(segment['audio_path']).suffix}"
+            _link(segment['audio_path'], directory / audio)
+            added.append({
+                'start': start,
+                'end': segment['end'] + offset,
+                'speaker': segment.get('speaker', 0),
+                'text': text,
+                'translated_text': segment['translated_text'],
+                'backend': segment.get('tts_backend', backend),
+                'audio': audio
+            })
+        if not added:
+            return
+
+        dub_file = self._dub_file(directory, dub_key)
+        with self.lock:
+            records = self._load_dubs(dub_file)
+            audio_files = {record['audio'] for record in added}
+            records = [record for record in records if record['audio'] not in audio_files] + added
+            # Oldest segments go first
+            stale = records[:-self.max_segments]
+            records = records[-self.max_segments:]
+            tmp_path = dub_file.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(records, f, ensure_ascii=False)
+            os.replace(tmp_path, dub_file)
+
+            # Settings keys least recently added to go first, with their audio
+            index = self._load_index(directory)
+            dubs = [name for name in index.get('dubs', []) if name != dub_file.name] + [dub_file.name]
+            for name in dubs[:-self.max_dubs]:
+                stale += self._load_dubs(directory / name)
+                (directory / name).unlink(missing_ok=True)
+            index['dubs'] = dubs[-self.max_dubs:]
+            self._save_index(directory, index)
+
+        for old in stale:
+            (directory / old['audio']).unlink(missing_ok=True)
+        logger.info(f"[RANGE_CACHE] 💾 Kept {len(added)} dubbed segment(s) for reuse")
+
+
+_range_cache = None
+_range_cache_lock = threading.Lock()
+
+def get_range_cache():
+    """
+    Get the process-wide range cache
+
+    Returns:
+        RangeCache: Shared instance (RANGE_CACHE_DIR, RANGE_CACHE_SPANS, RANGE_CACHE_SEGMENTS)
+    """
+    global _range_cache
+    with _range_cache_lock:
+        if _range_cache is None:
+            _range_cache = RangeCache(
+                cache_dir=os.getenv('RANGE_CACHE_DIR', os.path.join('cache', 'ranges')),
+                max_spans=int(os.getenv('RANGE_CACHE_SPANS', 3)),
+                max_segments=int(os.getenv('RANGE_CACHE_SEGMENTS', 2000))
+            )
+        return _range_cache
@@ -0,0 +1,391 @@
+import asyncio
+import threading
+import logging
+import os
+import re
+import time
+import itertools
+from collections import OrderedDict, deque
+
+logger = logging.getLogger(__name__)
+
+# Provider → (requests/min env, default, units/min env, default). A default of 0 disables that bucket.
+DEFAULT_LIMITS = {
+    'openai': ('OPENAI_RPM', 500, 'OPENAI_TPM', 40000),
+    'elevenlabs': ('ELEVENLABS_RPM', 120, 'ELEVENLABS_CHARS_PER_MINUTE', 0)
+}
+
+class TokenBucket:
+    """Continuously refilling token bucket sized to one minute of quota"""
+
+    def __init__(self, per_minute):
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+        self.set_rate(per_minute)
+
+    def set_rate(self, per_minute):
+        """Change the refill rate (and capacity) without losing accumulated tokens"""
+        self.per_minute = float(per_minute)
+        self.capacity = max(1.0, self.per_minute)
+        self.rate = self.per_minute / 60.0
+        self.tokens = min(self.tokens, self.capacity)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """Seconds until `amount` tokens are available (0 if available now)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+    def drain_to(self, remaining):
+        """Clamp available tokens to what the provider says is left"""
+        self._refill()
+        self.tokens = min(self.tokens, float(remaining))
+
+
+class ProviderRateLimiter:
+    """
+    Process-wide limiter for one API provider
+
+    Tracks requests per minute and units (tokens or characters) per minute,
+    learns the real ceiling from 429 responses and x-ratelimit-* headers,
+    and grants slots round-robin across jobs so one large job cannot starve
+    the others.
+
+    With a shared store (the job store in queue mode) the quota itself is
+    taken from buckets in the store, so every worker process on every host
+    draws from one provider budget; the local buckets then only carry the
+    learned rates.
+    """
+
+    def __init__(self, provider, requests_per_minute=None, units_per_minute=None, store=None):
+        self.provider = provider
+        self.configured_rpm = requests_per_minute
+        self.configured_upm = units_per_minute
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.unit_bucket = TokenBucket(units_per_minute) if units_per_minute else None
+        self.store = store
+
+        self.condition = threading.Condition()
+        self.queues = OrderedDict()  # job_id -> deque of waiting tickets
+        self.tickets = itertools.count()
+        self.paused_until = 0.0
+        self.consecutive_429 = 0
+
+        # Stats
+        self.granted = 0
+        self.rate_limited = 0
+
+    # ==================== ACQUIRE ====================
+
+    def acquire(self, job_id, units=1):
+        """
+        Block the calling thread until the job may send one request
+
+        Args:
+            job_id: Job the request belongs to (fairness key)
+            units: Tokens or characters the request will consume
+        """
+        with self.condition:
+            ticket = self._enqueue(job_id)
+            try:
+                while True:
+                    wait = self._try_grant(job_id, ticket, units)
+                    if wait <= 0:
+                        return
+                    self.condition.wait(min(wait, 1.0))
+            except BaseException:
+                self._remove(job_id, ticket)
+                raise
+
+    async def acquire_async(self, job_id, units=1):
+        """
+        Async variant of acquire for coroutines on the shared event loop
+
+        Args:
+            job_id: Job the request belongs to (fairness key)
+            units: Tokens or characters the request will consume
+        """
+        with self.condition:
+            ticket = self._enqueue(job_id)
+        try:
+            while True:
+                with self.condition:
+                    wait = self._try_grant(job_id, ticket, units)
+                if wait <= 0:
+                    return
+                await asyncio.sleep(min(wait, 0.05))
+        except BaseException:
+            with self.condition:
+                self._remove(job_id, ticket)
+            raise
+
+    def _enqueue(self, job_id):
+        ticket = next(self.tickets)
+        self.queues.setdefault(job_id, deque()).append(ticket)
+        return ticket
+
+    def _remove(self, job_id, ticket):
+        queue = self.queues.get(job_id)
+        if queue and ticket in queue:
+            queue.remove(ticket)
+            if not queue:
+                del self.queues[job_id]
+            self.condition.notify_all()
+
+    def _try_grant(self, job_id, ticket, units):
+        """
+        Grant the ticket if it is this job's turn and quota allows (caller holds the lock)
+
+        Returns:
+            float: 0 if granted, otherwise suggested seconds to wait
+        """
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+
+        # Round-robin: only the head ticket of the job at the front may proceed
+        head_job = next(iter(self.queues))
+        if head_job != job_id or self.queues[job_id][0] != ticket:
+            return 0.05
+
+        wait = self._take_shared(units) if self.store is not None else self._take_local(units)
+        if wait > 0:
+            return wait
+
+        queue = self.queues[job_id]
+        queue.popleft()
+        if queue:
+            self.queues.move_to_end(job_id)
+        else:
+            del self.queues[job_id]
+
+        self.granted += 1
+        self.condition.notify_all()
+        return 0.0
+
+    def _take_local(self, units):
+        """
+        Take one request and its units from this process's buckets
+
+        Returns:
+            float: 0 if taken, otherwise seconds to wait
+        """
+        wait = 0.0
+        if self.request_bucket:
+            wait = max(wait, self.request_bucket.wait_time(1))
+        if self.unit_bucket and units:
+            wait = max(wait, self.unit_bucket.wait_time(units))
+        if wait > 0:
+            return wait
+
+        if self.request_bucket:
+            self.request_bucket.consume(1)
+        if self.unit_bucket and units:
+            self.unit_bucket.consume(units)
+        return 0.0
+
+    def _take_shared(self, units):
+        """
+        Take one request and its units from the store's buckets, at the learned rates
+
+        Returns:
+            float: 0 if taken, otherwise seconds to wait
+        """
+        buckets = {}
+        if self.request_bucket:
+            buckets[f'{self.provider}:requests'] = (1, self.request_bucket.per_minute)
+        if self.unit_bucket and units:
+            buckets[f'{self.provider}:units'] = (units, self.unit_bucket.per_minute)
+        if not buckets:
+            return 0.0
+        try:
+            return self.store.take_tokens(buckets)
+        except Exception as e:
+            # Store unreachable: fall back to this process's share rather than stalling
+            logger.warning(f"[RATE_LIMITER] {self.provider}: shared quota unavailable ({e}), using local buckets")
+            return self._take_local(units)
+
+    def _limit_shared(self, kind, bucket, remaining):
+        """Clamp the store's bucket to the provider's remaining quota"""
+        try:
+            self.store.limit_tokens(f'{self.provider}:{kind}', remaining, bucket.per_minute)
+        except Exception as e:
+            logger.warning(f"[RATE_LIMITER] {self.provider}: could not update shared quota ({e})")
+
+    # ==================== FEEDBACK ====================
+
+    def record_success(self, headers=None):
+        """
+        Learn from a successful response
+
+        Args:
+            headers: Optional response headers (x-ratelimit-* are honoured)
+        """
+        with self.condition:
+            self.consecutive_429 = 0
+
+            if headers is not None:
+                self._apply_headers(headers)
+
+            # Recover slowly towards the configured ceiling after a back-off
+            for bucket, ceiling in ((self.request_bucket, self.configured_rpm),
+                                    (self.unit_bucket, self.configured_upm)):
+                if bucket and bucket.per_minute < ceiling:
+                    bucket.set_rate(min(ceiling, bucket.per_minute * 1.02))
+
+    def record_error(self, error):
+        """
+        Learn from a failed request
+
+        Args:
+            error: Exception raised by the SDK
+
+        Returns:
+            bool: True if the error was a rate-limit (HTTP 429) response
+        """
+        if getattr(error, 'status_code', None) != 429:
+            return False
+
+        retry_after = None
+        response = getattr(error, 'response', None)
+        if response is not None:
+            retry_after = _parse_duration(getattr(response, 'headers', {}).get('retry-after'))
+
+        with self.condition:
+            self.consecutive_429 += 1
+            self.rate_limited += 1
+            if retry_after is None:
+                retry_after = min(30.0, 0.5 * (2 ** self.consecutive_429))
+            self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+            # The real ceiling is lower than we thought
+            for bucket in (self.request_bucket, self.unit_bucket):
+                if bucket:
+                    bucket.set_rate(bucket.per_minute * 0.8)
+
+            # Other processes sharing the quota back off too
+            if self.store is not None and self.request_bucket:
+                self._limit_shared('requests', self.request_bucket, 0)
+
+        logger.warning(f"[RATE_LIMITER] {self.provider}: 429 received, pausing {retry_after:.1f}s")
+        return True
+
+    def _apply_headers(self, headers):
+        for kind, bucket, attr, name in (('requests', self.request_bucket, 'configured_rpm', 'requests'),
+                                         ('tokens', self.unit_bucket, 'configured_upm', 'units')):
+            if bucket is None:
+                continue
+            try:
+                limit = float(headers.get(f'x-ratelimit-limit-{kind}'))
+                remaining = float(headers.get(f'x-ratelimit-remaining-{kind}'))
+            except (TypeError, ValueError):
+                continue
+
+            if limit != getattr(self, attr):
+                logger.info(f"[RATE_LIMITER] {self.provider}: learned {kind} limit {limit:.0f}/min")
+                setattr(self, attr, limit)
+                bucket.set_rate(limit)
+            bucket.drain_to(remaining)
+            if self.store is not None:
+                self._limit_shared(name, bucket, remaining)
+
+            if remaining <= 0:
+                reset = _parse_duration(headers.get(f'x-ratelimit-reset-{kind}'))
+                if reset:
+                    self.paused_until = max(self.paused_until, time.monotonic() + reset)
+
+    def get_stats(self):
+        """
+        Get limiter statistics
+
+        Returns:
+            dict: Current rates, queue depth and counters
+        """
+        with self.condition:
+            return {
+                'provider': self.provider,
+                'requests_per_minute': self.request_bucket.per_minute if self.request_bucket else None,
+                'units_per_minute': self.unit_bucket.per_minute if self.unit_bucket else None,
+                'queued': sum(len(q) for q in self.queues.values()),
+                'waiting_jobs': len(self.queues),
+                'granted': self.granted,
+                'rate_limited': self.rate_limited
+            }
+
+
+def _parse_duration(value):
+    """
+    Parse a retry-after / x-ratelimit-reset value ('2', '1.5', '20ms', '6m0s')
+
+    Returns:
+        float or None: Seconds
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    total = 0.0
+    matched = False
+    for amount, unit in re.findall(r'([\d.]+)(ms|h|m|s)', value):
+        matched = True
+        total += float(amount) * {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}[unit]
+    return total if matched else None
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(provider):
+    """
+    Get the process-wide limiter for a provider (created on first use)
+
+    With JOB_EXECUTION=queue the quota is kept in the shared job store, so
+    the configured limits hold for all worker processes together.
+
+    Args:
+        provider: Provider name ('openai', 'elevenlabs')
+
+    Returns:
+        ProviderRateLimiter: Shared limiter
+    """
+    with _limiters_lock:
+        if provider not in _limiters:
+            rpm_env, rpm_default, upm_env, upm_default = DEFAULT_LIMITS.get(
+                provider, (f'{provider.upper()}_RPM', 60, None, 0)
+            )
+            rpm = int(os.getenv(rpm_env, rpm_default))
+            upm = int(os.getenv(upm_env, upm_default)) if upm_env else 0
+            store = None
+            if os.getenv('JOB_EXECUTION', 'inline') == 'queue':
+                from .job_store import get_job_store
+                store = get_job_store()
+            _limiters[provider] = ProviderRateLimiter(provider, rpm or None, upm or None, store)
+            logger.info(f"[RATE_LIMITER] {provider}: {rpm or 'unlimited'} req/min, {upm or 'unlimited'} units/min"
+                        f"{' (shared through the job store)' if store is not None else ''}")
+        return _limiters[provider]
+
+
+def get_all_rate_limiter_stats():
+    """
+    Get statistics for every limiter created so far
+
+    Returns:
+        list: One stats dict per provider
+    """
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return [limiter.get_stats() for limiter in limiters]
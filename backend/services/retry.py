@@ -0,0 +1,236 @@
+import asyncio
+import concurrent.futures
+import threading
+import logging
+import random
+import time
+from collections import deque
+from .tracing import bind
+
+logger = logging.getLogger(__name__)
+
+# Shared pool for hedged blocking calls (the caller's own thread only waits)
+_hedge_executor = None
+_hedge_executor_lock = threading.Lock()
+
+def _get_hedge_executor():
+    global _hedge_executor
+    with _hedge_executor_lock:
+        if _hedge_executor is None:
+            _hedge_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=16, thread_name_prefix='hedge'
+            )
+        return _hedge_executor
+
+
+def is_retryable(error):
+    """
+    Decide whether a failed API call is worth retrying
+
+    Walks the exception chain so wrapped SDK errors keep their status code.
+    Network errors (no status code), 408, 429 and 5xx are retryable;
+    other 4xx responses are not.
+
+    Args:
+        error: Exception raised by the call
+
+    Returns:
+        bool: True if the call should be retried
+    """
+    while error is not None:
+        status = getattr(error, 'status_code', None)
+        if status is not None:
+            return status in (408, 429) or status >= 500
+        error = error.__cause__
+    return True
+
+
+def backoff_delay(attempt, base=0.5, cap=10.0):
+    """
+    Exponential backoff with full jitter
+
+    Args:
+        attempt: Zero-based retry attempt
+        base: Delay of the first retry window in seconds
+        cap: Maximum window in seconds
+
+    Returns:
+        float: Seconds to sleep
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class LatencyTracker:
+    """Rolling window of call latencies used to pick the hedging threshold"""
+
+    def __init__(self, window=200, min_samples=20):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.lock = threading.Lock()
+
+    def record(self, latency):
+        with self.lock:
+            self.samples.append(latency)
+
+    def percentile(self, pct):
+        """
+        Latency at the given percentile
+
+        Returns:
+            float or None: Seconds, or None until enough samples were seen
+        """
+        with self.lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+        return ordered[index]
+
+
+_latency_trackers = {}
+_latency_trackers_lock = threading.Lock()
+
+def get_latency_tracker(name):
+    """
+    Get the process-wide latency tracker for a call type (shared across jobs)
+
+    Args:
+        name: Call type name (e.g. 'elevenlabs_tts')
+
+    Returns:
+        LatencyTracker: Shared tracker
+    """
+    with _latency_trackers_lock:
+        if name not in _latency_trackers:
+            _latency_trackers[name] = LatencyTracker()
+        return _latency_trackers[name]
+
+
+class ResilientCaller:
+    """
+    Runs API calls with jittered exponential-backoff retries and optional hedging
+
+    When hedging is enabled, a duplicate request is started once the first
+    attempt has been running longer than the observed p95 latency; whichever
+    finishes first wins.
+    """
+
+    def __init__(self, name, max_attempts=4, hedge=False, hedge_percentile=95):
+        self.name = name
+        self.max_attempts = max_attempts
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.latency = get_latency_tracker(name)
+
+        # Stats
+        self.retries = 0
+        self.hedges = 0
+
+    def call(self, fn):
+        """
+        Call a blocking function with retries (and hedging if enabled)
+
+        Args:
+            fn: Zero-argument callable performing one request
+
+        Returns:
+            Result of fn
+        """
+        for attempt in range(self.max_attempts):
+            start = time.time()
+            try:
+                result = self._call_hedged(fn)
+                self.latency.record(time.time() - start)
+                return result
+            except Exception as e:
+                if attempt + 1 >= self.max_attempts or not is_retryable(e):
+                    raise
+                delay = backoff_delay(attempt)
+                self.retries += 1
+                logger.warning(
+                    f"[RETRY] {self.name}: attempt {attempt + 1}/{self.max_attempts} failed ({str(e)[:80]}), "
+                    f"retrying in {delay:.2f}s"
+                )
+                time.sleep(delay)
+
+    async def call_async(self, factory):
+        """
+        Await a coroutine with retries (and hedging if enabled)
+
+        Args:
+            factory: Zero-argument callable returning a new coroutine per attempt
+
+        Returns:
+            Result of the coroutine
+        """
+        for attempt in range(self.max_attempts):
+            start = time.time()
+            try:
+                result = await self._call_hedged_async(factory)
+                self.latency.record(time.time() - start)
+                return result
+            except Exception as e:
+                if attempt + 1 >= self.max_attempts or not is_retryable(e):
+                    raise
+                delay = backoff_delay(attempt)
+                self.retries += 1
+                logger.warning(
+                    f"[RETRY] {self.name}: attempt {attempt + 1}/{self.max_attempts} failed ({str(e)[:80]}), "
+                    f"retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+
+    def _hedge_after(self):
+        if not self.hedge:
+            return None
+        return self.latency.percentile(self.hedge_percentile)
+
+    def _call_hedged(self, fn):
+        hedge_after = self._hedge_after()
+        if hedge_after is None:
+            return fn()
+
+        executor = _get_hedge_executor()
+        # Hedged attempts keep the caller's span as parent
+        fn = bind(fn)
+        primary = executor.submit(fn)
+        done, _ = concurrent.futures.wait([primary], timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        self.hedges += 1
+        logger.info(f"[RETRY] {self.name}: call exceeded p{self.hedge_percentile} ({hedge_after:.2f}s), sending hedge")
+        pending = {primary, executor.submit(fn)}
+        error = None
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    # The loser keeps running in the pool; its result is discarded
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    async def _call_hedged_async(self, factory):
+        hedge_after = self._hedge_after()
+        if hedge_after is None:
+            return await factory()
+
+        primary = asyncio.ensure_future(factory())
+        done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        self.hedges += 1
+        logger.info(f"[RETRY] {self.name}: call exceeded p{self.hedge_percentile} ({hedge_after:.2f}s), sending hedge")
+        pending = {primary, asyncio.ensure_future(factory())}
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    return task.result()
+                error = task.exception()
+        raise error
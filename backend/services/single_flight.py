@@ -0,0 +1,137 @@
+import threading
+import logging
+from urllib.parse import urlsplit, parse_qs
+
+logger = logging.getLogger(__name__)
+
+# 11-character YouTube video ids
+_YOUTUBE_ID_LENGTH = 11
+_YOUTUBE_HOSTS = ('youtube.com', 'youtube-nocookie.com', 'music.youtube.com')
+_YOUTUBE_PATH_PREFIXES = ('/shorts/', '/embed/', '/live/', '/v/')
+
+
+def normalize_video_url(url):
+    """
+    Canonical form of a video URL, equal for every way of writing the same video
+
+    YouTube links (watch?v=, youtu.be/, shorts, embeds, live, with or
+    without www./m. and extra parameters such as t= or si=) become
+    'youtube:<video id>'. Other URLs keep host, path and query, without
+    scheme, www./m. prefix and fragment.
+
+    Args:
+        url: Video URL as submitted
+
+    Returns:
+        str: Normalized key
+    """
+    url = (url or '').strip()
+    parts = urlsplit(url if '://' in url else f'https://{url}')
+    host = (parts.hostname or '').lower()
+    for prefix in ('www.', 'm.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+
+    video_id = None
+    if host == 'youtu.be':
+        video_id = parts.path.lstrip('/').split('/')[0]
+    elif host in _YOUTUBE_HOSTS:
+        if parts.path == '/watch':
+            video_id = parse_qs(parts.query).get('v', [None])[0]
+        else:
+            for prefix in _YOUTUBE_PATH_PREFIXES:
+                if parts.path.startswith(prefix):
+                    video_id = parts.path[len(prefix):].split('/')[0]
+                    break
+    if video_id and len(video_id) == _YOUTUBE_ID_LENGTH:
+        return f'youtube:{video_id}'
+
+    path = parts.path.rstrip('/') or '/'
+    return f"{host}{path}?{parts.query}" if parts.query else f'{host}{path}'
+
+
+class _Call:
+    """One in-flight execution and the result its followers wait for"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one execution
+
+    The first caller of a key (the leader) runs the function; callers that
+    arrive while it runs wait and receive the leader's result or exception
+    instead of repeating the work. Nothing is kept once the call returns:
+    completed work is the job of the caches (CacheManager), this only covers
+    the window in which neither job has finished yet.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn):
+        """
+        Run fn once for all concurrent callers with the same key
+
+        Args:
+            key: Hashable key of the work
+            fn: Callable taking no arguments
+
+        Returns:
+            tuple: (result, shared) - shared is True for callers that joined another call
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+            else:
+                call.followers += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+            if call.followers:
+                logger.info(f"[SINGLE_FLIGHT] Shared {key[0] if isinstance(key, tuple) else key} "
+                            f"with {call.followers} waiting caller(s)")
+        return call.result, False
+
+    def in_flight(self):
+        """Number of calls currently running"""
+        with self.lock:
+            return len(self.calls)
+
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+def get_single_flight():
+    """
+    Get the process-wide single-flight group (shared by all pipelines of the process)
+
+    Returns:
+        SingleFlight: Shared instance
+    """
+    global _single_flight
+    with _single_flight_lock:
+        if _single_flight is None:
+            _single_flight = SingleFlight()
+        return _single_flight
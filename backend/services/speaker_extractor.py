@@ -1,6 +1,7 @@
 import os
 import subprocess
 from pathlib import Path
+from .tracing import run_subprocess
 import logging
 from collections import defaultdict
 
@@ -144,7 +145,7 @@ class SpeakerExtractor:
                         segment_file
                     ]
                     
-                    subprocess.run(cmd, check=True, capture_output=True)
+                    run_subprocess(cmd, check=True, capture_output=True)
                     segment_files.append(segment_file)
                     
                     # Add to concat list
@@ -168,7 +169,7 @@ class SpeakerExtractor:
                 output_path
             ]
             
-            subprocess.run(cmd, check=True, capture_output=True)
+            run_subprocess(cmd, check=True, capture_output=True)
             
             # Cleanup temporary segment files
             for seg_file in segment_files:
@@ -0,0 +1,213 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Typical TTS speaking rate in characters per second (spaces and punctuation included).
+# CJK scripts carry more speech per character, hence the much lower rates.
+DEFAULT_CHARS_PER_SECOND = {
+    'en': 15.0,
+    'es': 16.0,
+    'fr': 15.5,
+    'de': 14.5,
+    'it': 15.5,
+    'pt': 15.5,
+    'ru': 13.5,
+    'hi': 13.0,
+    'ar': 12.0,
+    'ja': 7.5,
+    'zh': 5.5,
+    'ko': 7.0
+}
+
+# Predicted/available duration ratio above which a line needs audible speed-up
+FIT_MAX_RATIO = 1.1
+
+# Speed range accepted by the ElevenLabs voice_settings.speed parameter
+MIN_TTS_SPEED = 0.7
+MAX_TTS_SPEED = 1.2
+
+
+def chars_per_second(language):
+    """
+    Default speaking rate for a language
+
+    Args:
+        language: Language code
+
+    Returns:
+        float: Characters per second
+    """
+    return DEFAULT_CHARS_PER_SECOND.get(language.lower(), 15.0)
+
+
+def predict_duration(text, language):
+    """
+    Predict how long a TTS voice needs to speak a text
+
+    Args:
+        text: Text to be spoken
+        language: Language code of the text
+
+    Returns:
+        float: Predicted duration in seconds
+    """
+    return len(text.strip()) / chars_per_second(language)
+
+
+def target_chars(duration, language):
+    """
+    Number of characters that fit a time slot at the language's speaking rate
+
+    Args:
+        duration: Available duration in seconds
+        language: Language code
+
+    Returns:
+        int: Character budget
+    """
+    return max(1, int(duration * chars_per_second(language)))
+
+
+def overruns_duration(text, duration, language):
+    """
+    Check whether a text is predicted to overrun its time slot
+
+    Lines that are too short are left alone: padding them with extra words
+    sounds worse than a little silence.
+
+    Args:
+        text: Text to be spoken
+        duration: Available duration in seconds (None or <= 0 means unconstrained)
+        language: Language code of the text
+
+    Returns:
+        bool: True if the text needs to be shortened
+    """
+    if not duration or duration <= 0:
+        return False
+    return predict_duration(text, language) / duration > FIT_MAX_RATIO
+
+
+def mp3_duration(num_bytes, bitrate_kbps=128):
+    """
+    Duration of a constant-bitrate MP3 from its size (no ffprobe needed)
+
+    Args:
+        num_bytes: Size of the MP3 data
+        bitrate_kbps: Encoding bitrate (ElevenLabs mp3_44100_128 → 128)
+
+    Returns:
+        float: Duration in seconds
+    """
+    return num_bytes * 8 / (bitrate_kbps * 1000)
+
+
+class VoiceRateStats:
+    """
+    Learned speaking rate per voice and language, persisted across jobs
+
+    Rates are stored normalized to speed 1.0 so samples synthesized with a
+    speed setting still improve the estimate.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            if self.path.exists():
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.stats = json.load(f)
+                logger.info(f"[SPEECH_RATE] Loaded rates for {len(self.stats)} voice(s)")
+        except Exception as e:
+            logger.warning(f"[SPEECH_RATE] Failed to load voice rates: {e}")
+            self.stats = {}
+
+    def chars_per_second(self, voice_id, language, min_samples=3):
+        """
+        Learned rate for a voice, falling back to the language default
+
+        Args:
+            voice_id: TTS voice ID
+            language: Language code
+            min_samples: Samples required before trusting the learned rate
+
+        Returns:
+            float: Characters per second at speed 1.0
+        """
+        with self.lock:
+            entry = self.stats.get(f"{voice_id}:{language.lower()}")
+        if entry and entry['samples'] >= min_samples and entry['seconds'] > 0:
+            return entry['chars'] / entry['seconds']
+        return chars_per_second(language)
+
+    def record(self, voice_id, language, text, seconds, speed=None):
+        """
+        Record one synthesis result
+
+        Args:
+            voice_id: TTS voice ID
+            language: Language code
+            text: Text that was synthesized
+            seconds: Duration of the produced audio
+            speed: Speed setting used for the request (None means 1.0)
+        """
+        chars = len(text.strip())
+        if chars == 0 or seconds <= 0:
+            return
+
+        key = f"{voice_id}:{language.lower()}"
+        with self.lock:
+            entry = self.stats.setdefault(key, {'chars': 0, 'seconds': 0.0, 'samples': 0})
+            entry['chars'] += chars
+            entry['seconds'] += seconds * (speed or 1.0)
+            entry['samples'] += 1
+
+            # Decay old samples so the estimate follows model/voice changes
+            if entry['samples'] > 200:
+                entry['chars'] /= 2
+                entry['seconds'] /= 2
+                entry['samples'] //= 2
+            self.dirty = True
+
+    def save(self):
+        """Persist learned rates (atomic replace)"""
+        with self.lock:
+            if not self.dirty:
+                return
+            snapshot = json.dumps(self.stats, indent=2)
+            self.dirty = False
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(snapshot)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"[SPEECH_RATE] Failed to save voice rates: {e}")
+
+
+_voice_rate_stats = None
+_voice_rate_stats_lock = threading.Lock()
+
+def get_voice_rate_stats():
+    """
+    Get the process-wide voice rate statistics (stored in cache/voice_rates.json)
+
+    Returns:
+        VoiceRateStats: Shared statistics
+    """
+    global _voice_rate_stats
+    with _voice_rate_stats_lock:
+        if _voice_rate_stats is None:
+            _voice_rate_stats = VoiceRateStats(os.path.join('cache', 'voice_rates.json'))
+        return _voice_rate_stats
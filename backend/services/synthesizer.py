@@ -2,8 +2,19 @@ from elevenlabs.client import ElevenLabs
 import os
 import logging
 from pathlib import Path
+import asyncio
+import inspect
 import concurrent.futures
 import time
+from .async_runtime import AsyncRuntime, async_io_enabled
+from .rate_limiter import get_rate_limiter
+from .retry import ResilientCaller
+from .speech_rate import get_voice_rate_stats, mp3_duration, MIN_TTS_SPEED, MAX_TTS_SPEED
+from .tts_backends import get_tts_backend, failover_tts_backends, elevenlabs_speed_supported
+from .api_replay import get_api_replay
+from .tracing import start_span, bind
+from .metrics import WorkerPool
+from .events import get_event_bus
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -92,20 +103,51 @@ VOICE_POOLS = {
 }
 
 class SpeechSynthesizer:
-    """Service for synthesizing speech using ElevenLabs"""
+    """Service for synthesizing speech using ElevenLabs (or a local backend, see tts_backends.py)"""
     
-    def __init__(self, api_key=None, output_dir='temp'):
-        self.api_key = api_key or os.getenv('ELEVENLABS_API_KEY')
-        if not self.api_key:
-            raise ValueError("ElevenLabs API key is required")
+    def __init__(self, api_key=None, output_dir='temp', job_id=None, backend='elevenlabs'):
+        # Non-ElevenLabs backends synthesize locally and need no API key
+        self.backend_name = backend or 'elevenlabs'
+        self.backend = None
+        if self.backend_name != 'elevenlabs':
+            self.backend = get_tts_backend(self.backend_name)
+            self.api_key = None
+            self.client = None
+        else:
+            self.replay = get_api_replay()
+            self.api_key = api_key or os.getenv('ELEVENLABS_API_KEY') or self.replay.api_key()
+            if not self.api_key:
+                raise ValueError("ElevenLabs API key is required")
+            
+            # Initialize ElevenLabs client (SDK 1.0.0)
+            self.client = ElevenLabs(api_key=self.api_key)
+        
+        # Backends tried in order when the primary one fails (TTS_FAILOVER)
+        self.failover_backends = failover_tts_backends(self.backend_name)
         
-        # Initialize ElevenLabs client (SDK 1.0.0)
-        self.client = ElevenLabs(api_key=self.api_key)
         self.output_dir = output_dir
         Path(output_dir).mkdir(parents=True, exist_ok=True)
         
         # Speaker to voice mapping (populated during synthesis)
         self.speaker_voice_map = {}
+        
+        # Process-wide ElevenLabs quota (requests + characters), shared fairly across jobs
+        self.job_id = job_id or 'default'
+        self.rate_limiter = get_rate_limiter('elevenlabs')
+        
+        # Per-segment retries with jittered backoff; hedging past p95 is opt-in
+        self.caller = ResilientCaller(
+            'elevenlabs_tts',
+            max_attempts=int(os.getenv('SYNTHESIS_MAX_ATTEMPTS', 4)),
+            hedge=os.getenv('SYNTHESIS_HEDGE', 'False') == 'True'
+        )
+        
+        # Ask the TTS for a speed that lands each segment on its original duration,
+        # using speaking rates learned from previous syntheses
+        self.speed_control = os.getenv('SYNTHESIS_SPEED_CONTROL', 'True') == 'True'
+        self.voice_rates = get_voice_rate_stats()
+        self._elevenlabs_speed = None
+        self.language_code = 'en'
     
     def list_available_voices(self):
         """
@@ -114,13 +156,16 @@ class SpeechSynthesizer:
         Returns:
             list: Available voices
         """
+        if self.backend:
+            return self.backend.list_voices()
+        
         try:
             available_voices = self.client.voices.get_all()
             return available_voices
         except Exception as e:
             raise Exception(f"Failed to fetch voices: {str(e)}")
     
-    def synthesize_text(self, text, voice_id='21m00Tcm4TlvDq8ikWAM', model='eleven_multilingual_v2'):
+    def synthesize_text(self, text, voice_id='21m00Tcm4TlvDq8ikWAM', model='eleven_multilingual_v2', speed=None):
         """
         Synthesize speech from text
         
@@ -128,34 +173,32 @@ class SpeechSynthesizer:
             text: Text to synthesize
             voice_id: ElevenLabs voice ID (default: Rachel)
             model: Model to use (eleven_multilingual_v2 for multiple languages)
+            speed: Optional speaking speed (0.7-1.2, None for the voice default)
             
         Returns:
             bytes: Audio data
         """
+        return self._synthesize_text(text, voice_id, model, speed)[0]
+    
+    def _synthesize_text(self, text, voice_id, model, speed=None):
+        """
+        Synthesize speech from text, noting which backend produced it
+        
+        Returns:
+            tuple: (audio data, name of the backend that synthesized it)
+        """
         try:
             logger.info(f"[SYNTHESIZER] Generating speech for text: {text[:50]}...")
             logger.info(f"[SYNTHESIZER] Using voice_id: {voice_id}, model: {model}")
             
-            # Use new SDK 1.0.0 API with optimized voice settings
-            from elevenlabs import VoiceSettings
-            
-            audio_generator = self.client.generate(
-                text=text,
-                voice=voice_id,
-                model=model,
-                voice_settings=VoiceSettings(
-                    stability=0.5,           # Balanced stability for natural speech
-                    similarity_boost=0.75,   # High similarity to voice
-                    style=0.0,               # Neutral style for consistent timing
-                    use_speaker_boost=True   # Enhance speaker characteristics
-                )
-            )
-            
-            # Convert generator to bytes
-            audio = b''.join(audio_generator)
+            backend = self.backend_name
+            try:
+                audio = self.caller.call(lambda: self._generate_audio(text, voice_id, model, speed))
+            except Exception as e:
+                audio, backend = self._failover(e, text, voice_id, model, speed)
             
             logger.info(f"[SYNTHESIZER] Successfully generated {len(audio)} bytes of audio")
-            return audio
+            return audio, backend
             
         except Exception as e:
             error_type = type(e).__name__
@@ -172,7 +215,192 @@ class SpeechSynthesizer:
             elif 'auth' in error_msg.lower() or 'key' in error_msg.lower():
                 logger.error("[SYNTHESIZER ERROR] AUTHENTICATION ERROR - Invalid API key")
             
-            raise Exception(f"Speech synthesis failed [{error_type}]: {error_msg}")
+            raise Exception(f"Speech synthesis failed [{error_type}]: {error_msg}") from e
+    
+    def _generate_audio(self, text, voice_id, model, speed=None):
+        """
+        Single generate() request (one attempt, no retries)
+        
+        Returns:
+            bytes: Audio data
+        """
+        if self.backend:
+            return self._backend_audio(text, voice_id, model, speed)
+        
+        with self._tts_span(text, voice_id, model, speed) as span:
+            self.rate_limiter.acquire(self.job_id, len(text))
+            
+            try:
+                # Use new SDK 1.0.0 API with optimized voice settings
+                # (generator joined to bytes; recorded/replayed when API_REPLAY_MODE is set)
+                audio = self.replay.call(
+                    'elevenlabs',
+                    self._replay_request(text, voice_id, model),
+                    lambda: b''.join(self.client.generate(
+                        text=text,
+                        voice=voice_id,
+                        model=model,
+                        voice_settings=self._voice_settings(speed)
+                    )),
+                    details={'speed': speed}
+                )
+            except Exception as e:
+                self.rate_limiter.record_error(e)
+                raise
+            
+            self.rate_limiter.record_success()
+            self._record_rate(text, voice_id, audio, speed)
+            span.set_attribute('audio.bytes', len(audio))
+            return audio
+    
+    def _backend_audio(self, text, voice_id, model, speed=None):
+        """Synthesize with the local primary backend"""
+        with self._tts_span(text, voice_id, model, speed) as span:
+            audio = self.backend.synthesize(text, voice_id, model, speed,
+                                            language=self.language_code, job_id=self.job_id)
+            self._record_rate(text, voice_id, audio, speed)
+            span.set_attribute('audio.bytes', len(audio))
+            return audio
+    
+    def _report_segment(self, completed, total):
+        """Publish per-segment synthesis progress on the job event bus"""
+        get_event_bus().publish(self.job_id, 'segment', {
+            'stage': 'synthesis',
+            'completed': completed,
+            'total': total
+        })
+    
+    def _tts_span(self, text, voice_id, model, speed, backend=None):
+        """Span of one synthesis request (a TTS segment attempt)"""
+        backend = backend or self.backend_name
+        return start_span('tts.synthesize', self.job_id, kind='client' if backend == 'elevenlabs' else 'internal', attributes={
+            'tts.backend': backend,
+            'tts.voice_id': voice_id,
+            'tts.model': model,
+            'tts.speed': speed,
+            'text.chars': len(text)
+        })
+    
+    def _failover(self, error, text, voice_id, model, speed=None):
+        """
+        Retry a failed synthesis on the failover backends, in order
+        
+        Args:
+            error: Exception from the primary backend (re-raised if every backend fails)
+            text: Text to synthesize
+            voice_id: Voice ID (failover backends map it to one of their own voices)
+            model: Model requested from the primary backend
+            speed: Optional speaking speed
+            
+        Returns:
+            tuple: (audio data, name of the failover backend that produced it)
+        """
+        for backend in self.failover_backends:
+            try:
+                with self._tts_span(text, voice_id, model, speed, backend=backend.name) as span:
+                    audio = backend.synthesize(text, voice_id, model, speed,
+                                               language=self.language_code, job_id=self.job_id)
+                    span.set_attributes({'audio.bytes': len(audio), 'tts.failover': True})
+            except Exception as failover_error:
+                logger.warning(f"[SYNTHESIZER] Failover backend '{backend.name}' failed: {str(failover_error)}")
+                continue
+            logger.warning(f"[SYNTHESIZER] '{self.backend_name}' failed ({str(error)[:80]}), used '{backend.name}' instead")
+            return audio, backend.name
+        raise error
+    
+    def _replay_request(self, text, voice_id, model):
+        """
+        Fixture key of a TTS request (shared by the generate and convert paths)
+        
+        The speed is left out: it comes from the voice-rate stats, which every
+        synthesis updates, so a replay would never plan the recorded speed again.
+        It is stored with the fixture instead (details).
+        """
+        return {'text': text, 'voice_id': voice_id, 'model': model}
+    
+    def _rate_key(self, voice_id):
+        """Voice key for learned speaking rates (local voices are namespaced by backend)"""
+        if self.backend:
+            return f"{self.backend_name}:{voice_id}"
+        return voice_id
+    
+    def _voice_settings(self, speed=None):
+        """
+        Build VoiceSettings, including the speed setting when requested
+        
+        Args:
+            speed: Optional speaking speed
+            
+        Returns:
+            VoiceSettings: Settings for the TTS request
+        """
+        from elevenlabs import VoiceSettings
+        
+        settings = {
+            'stability': 0.5,           # Balanced stability for natural speech
+            'similarity_boost': 0.75,   # High similarity to voice
+            'style': 0.0,               # Neutral style for consistent timing
+            'use_speaker_boost': True   # Enhance speaker characteristics
+        }
+        
+        if speed is not None and self._speed_applied():
+            settings['speed'] = speed
+        
+        return VoiceSettings(**settings)
+    
+    def _speed_applied(self):
+        """
+        Whether the primary TTS honours the speed setting
+        
+        Local backends always do; ElevenLabs only with an SDK whose VoiceSettings
+        has a speed field. Otherwise alignment falls back to atempo.
+        
+        Returns:
+            bool: True when a requested speed reaches the audio
+        """
+        if self.backend:
+            return True
+        if self._elevenlabs_speed is None:
+            self._elevenlabs_speed = elevenlabs_speed_supported()
+            if not self._elevenlabs_speed:
+                logger.info("[SYNTHESIZER] ElevenLabs SDK has no VoiceSettings.speed, speed is left to alignment")
+        return self._elevenlabs_speed
+    
+    def _plan_speed(self, text, voice_id, segment):
+        """
+        Pick the TTS speed that makes the audio match the segment's original duration
+        
+        Args:
+            text: Text to synthesize
+            voice_id: Voice that will speak it
+            segment: Segment with 'start' and 'end'
+            
+        Returns:
+            float or None: Speed setting, or None when 1.0 is close enough
+        """
+        if not self.speed_control or not self._speed_applied():
+            return None
+        
+        target_duration = segment.get('end', 0) - segment.get('start', 0)
+        if target_duration <= 0:
+            return None
+        
+        rate = self.voice_rates.chars_per_second(self._rate_key(voice_id), self.language_code)
+        predicted_duration = len(text.strip()) / rate
+        speed = predicted_duration / target_duration
+        
+        if abs(speed - 1.0) <= 0.01:
+            return None
+        
+        speed = round(min(MAX_TTS_SPEED, max(MIN_TTS_SPEED, speed)), 2)
+        logger.info(f"[SYNTHESIZER] Predicted {predicted_duration:.2f}s for {target_duration:.2f}s slot → speed {speed:.2f}")
+        return speed
+    
+    def _record_rate(self, text, voice_id, audio, speed):
+        """Learn the voice's speaking rate from the produced audio"""
+        # A speed the TTS dropped must not be divided out of the measured duration
+        applied_speed = speed if self._speed_applied() else None
+        self.voice_rates.record(self._rate_key(voice_id), self.language_code, text, mp3_duration(len(audio)), applied_speed)
     
     def synthesize_segment(self, segment, voice_id='21m00Tcm4TlvDq8ikWAM', output_path=None):
         """
@@ -192,7 +420,9 @@ class SpeechSynthesizer:
             if not text:
                 raise ValueError("No text to synthesize")
             
-            audio_data = self.synthesize_text(text, voice_id)
+            audio_data, backend = self._synthesize_text(
+                text, voice_id, 'eleven_multilingual_v2', self._plan_speed(text, voice_id, segment)
+            )
             
             # Save audio to file
             if output_path is None:
@@ -205,13 +435,15 @@ class SpeechSynthesizer:
                 f.write(audio_data)
             
             segment['audio_path'] = output_path
+            segment['tts_backend'] = backend
             return segment
             
         except Exception as e:
             raise Exception(f"Failed to synthesize segment: {str(e)}")
     
     def synthesize_segments(self, segments, voice_id='21m00Tcm4TlvDq8ikWAM', job_id='default', 
-                           language_code='en', multi_speaker=True, parallel=True, max_workers=5):
+                           language_code='en', multi_speaker=True, parallel=True, max_workers=5,
+                           use_async=None, speakers=None):
         """
         Synthesize multiple segments with optional multi-speaker support
         
@@ -223,12 +455,22 @@ class SpeechSynthesizer:
             multi_speaker: Enable multi-speaker voice assignment
             parallel: Enable parallel synthesis (default: True)
             max_workers: Maximum parallel workers (default: 5)
+            use_async: Use the shared asyncio client path (default: ASYNC_IO env, True)
+            speakers: Optional speaker IDs of the whole video, so synthesizing a
+                      subset of the segments keeps the same voice per speaker
             
         Returns:
             list: Segments with audio_path added
         """
+        if use_async is None:
+            use_async = async_io_enabled()
+        # Local backends are blocking CPU work: use the thread pool path
+        if self.backend:
+            use_async = False
+        self.language_code = language_code
+        
         # Detect if we have multi-speaker content
-        speakers = set(segment.get('speaker', 0) for segment in segments)
+        speakers = set(speakers or (segment.get('speaker', 0) for segment in segments))
         has_multiple_speakers = len(speakers) > 1
         
         if has_multiple_speakers and multi_speaker:
@@ -240,17 +482,32 @@ class SpeechSynthesizer:
             # Use default voice for all
             self.speaker_voice_map = {0: voice_id}
         
-        # Use parallel synthesis if enabled
-        if parallel:
+        # Use async or parallel synthesis if enabled
+        if parallel and use_async:
+            logger.info(f"[SYNTHESIZER] Using async synthesis on the shared event loop")
+            jobs = []
+            for i, segment in enumerate(segments):
+                speaker_id = segment.get('speaker', 0)
+                jobs.append((
+                    i,
+                    segment,
+                    self.speaker_voice_map.get(speaker_id, voice_id),
+                    os.path.join(self.output_dir, f"{job_id}_segment_{i:04d}.mp3")
+                ))
+            results = self._synthesize_async(jobs)
+        elif parallel:
             logger.info(f"[SYNTHESIZER] Using parallel synthesis with {max_workers} workers")
-            return self._synthesize_segments_parallel(
+            results = self._synthesize_segments_parallel(
                 segments, voice_id, job_id, max_workers
             )
         else:
             logger.info(f"[SYNTHESIZER] Using sequential synthesis")
-            return self._synthesize_segments_sequential(
+            results = self._synthesize_segments_sequential(
                 segments, voice_id, job_id
             )
+        
+        self.voice_rates.save()
+        return results
     
     def _synthesize_segments_sequential(self, segments, voice_id, job_id):
         """
@@ -278,6 +535,7 @@ class SpeechSynthesizer:
                 )
                 
                 synthesized_segments.append(synthesized_segment)
+                self._report_segment(len(synthesized_segments), len(segments))
                 
             except Exception as e:
                 error_msg = str(e)
@@ -285,6 +543,7 @@ class SpeechSynthesizer:
                 print(f"Warning: Failed to synthesize segment {i}: {error_msg}")
                 # Add segment without audio
                 synthesized_segments.append(segment)
+                self._report_segment(len(synthesized_segments), len(segments))
         
         return synthesized_segments
     
@@ -331,10 +590,11 @@ class SpeechSynthesizer:
         results = [None] * len(segments)
         
         # Use ThreadPoolExecutor for I/O-bound API calls
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor, \
+                WorkerPool('synthesis', max_workers) as pool:
             # Submit all tasks
             future_to_index = {
-                executor.submit(synthesize_single, i, segment): i 
+                executor.submit(pool.wrap(bind(synthesize_single)), i, segment): i 
                 for i, segment in enumerate(segments)
             }
             
@@ -344,6 +604,7 @@ class SpeechSynthesizer:
                 idx, result, error = future.result()
                 results[idx] = result
                 completed += 1
+                self._report_segment(completed, len(segments))
                 
                 if error:
                     logger.warning(f"[SYNTHESIZER] Segment {idx} failed: {error}")
@@ -387,7 +648,7 @@ class SpeechSynthesizer:
     
     def synthesize_segments_with_cloned_voices(self, segments, cloned_voices, 
                                               language_code='en', model='eleven_multilingual_v2',
-                                              parallel=True, max_workers=5):
+                                              parallel=True, max_workers=5, use_async=None):
         """
         Synthesize segments using cloned voices
         
@@ -398,21 +659,52 @@ class SpeechSynthesizer:
             model: ElevenLabs model to use
             parallel: Enable parallel synthesis (default: True)
             max_workers: Maximum parallel workers (default: 5)
+            use_async: Use the shared asyncio client path (default: ASYNC_IO env, True)
             
         Returns:
             list: Segments with audio_path added
         """
+        if use_async is None:
+            use_async = async_io_enabled()
+        # Local backends are blocking CPU work: use the thread pool path
+        if self.backend:
+            use_async = False
+        self.language_code = language_code
+        
         try:
             logger.info(f"[SYNTHESIZER] Synthesizing with cloned voices")
             logger.info(f"[SYNTHESIZER] Cloned voices: {cloned_voices}")
             logger.info(f"[SYNTHESIZER] Segments to synthesize: {len(segments)}")
             
-            if parallel:
+            if parallel and use_async:
+                logger.info(f"[SYNTHESIZER] Using async synthesis on the shared event loop")
+                jobs = []
+                for i, segment in enumerate(segments):
+                    speaker = segment.get('speaker', 0)
+                    voice_id = cloned_voices.get(speaker)
+                    if not voice_id:
+                        logger.warning(
+                            f"[SYNTHESIZER] No cloned voice for speaker {speaker}, "
+                            f"using default voice"
+                        )
+                        voice_id = self.get_voice_for_language('en')
+                    jobs.append((
+                        i,
+                        segment,
+                        voice_id,
+                        os.path.join(self.output_dir, f'segment_{i}_{speaker}.mp3')
+                    ))
+                results = self._synthesize_async(jobs, model)
+                logger.info(f"[SYNTHESIZER] ✅ Synthesized {len(results)} segments with cloned voices")
+            elif parallel:
                 logger.info(f"[SYNTHESIZER] Using parallel synthesis with {max_workers} workers")
-                return self._synthesize_cloned_parallel(segments, cloned_voices, model, max_workers)
+                results = self._synthesize_cloned_parallel(segments, cloned_voices, model, max_workers)
             else:
                 logger.info(f"[SYNTHESIZER] Using sequential synthesis")
-                return self._synthesize_cloned_sequential(segments, cloned_voices, model)
+                results = self._synthesize_cloned_sequential(segments, cloned_voices, model)
+            
+            self.voice_rates.save()
+            return results
             
         except Exception as e:
             logger.error(f"[SYNTHESIZER] ❌ Synthesis failed: {str(e)}")
@@ -422,8 +714,6 @@ class SpeechSynthesizer:
         """
         Sequential synthesis with cloned voices (original implementation)
         """
-        from elevenlabs import VoiceSettings
-        
         synthesized_segments = []
         
         for i, segment in enumerate(segments):
@@ -433,6 +723,7 @@ class SpeechSynthesizer:
             if not text:
                 logger.warning(f"[SYNTHESIZER] Segment {i} has no text, skipping")
                 synthesized_segments.append(segment)
+                self._report_segment(len(synthesized_segments), len(segments))
                 continue
             
             # Get cloned voice for this speaker
@@ -447,32 +738,17 @@ class SpeechSynthesizer:
             
             logger.info(f"[SYNTHESIZER] Segment {i}: Speaker {speaker} → Voice {voice_id[:8]}...")
             
-            # Generate speech
-            audio_data = self.client.text_to_speech.convert(
-                voice_id=voice_id,
-                text=text,
-                model_id=model,
-                output_format='mp3_44100_128',
-                voice_settings=VoiceSettings(
-                    stability=0.5,
-                    similarity_boost=0.75,
-                    style=0.0,
-                    use_speaker_boost=True
-                )
-            )
-            
-            # Save audio to file
+            # Generate speech and save audio to file
             audio_path = os.path.join(
                 self.output_dir,
                 f'segment_{i}_{speaker}.mp3'
             )
-            
-            with open(audio_path, 'wb') as f:
-                for chunk in audio_data:
-                    f.write(chunk)
-            
+            segment['tts_backend'] = self._convert_to_file(
+                text, voice_id, model, audio_path, self._plan_speed(text, voice_id, segment)
+            )
             segment['audio_path'] = audio_path
             synthesized_segments.append(segment)
+            self._report_segment(len(synthesized_segments), len(segments))
         
         logger.info(f"[SYNTHESIZER] ✅ Synthesized {len(synthesized_segments)} segments with cloned voices")
         return synthesized_segments
@@ -481,8 +757,6 @@ class SpeechSynthesizer:
         """
         Parallel synthesis with cloned voices
         """
-        from elevenlabs import VoiceSettings
-        
         def synthesize_single_cloned(i, segment):
             """Synthesize a single segment with cloned voice"""
             try:
@@ -505,30 +779,14 @@ class SpeechSynthesizer:
                 
                 logger.info(f"[SYNTHESIZER] Segment {i}: Speaker {speaker} → Voice {voice_id[:8]}...")
                 
-                # Generate speech
-                audio_data = self.client.text_to_speech.convert(
-                    voice_id=voice_id,
-                    text=text,
-                    model_id=model,
-                    output_format='mp3_44100_128',
-                    voice_settings=VoiceSettings(
-                        stability=0.5,
-                        similarity_boost=0.75,
-                        style=0.0,
-                        use_speaker_boost=True
-                    )
-                )
-                
-                # Save audio to file
+                # Generate speech and save audio to file
                 audio_path = os.path.join(
                     self.output_dir,
                     f'segment_{i}_{speaker}.mp3'
                 )
-                
-                with open(audio_path, 'wb') as f:
-                    for chunk in audio_data:
-                        f.write(chunk)
-                
+                segment['tts_backend'] = self._convert_to_file(
+                    text, voice_id, model, audio_path, self._plan_speed(text, voice_id, segment)
+                )
                 segment['audio_path'] = audio_path
                 return (i, segment, None)
                 
@@ -541,10 +799,11 @@ class SpeechSynthesizer:
         results = [None] * len(segments)
         
         # Use ThreadPoolExecutor for I/O-bound API calls
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor, \
+                WorkerPool('synthesis', max_workers) as pool:
             # Submit all tasks
             future_to_index = {
-                executor.submit(synthesize_single_cloned, i, segment): i 
+                executor.submit(pool.wrap(bind(synthesize_single_cloned)), i, segment): i 
                 for i, segment in enumerate(segments)
             }
             
@@ -554,6 +813,7 @@ class SpeechSynthesizer:
                 idx, result, error = future.result()
                 results[idx] = result
                 completed += 1
+                self._report_segment(completed, len(segments))
                 
                 if error:
                     logger.warning(f"[SYNTHESIZER] Segment {idx} failed: {error}")
@@ -564,3 +824,183 @@ class SpeechSynthesizer:
         
         logger.info(f"[SYNTHESIZER] ✅ Synthesized {len(results)} segments with cloned voices")
         return results
+    
+    def _convert_to_file(self, text, voice_id, model, output_path, speed=None):
+        """
+        Synthesize text with text_to_speech.convert (with retries) and save it
+        
+        Args:
+            text: Text to synthesize
+            voice_id: ElevenLabs voice ID
+            model: ElevenLabs model to use
+            output_path: Path to save audio file
+            speed: Optional speaking speed
+            
+        Returns:
+            str: Name of the backend that synthesized the audio
+        """
+        backend = self.backend_name
+        try:
+            audio_data = self.caller.call(lambda: self._convert_audio(text, voice_id, model, speed))
+        except Exception as e:
+            audio_data, backend = self._failover(e, text, voice_id, model, speed)
+        
+        with open(output_path, 'wb') as f:
+            f.write(audio_data)
+        return backend
+    
+    def _convert_audio(self, text, voice_id, model, speed=None):
+        """
+        Single text_to_speech.convert request (one attempt, no retries)
+        
+        Returns:
+            bytes: Audio data
+        """
+        if self.backend:
+            return self._backend_audio(text, voice_id, model, speed)
+        
+        with self._tts_span(text, voice_id, model, speed) as span:
+            self.rate_limiter.acquire(self.job_id, len(text))
+            
+            try:
+                audio_data = self.replay.call(
+                    'elevenlabs',
+                    self._replay_request(text, voice_id, model),
+                    lambda: b''.join(self.client.text_to_speech.convert(
+                        voice_id=voice_id,
+                        text=text,
+                        model_id=model,
+                        output_format='mp3_44100_128',
+                        voice_settings=self._voice_settings(speed)
+                    )),
+                    details={'speed': speed}
+                )
+            except Exception as e:
+                self.rate_limiter.record_error(e)
+                raise
+            
+            self.rate_limiter.record_success()
+            self._record_rate(text, voice_id, audio_data, speed)
+            span.set_attribute('audio.bytes', len(audio_data))
+            return audio_data
+    
+    def _synthesize_async(self, jobs, model='eleven_multilingual_v2'):
+        """
+        Synthesize segments concurrently on the shared event loop
+        
+        In-flight requests are bounded by the process-wide ElevenLabs
+        semaphore, not by a per-call thread pool.
+        
+        Args:
+            jobs: List of (index, segment, voice_id, output_path) tuples
+            model: ElevenLabs model to use
+            
+        Returns:
+            list: Synthesized segments in original order
+        """
+        results = [None] * len(jobs)
+        
+        async def synthesize_all():
+            completed = 0
+            tasks = [
+                self._synthesize_to_file_async(i, segment, voice_id, output_path, model)
+                for i, segment, voice_id, output_path in jobs
+            ]
+            for task in asyncio.as_completed(tasks):
+                idx, result, error = await task
+                results[idx] = result
+                completed += 1
+                self._report_segment(completed, len(jobs))
+                
+                if error:
+                    logger.warning(f"[SYNTHESIZER] Segment {idx} failed: {error}")
+                
+                # Log progress
+                if completed % 5 == 0 or completed == len(jobs):
+                    logger.info(f"[SYNTHESIZER] Progress: {completed}/{len(jobs)} segments completed")
+        
+        AsyncRuntime.get().run(synthesize_all())
+        return results
+    
+    async def _synthesize_to_file_async(self, i, segment, voice_id, output_path, model):
+        """
+        Synthesize one segment with the shared AsyncElevenLabs client and save it
+        
+        Returns:
+            tuple: (index, segment, error message or None)
+        """
+        try:
+            text = segment.get('translated_text') or segment.get('text', '')
+            
+            if not text:
+                logger.warning(f"[SYNTHESIZER] Segment {i} has no text, skipping")
+                return (i, segment, None)
+            
+            logger.info(f"[SYNTHESIZER] Segment {i}: Speaker {segment.get('speaker', 0)} → Voice {voice_id[:8]}...")
+            
+            speed = self._plan_speed(text, voice_id, segment)
+            backend = self.backend_name
+            try:
+                audio_data = await self.caller.call_async(
+                    lambda: self._convert_audio_async(text, voice_id, model, speed)
+                )
+            except Exception as e:
+                audio_data, backend = await asyncio.to_thread(self._failover, e, text, voice_id, model, speed)
+            
+            def write_audio():
+                with open(output_path, 'wb') as f:
+                    f.write(audio_data)
+            
+            # Keep disk I/O off the event loop
+            await asyncio.to_thread(write_audio)
+            
+            segment['audio_path'] = output_path
+            segment['tts_backend'] = backend
+            return (i, segment, None)
+            
+        except Exception as e:
+            error_msg = str(e)
+            logger.error(f"[SYNTHESIZER] Failed to synthesize segment {i}: {error_msg}")
+            return (i, segment, error_msg)
+    
+    async def _convert_audio_async(self, text, voice_id, model, speed=None):
+        """
+        Single async text_to_speech.convert request (one attempt, no retries)
+        
+        Returns:
+            bytes: Audio data
+        """
+        runtime = AsyncRuntime.get()
+        
+        async def convert():
+            audio_stream = runtime.elevenlabs_client(self.api_key).text_to_speech.convert(
+                voice_id=voice_id,
+                text=text,
+                model_id=model,
+                output_format='mp3_44100_128',
+                voice_settings=self._voice_settings(speed)
+            )
+            # Depending on SDK version convert() is a coroutine or an async generator
+            if inspect.isawaitable(audio_stream):
+                audio_stream = await audio_stream
+            return b''.join([chunk async for chunk in audio_stream])
+        
+        with self._tts_span(text, voice_id, model, speed) as span:
+            await self.rate_limiter.acquire_async(self.job_id, len(text))
+            
+            async with runtime.semaphore('elevenlabs'):
+                try:
+                    audio_data = await self.replay.call_async(
+                        'elevenlabs',
+                        self._replay_request(text, voice_id, model),
+                        convert,
+                        details={'speed': speed}
+                    )
+                except Exception as e:
+                    self.rate_limiter.record_error(e)
+                    raise
+            
+            self.rate_limiter.record_success()
+            self._record_rate(text, voice_id, audio_data, speed)
+            span.set_attribute('audio.bytes', len(audio_data))
+            return audio_data
@@ -0,0 +1,450 @@
+import contextvars
+import json
+import os
+import subprocess
+import threading
+import time
+import urllib.request
+import logging
+from pathlib import Path
+from .profiler import JobThread, current_job
+
+logger = logging.getLogger(__name__)
+
+# Exporters selectable through TRACING_EXPORT
+TRACING_EXPORTERS = ('file', 'otlp')
+
+# OTLP span kinds
+SPAN_KINDS = {'internal': 1, 'server': 2, 'client': 3}
+
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+
+class _NoopSpan:
+    """Span returned while tracing is disabled (or outside any job trace)"""
+
+    trace_id = None
+    span_id = None
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, attributes):
+        pass
+
+    def record_error(self, error):
+        pass
+
+    def end(self, attributes=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """
+    A timed operation within a job trace
+
+    Starting a span makes it the current span of the calling context, so
+    spans started underneath (in the same thread, or in work bound with
+    bind()/bind_coroutine()) become its children. Usable as a context
+    manager; exceptions leaving the block mark the span as failed.
+    """
+
+    def __init__(self, trace, name, parent_id=None, kind='internal', attributes=None):
+        self.trace = trace
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = {}
+        self.set_attributes(attributes)
+        self.error = None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self._previous = _current_span.get()
+        self._token = _current_span.set(self)
+
+    @property
+    def trace_id(self):
+        return self.trace.trace_id
+
+    def set_attribute(self, key, value):
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, attributes):
+        for key, value in (attributes or {}).items():
+            self.set_attribute(key, value)
+
+    def record_error(self, error):
+        self.error = f"{type(error).__name__}: {error}"
+
+    def end(self, attributes=None):
+        """
+        Finish the span
+
+        Args:
+            attributes: Optional attributes to add before finishing
+        """
+        if self.end_ns is not None:
+            return
+        self.set_attributes(attributes)
+        self.end_ns = time.time_ns()
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # Ended from another context (e.g. a stage span closed on failure)
+            if _current_span.get() is self:
+                _current_span.set(self._previous)
+        self.trace.finish(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.record_error(exc)
+        self.end()
+        return False
+
+
+class Trace:
+    """All spans of one job"""
+
+    def __init__(self, job_id):
+        self.trace_id = os.urandom(16).hex()
+        self.job_id = job_id
+        self.root = None
+        self.spans = []
+        self.open_spans = set()
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def start(self, name, parent_id, kind, attributes):
+        span = Span(self, name, parent_id, kind, attributes)
+        with self.lock:
+            self.open_spans.add(span)
+        return span
+
+    def finish(self, span):
+        with self.lock:
+            self.open_spans.discard(span)
+            # Late spans (e.g. a losing hedged request) are dropped after export
+            if not self.closed:
+                self.spans.append(span)
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def to_otlp(trace, service_name):
+    """
+    OTLP/JSON payload (ExportTraceServiceRequest) of a finished trace
+
+    Args:
+        trace: Trace to encode
+        service_name: Value of the service.name resource attribute
+
+    Returns:
+        dict: JSON-serializable payload
+    """
+    spans = []
+    for span in trace.spans:
+        encoded = {
+            'traceId': trace.trace_id,
+            'spanId': span.span_id,
+            'name': span.name,
+            'kind': SPAN_KINDS.get(span.kind, 1),
+            'startTimeUnixNano': str(span.start_ns),
+            'endTimeUnixNano': str(span.end_ns),
+            'attributes': [{'key': k, 'value': _otlp_value(v)} for k, v in span.attributes.items()],
+            'status': {'code': 2, 'message': span.error} if span.error else {'code': 1}
+        }
+        if span.parent_id:
+            encoded['parentSpanId'] = span.parent_id
+        spans.append(encoded)
+
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': [
+                {'key': 'service.name', 'value': {'stringValue': service_name}},
+                {'key': 'job.id', 'value': {'stringValue': str(trace.job_id)}}
+            ]},
+            'scopeSpans': [{'scope': {'name': 'autodub'}, 'spans': spans}]
+        }]
+    }
+
+
+class FileExporter:
+    """Appends one OTLP/JSON payload per trace to a JSON Lines file"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+
+    def export(self, payload):
+        line = json.dumps(payload, ensure_ascii=False)
+        with self.lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+
+class OTLPExporter:
+    """Posts traces to an OTLP/HTTP collector (JSON encoding) without blocking the job"""
+
+    def __init__(self, endpoint):
+        self.url = endpoint.rstrip('/') + '/v1/traces'
+
+    def _post(self, body):
+        request = urllib.request.Request(
+            self.url, data=body, headers={'Content-Type': 'application/json'}, method='POST'
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                response.read()
+        except Exception as e:
+            logger.warning(f"[TRACING] Failed to export trace to {self.url}: {e}")
+
+    def export(self, payload):
+        body = json.dumps(payload).encode('utf-8')
+        threading.Thread(target=self._post, args=(body,), name='otlp-export', daemon=True).start()
+
+
+class Tracer:
+    """Creates one trace per job and hands finished traces to the exporters"""
+
+    def __init__(self, exporters=None, service_name='autodub'):
+        self.exporters = exporters or []
+        self.service_name = service_name
+        self.traces = {}
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.exporters)
+
+    def start_trace(self, job_id, name='dubbing_job', attributes=None):
+        """
+        Start the trace of a job; its root span becomes the current span
+
+        Args:
+            job_id: Job identifier
+            name: Root span name
+            attributes: Optional root span attributes
+
+        Returns:
+            Span: Root span
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        trace = Trace(job_id)
+        trace.root = trace.start(name, None, 'internal', attributes)
+        with self.lock:
+            self.traces[job_id] = trace
+        return trace.root
+
+    def start_span(self, name, job_id=None, kind='internal', attributes=None):
+        """
+        Start a span under the current span, or under the job's root span
+
+        Args:
+            name: Span name
+            job_id: Optional job identifier, used when no span is current
+            kind: 'internal' or 'client' (outgoing API calls)
+            attributes: Optional attributes
+
+        Returns:
+            Span: The new span (NOOP_SPAN outside a job trace)
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+
+        parent = _current_span.get()
+        if parent is None or parent.trace.closed:
+            with self.lock:
+                trace = self.traces.get(job_id)
+            if trace is None:
+                return NOOP_SPAN
+            parent = trace.root
+        return parent.trace.start(name, parent.span_id, kind, attributes)
+
+    def end_trace(self, job_id, error=None):
+        """
+        Finish a job trace and export it
+
+        Spans still open (a stage interrupted by an error) are closed first.
+
+        Args:
+            job_id: Job identifier
+            error: Optional exception that failed the job
+        """
+        with self.lock:
+            trace = self.traces.pop(job_id, None)
+        if trace is None:
+            return
+
+        with trace.lock:
+            open_spans = sorted(trace.open_spans, key=lambda span: -span.start_ns)
+        for span in open_spans:
+            if error is not None:
+                span.record_error(error)
+            span.end()
+
+        with trace.lock:
+            trace.closed = True
+        payload = to_otlp(trace, self.service_name)
+        for exporter in self.exporters:
+            try:
+                exporter.export(payload)
+            except Exception as e:
+                logger.warning(f"[TRACING] Exporter {type(exporter).__name__} failed: {e}")
+        logger.info(f"[TRACING] Trace {trace.trace_id} of job {job_id}: {len(trace.spans)} spans")
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+def get_tracer():
+    """
+    Get the process-wide tracer
+
+    Configured from TRACING_EXPORT (comma separated: file, otlp; empty
+    disables tracing), TRACING_FILE (default traces/traces.jsonl) and
+    OTEL_EXPORTER_OTLP_ENDPOINT (default http://localhost:4318).
+
+    Returns:
+        Tracer: Shared instance
+    """
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            exporters = []
+            for name in os.getenv('TRACING_EXPORT', '').split(','):
+                name = name.strip()
+                if name == 'file':
+                    exporters.append(FileExporter(os.getenv('TRACING_FILE', 'traces/traces.jsonl')))
+                elif name == 'otlp':
+                    exporters.append(OTLPExporter(os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT', 'http://localhost:4318')))
+                elif name:
+                    logger.warning(f"[TRACING] Unknown exporter '{name}' (expected one of {', '.join(TRACING_EXPORTERS)})")
+            _tracer = Tracer(exporters, service_name=os.getenv('OTEL_SERVICE_NAME', 'autodub'))
+        return _tracer
+
+
+def start_trace(job_id, name='dubbing_job', attributes=None):
+    """Start a job trace on the shared tracer (see Tracer.start_trace)"""
+    return get_tracer().start_trace(job_id, name, attributes)
+
+
+def end_trace(job_id, error=None):
+    """Finish and export a job trace on the shared tracer (see Tracer.end_trace)"""
+    get_tracer().end_trace(job_id, error)
+
+
+def start_span(name, job_id=None, kind='internal', attributes=None):
+    """Start a span on the shared tracer (see Tracer.start_span)"""
+    return get_tracer().start_span(name, job_id, kind, attributes)
+
+
+def current_span():
+    """The span of the calling context, or NOOP_SPAN"""
+    return _current_span.get() or NOOP_SPAN
+
+
+def bind(fn):
+    """
+    Carry the current span into a function run on another thread (executor submissions)
+
+    The job the caller works for travels along too, so the profiler
+    attributes the worker thread's stacks to it.
+
+    Args:
+        fn: Callable to wrap
+
+    Returns:
+        callable: fn, running under the caller's current span
+    """
+    span = _current_span.get()
+    job_id = current_job()
+    if span is None and job_id is None:
+        return fn
+
+    def bound(*args, **kwargs):
+        token = _current_span.set(span)
+        try:
+            if job_id is None:
+                return fn(*args, **kwargs)
+            with JobThread(job_id):
+                return fn(*args, **kwargs)
+        finally:
+            _current_span.reset(token)
+
+    return bound
+
+
+def bind_coroutine(coro):
+    """
+    Carry the current span into a coroutine run on the shared event loop
+
+    Args:
+        coro: Coroutine object
+
+    Returns:
+        Coroutine running under the caller's current span
+    """
+    span = _current_span.get()
+    if span is None:
+        return coro
+
+    async def bound():
+        _current_span.set(span)
+        return await coro
+
+    return bound()
+
+
+def run_subprocess(cmd, **kwargs):
+    """
+    subprocess.run with a span per call (command, exit code, bytes in and out)
+
+    Args:
+        cmd: Command list
+        **kwargs: subprocess.run keyword arguments
+
+    Returns:
+        subprocess.CompletedProcess
+    """
+    span = start_span(f"subprocess.{os.path.basename(str(cmd[0]))}", attributes={
+        'process.command_line': ' '.join(str(part) for part in cmd)[:1000]
+    })
+    if span is NOOP_SPAN:
+        return subprocess.run(cmd, **kwargs)
+
+    with span:
+        if kwargs.get('input') is not None:
+            span.set_attribute('process.input_bytes', len(kwargs['input']))
+        try:
+            result = subprocess.run(cmd, **kwargs)
+        except subprocess.CalledProcessError as e:
+            span.set_attribute('process.exit_code', e.returncode)
+            raise
+        span.set_attribute('process.exit_code', result.returncode)
+        if isinstance(result.stdout, (bytes, str)):
+            span.set_attribute('process.stdout_bytes', len(result.stdout))
+        return result
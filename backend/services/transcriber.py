@@ -1,14 +1,18 @@
 from deepgram import DeepgramClient, PrerecordedOptions, FileSource
 import os
+import hashlib
 import logging
 from .cache_manager import CacheManager
+from .asr_backends import get_asr_backend
+from .api_replay import get_api_replay
+from .tracing import start_span, current_span
 
 logger = logging.getLogger(__name__)
 
 class Transcriber:
     """Service for transcribing audio using Deepgram"""
     
-    def __init__(self, api_key=None, use_cache=True, video_url=None, start_time=None, end_time=None):
+    def __init__(self, api_key=None, use_cache=True, video_url=None, start_time=None, end_time=None, backend='deepgram'):
         # CRITICAL: Clear proxy environment variables FIRST
         proxy_vars = ['HTTP_PROXY', 'HTTPS_PROXY', 'http_proxy', 'https_proxy', 
                       'ALL_PROXY', 'all_proxy', 'NO_PROXY', 'no_proxy']
@@ -16,20 +20,29 @@ class Transcriber:
             if var in os.environ:
                 del os.environ[var]
         
-        self.api_key = api_key or os.getenv('DEEPGRAM_API_KEY')
-        if not self.api_key:
-            raise ValueError("Deepgram API key is required")
-        
-        logger.info(f"[TRANSCRIBER] Initializing Deepgram client...")
-        logger.info(f"[TRANSCRIBER] API key found: {self.api_key[:10]}...{self.api_key[-4:]}")
-        
-        # Initialize client with API key
-        try:
-            self.client = DeepgramClient(api_key=self.api_key)
-            logger.info(f"[TRANSCRIBER] ✅ Deepgram client initialized successfully")
-        except Exception as e:
-            logger.error(f"[TRANSCRIBER] ❌ Failed to initialize Deepgram client: {e}")
-            raise
+        # Local engines (see asr_backends) need no Deepgram client
+        self.backend_name = backend or 'deepgram'
+        self.backend = None if self.backend_name == 'deepgram' else get_asr_backend(self.backend_name)
+        if self.backend is not None:
+            logger.info(f"[TRANSCRIBER] Using '{self.backend_name}' ASR backend")
+            self.api_key = None
+            self.client = None
+        else:
+            self.replay = get_api_replay()
+            self.api_key = api_key or os.getenv('DEEPGRAM_API_KEY') or self.replay.api_key()
+            if not self.api_key:
+                raise ValueError("Deepgram API key is required")
+            
+            logger.info(f"[TRANSCRIBER] Initializing Deepgram client...")
+            logger.info(f"[TRANSCRIBER] API key found: {self.api_key[:10]}...{self.api_key[-4:]}")
+            
+            # Initialize client with API key
+            try:
+                self.client = DeepgramClient(api_key=self.api_key)
+                logger.info(f"[TRANSCRIBER] ✅ Deepgram client initialized successfully")
+            except Exception as e:
+                logger.error(f"[TRANSCRIBER] ❌ Failed to initialize Deepgram client: {e}")
+                raise
         
         # Initialize cache with video metadata for job-agnostic caching
         self.use_cache = use_cache
@@ -54,13 +67,28 @@ class Transcriber:
         # Check cache first (with video_url for job-agnostic caching)
         if self.use_cache:
             cached = self.cache.get_cached_transcription(
-                audio_path, language, self.video_url, self.start_time, self.end_time
+                audio_path, language, self.video_url, self.start_time, self.end_time, self.backend_name
             )
+            current_span().set_attribute('cache.hit', bool(cached))
             if cached:
                 logger.info(f"[TRANSCRIBER] Using cached transcription")
                 return cached
         
         try:
+            if self.backend is not None:
+                logger.info(f"[TRANSCRIBER] Transcribing locally with '{self.backend_name}': {audio_path}")
+                with start_span('asr.transcribe', attributes={'asr.backend': self.backend_name}):
+                    transcription_data = self._parse_transcription(self.backend.transcribe(audio_path, language))
+                logger.info(f"[TRANSCRIBER] ✅ Transcription completed")
+                
+                if self.use_cache:
+                    self.cache.cache_transcription(
+                        audio_path, language, transcription_data,
+                        self.video_url, self.start_time, self.end_time, self.backend_name
+                    )
+                
+                return transcription_data
+            
             logger.info(f"[TRANSCRIBER] Reading audio file: {audio_path}")
             
             with open(audio_path, 'rb') as audio_file:
@@ -90,22 +118,27 @@ class Transcriber:
             
             logger.info(f"[TRANSCRIBER] Sending transcription request...")
             
-            # Call the transcribe_file method
-            response = self.client.listen.prerecorded.v("1").transcribe_file(
-                payload, 
-                options
-            )
+            # Call the transcribe_file method (recorded/replayed when API_REPLAY_MODE is set)
+            with start_span('deepgram.transcribe', kind='client', attributes={
+                'deepgram.model': 'nova-3',
+                'audio.bytes': len(buffer_data)
+            }):
+                response = self.replay.call(
+                    'deepgram',
+                    self._replay_request(buffer_data, language),
+                    lambda: self.client.listen.prerecorded.v("1").transcribe_file(payload, options).to_dict()
+                )
             
             logger.info(f"[TRANSCRIBER] ✅ Transcription completed")
             
             # Parse the response
-            transcription_data = self._parse_transcription(response.to_dict())
+            transcription_data = self._parse_transcription(response)
             
             # Cache the result (with video_url for job-agnostic caching)
             if self.use_cache:
                 self.cache.cache_transcription(
                     audio_path, language, transcription_data,
-                    self.video_url, self.start_time, self.end_time
+                    self.video_url, self.start_time, self.end_time, self.backend_name
                 )
             
             return transcription_data
@@ -114,6 +147,15 @@ class Transcriber:
             logger.error(f"[TRANSCRIBER] ❌ Transcription failed: {str(e)}")
             raise Exception(f"Transcription failed: {str(e)}")
     
+    def _replay_request(self, buffer_data, language):
+        """Fixture key of a transcription: the video clip when known, else the audio bytes"""
+        request = {'model': 'nova-3', 'language': language}
+        if self.video_url:
+            request.update(video_url=self.video_url, start_time=self.start_time, end_time=self.end_time)
+        else:
+            request['audio_sha256'] = hashlib.sha256(buffer_data).hexdigest()
+        return request
+    
     def _parse_transcription(self, response):
         """Parse Deepgram response to extract text, timestamps, and speaker info"""
         try:
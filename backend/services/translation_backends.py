@@ -0,0 +1,157 @@
+import os
+import threading
+import logging
+from abc import ABC, abstractmethod
+
+logger = logging.getLogger(__name__)
+
+# 'openai' is Translator's built-in LLM path (JSON batching, context, glossary, memory);
+# the others are plain text-in/text-out engines implementing TranslationBackend
+TRANSLATION_BACKEND_NAMES = ('openai', 'local', 'stub')
+
+
+class TranslationBackend(ABC):
+    """Interface for translation engines that Translator can delegate to"""
+
+    name = None
+
+    @abstractmethod
+    def translate_texts(self, texts, target_language, source_language='en'):
+        """
+        Translate a list of texts
+
+        Args:
+            texts: List of texts to translate
+            target_language: Target language code
+            source_language: Source language code
+
+        Returns:
+            list: Translated texts in input order
+        """
+        raise NotImplementedError
+
+
+class StubTranslationBackend(TranslationBackend):
+    """
+    Deterministic offline stand-in: tags each text with the target language
+
+    Needs no network, model or API key, so the rest of the pipeline can be
+    exercised and benchmarked offline.
+    """
+
+    name = 'stub'
+
+    def translate_texts(self, texts, target_language, source_language='en'):
+        return [f"[{target_language}] {text}" if text.strip() else text for text in texts]
+
+
+class MarianTranslationBackend(TranslationBackend):
+    """
+    Local CPU translation with MarianMT (OPUS-MT) models
+
+    Requires the optional transformers and sentencepiece packages. One model
+    is loaded per language pair on first use and shared by all jobs.
+    """
+
+    name = 'local'
+
+    def __init__(self, model_template=None, batch_size=16):
+        self.model_template = model_template or os.getenv(
+            'LOCAL_TRANSLATION_MODEL', 'Helsinki-NLP/opus-mt-{source}-{target}'
+        )
+        self.batch_size = batch_size
+        self.models = {}
+        self.lock = threading.Lock()
+
+    def _load(self, source_language, target_language):
+        key = (source_language.lower(), target_language.lower())
+        with self.lock:
+            if key not in self.models:
+                from transformers import MarianMTModel, MarianTokenizer
+
+                model_name = self.model_template.format(source=key[0], target=key[1])
+                logger.info(f"[TRANSLATION_BACKEND] Loading local model {model_name}")
+                tokenizer = MarianTokenizer.from_pretrained(model_name)
+                model = MarianMTModel.from_pretrained(model_name)
+                model.eval()
+                self.models[key] = (tokenizer, model, threading.Lock())
+            return self.models[key]
+
+    def translate_texts(self, texts, target_language, source_language='en'):
+        import torch
+
+        tokenizer, model, model_lock = self._load(source_language, target_language)
+        results = list(texts)
+        indices = [i for i, text in enumerate(texts) if text.strip()]
+
+        for offset in range(0, len(indices), self.batch_size):
+            chunk = indices[offset:offset + self.batch_size]
+            inputs = tokenizer([texts[i] for i in chunk], return_tensors='pt', padding=True, truncation=True)
+            # Greedy decoding keeps CPU latency low; one generate() per model at a time
+            with model_lock, torch.inference_mode():
+                outputs = model.generate(**inputs, num_beams=1, max_new_tokens=256)
+            for i, translated in zip(chunk, tokenizer.batch_decode(outputs, skip_special_tokens=True)):
+                results[i] = translated.strip()
+
+        return results
+
+
+_BACKEND_CLASSES = {
+    'local': MarianTranslationBackend,
+    'stub': StubTranslationBackend
+}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+def get_translation_backend(name):
+    """
+    Get the process-wide instance of a text translation backend
+
+    Args:
+        name: Backend name ('local' or 'stub')
+
+    Returns:
+        TranslationBackend: Shared backend instance
+    """
+    if name not in _BACKEND_CLASSES:
+        raise ValueError(f"Unknown translation backend: {name}")
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = _BACKEND_CLASSES[name]()
+        return _backends[name]
+
+
+def select_translation_backend(source_language, target_language, requested=None):
+    """
+    Pick the translation backend for a job
+
+    A backend requested by the job wins. Otherwise TRANSLATION_BACKEND_ROUTES
+    is consulted (e.g. "en-es=local,*-ja=openai", most specific rule first),
+    then TRANSLATION_BACKEND (default: openai).
+
+    Args:
+        source_language: Source language code
+        target_language: Target language code
+        requested: Optional backend name from the job request
+
+    Returns:
+        str: Backend name
+    """
+    if requested:
+        if requested not in TRANSLATION_BACKEND_NAMES:
+            raise ValueError(f"Unknown translation backend: {requested}")
+        return requested
+
+    routes = {}
+    for rule in os.getenv('TRANSLATION_BACKEND_ROUTES', '').split(','):
+        if '=' in rule:
+            pair, backend = rule.split('=', 1)
+            routes[pair.strip().lower()] = backend.strip()
+
+    source, target = source_language.lower(), target_language.lower()
+    for pair in (f"{source}-{target}", f"*-{target}", f"{source}-*"):
+        if pair in routes and routes[pair] in TRANSLATION_BACKEND_NAMES:
+            return routes[pair]
+
+    return os.getenv('TRANSLATION_BACKEND', 'openai')
@@ -0,0 +1,308 @@
+import json
+import logging
+import os
+import random
+import re
+import threading
+import zlib
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Similarity at or above which a stored translation is sent to the LLM to be edited.
+# Only exact matches after normalization are reused as-is: a high trigram score
+# says nothing about meaning ("We do not recommend this" vs "We recommend this").
+EDIT_SIMILARITY = 0.6
+
+# MinHash signature length and LSH banding (16 bands x 4 rows ≈ 0.5 Jaccard candidate threshold)
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+
+# Disfluencies Deepgram emits with filler_words=True
+FILLER_WORDS = {'um', 'umm', 'uh', 'uhh', 'uhm', 'er', 'erm', 'ah', 'hmm', 'mm', 'mhm'}
+
+NUMBER_WORDS = {
+    'zero': 0, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6,
+    'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12,
+    'thirteen': 13, 'fourteen': 14, 'fifteen': 15, 'sixteen': 16, 'seventeen': 17,
+    'eighteen': 18, 'nineteen': 19
+}
+TENS_WORDS = {
+    'twenty': 20, 'thirty': 30, 'forty': 40, 'fifty': 50,
+    'sixty': 60, 'seventy': 70, 'eighty': 80, 'ninety': 90
+}
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(1)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def normalize_text(text):
+    """
+    Normalize source text so transcription noise does not defeat matching
+
+    Lowercases, strips punctuation, drops filler words and spells number
+    words as digits ("twenty five" → "25").
+
+    Args:
+        text: Source text
+
+    Returns:
+        str: Normalized text
+    """
+    words = re.sub(r"[^\w\s]", ' ', text.lower().replace('-', ' ')).split()
+
+    normalized = []
+    for word in words:
+        if word in FILLER_WORDS:
+            continue
+        if word in NUMBER_WORDS:
+            value = NUMBER_WORDS[word]
+            # "twenty" + "five" → 25
+            if normalized and normalized[-1].isdigit() and int(normalized[-1]) in TENS_WORDS.values() and value < 10:
+                normalized[-1] = str(int(normalized[-1]) + value)
+                continue
+            normalized.append(str(value))
+        elif word in TENS_WORDS:
+            normalized.append(str(TENS_WORDS[word]))
+        else:
+            normalized.append(word)
+
+    return ' '.join(normalized)
+
+
+def shingles(normalized, size=3):
+    """
+    Character n-grams of a normalized text
+
+    Args:
+        normalized: Normalized text
+        size: n-gram length
+
+    Returns:
+        set: Shingles (the whole text when shorter than size)
+    """
+    if len(normalized) <= size:
+        return {normalized}
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+def minhash(shingle_set):
+    """
+    MinHash signature of a shingle set
+
+    Args:
+        shingle_set: Set of shingles
+
+    Returns:
+        tuple: NUM_PERMUTATIONS minimum hash values
+    """
+    hashes = [zlib.crc32(s.encode('utf-8')) for s in shingle_set]
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def jaccard(a, b):
+    """Jaccard similarity of two sets"""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class _LanguagePairIndex:
+    """In-memory index of the translation memory for one language pair"""
+
+    def __init__(self):
+        self.entries = []   # (source, translation, shingle set)
+        self.exact = {}     # normalized source -> entry index
+        self.buckets = {}   # (band, band hash) -> [entry index]
+
+    def add(self, source, translation):
+        normalized = normalize_text(source)
+        if not normalized:
+            return
+
+        index = self.exact.get(normalized)
+        if index is not None:
+            # Newer translations win (e.g. after a duration-fit rewrite)
+            self.entries[index] = (source, translation, self.entries[index][2])
+            return
+
+        shingle_set = shingles(normalized)
+        index = len(self.entries)
+        self.entries.append((source, translation, shingle_set))
+        self.exact[normalized] = index
+        for key in self._band_keys(minhash(shingle_set)):
+            self.buckets.setdefault(key, []).append(index)
+
+    def lookup(self, text):
+        normalized = normalize_text(text)
+        if not normalized:
+            return None
+
+        index = self.exact.get(normalized)
+        if index is not None:
+            source, translation, _ = self.entries[index]
+            return 1.0, source, translation, True
+
+        shingle_set = shingles(normalized)
+        candidates = set()
+        for key in self._band_keys(minhash(shingle_set)):
+            candidates.update(self.buckets.get(key, ()))
+
+        best = None
+        for index in candidates:
+            source, translation, entry_shingles = self.entries[index]
+            similarity = jaccard(shingle_set, entry_shingles)
+            if best is None or similarity > best[0]:
+                best = (similarity, source, translation, False)
+        return best
+
+    def _band_keys(self, signature):
+        rows = NUM_PERMUTATIONS // LSH_BANDS
+        return [
+            (band, hash(signature[band * rows:(band + 1) * rows]))
+            for band in range(LSH_BANDS)
+        ]
+
+
+class TranslationMemory:
+    """
+    Fuzzy translation memory shared across jobs
+
+    Source sentences are normalized and indexed with MinHash/LSH over
+    character trigrams, so near-identical sentences from a re-run of
+    Deepgram (punctuation, filler words, numerals) still find their
+    earlier translation. Entries are appended to a JSONL file.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.indexes = {}
+
+        # Stats
+        self.reused = 0
+        self.edits = 0
+        self.misses = 0
+
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        count = 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self._index(entry['source_language'], entry['target_language']).add(
+                            entry['source'], entry['translation']
+                        )
+                        count += 1
+                    except (ValueError, KeyError):
+                        continue
+            logger.info(f"[TRANSLATION_MEMORY] Loaded {count} entries")
+        except Exception as e:
+            logger.warning(f"[TRANSLATION_MEMORY] Failed to load translation memory: {e}")
+
+    def _index(self, source_language, target_language):
+        key = (source_language.lower(), target_language.lower())
+        if key not in self.indexes:
+            self.indexes[key] = _LanguagePairIndex()
+        return self.indexes[key]
+
+    def lookup(self, text, source_language, target_language):
+        """
+        Find the most similar stored sentence
+
+        Args:
+            text: Source text
+            source_language: Source language code
+            target_language: Target language code
+
+        Returns:
+            tuple or None: (similarity, stored source, stored translation, exact), or None
+                           when nothing reaches EDIT_SIMILARITY. exact is True only when
+                           both sentences normalize to the same text (they differ at most
+                           in case, punctuation, filler words and spelled-out numbers);
+                           only those translations may be reused without an edit request
+        """
+        with self.lock:
+            match = self._index(source_language, target_language).lookup(text)
+
+            if match and match[3]:
+                self.reused += 1
+            elif match and match[0] >= EDIT_SIMILARITY:
+                self.edits += 1
+            else:
+                self.misses += 1
+                return None
+        return match
+
+    def add(self, text, source_language, target_language, translation):
+        """
+        Store a translation
+
+        Args:
+            text: Source text
+            source_language: Source language code
+            target_language: Target language code
+            translation: Translated text
+        """
+        if not text.strip() or not translation.strip():
+            return
+
+        line = json.dumps({
+            'source': text,
+            'source_language': source_language,
+            'target_language': target_language,
+            'translation': translation
+        }, ensure_ascii=False)
+
+        with self.lock:
+            self._index(source_language, target_language).add(text, translation)
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(line + '\n')
+            except Exception as e:
+                logger.warning(f"[TRANSLATION_MEMORY] Failed to persist entry: {e}")
+
+    def get_stats(self):
+        """
+        Get translation memory statistics
+
+        Returns:
+            dict: Entry count and lookup outcomes
+        """
+        with self.lock:
+            return {
+                'entries': sum(len(index.entries) for index in self.indexes.values()),
+                'reused': self.reused,
+                'edits': self.edits,
+                'misses': self.misses
+            }
+
+
+_translation_memory = None
+_translation_memory_lock = threading.Lock()
+
+def get_translation_memory():
+    """
+    Get the process-wide translation memory (stored in cache/translation_memory.jsonl)
+
+    Returns:
+        TranslationMemory: Shared translation memory
+    """
+    global _translation_memory
+    with _translation_memory_lock:
+        if _translation_memory is None:
+            _translation_memory = TranslationMemory(os.path.join('cache', 'translation_memory.jsonl'))
+        return _translation_memory
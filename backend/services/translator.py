@@ -1,29 +1,146 @@
 from openai import OpenAI
 import os
+import re
+import json
+import time
+import asyncio
 import concurrent.futures
 import logging
 from .cache_manager import CacheManager
+from .adaptive_concurrency import AdaptiveConcurrency
+from .async_runtime import AsyncRuntime, async_io_enabled
+from .rate_limiter import get_rate_limiter
+from .speech_rate import predict_duration, target_chars, overruns_duration
+from .translation_memory import get_translation_memory
+from .glossary import Glossary
+from .translation_backends import get_translation_backend
+from .api_replay import get_api_replay, encode_raw_chat_completion, decode_raw_chat_completion
+from .tracing import start_span, current_span, bind
+from .metrics import WorkerPool
 
 logger = logging.getLogger(__name__)
 
+LANGUAGE_NAMES = {
+    'en': 'English',
+    'es': 'Spanish',
+    'fr': 'French',
+    'de': 'German',
+    'it': 'Italian',
+    'pt': 'Portuguese',
+    'ja': 'Japanese',
+    'ko': 'Korean',
+    'zh': 'Chinese',
+    'hi': 'Hindi',
+    'ar': 'Arabic',
+    'ru': 'Russian'
+}
+
+# Rough output-token multiplier per target language (non-Latin scripts tokenize worse)
+TOKEN_EXPANSION = {
+    'ja': 2.0,
+    'zh': 2.0,
+    'ko': 2.0,
+    'hi': 2.5,
+    'ar': 2.0,
+    'ru': 1.8
+}
+
+MAX_OUTPUT_TOKENS = 4000
+
+# Re-translation passes for items whose predicted spoken duration overruns their time slot
+FIT_PASSES = 1
+
+# Segments sent as read-only context on each side of a batch
+CONTEXT_NEIGHBOURS = 2
+
+# Transcript characters read by the one-off summary/glossary request
+CONTEXT_MAX_CHARS = 24000
+
+# Re-translation passes for items that ignore a required project glossary term
+GLOSSARY_PASSES = 1
+
+
+def estimate_tokens(text):
+    """
+    Cheap token estimate without a tokenizer
+
+    Args:
+        text: Text to estimate
+
+    Returns:
+        int: Approximate token count (~4 chars/token, 1 token per CJK character)
+    """
+    wide = sum(1 for ch in text if ord(ch) >= 0x2E80)
+    return (len(text) - wide) // 4 + wide + 1
+
+class _TranslationBatch:
+    """Mutable state of one JSON batch: edit memory matches, translate, enforce the glossary, fit to time slots"""
+    
+    def __init__(self, texts, target_language, source_language, max_retries, durations, context=None):
+        self.texts = texts
+        self.target_language = target_language
+        self.source_language = source_language
+        self.max_retries = max_retries
+        self.durations = durations
+        self.context = context
+        
+        self.results = [None] * len(texts)
+        self.pending = []
+        self.attempt = 0
+        self.phase = 'translate'
+        self.fit_pending = []
+        self.fit_attempt = 0
+        self.verify_pending = {}  # index -> missing glossary terms
+        self.verify_attempt = 0
+        self.edit_matches = {}  # index -> (similarity, stored source, stored translation, exact)
+
 class Translator:
-    """Service for translating text using OpenAI"""
+    """Service for translating text using OpenAI (or a local backend, see translation_backends.py)"""
     
-    def __init__(self, api_key=None, use_cache=True):
-        self.api_key = api_key or os.getenv('OPENAI_API_KEY')
-        if not self.api_key:
-            raise ValueError("OpenAI API key is required")
-        # Initialize OpenAI client without proxies parameter
-        try:
-            self.client = OpenAI(api_key=self.api_key, max_retries=2, timeout=60.0)
-        except TypeError:
-            # Fallback for older SDK versions
-            self.client = OpenAI(api_key=self.api_key)
+    def __init__(self, api_key=None, use_cache=True, job_id=None, glossary=None, backend='openai'):
+        # Non-OpenAI backends translate text directly and need no API key
+        self.backend_name = backend or 'openai'
+        self.backend = None
+        if self.backend_name != 'openai':
+            self.backend = get_translation_backend(self.backend_name)
+            self.api_key = None
+            self.client = None
+        else:
+            self.replay = get_api_replay()
+            self.api_key = api_key or os.getenv('OPENAI_API_KEY') or self.replay.api_key()
+            if not self.api_key:
+                raise ValueError("OpenAI API key is required")
+            # Initialize OpenAI client without proxies parameter
+            try:
+                self.client = OpenAI(api_key=self.api_key, max_retries=2, timeout=60.0)
+            except TypeError:
+                # Fallback for older SDK versions
+                self.client = OpenAI(api_key=self.api_key)
         
         # Initialize cache
         self.use_cache = use_cache
         if self.use_cache:
             self.cache = CacheManager()
+        
+        # Fuzzy matches against earlier jobs: reuse near-identical sentences, edit similar ones
+        self.translation_memory = None
+        if self.use_cache and os.getenv('TRANSLATION_MEMORY', 'True') == 'True':
+            self.translation_memory = get_translation_memory()
+        self.edit_model = os.getenv('TRANSLATION_EDIT_MODEL', 'gpt-4o-mini')
+        
+        # Project terminology (see services/glossary.py), enforced on every batch
+        self.glossary = glossary
+        
+        # Process-wide OpenAI quota, shared fairly with every other job
+        self.job_id = job_id or 'default'
+        self.rate_limiter = get_rate_limiter('openai')
+        
+        # Concurrency adapts to observed latency and rate-limit headers
+        self.concurrency = AdaptiveConcurrency(
+            'openai',
+            initial=3,
+            maximum=int(os.getenv('TRANSLATION_MAX_WORKERS', 8))
+        )
     
     def translate_text(self, text, target_language, source_language='en'):
         """
@@ -37,48 +154,43 @@ class Translator:
         Returns:
             str: Translated text
         """
+        if self.backend:
+            return self.backend.translate_texts([text], target_language, source_language)[0]
+        
         # Check cache first
         if self.use_cache:
             cached = self.cache.get_cached_translation(text, source_language, target_language)
             if cached:
                 return cached
         
+        if self.translation_memory:
+            match = self.translation_memory.lookup(text, source_language, target_language)
+            if match and match[3]:
+                return match[2]
+        
         try:
-            language_map = {
-                'en': 'English',
-                'es': 'Spanish',
-                'fr': 'French',
-                'de': 'German',
-                'it': 'Italian',
-                'pt': 'Portuguese',
-                'ja': 'Japanese',
-                'ko': 'Korean',
-                'zh': 'Chinese',
-                'hi': 'Hindi',
-                'ar': 'Arabic',
-                'ru': 'Russian'
-            }
-            
-            target_lang_name = language_map.get(target_language.lower(), target_language)
-            source_lang_name = language_map.get(source_language.lower(), source_language)
+            target_lang_name = LANGUAGE_NAMES.get(target_language.lower(), target_language)
+            source_lang_name = LANGUAGE_NAMES.get(source_language.lower(), source_language)
             
             prompt = f"Translate the following text from {source_lang_name} to {target_lang_name}. Maintain the tone and style. Only return the translation, nothing else:\n\n{text}"
             
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
+            response = self._call_openai({
+                'model': "gpt-4",
+                'messages': [
                     {"role": "system", "content": f"You are a professional translator. Translate text from {source_lang_name} to {target_lang_name} accurately while preserving meaning, tone, and style."},
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.3,
-                max_tokens=2000
-            )
+                'temperature': 0.3,
+                'max_tokens': 2000
+            })
             
             translated_text = response.choices[0].message.content.strip()
             
             # Cache the result
             if self.use_cache:
                 self.cache.cache_translation(text, source_language, target_language, translated_text)
+            if self.translation_memory:
+                self.translation_memory.add(text, source_language, target_language, translated_text)
             
             return translated_text
             
@@ -129,198 +241,1038 @@ class Translator:
         return translated_segments
     
     def batch_translate_segments(self, segments, target_language, source_language='en', 
-                                 batch_size=5, parallel=True, max_workers=3):
+                                 batch_size=40, parallel=True, max_workers=None, token_budget=None,
+                                 use_async=None, fit_durations=None, context_window=None):
         """
-        Translate segments in batches for efficiency
+        Translate segments in batches packed by estimated token count
         
         Args:
             segments: List of segments
             target_language: Target language
             source_language: Source language
-            batch_size: Number of segments to translate at once
+            batch_size: Maximum number of segments per batch
             parallel: Enable parallel translation (default: True)
-            max_workers: Maximum parallel workers (default: 3)
+            max_workers: Upper bound on parallel requests (default: adaptive limiter maximum)
+            token_budget: Estimated output tokens per batch (default: TRANSLATION_TOKEN_BUDGET or 3000)
+            use_async: Use the shared asyncio client path (default: ASYNC_IO env, True)
+            fit_durations: Ask for translations that fit each segment's duration
+                           (default: DURATION_AWARE_TRANSLATION env, True)
+            context_window: Send a job summary, glossary and neighbouring sentences
+                            with every batch (default: CONTEXT_TRANSLATION env, True)
             
         Returns:
             list: Translated segments
         """
-        # Route to parallel or sequential implementation
-        if parallel:
-            logger.info(f"[TRANSLATOR] Using parallel translation with {max_workers} workers")
+        if use_async is None:
+            use_async = async_io_enabled()
+        if fit_durations is None:
+            fit_durations = os.getenv('DURATION_AWARE_TRANSLATION', 'True') == 'True'
+        if context_window is None:
+            context_window = os.getenv('CONTEXT_TRANSLATION', 'True') == 'True'
+        if token_budget is None:
+            token_budget = int(os.getenv('TRANSLATION_TOKEN_BUDGET', 3000))
+        
+        if self.backend:
+            return self._batch_translate_backend(segments, target_language, source_language, batch_size)
+        
+        batches = self._pack_batches(segments, target_language, token_budget, batch_size)
+        logger.info(f"[TRANSLATOR] Packed {len(segments)} segments into {len(batches)} batches (budget: {token_budget} tokens)")
+        
+        contexts = None
+        if context_window or self.glossary:
+            contexts = self._build_batch_contexts(
+                segments, batches, target_language, source_language, context_window
+            )
+        
+        # Route to async, parallel or sequential implementation
+        if parallel and use_async:
+            logger.info(f"[TRANSLATOR] Using async translation on the shared event loop")
+            return self._batch_translate_async(
+                batches, target_language, source_language, fit_durations, contexts
+            )
+        elif parallel:
+            max_workers = max_workers or self.concurrency.maximum
+            logger.info(f"[TRANSLATOR] Using parallel translation with up to {max_workers} workers")
             return self._batch_translate_parallel(
-                segments, target_language, source_language, batch_size, max_workers
+                batches, target_language, source_language, max_workers, fit_durations, contexts
             )
         else:
             logger.info(f"[TRANSLATOR] Using sequential translation")
             return self._batch_translate_sequential(
-                segments, target_language, source_language, batch_size
+                batches, target_language, source_language, fit_durations, contexts
             )
     
-    def _batch_translate_sequential(self, segments, target_language, source_language='en', batch_size=5):
+    def _batch_translate_backend(self, segments, target_language, source_language, batch_size):
         """
-        Sequential batch translation (original implementation)
+        Translate segments with a local backend
+        
+        Local output is never written to the shared cache or translation memory,
+        which only hold OpenAI translations.
         
         Args:
             segments: List of segments
-            target_language: Target language
-            source_language: Source language
-            batch_size: Number of segments to translate at once
+            target_language: Target language code
+            source_language: Source language code
+            batch_size: Segments per backend call
             
         Returns:
             list: Translated segments
         """
+        logger.info(f"[TRANSLATOR] Using '{self.backend_name}' translation backend")
+        
         translated_segments = []
+        for offset in range(0, len(segments), batch_size):
+            batch = segments[offset:offset + batch_size]
+            with start_span('translation.batch', self.job_id, attributes={
+                'segments': len(batch),
+                'translation.backend': self.backend_name
+            }):
+                translated_texts = self.backend.translate_texts(
+                    [seg['text'] for seg in batch], target_language, source_language
+                )
+            
+            for segment, translated_text in zip(batch, translated_texts):
+                translated_segments.append({
+                    'original_text': segment['text'],
+                    'translated_text': translated_text,
+                    'start': segment['start'],
+                    'end': segment['end'],
+                    'speaker': segment.get('speaker', 0)
+                })
+        
+        logger.info(f"[TRANSLATOR] ✅ Translated {len(translated_segments)} segments")
+        return translated_segments
+    
+    def build_job_context(self, segments, target_language, source_language='en'):
+        """
+        Summarize the transcript and extract a glossary once per job
+        
+        The result is sent with every batch so names and recurring terms are
+        translated the same way everywhere, without each request having to
+        re-infer what the video is about.
+        
+        Args:
+            segments: List of segments (the whole transcript)
+            target_language: Target language code
+            source_language: Source language code
+            
+        Returns:
+            dict or None: {'summary': str, 'glossary': [{'source', 'target'}]} or None on failure
+        """
+        transcript = ' '.join(seg['text'].strip() for seg in segments if seg['text'].strip())
+        transcript = transcript[:CONTEXT_MAX_CHARS]
+        if not transcript:
+            return None
+        
+        if self.use_cache:
+            cached = self.cache.get_cached_translation_context(transcript, source_language, target_language)
+            if cached:
+                return cached
+        
+        target_lang_name = LANGUAGE_NAMES.get(target_language.lower(), target_language)
+        source_lang_name = LANGUAGE_NAMES.get(source_language.lower(), source_language)
+        
+        prompt = (
+            f"Read the {source_lang_name} video transcript below. It will be translated to "
+            f"{target_lang_name} in separate chunks.\n"
+            f"Return ONLY a JSON object of the form "
+            f"{{\"summary\": <2-3 sentence summary in English: topic, speakers, tone>, "
+            f"\"glossary\": [{{\"source\": <term as written in the transcript>, \"target\": <{target_lang_name} rendering>}}]}}. "
+            f"List at most 30 names, products and recurring technical terms whose translation must stay consistent; "
+            f"keep names that should not be translated unchanged in \"target\".\n\n{transcript}"
+        )
+        
+        try:
+            response = self._call_openai({
+                'model': "gpt-4",
+                'messages': [
+                    {"role": "system", "content": "You are a professional translator preparing a dubbing project. You always answer with valid JSON."},
+                    {"role": "user", "content": prompt}
+                ],
+                'temperature': 0.2,
+                'max_tokens': 1000
+            })
+            data = json.loads(self._strip_code_fence(response.choices[0].message.content))
+        except Exception as e:
+            logger.warning(f"[TRANSLATOR] Failed to build job context, continuing without it: {str(e)}")
+            return None
+        
+        summary = data.get('summary') if isinstance(data, dict) else None
+        glossary = []
+        for entry in (data.get('glossary') or []) if isinstance(data, dict) else []:
+            if (isinstance(entry, dict) and isinstance(entry.get('source'), str)
+                    and isinstance(entry.get('target'), str) and entry['source'].strip()):
+                glossary.append({'source': entry['source'].strip(), 'target': entry['target'].strip()})
+        
+        context = {
+            'summary': summary.strip() if isinstance(summary, str) else '',
+            'glossary': glossary[:30]
+        }
+        logger.info(f"[TRANSLATOR] Built job context: {len(context['summary'])} char summary, {len(context['glossary'])} glossary terms")
+        
+        if self.use_cache:
+            self.cache.cache_translation_context(transcript, source_language, target_language, context)
+        
+        return context
+    
+    def _build_batch_contexts(self, segments, batches, target_language, source_language, context_window=True):
+        """
+        Context for each batch: job summary, glossary terms it uses, neighbouring sentences
+        
+        Args:
+            segments: All segments, in order
+            batches: Consecutive segment batches from _pack_batches
+            target_language: Target language code
+            source_language: Source language code
+            context_window: Include the job summary and neighbouring sentences
+                            (project glossary terms are always included)
+            
+        Returns:
+            list: One context dict per batch
+        """
+        # A single batch already sees the whole transcript
+        job_context = None
+        if context_window and len(batches) > 1:
+            job_context = self.build_job_context(segments, target_language, source_language)
+        
+        job_glossary = None
+        if job_context and job_context['glossary']:
+            job_glossary = Glossary([
+                {'source': entry['source'], 'translations': {target_language.lower(): entry['target']}}
+                for entry in job_context['glossary']
+            ])
+        
+        contexts = []
+        offset = 0
+        for batch in batches:
+            end = offset + len(batch)
+            texts = [seg['text'] for seg in batch]
+            
+            # Only the terms that actually occur in this batch are sent; project terms win
+            terms = self.glossary.terms_for(texts, target_language) if self.glossary else []
+            if job_glossary:
+                known = {term['source'].lower() for term in terms}
+                terms += [
+                    term for term in job_glossary.terms_for(texts, target_language)
+                    if term['source'].lower() not in known
+                ]
+            
+            context = {
+                'summary': job_context['summary'] if job_context else '',
+                'glossary': terms,
+                'before': [],
+                'after': []
+            }
+            if context_window:
+                context['before'] = [seg['text'] for seg in segments[max(0, offset - CONTEXT_NEIGHBOURS):offset]]
+                context['after'] = [seg['text'] for seg in segments[end:end + CONTEXT_NEIGHBOURS]]
+            contexts.append(context)
+            offset = end
+        
+        return contexts
+    
+    def _pack_batches(self, segments, target_language, token_budget, max_items):
+        """
+        Greedily pack consecutive segments into batches under a token budget
+        
+        Args:
+            segments: List of segments
+            target_language: Target language code (drives output expansion)
+            token_budget: Estimated output tokens allowed per batch
+            max_items: Maximum segments per batch
+            
+        Returns:
+            list: List of segment batches
+        """
+        batches = []
+        current = []
+        current_tokens = 0
+        
+        for segment in segments:
+            cost = self._estimate_output_tokens(segment['text'], target_language)
+            
+            if current and (current_tokens + cost > token_budget or len(current) >= max_items):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            
+            current.append(segment)
+            current_tokens += cost
+        
+        if current:
+            batches.append(current)
+        
+        return batches
+    
+    def _segment_durations(self, batch, fit_durations):
+        """Available time slot of each segment, or None when duration fitting is off"""
+        if not fit_durations:
+            return None
+        return [segment['end'] - segment['start'] for segment in batch]
+    
+    def _estimate_output_tokens(self, text, target_language):
+        """Estimated reply tokens for one item, including its JSON envelope"""
+        expansion = TOKEN_EXPANSION.get(target_language.lower(), 1.3)
+        return int(estimate_tokens(text) * expansion) + 12
+    
+    def translate_batch_json(self, texts, target_language, source_language='en', max_retries=2, durations=None,
+                             context=None):
+        """
+        Translate a list of texts in a single request using an index-keyed JSON array
+        
+        Only the ids missing from (or invalid in) the reply are re-requested,
+        so a partially malformed response never misaligns the batch. When
+        durations are given, items whose predicted spoken length overruns their
+        time slot are re-requested once with an explicit length target.
+        
+        Args:
+            texts: List of texts to translate
+            target_language: Target language code
+            source_language: Source language code
+            max_retries: Extra attempts for ids missing from the reply
+            durations: Optional list of available durations in seconds (one per text)
+            context: Optional dict with 'summary', 'glossary', 'before' and 'after' (see _build_batch_contexts)
+            
+        Returns:
+            list: Translated texts in input order (original text if all attempts failed)
+        """
+        with start_span('translation.batch', self.job_id, attributes={'segments': len(texts)}) as span:
+            batch = self._start_batch(texts, target_language, source_language, max_retries, durations, context)
+            request_counts = {}
+            
+            while True:
+                step = self._next_batch_step(batch)
+                if step is None:
+                    break
+                request_counts[f"requests.{step['kind']}"] = request_counts.get(f"requests.{step['kind']}", 0) + 1
+                try:
+                    response = self._call_openai(step['request'])
+                    content = response.choices[0].message.content
+                except Exception as e:
+                    logger.warning(f"[TRANSLATOR] JSON {step['kind']} request failed: {str(e)}")
+                    content = None
+                self._apply_batch_reply(batch, step, content)
+            span.set_attributes(request_counts)
+        
+        return batch.results
+    
+    async def translate_batch_json_async(self, texts, target_language, source_language='en', max_retries=2,
+                                         durations=None, context=None):
+        """
+        Async variant of translate_batch_json, run on the shared event loop
+        
+        Args:
+            texts: List of texts to translate
+            target_language: Target language code
+            source_language: Source language code
+            max_retries: Extra attempts for ids missing from the reply
+            durations: Optional list of available durations in seconds (one per text)
+            context: Optional dict with 'summary', 'glossary', 'before' and 'after' (see _build_batch_contexts)
+            
+        Returns:
+            list: Translated texts in input order (original text if all attempts failed)
+        """
+        with start_span('translation.batch', self.job_id, attributes={'segments': len(texts)}) as span:
+            batch = self._start_batch(texts, target_language, source_language, max_retries, durations, context)
+            request_counts = {}
+            
+            while True:
+                step = self._next_batch_step(batch)
+                if step is None:
+                    break
+                request_counts[f"requests.{step['kind']}"] = request_counts.get(f"requests.{step['kind']}", 0) + 1
+                try:
+                    response = await self._call_openai_async(step['request'])
+                    content = response.choices[0].message.content
+                except Exception as e:
+                    logger.warning(f"[TRANSLATOR] JSON {step['kind']} request failed: {str(e)}")
+                    content = None
+                self._apply_batch_reply(batch, step, content)
+            span.set_attributes(request_counts)
         
-        for i in range(0, len(segments), batch_size):
-            batch = segments[i:i + batch_size]
+        return batch.results
+    
+    def _start_batch(self, texts, target_language, source_language, max_retries, durations, context=None):
+        """
+        Create batch state, serving what we can from the cache and translation memory
+        
+        Returns:
+            _TranslationBatch: Batch state with cached entries filled in
+        """
+        batch = _TranslationBatch(texts, target_language, source_language, max_retries, durations, context)
+        cache_hits = memory_reused = 0
+        
+        for i, text in enumerate(texts):
+            if not text.strip():
+                batch.results[i] = text
+                continue
+            if self.use_cache:
+                cached = self.cache.get_cached_translation(text, source_language, target_language)
+                if cached:
+                    # Cached entries that overrun their time slot are picked up by the fit phase
+                    batch.results[i] = cached
+                    cache_hits += 1
+                    continue
+            if self.translation_memory:
+                match = self.translation_memory.lookup(text, source_language, target_language)
+                if match and match[3]:
+                    batch.results[i] = match[2]
+                    memory_reused += 1
+                    continue
+                if match:
+                    batch.edit_matches[i] = match
+                    continue
+            batch.pending.append(i)
+        
+        current_span().set_attributes({
+            'cache.hits': cache_hits,
+            'cache.misses': len(batch.pending) + len(batch.edit_matches),
+            'memory.reused': memory_reused,
+            'memory.edits': len(batch.edit_matches)
+        })
+        
+        if batch.edit_matches:
+            batch.phase = 'edit'
+        
+        return batch
+    
+    def _next_batch_step(self, batch):
+        """
+        Decide the next request for a batch
+        
+        Returns:
+            dict or None: {'kind', 'items', 'request'} or None when the batch is done
+        """
+        if batch.phase == 'edit':
+            batch.phase = 'translate'
+            items = {i: batch.texts[i] for i in batch.edit_matches}
+            return {
+                'kind': 'edit',
+                'items': items,
+                'request': self._build_edit_request(batch)
+            }
+        
+        if batch.phase == 'translate':
+            if batch.pending and batch.attempt <= batch.max_retries:
+                items = {i: batch.texts[i] for i in batch.pending}
+                char_budgets = self._char_budgets(batch, batch.pending)
+                return {
+                    'kind': 'translate',
+                    'items': items,
+                    'request': self._build_json_request(
+                        items, batch.target_language, batch.source_language, char_budgets, batch.context
+                    )
+                }
+            
+            for i in batch.pending:
+                logger.error(f"[TRANSLATOR] Giving up on item {i} after {batch.max_retries + 1} attempts, keeping original text")
+                batch.results[i] = batch.texts[i]
+            
+            batch.phase = 'verify'
+            batch.verify_pending = self._glossary_violations(batch, [
+                i for i in range(len(batch.texts)) if i not in batch.pending
+            ])
+            if batch.verify_pending:
+                logger.info(f"[TRANSLATOR] {len(batch.verify_pending)} item(s) ignore project glossary terms, re-requesting them")
+        
+        if batch.phase == 'verify':
+            if batch.verify_pending and batch.verify_attempt < GLOSSARY_PASSES:
+                items = {i: batch.texts[i] for i in batch.verify_pending}
+                return {
+                    'kind': 'verify',
+                    'items': items,
+                    'request': self._build_json_request(
+                        items, batch.target_language, batch.source_language,
+                        self._char_budgets(batch, list(items)), batch.context,
+                        required_terms=batch.verify_pending
+                    )
+                }
             
-            # Combine texts with markers
-            combined_text = "\n---\n".join([seg['text'] for seg in batch])
+            for i, missing in batch.verify_pending.items():
+                logger.warning(f"[TRANSLATOR] Item {i} still misses glossary terms: {', '.join(term['target'] for term in missing)}")
             
+            batch.phase = 'fit'
+            batch.fit_pending = self._out_of_bounds(batch, [
+                i for i in range(len(batch.texts)) if i not in batch.pending
+            ])
+            if batch.fit_pending:
+                logger.info(f"[TRANSLATOR] {len(batch.fit_pending)} item(s) overrun their time slot, requesting shorter rewrites")
+        
+        if batch.phase == 'fit':
+            if batch.fit_pending and batch.fit_attempt < FIT_PASSES:
+                items = {i: batch.texts[i] for i in batch.fit_pending}
+                return {
+                    'kind': 'fit',
+                    'items': items,
+                    'request': self._build_fit_request(batch, batch.fit_pending)
+                }
+            batch.phase = 'done'
+        
+        return None
+    
+    def _apply_batch_reply(self, batch, step, content):
+        """Record one reply (None if the request failed) into the batch state"""
+        translated = {}
+        if content is not None:
             try:
-                translated_combined = self.translate_text(
-                    combined_text,
-                    target_language,
-                    source_language
+                translated = self._parse_json_translations(content, step['items'])
+            except Exception as e:
+                logger.warning(f"[TRANSLATOR] Invalid JSON {step['kind']} reply: {str(e)}")
+        
+        if step['kind'] == 'edit':
+            for i, translated_text in translated.items():
+                batch.results[i] = translated_text
+                self._cache_result(batch, i)
+            
+            # Anything the cheap edit did not return goes through a full translation
+            missed = [i for i in batch.edit_matches if batch.results[i] is None]
+            if missed:
+                logger.warning(f"[TRANSLATOR] {len(missed)} edit(s) missing from JSON reply, translating them in full")
+            batch.pending = sorted(batch.pending + missed)
+        elif step['kind'] == 'translate':
+            for i, translated_text in translated.items():
+                batch.results[i] = translated_text
+                self._cache_result(batch, i)
+            
+            batch.pending = [i for i in batch.pending if batch.results[i] is None]
+            if batch.pending:
+                logger.warning(f"[TRANSLATOR] {len(batch.pending)} item(s) missing from JSON reply, retrying only those")
+            batch.attempt += 1
+        elif step['kind'] == 'verify':
+            for i, translated_text in translated.items():
+                if len(self._missing_terms(batch, i, translated_text)) < len(batch.verify_pending[i]):
+                    batch.results[i] = translated_text
+                    self._cache_result(batch, i)
+            
+            batch.verify_pending = self._glossary_violations(batch, list(batch.verify_pending))
+            batch.verify_attempt += 1
+        else:
+            for i, rewritten in translated.items():
+                duration = batch.durations[i]
+                before = abs(predict_duration(batch.results[i], batch.target_language) / duration - 1)
+                after = abs(predict_duration(rewritten, batch.target_language) / duration - 1)
+                # A shorter line must not drop required terminology
+                if len(self._missing_terms(batch, i, rewritten)) > len(self._missing_terms(batch, i, batch.results[i])):
+                    continue
+                if after < before:
+                    batch.results[i] = rewritten
+                    self._cache_result(batch, i)
+            
+            batch.fit_pending = self._out_of_bounds(batch, batch.fit_pending)
+            batch.fit_attempt += 1
+    
+    def _cache_result(self, batch, i):
+        if self.use_cache:
+            self.cache.cache_translation(
+                batch.texts[i], batch.source_language, batch.target_language, batch.results[i]
+            )
+        if self.translation_memory:
+            self.translation_memory.add(
+                batch.texts[i], batch.source_language, batch.target_language, batch.results[i]
+            )
+    
+    def _char_budgets(self, batch, indices):
+        """Per-item character budgets for items with a known time slot"""
+        if not batch.durations:
+            return None
+        return {
+            i: target_chars(batch.durations[i], batch.target_language)
+            for i in indices
+            if batch.durations[i] and batch.durations[i] > 0
+        }
+    
+    def _missing_terms(self, batch, i, translation):
+        """Project glossary renderings absent from a candidate translation of item i"""
+        if not self.glossary:
+            return []
+        return self.glossary.missing_terms(batch.texts[i], translation, batch.target_language)
+    
+    def _glossary_violations(self, batch, indices):
+        """Translated items that miss required glossary terms: {index: missing terms}"""
+        violations = {}
+        for i in indices:
+            if batch.results[i] == batch.texts[i]:
+                continue
+            missing = self._missing_terms(batch, i, batch.results[i])
+            if missing:
+                violations[i] = missing
+        return violations
+    
+    def _out_of_bounds(self, batch, indices):
+        """Indices whose translation is predicted to overrun its time slot"""
+        if not batch.durations:
+            return []
+        return [
+            i for i in indices
+            if batch.results[i] != batch.texts[i]
+            and overruns_duration(batch.results[i], batch.durations[i], batch.target_language)
+        ]
+    
+    def _build_json_request(self, items, target_language, source_language, char_budgets=None, context=None,
+                            required_terms=None):
+        """
+        Build chat completion arguments for an index-keyed JSON translation request
+        
+        Args:
+            items: dict {id: text} to translate
+            target_language: Target language code
+            source_language: Source language code
+            char_budgets: Optional dict {id: max characters} from the segment durations
+            context: Optional batch context (summary, glossary, neighbouring sentences)
+            required_terms: Optional dict {id: [{'source', 'target'}]} of renderings the reply must use
+            
+        Returns:
+            dict: Keyword arguments for chat.completions.create
+        """
+        target_lang_name = LANGUAGE_NAMES.get(target_language.lower(), target_language)
+        source_lang_name = LANGUAGE_NAMES.get(source_language.lower(), source_language)
+        
+        entries = []
+        for i, text in items.items():
+            entry = {'id': i, 'text': text}
+            if char_budgets and i in char_budgets:
+                entry['max_chars'] = char_budgets[i]
+            if required_terms and i in required_terms:
+                entry['must_use'] = [term['target'] for term in required_terms[i]]
+            entries.append(entry)
+        payload = json.dumps(entries, ensure_ascii=False)
+        
+        expected_tokens = sum(self._estimate_output_tokens(text, target_language) for text in items.values())
+        max_tokens = min(MAX_OUTPUT_TOKENS, max(256, int(expected_tokens * 1.5) + 50))
+        
+        length_rule = ""
+        if char_budgets:
+            length_rule = (
+                f"Items with \"max_chars\" are dubbed into a fixed time slot: keep their translation "
+                f"within that many characters, paraphrasing concisely if needed.\n"
+            )
+        
+        terms_rule = ""
+        if required_terms:
+            terms_rule = "Items with \"must_use\" must contain each of those terms exactly as written.\n"
+        
+        prompt = (
+            f"{self._format_context(context)}"
+            f"Translate the \"text\" of every item in the JSON array below from {source_lang_name} "
+            f"to {target_lang_name}. Maintain the tone and style.\n"
+            f"{length_rule}"
+            f"{terms_rule}"
+            f"Return ONLY a JSON object of the form "
+            f"{{\"translations\": [{{\"id\": <id>, \"text\": <translation>}}]}} "
+            f"with exactly one entry per input id. Never merge or split items.\n\n{payload}"
+        )
+        
+        return {
+            'model': "gpt-4",
+            'messages': [
+                {"role": "system", "content": f"You are a professional translator. Translate text from {source_lang_name} to {target_lang_name} accurately while preserving meaning, tone, and style. You always answer with valid JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            'temperature': 0.3,
+            'max_tokens': max_tokens
+        }
+    
+    def _build_edit_request(self, batch):
+        """
+        Build a cheap request adapting translation-memory matches to their new source
+        
+        Args:
+            batch: Batch state with edit_matches
+            
+        Returns:
+            dict: Keyword arguments for chat.completions.create
+        """
+        target_lang_name = LANGUAGE_NAMES.get(batch.target_language.lower(), batch.target_language)
+        source_lang_name = LANGUAGE_NAMES.get(batch.source_language.lower(), batch.source_language)
+        
+        entries = []
+        for i, (_, stored_source, stored_translation, _) in batch.edit_matches.items():
+            entries.append({
+                'id': i,
+                'text': batch.texts[i],
+                'reference_source': stored_source,
+                'reference_translation': stored_translation
+            })
+        payload = json.dumps(entries, ensure_ascii=False)
+        
+        expected_tokens = sum(
+            self._estimate_output_tokens(batch.texts[i], batch.target_language) for i in batch.edit_matches
+        )
+        max_tokens = min(MAX_OUTPUT_TOKENS, max(256, int(expected_tokens * 1.5) + 50))
+        
+        glossary_context = {'glossary': batch.context['glossary']} if batch.context else None
+        prompt = (
+            f"{self._format_context(glossary_context)}"
+            f"Each item's {source_lang_name} \"text\" is a slight variation of \"reference_source\", "
+            f"whose {target_lang_name} translation is \"reference_translation\". "
+            f"Edit \"reference_translation\" minimally so it translates \"text\"; keep the wording otherwise unchanged.\n"
+            f"Return ONLY a JSON object of the form "
+            f"{{\"translations\": [{{\"id\": <id>, \"text\": <edited translation>}}]}} "
+            f"with exactly one entry per input id.\n\n{payload}"
+        )
+        
+        return {
+            'model': self.edit_model,
+            'messages': [
+                {"role": "system", "content": f"You are a professional translator revising {target_lang_name} translations. You always answer with valid JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            'temperature': 0.2,
+            'max_tokens': max_tokens
+        }
+    
+    def _build_fit_request(self, batch, indices):
+        """
+        Build a request asking to shorten translations to their time slot
+        
+        Args:
+            batch: Batch state
+            indices: Items whose current translation overruns its time slot
+            
+        Returns:
+            dict: Keyword arguments for chat.completions.create
+        """
+        target_lang_name = LANGUAGE_NAMES.get(batch.target_language.lower(), batch.target_language)
+        
+        entries = []
+        for i in indices:
+            entries.append({
+                'id': i,
+                'source': batch.texts[i],
+                'translation': batch.results[i],
+                'current_chars': len(batch.results[i]),
+                'target_chars': target_chars(batch.durations[i], batch.target_language)
+            })
+        payload = json.dumps(entries, ensure_ascii=False)
+        
+        expected_tokens = sum(self._estimate_output_tokens(batch.results[i], batch.target_language) for i in indices)
+        max_tokens = min(MAX_OUTPUT_TOKENS, max(256, int(expected_tokens * 1.5) + 50))
+        
+        glossary_context = {'glossary': batch.context['glossary']} if batch.context else None
+        prompt = (
+            f"{self._format_context(glossary_context)}"
+            f"Each item below is a {target_lang_name} dubbing line that is too long for its time slot. "
+            f"Rewrite \"translation\" in {target_lang_name} so it is at most \"target_chars\" characters "
+            f"while keeping the meaning of \"source\": paraphrase concisely and drop redundant words.\n"
+            f"Return ONLY a JSON object of the form "
+            f"{{\"translations\": [{{\"id\": <id>, \"text\": <rewritten translation>}}]}} "
+            f"with exactly one entry per input id.\n\n{payload}"
+        )
+        
+        return {
+            'model': "gpt-4",
+            'messages': [
+                {"role": "system", "content": f"You are a professional dubbing adapter writing {target_lang_name} scripts that match on-screen timing. You always answer with valid JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            'temperature': 0.3,
+            'max_tokens': max_tokens
+        }
+    
+    def _format_context(self, context):
+        """
+        Render a batch context as a prompt preamble
+        
+        Args:
+            context: Context dict or None
+            
+        Returns:
+            str: Preamble ending with a blank line, or '' when there is nothing to add
+        """
+        if not context:
+            return ""
+        
+        lines = []
+        if context.get('summary'):
+            lines.append(f"Video summary: {context['summary']}")
+        if context.get('glossary'):
+            lines.append("Glossary (always use these renderings):")
+            lines.extend(f"- {entry['source']} → {entry['target']}" for entry in context['glossary'])
+        if context.get('before'):
+            lines.append(f"Preceding lines (context only, do not translate): {' '.join(context['before'])}")
+        if context.get('after'):
+            lines.append(f"Following lines (context only, do not translate): {' '.join(context['after'])}")
+        
+        if not lines:
+            return ""
+        return '\n'.join(lines) + '\n\n'
+    
+    def _request_units(self, request):
+        """Tokens a request counts against TPM (prompt estimate + max_tokens)"""
+        return sum(estimate_tokens(m['content']) for m in request['messages']) + request['max_tokens']
+    
+    def _call_openai(self, request):
+        """
+        Blocking chat completion gated by the global rate limiter and adaptive concurrency
+        
+        Args:
+            request: Keyword arguments for chat.completions.create
+            
+        Returns:
+            Parsed chat completion response
+        """
+        with self._openai_span(request) as span:
+            self.rate_limiter.acquire(self.job_id, self._request_units(request))
+            self.concurrency.acquire()
+            start = time.time()
+            try:
+                raw_response = self.replay.call(
+                    'openai',
+                    request,
+                    lambda: self.client.chat.completions.with_raw_response.create(**request),
+                    encode=encode_raw_chat_completion,
+                    decode=decode_raw_chat_completion
                 )
-                
-                # Split back into segments
-                translated_texts = translated_combined.split("\n---\n")
-                
-                for j, segment in enumerate(batch):
-                    translated_text = translated_texts[j] if j < len(translated_texts) else segment['text']
-                    
-                    translated_segments.append({
-                        'original_text': segment['text'],
-                        'translated_text': translated_text.strip(),
-                        'start': segment['start'],
-                        'end': segment['end'],
-                        'speaker': segment.get('speaker', 0)  # Preserve speaker info
-                    })
-                    
             except Exception as e:
-                print(f"Warning: Batch translation failed, falling back to individual: {str(e)}")
-                # Fallback to individual translation
-                for segment in batch:
-                    try:
-                        translated_text = self.translate_text(
-                            segment['text'],
-                            target_language,
-                            source_language
-                        )
-                    except:
-                        translated_text = segment['text']
-                    
-                    translated_segments.append({
-                        'original_text': segment['text'],
-                        'translated_text': translated_text,
-                        'start': segment['start'],
-                        'end': segment['end'],
-                        'speaker': segment.get('speaker', 0)  # Preserve speaker info
-                    })
+                rate_limited = self.rate_limiter.record_error(e)
+                self.concurrency.release(rate_limited=rate_limited)
+                raise
+            self.concurrency.release(latency=time.time() - start, headers=raw_response.headers)
+            self.rate_limiter.record_success(raw_response.headers)
+            
+            response = raw_response.parse()
+            self._record_usage(span, response)
+            return response
+    
+    async def _call_openai_async(self, request):
+        """
+        Async chat completion on the shared client, gated by the global rate limiter
+        
+        Args:
+            request: Keyword arguments for chat.completions.create
+            
+        Returns:
+            Parsed chat completion response
+        """
+        runtime = AsyncRuntime.get()
+        
+        with self._openai_span(request) as span:
+            await self.rate_limiter.acquire_async(self.job_id, self._request_units(request))
+            
+            async with runtime.semaphore('openai'):
+                try:
+                    raw_response = await self.replay.call_async(
+                        'openai',
+                        request,
+                        lambda: runtime.openai_client(self.api_key).chat.completions.with_raw_response.create(**request),
+                        encode=encode_raw_chat_completion,
+                        decode=decode_raw_chat_completion
+                    )
+                except Exception as e:
+                    self.rate_limiter.record_error(e)
+                    raise
+            self.rate_limiter.record_success(raw_response.headers)
+            
+            response = raw_response.parse()
+            self._record_usage(span, response)
+            return response
+    
+    def _openai_span(self, request):
+        """Client span of one chat completion request"""
+        return start_span('openai.chat', self.job_id, kind='client', attributes={
+            'openai.model': request.get('model'),
+            'openai.max_tokens': request.get('max_tokens'),
+            'openai.prompt_chars': sum(len(m['content']) for m in request['messages'])
+        })
+    
+    def _record_usage(self, span, response):
+        """Token usage of a completion as span attributes"""
+        usage = getattr(response, 'usage', None)
+        if usage is not None:
+            span.set_attributes({
+                'openai.prompt_tokens': getattr(usage, 'prompt_tokens', None),
+                'openai.completion_tokens': getattr(usage, 'completion_tokens', None)
+            })
+    
+    def _parse_json_translations(self, content, items):
+        """
+        Parse and validate a JSON translation reply against the requested ids
         
+        Args:
+            content: Raw model reply
+            items: dict {id: text} that was requested
+            
+        Returns:
+            dict: {id: translated_text} for valid entries only
+        """
+        data = json.loads(self._strip_code_fence(content))
+        entries = data.get('translations') if isinstance(data, dict) else data
+        
+        if not isinstance(entries, list):
+            raise ValueError("Reply does not contain a translations array")
+        
+        translated = {}
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            try:
+                entry_id = int(entry.get('id'))
+            except (TypeError, ValueError):
+                continue
+            text = entry.get('text')
+            if entry_id in items and isinstance(text, str) and text.strip():
+                translated[entry_id] = text.strip()
+        
+        return translated
+    
+    def _strip_code_fence(self, content):
+        """Tolerate replies wrapped in a markdown code fence"""
+        content = content.strip()
+        fenced = re.match(r'^```(?:json)?\s*(.*?)\s*```$', content, re.DOTALL)
+        if fenced:
+            content = fenced.group(1)
+        return content
+    
+    def _batch_translate_async(self, batches, target_language, source_language, fit_durations=False,
+                               contexts=None):
+        """
+        Translate all batches concurrently on the shared event loop
+        
+        In-flight requests are bounded by the process-wide OpenAI semaphore,
+        not by a per-call thread pool.
+        
+        Args:
+            batches: List of segment batches
+            target_language: Target language code
+            source_language: Source language code
+            fit_durations: Fit each translation to its segment duration
+            contexts: Optional list of batch contexts (one per batch)
+            
+        Returns:
+            list: Translated segments in original order
+        """
+        contexts = contexts or [None] * len(batches)
+        
+        async def translate_all():
+            return await asyncio.gather(*[
+                self.translate_batch_json_async(
+                    [seg['text'] for seg in batch],
+                    target_language,
+                    source_language,
+                    durations=self._segment_durations(batch, fit_durations),
+                    context=context
+                )
+                for batch, context in zip(batches, contexts)
+            ])
+        
+        results = AsyncRuntime.get().run(translate_all())
+        
+        translated_segments = []
+        for batch, translated_texts in zip(batches, results):
+            for segment, translated_text in zip(batch, translated_texts):
+                translated_segments.append({
+                    'original_text': segment['text'],
+                    'translated_text': translated_text,
+                    'start': segment['start'],
+                    'end': segment['end'],
+                    'speaker': segment.get('speaker', 0)
+                })
+        
+        logger.info(f"[TRANSLATOR] ✅ Translated {len(translated_segments)} segments")
         return translated_segments
     
-    def _batch_translate_parallel(self, segments, target_language, source_language, 
-                                  batch_size, max_workers):
+    def _batch_translate_sequential(self, batches, target_language, source_language='en', fit_durations=False,
+                                    contexts=None):
+        """
+        Sequential batch translation
+        
+        Args:
+            batches: List of segment batches
+            target_language: Target language
+            source_language: Source language
+            fit_durations: Fit each translation to its segment duration
+            contexts: Optional list of batch contexts (one per batch)
+            
+        Returns:
+            list: Translated segments
+        """
+        translated_segments = []
+        contexts = contexts or [None] * len(batches)
+        
+        for batch, context in zip(batches, contexts):
+            translated_texts = self.translate_batch_json(
+                [seg['text'] for seg in batch],
+                target_language,
+                source_language,
+                durations=self._segment_durations(batch, fit_durations),
+                context=context
+            )
+            
+            for segment, translated_text in zip(batch, translated_texts):
+                translated_segments.append({
+                    'original_text': segment['text'],
+                    'translated_text': translated_text,
+                    'start': segment['start'],
+                    'end': segment['end'],
+                    'speaker': segment.get('speaker', 0)  # Preserve speaker info
+                })
+        
+        return translated_segments
+    
+    def _batch_translate_parallel(self, batches, target_language, source_language, max_workers,
+                                  fit_durations=False, contexts=None):
         """
         Parallel batch translation using ThreadPoolExecutor
         
+        The pool only bounds the number of threads; the number of requests
+        actually in flight is governed by self.concurrency.
+        
         Args:
-            segments: List of segments to translate
+            batches: List of segment batches
             target_language: Target language code
             source_language: Source language code
-            batch_size: Number of segments per batch
             max_workers: Maximum parallel workers
+            fit_durations: Fit each translation to its segment duration
+            contexts: Optional list of batch contexts (one per batch)
             
         Returns:
             list: Translated segments in original order
         """
+        contexts = contexts or [None] * len(batches)
+        
         def translate_batch(batch_index, batch):
             """Translate a single batch of segments"""
-            try:
-                # Combine texts with markers
-                combined_text = "\n---\n".join([seg['text'] for seg in batch])
-                
-                logger.info(f"[TRANSLATOR] Translating batch {batch_index} ({len(batch)} segments)")
-                
-                translated_combined = self.translate_text(
-                    combined_text,
-                    target_language,
-                    source_language
-                )
-                
-                # Split back into segments
-                translated_texts = translated_combined.split("\n---\n")
-                
-                batch_results = []
-                for j, segment in enumerate(batch):
-                    translated_text = translated_texts[j] if j < len(translated_texts) else segment['text']
-                    
-                    batch_results.append({
-                        'original_text': segment['text'],
-                        'translated_text': translated_text.strip(),
-                        'start': segment['start'],
-                        'end': segment['end'],
-                        'speaker': segment.get('speaker', 0)
-                    })
-                
-                return (batch_index, batch_results, None)
-                
-            except Exception as e:
-                error_msg = str(e)
-                logger.error(f"[TRANSLATOR] Batch {batch_index} failed: {error_msg}")
-                
-                # Fallback: translate individually
-                batch_results = []
-                for segment in batch:
-                    try:
-                        translated_text = self.translate_text(
-                            segment['text'],
-                            target_language,
-                            source_language
-                        )
-                    except:
-                        translated_text = segment['text']
-                    
-                    batch_results.append({
-                        'original_text': segment['text'],
-                        'translated_text': translated_text,
-                        'start': segment['start'],
-                        'end': segment['end'],
-                        'speaker': segment.get('speaker', 0)
-                    })
-                
-                return (batch_index, batch_results, error_msg)
-        
-        # Create batches
-        batches = []
-        for i in range(0, len(segments), batch_size):
-            batches.append(segments[i:i + batch_size])
-        
-        logger.info(f"[TRANSLATOR] Processing {len(segments)} segments in {len(batches)} batches")
+            logger.info(f"[TRANSLATOR] Translating batch {batch_index} ({len(batch)} segments)")
+            
+            translated_texts = self.translate_batch_json(
+                [seg['text'] for seg in batch],
+                target_language,
+                source_language,
+                durations=self._segment_durations(batch, fit_durations),
+                context=contexts[batch_index]
+            )
+            
+            batch_results = []
+            for segment, translated_text in zip(batch, translated_texts):
+                batch_results.append({
+                    'original_text': segment['text'],
+                    'translated_text': translated_text,
+                    'start': segment['start'],
+                    'end': segment['end'],
+                    'speaker': segment.get('speaker', 0)
+                })
+            
+            return (batch_index, batch_results)
         
         # Store results with original batch order
         results = [None] * len(batches)
         
         # Use ThreadPoolExecutor for I/O-bound API calls
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor, \
+                WorkerPool('translation', max_workers) as pool:
             # Submit all batch translation tasks
             future_to_batch = {
-                executor.submit(translate_batch, i, batch): i 
+                executor.submit(pool.wrap(bind(translate_batch)), i, batch): i 
                 for i, batch in enumerate(batches)
             }
             
             # Collect results as they complete
             completed = 0
             for future in concurrent.futures.as_completed(future_to_batch):
-                batch_idx, batch_results, error = future.result()
+                batch_idx, batch_results = future.result()
                 results[batch_idx] = batch_results
                 completed += 1
                 
-                if error:
-                    logger.warning(f"[TRANSLATOR] Batch {batch_idx} had errors (used fallback)")
-                
                 # Log progress
                 logger.info(f"[TRANSLATOR] Progress: {completed}/{len(batches)} batches completed")
         
@@ -0,0 +1,315 @@
+import os
+import json
+import math
+import zlib
+import threading
+import logging
+from abc import ABC, abstractmethod
+from array import array
+from pathlib import Path
+from .rate_limiter import get_rate_limiter
+from .speech_rate import chars_per_second
+from .tracing import run_subprocess
+
+logger = logging.getLogger(__name__)
+
+# 'elevenlabs' is also SpeechSynthesizer's built-in path (async client, hedging);
+# every backend here can additionally serve as a failover target
+TTS_BACKEND_NAMES = ('elevenlabs', 'piper', 'tone')
+
+
+def encode_mp3(pcm, sample_rate):
+    """
+    Encode 16-bit mono PCM as 128 kbps MP3 (the format ElevenLabs returns)
+
+    Args:
+        pcm: Raw s16le samples
+        sample_rate: Sample rate of the PCM data
+
+    Returns:
+        bytes: MP3 data
+    """
+    result = run_subprocess(
+        [
+            'ffmpeg', '-hide_banner', '-loglevel', 'error',
+            '-f', 's16le', '-ar', str(sample_rate), '-ac', '1', '-i', 'pipe:0',
+            '-ar', '44100', '-codec:a', 'libmp3lame', '-b:a', '128k', '-f', 'mp3', 'pipe:1'
+        ],
+        input=pcm,
+        capture_output=True,
+        check=True
+    )
+    return result.stdout
+
+
+def elevenlabs_speed_supported():
+    """
+    Whether the installed ElevenLabs SDK can send a speaking speed
+
+    VoiceSettings ignores unknown fields instead of rejecting them, so an SDK
+    without the speed field (e.g. the pinned 1.0.0) silently drops the value.
+
+    Returns:
+        bool: True when VoiceSettings has a speed field
+    """
+    from elevenlabs import VoiceSettings
+
+    fields = getattr(VoiceSettings, 'model_fields', None) or getattr(VoiceSettings, '__fields__', {})
+    return 'speed' in fields
+
+
+class TTSBackend(ABC):
+    """Interface for text-to-speech engines"""
+
+    name = None
+
+    @abstractmethod
+    def synthesize(self, text, voice_id, model=None, speed=None, language=None, job_id=None):
+        """
+        Synthesize speech
+
+        Args:
+            text: Text to speak
+            voice_id: Voice to use (backends map unknown IDs to one of their own voices)
+            model: Optional model name (backend specific)
+            speed: Optional speaking speed (1.0 = natural)
+            language: Optional language code of the text (the job's target language)
+            job_id: Optional job the request belongs to (rate limiter fairness key)
+
+        Returns:
+            bytes: MP3 audio
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def clone(self, name, audio_path, description=""):
+        """
+        Create a voice from a speaker sample
+
+        Args:
+            name: Name for the voice
+            audio_path: Path to the speaker sample
+            description: Optional description
+
+        Returns:
+            str: Voice ID usable with synthesize()
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_voices(self):
+        """
+        List available voices
+
+        Returns:
+            list: [{'voice_id', 'name'}]
+        """
+        raise NotImplementedError
+
+
+class ElevenLabsTTSBackend(TTSBackend):
+    """ElevenLabs API, sharing the process-wide ElevenLabs rate limiter"""
+
+    name = 'elevenlabs'
+
+    def __init__(self, api_key=None):
+        from elevenlabs.client import ElevenLabs
+
+        self.api_key = api_key or os.getenv('ELEVENLABS_API_KEY')
+        if not self.api_key:
+            raise ValueError("ElevenLabs API key is required")
+        self.client = ElevenLabs(api_key=self.api_key)
+        self.rate_limiter = get_rate_limiter('elevenlabs')
+
+    def synthesize(self, text, voice_id, model=None, speed=None, language=None, job_id=None):
+        from elevenlabs import VoiceSettings
+
+        settings = {'stability': 0.5, 'similarity_boost': 0.75, 'style': 0.0, 'use_speaker_boost': True}
+        if speed is not None and elevenlabs_speed_supported():
+            settings['speed'] = speed
+
+        self.rate_limiter.acquire(job_id or 'default', len(text))
+        try:
+            audio = b''.join(self.client.text_to_speech.convert(
+                voice_id=voice_id,
+                text=text,
+                model_id=model or 'eleven_multilingual_v2',
+                output_format='mp3_44100_128',
+                voice_settings=VoiceSettings(**settings)
+            ))
+        except Exception as e:
+            self.rate_limiter.record_error(e)
+            raise
+        self.rate_limiter.record_success()
+        return audio
+
+    def clone(self, name, audio_path, description=""):
+        with open(audio_path, 'rb') as audio_file:
+            voice = self.client.voices.add(
+                name=name,
+                description=description or f"Cloned voice for {name}",
+                files=[audio_file]
+            )
+        return voice.voice_id
+
+    def list_voices(self):
+        return [
+            {'voice_id': voice.voice_id, 'name': voice.name}
+            for voice in self.client.voices.get_all().voices
+        ]
+
+
+class PiperTTSBackend(TTSBackend):
+    """
+    Local CPU synthesis with the Piper CLI
+
+    Voices are the *.onnx models in PIPER_VOICES_DIR (each with its .onnx.json
+    config). Piper cannot clone, so clone() picks a stock voice deterministically.
+    """
+
+    name = 'piper'
+
+    def __init__(self, voices_dir=None, executable=None):
+        self.voices_dir = Path(voices_dir or os.getenv('PIPER_VOICES_DIR', 'models/piper'))
+        self.executable = executable or os.getenv('PIPER_EXECUTABLE', 'piper')
+
+    def _voices(self):
+        voices = sorted(p.name[:-len('.onnx')] for p in self.voices_dir.glob('*.onnx'))
+        if not voices:
+            raise RuntimeError(f"No Piper voices found in {self.voices_dir}")
+        return voices
+
+    def _resolve_voice(self, voice_id):
+        voices = self._voices()
+        if voice_id in voices:
+            return voice_id
+        return voices[zlib.crc32(voice_id.encode('utf-8')) % len(voices)]
+
+    def synthesize(self, text, voice_id, model=None, speed=None, language=None, job_id=None):
+        voice = self._resolve_voice(voice_id)
+        model_path = self.voices_dir / f"{voice}.onnx"
+
+        sample_rate = 22050
+        config_path = self.voices_dir / f"{voice}.onnx.json"
+        if config_path.exists():
+            with open(config_path, 'r', encoding='utf-8') as f:
+                sample_rate = json.load(f).get('audio', {}).get('sample_rate', sample_rate)
+
+        cmd = [self.executable, '--model', str(model_path), '--output_raw']
+        if speed:
+            # Piper's length_scale is the inverse of speed
+            cmd += ['--length_scale', f"{1.0 / speed:.3f}"]
+
+        result = run_subprocess(cmd, input=text.encode('utf-8'), capture_output=True, check=True)
+        return encode_mp3(result.stdout, sample_rate)
+
+    def clone(self, name, audio_path, description=""):
+        voice = self._resolve_voice(name)
+        logger.info(f"[TTS_BACKEND] Piper cannot clone voices, using stock voice '{voice}' for {name}")
+        return voice
+
+    def list_voices(self):
+        return [{'voice_id': voice, 'name': voice} for voice in self._voices()]
+
+
+class ToneTTSBackend(TTSBackend):
+    """
+    Deterministic tone generator for offline tests and benchmarks
+
+    Produces a syllable-modulated tone whose pitch depends on the voice ID
+    and whose length follows the language's typical speaking rate, so the
+    alignment and merge stages see realistic durations.
+    """
+
+    name = 'tone'
+
+    SAMPLE_RATE = 16000
+    VOICES = ['tone-low', 'tone-mid', 'tone-high']
+
+    def __init__(self, language='en'):
+        self.language = language
+
+    def synthesize(self, text, voice_id, model=None, speed=None, language=None, job_id=None):
+        # The instance is shared by every job: the job's language comes with each call
+        duration = max(0.3, len(text.strip()) / chars_per_second(language or self.language) / (speed or 1.0))
+        frequency = 110 + zlib.crc32(voice_id.encode('utf-8')) % 190
+
+        samples = array('h')
+        for n in range(int(duration * self.SAMPLE_RATE)):
+            t = n / self.SAMPLE_RATE
+            # ~4 syllables per second
+            envelope = 0.5 - 0.5 * math.cos(2 * math.pi * 4 * t)
+            samples.append(int(8000 * envelope * math.sin(2 * math.pi * frequency * t)))
+
+        return encode_mp3(samples.tobytes(), self.SAMPLE_RATE)
+
+    def clone(self, name, audio_path, description=""):
+        return f"tone-{zlib.crc32(name.encode('utf-8')):08x}"
+
+    def list_voices(self):
+        return [{'voice_id': voice, 'name': voice} for voice in self.VOICES]
+
+
+_BACKEND_CLASSES = {
+    'elevenlabs': ElevenLabsTTSBackend,
+    'piper': PiperTTSBackend,
+    'tone': ToneTTSBackend
+}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+def get_tts_backend(name):
+    """
+    Get the process-wide instance of a TTS backend
+
+    Args:
+        name: Backend name ('elevenlabs', 'piper' or 'tone')
+
+    Returns:
+        TTSBackend: Shared backend instance
+    """
+    if name not in _BACKEND_CLASSES:
+        raise ValueError(f"Unknown TTS backend: {name}")
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = _BACKEND_CLASSES[name]()
+        return _backends[name]
+
+
+def select_tts_backend(requested=None):
+    """
+    Pick the TTS backend for a job (requested by the job, else TTS_BACKEND, default: elevenlabs)
+
+    Args:
+        requested: Optional backend name from the job request
+
+    Returns:
+        str: Backend name
+    """
+    name = requested or os.getenv('TTS_BACKEND', 'elevenlabs')
+    if name not in TTS_BACKEND_NAMES:
+        raise ValueError(f"Unknown TTS backend: {name}")
+    return name
+
+
+def failover_tts_backends(primary):
+    """
+    Backends to try, in order, when the primary backend fails (TTS_FAILOVER, e.g. "piper,tone")
+
+    Args:
+        primary: Name of the primary backend (never repeated in the list)
+
+    Returns:
+        list: TTSBackend instances
+    """
+    names = [name.strip() for name in os.getenv('TTS_FAILOVER', '').split(',') if name.strip()]
+    backends = []
+    for name in names:
+        if name == primary:
+            continue
+        try:
+            backends.append(get_tts_backend(name))
+        except Exception as e:
+            logger.warning(f"[TTS_BACKEND] Failover backend '{name}' unavailable: {e}")
+    return backends
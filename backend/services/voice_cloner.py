@@ -1,26 +1,47 @@
 import os
+import hashlib
 import logging
 from elevenlabs.client import ElevenLabs
 from .cache_manager import CacheManager
+from .rate_limiter import get_rate_limiter
+from .tts_backends import get_tts_backend
+from .api_replay import get_api_replay
+from .tracing import start_span
 
 logger = logging.getLogger(__name__)
 
 class VoiceCloner:
-    """Clone voices using ElevenLabs Professional Voice Cloning"""
+    """Clone voices using ElevenLabs Professional Voice Cloning (or a local backend, see tts_backends.py)"""
     
-    def __init__(self, api_key=None, use_cache=True, video_url=None):
-        self.api_key = api_key or os.getenv('ELEVENLABS_API_KEY')
-        if not self.api_key:
-            raise ValueError("ElevenLabs API key is required")
-        
-        self.client = ElevenLabs(api_key=self.api_key)
-        logger.info(f"[VOICE_CLONER] Initialized with API key: {self.api_key[:10]}...")
+    def __init__(self, api_key=None, use_cache=True, video_url=None, job_id=None, backend='elevenlabs'):
+        # Non-ElevenLabs backends clone locally and need no API key
+        self.backend_name = backend or 'elevenlabs'
+        self.backend = None
+        if self.backend_name != 'elevenlabs':
+            self.backend = get_tts_backend(self.backend_name)
+            self.api_key = None
+            self.client = None
+            # Local voice IDs must not leak into the shared ElevenLabs voice cache
+            use_cache = False
+            logger.info(f"[VOICE_CLONER] Initialized with '{self.backend_name}' backend")
+        else:
+            self.replay = get_api_replay()
+            self.api_key = api_key or os.getenv('ELEVENLABS_API_KEY') or self.replay.api_key()
+            if not self.api_key:
+                raise ValueError("ElevenLabs API key is required")
+            
+            self.client = ElevenLabs(api_key=self.api_key)
+            logger.info(f"[VOICE_CLONER] Initialized with API key: {self.api_key[:10]}...")
         
         # Initialize cache with video URL for job-agnostic caching
         self.use_cache = use_cache
         self.video_url = video_url
         if self.use_cache:
             self.cache = CacheManager()
+        
+        # Process-wide ElevenLabs quota, shared fairly across jobs
+        self.job_id = job_id or 'default'
+        self.rate_limiter = get_rate_limiter('elevenlabs')
     
     def clone_voice(self, audio_path, voice_name, description="", speaker_id=None):
         """
@@ -41,6 +62,7 @@ class VoiceCloner:
                 audio_path, voice_name, self.video_url, speaker_id
             )
             if cached_voice_id:
+                start_span('voice.clone', attributes={'speaker.id': speaker_id, 'cache.hit': True}).end()
                 logger.info(f"[VOICE_CLONER] Using cached voice ID: {cached_voice_id}")
                 return cached_voice_id
         
@@ -56,16 +78,39 @@ class VoiceCloner:
             file_size = os.path.getsize(audio_path) / (1024 * 1024)  # MB
             logger.info(f"[VOICE_CLONER] Audio file size: {file_size:.2f} MB")
             
-            # Open audio file
-            with open(audio_path, 'rb') as audio_file:
-                # Clone voice using ElevenLabs API
-                voice = self.client.voices.add(
-                    name=voice_name,
-                    description=description or f"Cloned voice for {voice_name}",
-                    files=[audio_file]
-                )
+            if self.backend:
+                voice_id = self.backend.clone(voice_name, audio_path, description)
+                logger.info(f"[VOICE_CLONER] ✅ Voice ready on '{self.backend_name}': {voice_id}")
+                return voice_id
+            
+            self.rate_limiter.acquire(self.job_id, 0)
+            
+            def add_voice():
+                # Open audio file and clone voice using ElevenLabs API
+                with open(audio_path, 'rb') as audio_file:
+                    return self.client.voices.add(
+                        name=voice_name,
+                        description=description or f"Cloned voice for {voice_name}",
+                        files=[audio_file]
+                    ).voice_id
+            
+            try:
+                # Voice names embed the job ID, so fixtures are keyed by clip and speaker
+                with start_span('voice.clone', kind='client', attributes={
+                    'speaker.id': speaker_id,
+                    'cache.hit': False,
+                    'audio.bytes': os.path.getsize(audio_path)
+                }):
+                    voice_id = self.replay.call(
+                        'elevenlabs',
+                        self._replay_request(audio_path, speaker_id),
+                        add_voice
+                    )
+            except Exception as e:
+                self.rate_limiter.record_error(e)
+                raise
+            self.rate_limiter.record_success()
             
-            voice_id = voice.voice_id
             logger.info(f"[VOICE_CLONER] ✅ Voice cloned successfully")
             logger.info(f"[VOICE_CLONER] Voice ID: {voice_id}")
             logger.info(f"[VOICE_CLONER] Voice Name: {voice_name}")
@@ -82,6 +127,13 @@ class VoiceCloner:
             logger.error(f"[VOICE_CLONER] ❌ Voice cloning failed: {str(e)}")
             raise Exception(f"Voice cloning failed: {str(e)}")
     
+    def _replay_request(self, audio_path, speaker_id):
+        """Fixture key of a clone request: the video and speaker when known, else the sample bytes"""
+        if self.video_url and speaker_id is not None:
+            return {'clone': True, 'video_url': self.video_url, 'speaker_id': speaker_id}
+        with open(audio_path, 'rb') as f:
+            return {'clone': True, 'audio_sha256': hashlib.sha256(f.read()).hexdigest()}
+    
     def list_voices(self):
         """
         List all available voices (including cloned ones)
@@ -89,6 +141,9 @@ class VoiceCloner:
         Returns:
             list: List of voice objects
         """
+        if self.backend:
+            return self.backend.list_voices()
+        
         try:
             voices = self.client.voices.get_all()
             logger.info(f"[VOICE_CLONER] Found {len(voices.voices)} voices")
@@ -104,6 +159,10 @@ class VoiceCloner:
         Args:
             voice_id: ID of the voice to delete
         """
+        if self.backend:
+            # Local voices are stock models, nothing to delete
+            return
+        
         try:
             self.client.voices.delete(voice_id)
             logger.info(f"[VOICE_CLONER] ✅ Deleted voice: {voice_id}")
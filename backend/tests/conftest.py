@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+# Tests import backend modules the way app.py and worker.py do (services.x, job_manager)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def working_dir(tmp_path, monkeypatch):
+    """Run every test in its own directory: caches and outputs use relative paths"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
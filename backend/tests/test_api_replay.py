@@ -0,0 +1,69 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from services.api_replay import APIReplay, FixtureMissing, LatencyModel, parse_latencies
+from services.synthesizer import SpeechSynthesizer
+
+NO_LATENCY = {'*': LatencyModel('none')}
+
+
+def _fail():
+    raise AssertionError('replay must not call the real API')
+
+
+def test_replay_serves_recorded_responses(tmp_path):
+    recorder = APIReplay(mode='record', fixture_dir=tmp_path)
+    assert recorder.call('openai', {'text': 'hi', 'n': 1}, lambda: {'reply': 'hola'}) == {'reply': 'hola'}
+    assert recorder.call('elevenlabs', {'text': 'hi'}, lambda: b'\x00mp3') == b'\x00mp3'
+
+    replay = APIReplay(mode='replay', fixture_dir=tmp_path, latencies=NO_LATENCY)
+
+    # Key order does not matter
+    assert replay.call('openai', {'n': 1, 'text': 'hi'}, _fail) == {'reply': 'hola'}
+    assert replay.call('elevenlabs', {'text': 'hi'}, _fail) == b'\x00mp3'
+    assert replay.stats == {'recorded': 0, 'replayed': 2, 'missing': 0}
+
+
+def test_missing_fixture_raises(tmp_path):
+    replay = APIReplay(mode='replay', fixture_dir=tmp_path, latencies=NO_LATENCY)
+
+    with pytest.raises(FixtureMissing):
+        replay.call('openai', {'text': 'never recorded'}, _fail)
+
+
+def test_details_are_stored_but_not_keyed(tmp_path):
+    recorder = APIReplay(mode='record', fixture_dir=tmp_path)
+    recorder.call('elevenlabs', {'text': 'hi'}, lambda: b'audio', details={'speed': 1.1})
+
+    replay = APIReplay(mode='replay', fixture_dir=tmp_path, latencies=NO_LATENCY)
+
+    assert replay.call('elevenlabs', {'text': 'hi'}, _fail, details={'speed': 0.9}) == b'audio'
+    meta_path, = (tmp_path / 'elevenlabs').glob('*.json')
+    with open(meta_path, encoding='utf-8') as f:
+        assert json.load(f)['details'] == {'speed': 1.1}
+
+
+def test_tts_replay_ignores_learned_speed(monkeypatch, tmp_path):
+    monkeypatch.setenv('ELEVENLABS_API_KEY', 'test-key')
+    synthesizer = SpeechSynthesizer(output_dir=str(tmp_path), job_id='job')
+    synthesizer.client = SimpleNamespace(generate=lambda **kwargs: iter([b'\xff\xfb', b'audio']))
+    synthesizer.replay = APIReplay(mode='record', fixture_dir=tmp_path / 'fixtures')
+    recorded = synthesizer.synthesize_text('Hello there', 'voice', speed=1.1)
+
+    # Voice-rate stats moved on since recording: the planned speed differs
+    synthesizer.client = None
+    synthesizer.replay = APIReplay(mode='replay', fixture_dir=tmp_path / 'fixtures', latencies=NO_LATENCY)
+
+    assert synthesizer.synthesize_text('Hello there', 'voice', speed=0.95) == recorded
+
+
+def test_latency_specs():
+    latencies = parse_latencies('openai=fixed:1.5, *=none')
+
+    assert latencies['openai'].sample(None) == 1.5
+    assert latencies['*'].sample(None, recorded=3.0) == 0.0
+    assert LatencyModel('recorded').sample(None, recorded=3.0) == 3.0
+    with pytest.raises(ValueError):
+        LatencyModel('fixed')
@@ -0,0 +1,71 @@
+import pytest
+
+import app as app_module
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setitem(app_module.app.config, 'OUTPUT_FOLDER', str(tmp_path))
+    monkeypatch.setitem(app_module.app.config, 'X_ACCEL_REDIRECT_PREFIX', None)
+    output = tmp_path / 'job_dubbed.mp4'
+    output.write_bytes(CONTENT)
+    jobs = {
+        'done': {'job_id': 'done', 'status': 'completed', 'output_file': str(output)},
+        'running': {'job_id': 'running', 'status': 'processing', 'output_file': None},
+    }
+    monkeypatch.setattr(app_module.job_manager, 'jobs', jobs)
+    return app_module.app.test_client()
+
+
+def test_download_sends_the_whole_file_with_validators(client):
+    response = client.get('/api/download/done')
+
+    assert response.status_code == 200
+    assert response.data == CONTENT
+    assert response.headers['Accept-Ranges'] == 'bytes'
+    assert response.headers['ETag']
+    assert 'attachment' in response.headers['Content-Disposition']
+
+
+def test_range_requests_get_partial_content(client):
+    response = client.get('/api/download/done', headers={'Range': 'bytes=100-199'})
+
+    assert response.status_code == 206
+    assert response.data == CONTENT[100:200]
+    assert response.headers['Content-Range'] == f'bytes 100-199/{len(CONTENT)}'
+
+
+def test_unsatisfiable_range(client):
+    response = client.get('/api/download/done', headers={'Range': f'bytes={len(CONTENT) + 10}-'})
+
+    assert response.status_code == 416
+
+
+def test_conditional_requests(client):
+    etag = client.get('/api/download/done').headers['ETag']
+
+    assert client.get('/api/download/done', headers={'If-None-Match': etag}).status_code == 304
+
+    resumed = client.get('/api/download/done', headers={'Range': 'bytes=10-19', 'If-Range': etag})
+    assert (resumed.status_code, resumed.data) == (206, CONTENT[10:20])
+
+    # The file changed since the partial download started: send all of it
+    stale = client.get('/api/download/done', headers={'Range': 'bytes=10-19', 'If-Range': '"stale"'})
+    assert (stale.status_code, stale.data) == (200, CONTENT)
+
+
+def test_proxy_offload_returns_only_headers(client, monkeypatch):
+    monkeypatch.setitem(app_module.app.config, 'X_ACCEL_REDIRECT_PREFIX', '/protected/')
+
+    response = client.get('/api/download/done')
+
+    assert response.status_code == 200
+    assert response.headers['X-Accel-Redirect'] == '/protected/job_dubbed.mp4'
+    assert response.data == b''
+
+
+def test_download_of_unfinished_or_unknown_job(client):
+    assert client.get('/api/download/running').status_code == 400
+    assert client.get('/api/download/missing').status_code == 404
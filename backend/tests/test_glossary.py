@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+from services import glossary as glossary_module
+from services.glossary import AhoCorasick, Glossary, load_glossary, save_glossary, read_glossary_terms
+
+TERMS = [
+    {'source': 'Acme Cloud', 'translations': {'es': 'Acme Cloud', 'fr': 'Acme Cloud'}},
+    {'source': 'cloud', 'translations': {'es': 'nube'}},
+    {'source': 'dashboard', 'translations': {'es': 'panel'}},
+    {'source': 'sign in', 'translations': {'es': 'iniciar sesión'}},
+]
+
+
+@pytest.fixture(autouse=True)
+def glossary_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv('GLOSSARY_DIR', str(tmp_path / 'glossaries'))
+    monkeypatch.setattr(glossary_module, '_glossaries', {})
+
+
+def test_aho_corasick_finds_overlapping_patterns():
+    matcher = AhoCorasick(['he', 'she', 'hers', 'his'])
+
+    assert sorted(matcher.find_all('ushers')) == []
+    assert sorted(matcher.find_all('she said his hers')) == [(0, 3, 1), (9, 12, 3), (13, 17, 2)]
+
+
+def test_aho_corasick_matches_on_word_boundaries_case_insensitively():
+    matcher = AhoCorasick(['Acme'])
+
+    assert matcher.find_all('ACME, then acme.') == [(0, 4, 0), (11, 15, 0)]
+    assert matcher.find_all('Acmetron and xacme') == []
+
+
+def test_match_prefers_leftmost_longest():
+    glossary = Glossary(TERMS)
+
+    assert glossary.match('Open the Acme Cloud dashboard') == [0, 2]
+    assert glossary.match('Our cloud, the Acme Cloud') == [1, 0]
+
+
+def test_terms_for_batch_only_lists_terms_with_a_rendering():
+    glossary = Glossary(TERMS)
+
+    assert glossary.terms_for(['Sign in to the cloud', 'the cloud again'], 'fr') == []
+    assert glossary.terms_for(['Sign in to the cloud', 'the cloud again'], 'ES') == [
+        {'source': 'sign in', 'target': 'iniciar sesión'},
+        {'source': 'cloud', 'target': 'nube'},
+    ]
+
+
+def test_missing_terms():
+    glossary = Glossary(TERMS)
+
+    assert glossary.missing_terms('Open the dashboard', 'Abre el Panel', 'es') == []
+    assert glossary.missing_terms('Open the dashboard', 'Abre el tablero', 'es') == [
+        {'source': 'dashboard', 'target': 'panel'}
+    ]
+
+
+def test_invalid_entries_are_dropped():
+    glossary = Glossary([{'source': ' ', 'translations': {}}, {'source': 'x'}, {'translations': {}}] + TERMS[:1])
+
+    assert len(glossary) == 1
+
+
+def test_saved_glossary_is_loaded_and_reloaded_on_change(tmp_path):
+    assert load_glossary('acme') is None
+
+    save_glossary('acme', TERMS[:2])
+    assert len(load_glossary('acme')) == 2
+    assert load_glossary('acme') is load_glossary('acme')
+
+    save_glossary('acme', TERMS)
+    # Make the change visible even on filesystems with coarse timestamps
+    path = tmp_path / 'glossaries' / 'acme.json'
+    os.utime(path, (path.stat().st_atime, path.stat().st_mtime + 10))
+    assert len(read_glossary_terms('acme')) == 4
+
+
+def test_project_names_are_checked():
+    with pytest.raises(ValueError):
+        save_glossary('../etc', TERMS)
@@ -0,0 +1,110 @@
+import os
+
+import pytest
+
+from job_manager import JobManager
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.delenv('JOB_EXECUTION', raising=False)
+    manager = JobManager()
+    # Jobs stay queued: no pipeline runs in these tests
+    monkeypatch.setattr(manager, '_process_job', lambda *args: None)
+    return manager
+
+
+def _create(manager, job_id, url='https://www.youtube.com/watch?v=dQw4w9WgXcQ'):
+    return manager.create_job(job_id, url, 'es', start_time=10, end_time=40)
+
+
+def _progress(job_id, status, progress=100):
+    return {'type': 'progress', 'job_id': job_id, 'data': {
+        'status': status, 'progress': progress, 'message': 'Dubbing completed successfully!', 'stage': None
+    }}
+
+
+def test_identical_job_is_attached(manager):
+    primary = _create(manager, 'primary')
+    attached = _create(manager, 'attached', url='https://youtu.be/dQw4w9WgXcQ?t=5')
+    other = manager.create_job('other', 'https://youtu.be/dQw4w9WgXcQ', 'fr', start_time=10, end_time=40)
+
+    assert primary['status'] == 'queued'
+    assert attached['status'] == 'queued'
+    assert attached['attached_to'] == 'primary'
+    assert 'attached_to' not in other
+
+
+def test_attached_job_mirrors_primary_progress(manager):
+    _create(manager, 'primary')
+    _create(manager, 'attached')
+    manager._on_event(_progress('primary', 'processing', progress=45))
+
+    job = manager.get_job('attached')
+
+    assert job['status'] == 'processing'
+    assert job['progress'] == 45
+
+
+def test_progress_events_do_not_complete_jobs(manager):
+    _create(manager, 'primary')
+    _create(manager, 'attached')
+
+    # The pipeline's final progress event comes before output_file is set
+    manager._on_event(_progress('primary', 'completed'))
+
+    assert manager.get_job('primary')['status'] == 'queued'
+    assert manager.get_job('primary')['progress'] == 100
+    assert manager.get_job('attached')['status'] == 'queued'
+
+
+def test_completed_primary_without_output_is_still_running(manager):
+    _create(manager, 'primary')
+    _create(manager, 'attached')
+    manager.jobs['primary']['status'] = 'completed'
+
+    job = manager.get_job('attached')
+
+    assert job['status'] == 'processing'
+    assert job['output_file'] is None
+
+
+def test_attached_job_gets_its_own_output(manager, tmp_path):
+    _create(manager, 'primary')
+    _create(manager, 'attached')
+    output = tmp_path / 'primary_dubbed.mp4'
+    output.write_bytes(b'video')
+    manager._update_job('primary', {'status': 'completed', 'progress': 100, 'output_file': str(output)})
+
+    job = manager.get_job('attached')
+
+    assert job['status'] == 'completed'
+    assert job['output_file'] == str(tmp_path / 'attached_dubbed.mp4')
+    with open(job['output_file'], 'rb') as f:
+        assert f.read() == b'video'
+    # Independent of the primary's file
+    os.remove(output)
+    assert os.path.exists(job['output_file'])
+
+
+def test_attached_job_fails_with_primary(manager):
+    _create(manager, 'primary')
+    _create(manager, 'attached')
+    manager._update_job('primary', {'status': 'failed', 'message': 'Job failed: boom', 'error': 'boom'})
+
+    job = manager.get_job('attached')
+
+    assert job['status'] == 'failed'
+    assert job['error'] == 'boom'
+
+
+def test_attached_job_fails_when_primary_is_deleted(manager):
+    _create(manager, 'primary')
+    _create(manager, 'attached')
+    with manager.lock:
+        del manager.jobs['primary']
+
+    job = manager.get_job('attached')
+
+    assert job['status'] == 'failed'
+    assert 'primary' in job['error']
@@ -0,0 +1,186 @@
+import os
+import threading
+import uuid
+
+import pytest
+
+from services.job_store import JobStore, SQLiteJobStore, RedisJobStore
+
+
+def _redis_store():
+    pytest.importorskip('redis')
+    store = RedisJobStore(url=os.getenv('TEST_REDIS_URL', 'redis://localhost:6379/15'),
+                          prefix=f'autodub-test-{uuid.uuid4().hex[:8]}')
+    try:
+        store.client.ping()
+    except Exception:
+        pytest.skip('no Redis server')
+    return store
+
+
+@pytest.fixture(params=['sqlite', 'redis'])
+def store(request, tmp_path):
+    if request.param == 'sqlite':
+        yield SQLiteJobStore(str(tmp_path / 'jobs.db'))
+        return
+    store = _redis_store()
+    yield store
+    keys = store.client.keys(f'{store.prefix}:*')
+    if keys:
+        store.client.delete(*keys)
+
+
+def _job(job_id, status='queued', **fields):
+    return dict({'job_id': job_id, 'status': status, 'progress': 0, 'message': 'Job queued'}, **fields)
+
+
+def test_claims_are_fifo_and_leased(store):
+    store.add(_job('a'))
+    store.add(_job('b'))
+
+    first = store.claim('worker-1', 60)
+    second = store.claim('worker-2', 60)
+
+    assert (first['job_id'], first['worker_id'], first['attempts']) == ('a', 'worker-1', 1)
+    assert second['job_id'] == 'b'
+    assert store.claim('worker-1', 60) is None
+    assert store.get('a')['status'] == 'processing'
+
+
+def test_attached_jobs_are_never_claimed(store):
+    store.add(_job('attached', status='attached', attached_to='a'))
+
+    assert store.claim('worker-1', 60) is None
+
+
+def test_only_the_lease_holder_renews_and_updates(store):
+    store.add(_job('a'))
+    store.claim('worker-1', 60)
+
+    assert store.heartbeat('a', 'worker-1', 60)
+    assert not store.heartbeat('a', 'worker-2', 60)
+    assert not store.update('a', {'progress': 50}, owner='worker-2')
+    assert store.update('a', {'progress': 40}, owner='worker-1')
+    assert store.update('a', {'message': 'API node'})
+    assert store.get('a')['progress'] == 40
+
+
+def test_expired_leases_are_requeued_then_failed(store):
+    store.add(_job('a'))
+    store.claim('worker-1', -1)
+
+    requeued, = store.requeue_expired(max_attempts=2)
+    assert requeued['status'] == 'queued'
+    # The worker that lost the job can no longer write to it
+    assert not store.update('a', {'status': 'completed'}, owner='worker-1')
+    assert not store.heartbeat('a', 'worker-1', 60)
+
+    again = store.claim('worker-2', -1)
+    assert (again['job_id'], again['attempts']) == ('a', 2)
+    failed, = store.requeue_expired(max_attempts=2)
+    assert failed['status'] == 'failed'
+    assert 'worker-2' in failed['error']
+    assert store.claim('worker-3', 60) is None
+
+
+def test_live_leases_are_kept(store):
+    store.add(_job('a'))
+    store.claim('worker-1', 60)
+
+    assert store.requeue_expired(max_attempts=3) == []
+    assert store.get('a')['status'] == 'processing'
+
+
+def test_finished_jobs_keep_their_owner_for_late_updates(store):
+    store.add(_job('a'))
+    store.claim('worker-1', 60)
+    assert store.update('a', {'status': 'completed'}, owner='worker-1')
+
+    assert store.update('a', {'profile': 'profile.json'}, owner='worker-1')
+    assert store.requeue_expired(max_attempts=3) == []
+
+
+def test_find_active_by_dedupe_key(store):
+    store.add(_job('a', dedupe_key='key'))
+    store.add(_job('other', dedupe_key='other-key'))
+
+    assert store.find_active('key')['job_id'] == 'a'
+    store.update('a', {'status': 'completed'})
+    assert store.find_active('key') is None
+    assert store.find_active('missing') is None
+
+
+def test_event_log_is_read_with_a_cursor_and_compacted(store):
+    store.add(_job('a'))
+    for event_id in (1, 2, 3):
+        store.add_event({'id': event_id, 'type': 'progress', 'job_id': 'a', 'time': 1.0,
+                         'data': {'progress': event_id * 10}})
+
+    events, cursor = store.events_after(None, limit=2)
+    assert [event['id'] for event in events] == [1, 2]
+    events, cursor = store.events_after(cursor)
+    assert [event['data']['progress'] for event in events] == [30]
+    assert store.events_after(cursor) == ([], cursor)
+    assert store.last_event_id('a') == 3
+
+    store.compact_events('a')
+    assert [event['id'] for event in store.events_after(None)[0]] == [3]
+
+    assert store.delete('a')
+    assert store.get('a') is None
+    assert store.events_after(None)[0] == []
+
+
+def test_workers_report_heartbeats(store):
+    store.register_worker('worker-1', {'host': 'h1', 'pid': 1})
+
+    workers = store.workers(max_age=30)
+
+    assert [(w['worker_id'], w['host']) for w in workers] == [('worker-1', 'h1')]
+
+
+def test_concurrent_claims_never_share_a_job(tmp_path):
+    path = str(tmp_path / 'jobs.db')
+    store = SQLiteJobStore(path)
+    for i in range(40):
+        store.add(_job(f'job-{i}'))
+    claimed = []
+
+    def work(worker_id):
+        # One connection per store and thread, as in separate worker processes
+        worker_store = SQLiteJobStore(path)
+        while (job := worker_store.claim(worker_id, 60)) is not None:
+            claimed.append(job['job_id'])
+
+    threads = [threading.Thread(target=work, args=(f'worker-{i}',)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == sorted(f'job-{i}' for i in range(40))
+
+
+def test_shared_buckets_take_all_or_nothing(store):
+    assert store.take_tokens({'openai:requests': (1, 60), 'openai:units': (50, 60)}) == 0
+
+    # Not enough units left: nothing is taken, the wait covers the missing units
+    wait = store.take_tokens({'openai:requests': (1, 60), 'openai:units': (20, 60)})
+    assert 9 < wait <= 10
+    assert store.take_tokens({'openai:requests': (59, 60)}) == 0
+    assert store.take_tokens({'openai:requests': (1, 60)}) > 0
+
+
+def test_limit_tokens_drains_a_shared_bucket(store):
+    store.limit_tokens('elevenlabs:requests', 0, 120)
+
+    assert 0 < store.take_tokens({'elevenlabs:requests': (1, 120)}) <= 0.5
+
+
+def test_incomplete_store_fails_at_construction():
+    class QueueOnly(JobStore):
+        def add(self, job):
+            pass
+
+    with pytest.raises(TypeError):
+        QueueOnly()
@@ -0,0 +1,44 @@
+import json
+
+from services.metrics import MetricsRegistry
+
+
+def _registry():
+    registry = MetricsRegistry()
+    jobs = registry.counter('autodub_jobs_finished_total', 'Dubbing jobs finished, by outcome', ('status',))
+    stages = registry.histogram('autodub_stage_duration_seconds', 'Wall time of pipeline stages', ('stage',),
+                                buckets=(1, 10))
+    return registry, jobs, stages
+
+
+def test_worker_snapshots_are_summed_into_local_families():
+    api, api_jobs, _ = _registry()
+    worker, worker_jobs, worker_stages = _registry()
+    api_jobs.inc(status='completed')
+    worker_jobs.inc(status='completed')
+    worker_jobs.inc(status='failed')
+    worker_stages.observe(5, stage='translation')
+
+    # Published through the job store as JSON
+    snapshot = json.loads(json.dumps(worker.snapshot()))
+    api.add_source(lambda: [snapshot, snapshot])
+    lines = api.render().splitlines()
+
+    assert 'autodub_jobs_finished_total{status="completed"} 3' in lines
+    assert 'autodub_jobs_finished_total{status="failed"} 2' in lines
+    assert 'autodub_stage_duration_seconds_bucket{stage="translation",le="1"} 0' in lines
+    assert 'autodub_stage_duration_seconds_bucket{stage="translation",le="+Inf"} 2' in lines
+    assert 'autodub_stage_duration_seconds_count{stage="translation"} 2' in lines
+    assert lines.count('# TYPE autodub_jobs_finished_total counter') == 1
+
+
+def test_failing_source_does_not_break_the_scrape():
+    registry, jobs, _ = _registry()
+    jobs.inc(status='completed')
+
+    def broken():
+        raise ConnectionError('store down')
+
+    registry.add_source(broken)
+
+    assert 'autodub_jobs_finished_total{status="completed"} 1' in registry.render()
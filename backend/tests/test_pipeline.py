@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+from services import range_cache
+from services.pipeline import DubbingPipeline
+
+
+@pytest.fixture
+def make_pipeline(monkeypatch, tmp_path):
+    monkeypatch.setenv('RANGE_CACHE_DIR', str(tmp_path / 'ranges'))
+    monkeypatch.setattr(range_cache, '_range_cache', None)
+
+    def make(job_id='job', start_time=10, end_time=40, **kwargs):
+        # Offline backends: no API keys or models needed to build the pipeline
+        return DubbingPipeline(
+            job_id, 'https://www.youtube.com/watch?v=dQw4w9WgXcQ', 'es', start_time=start_time, end_time=end_time,
+            translation_backend='stub', tts_backend='tone', asr_backend='local', **kwargs
+        )
+    return make
+
+
+def _segments(*spans):
+    return [{'text': text, 'start': start, 'end': end, 'speaker': 0} for text, start, end in spans]
+
+
+def test_translation_key_covers_segment_text_and_timing(make_pipeline):
+    pipeline = make_pipeline()
+    other = make_pipeline(job_id='other')
+
+    segments = _segments(('Hello', 0.0, 1.0), ('World', 1.5, 2.5))
+
+    assert pipeline._translation_key(segments) == other._translation_key(_segments(('Hello', 0.0, 1.0), ('World', 1.5, 2.5)))
+    # Same transcription and segment count, different segments (e.g. after range reuse)
+    assert pipeline._translation_key(segments) != pipeline._translation_key(_segments(('Hello', 0.0, 1.0), ('Again', 3.0, 4.0)))
+    assert pipeline._translation_key(segments) != pipeline._translation_key(_segments(('Hello', 0.0, 1.0), ('World', 1.5, 2.0)))
+
+
+def _synthesized(segments, tmp_path):
+    synthesized = []
+    for segment in segments:
+        audio_path = tmp_path / f"{segment['text']}.mp3"
+        audio_path.write_bytes(b'mp3')
+        synthesized.append({
+            'original_text': segment['text'], 'translated_text': f"es:{segment['text']}", 'start': segment['start'],
+            'end': segment['end'], 'speaker': segment['speaker'], 'audio_path': str(audio_path)
+        })
+    return synthesized
+
+
+def test_overlapping_range_only_dubs_new_segments(make_pipeline, tmp_path):
+    os.makedirs('temp', exist_ok=True)
+    # First job, range 10-40s (segment times relative to the range)
+    first = make_pipeline(job_id='first', start_time=10, end_time=40)
+    first.transcription = {'segments': _segments(('Hello', 1.0, 2.0), ('World', 5.0, 6.0))}
+    first._keep_dubbed_segments(_synthesized(first.transcription['segments'], tmp_path))
+
+    # Second job, range 8-42s: the same speech 2s later in range time, plus new lines at the edges
+    second = make_pipeline(job_id='second', start_time=8, end_time=42)
+    second.transcription = {'segments': _segments(('Before', 0.5, 1.5), ('Hello', 3.0, 4.0), ('World', 7.0, 8.0),
+                                                   ('After', 33.0, 33.5))}
+    reused, pending = second._split_reusable(second.transcription['segments'])
+
+    assert [s['translated_text'] for s in reused] == ['es:Hello', 'es:World']
+    assert [s['text'] for s in pending] == ['Before', 'After']
+    merged = second._merge_reused(_synthesized(pending, tmp_path), reused)
+    assert [s['original_text'] for s in merged] == ['Before', 'Hello', 'World', 'After']
+    assert [s['start'] for s in merged] == [0.5, 3.0, 7.0, 33.0]
+
+
+def test_range_reuse_respects_job_settings(make_pipeline, tmp_path):
+    os.makedirs('temp', exist_ok=True)
+    first = make_pipeline(job_id='first')
+    first.transcription = {'segments': _segments(('Hello', 1.0, 2.0))}
+    first._keep_dubbed_segments(_synthesized(first.transcription['segments'], tmp_path))
+
+    other_project = make_pipeline(job_id='second', project='acme')
+    other_project.transcription = first.transcription
+
+    assert other_project._split_reusable(first.transcription['segments'])[0] == []
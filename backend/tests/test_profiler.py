@@ -0,0 +1,39 @@
+import sys
+import threading
+
+from services.profiler import ProfileSession, SamplingProfiler
+
+
+def test_closed_session_drops_late_samples():
+    session = ProfileSession('job', forced=True)
+    frame = sys._getframe()
+    session.add('MainThread', frame)
+
+    session.close()
+    session.add('MainThread', frame)
+
+    assert session.samples == 1
+    assert session.folded().endswith(' 1\n')
+
+
+def test_finish_while_the_sampler_adds(tmp_path):
+    profiler = SamplingProfiler(output_dir=tmp_path)
+    profiler.start('job', forced=True)
+    session = profiler.sessions['job']
+    stop = threading.Event()
+
+    def sample():
+        # What the sampler thread does with its snapshot of the sessions
+        while not stop.is_set():
+            session.add(f'worker-{session.samples % 50}', sys._getframe())
+
+    sampler = threading.Thread(target=sample)
+    sampler.start()
+    try:
+        path = profiler.finish('job', 1.0)
+    finally:
+        stop.set()
+        sampler.join()
+
+    assert path == str(tmp_path / 'job_profile.folded')
+    assert session.closed
@@ -0,0 +1,198 @@
+import os
+
+import pytest
+
+from services.range_cache import RangeCache, slice_transcription, shift_transcription
+
+URL = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+DUB_KEY = ['en', 'es', 'deepgram', 'openai', 'elevenlabs', None, [0]]
+
+
+def _word(word, start, end):
+    return {'word': word, 'punctuated_word': word, 'start': start, 'end': end}
+
+
+# Video time: "one two" 10-11s, "three four" 12-14s, "five" 20-21s
+TRANSCRIPTION = {
+    'segments': [
+        {'text': 'one two', 'start': 10.0, 'end': 11.0, 'speaker': 0},
+        {'text': 'three four', 'start': 12.0, 'end': 14.0, 'speaker': 1},
+        {'text': 'five', 'start': 20.0, 'end': 21.0, 'speaker': 0},
+    ],
+    'words': [
+        _word('one', 10.0, 10.4), _word('two', 10.5, 11.0),
+        _word('three', 12.0, 12.8), _word('four', 13.2, 14.0),
+        _word('five', 20.0, 21.0),
+    ],
+    'speaker_count': 2
+}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return RangeCache(cache_dir=tmp_path / 'ranges', max_spans=2)
+
+
+def _file(path, content=b'data'):
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_slice_keeps_inner_segments_and_shifts_to_range_time():
+    sliced = slice_transcription(TRANSCRIPTION, 9.0, 15.0)
+
+    assert [(s['text'], s['start'], s['end']) for s in sliced['segments']] == [
+        ('one two', 1.0, 2.0), ('three four', 3.0, 5.0)
+    ]
+    assert [w['word'] for w in sliced['words']] == ['one', 'two', 'three', 'four']
+    assert sliced['full_text'] == 'one two three four'
+
+
+def test_slice_rebuilds_boundary_segments_from_words():
+    sliced = slice_transcription(TRANSCRIPTION, 13.0, None)
+
+    assert [(s['text'], s['start'], s['end']) for s in sliced['segments']] == [
+        ('four', 0.2, 1.0), ('five', 7.0, 8.0)
+    ]
+    assert sliced['segments'][0]['speaker'] == 1
+
+
+def test_shift_then_slice_round_trips():
+    range_time = slice_transcription(TRANSCRIPTION, 10.0, 21.0)
+
+    assert shift_transcription(range_time, 10.0)['segments'] == TRANSCRIPTION['segments']
+
+
+def test_transcription_is_found_for_contained_ranges_only(cache):
+    cache.add_transcription(URL, 'en', 'deepgram', 10.0, 21.0, False, slice_transcription(TRANSCRIPTION, 10.0, 21.0))
+
+    inner = cache.find_transcription('https://youtu.be/dQw4w9WgXcQ', 'en', 'deepgram', 12, 15)
+
+    assert [(s['text'], s['start']) for s in inner['segments']] == [('three four', 0.0)]
+    assert cache.find_transcription(URL, 'en', 'deepgram', 5, 15) is None
+    assert cache.find_transcription(URL, 'en', 'deepgram', 12, None) is None
+    assert cache.find_transcription(URL, 'fr', 'deepgram', 12, 15) is None
+    assert cache.find_transcription(URL, 'en', 'local', 12, 15) is None
+
+
+def test_smallest_covering_span_wins_and_contained_spans_are_dropped(cache, tmp_path):
+    video = _file(tmp_path / 'video.mp4')
+    cache.add_span(URL, 10, 20, False, {'video': video})
+    cache.add_span(URL, 0, 60, False, {'video': video})
+    cache.add_span(URL, 30, 40, False, {'video': video})
+
+    assert len(cache._load_index(cache._video_dir(URL))['spans']) == 2
+    assert cache.find_span(URL, 12, 18)['start'] == 0
+    assert cache.find_span(URL, 32, 38)['start'] == 30
+    assert cache.find_span(URL, 50, 70) is None
+    span = cache.find_span(URL, 0, 60)
+    assert os.path.exists(span['files']['video'])
+
+
+def test_spans_to_the_end_cover_open_ranges(cache, tmp_path):
+    cache.add_span(URL, 5, 100, True, {'video': _file(tmp_path / 'video.mp4')})
+
+    assert cache.find_span(URL, 30, None) is not None
+    assert cache.find_span(URL, 0, None) is None
+
+
+def test_dubbed_segments_are_reused_across_overlapping_ranges(cache, tmp_path):
+    # First job: range 10-21s, segments in range time
+    audio = _file(tmp_path / 'seg.mp3', b'mp3')
+    cache.add_dubbed_segments(URL, DUB_KEY, [
+        {'original_text': 'one two', 'translated_text': 'uno dos', 'start': 0.0, 'end': 1.0,
+         'speaker': 0, 'audio_path': audio},
+        {'original_text': 'three four', 'translated_text': 'tres cuatro', 'start': 2.0, 'end': 4.0,
+         'speaker': 1, 'audio_path': audio},
+    ], offset=10.0)
+
+    # Second job: range 8-30s, transcribed slightly differently
+    segments = [
+        {'text': 'Hi', 'start': 0.5, 'end': 1.5, 'speaker': 0},
+        {'text': 'one two', 'start': 2.1, 'end': 3.1, 'speaker': 0},
+        {'text': 'three four', 'start': 4.0, 'end': 6.0, 'speaker': 0},
+        {'text': 'three four', 'start': 4.0, 'end': 6.0, 'speaker': 1},
+    ]
+    output_dir = tmp_path / 'out'
+    output_dir.mkdir()
+    reused, pending = cache.match_dubbed_segments(URL, DUB_KEY, segments, 8.0, str(output_dir), 'job2')
+
+    assert [(s['translated_text'], s['start'], s['speaker']) for s in reused] == [
+        ('uno dos', 2.1, 0), ('tres cuatro', 4.0, 1)
+    ]
+    assert all(os.path.exists(s['audio_path']) for s in reused)
+    # Different text or speaker: dubbed again
+    assert [(s['text'], s['speaker']) for s in pending] == [('Hi', 0), ('three four', 0)]
+
+    # Other settings (e.g. another target language) never share segments
+    reused, _ = cache.match_dubbed_segments(URL, DUB_KEY[:1] + ['fr'] + DUB_KEY[2:], segments, 8.0,
+                                            str(output_dir), 'job3')
+    assert reused == []
+
+
+def test_dubbed_segments_outside_tolerance_are_not_reused(cache, tmp_path):
+    cache.add_dubbed_segments(URL, DUB_KEY, [
+        {'original_text': 'five', 'translated_text': 'cinco', 'start': 10.0, 'end': 11.0,
+         'speaker': 0, 'audio_path': _file(tmp_path / 'seg.mp3')},
+    ], offset=10.0)
+
+    reused, pending = cache.match_dubbed_segments(
+        URL, DUB_KEY, [{'text': 'five', 'start': 10.5, 'end': 11.5, 'speaker': 0}], 10.0, str(tmp_path), 'job'
+    )
+
+    assert reused == []
+    assert len(pending) == 1
+
+
+def _dubbed(tmp_path, count, **fields):
+    audio = _file(tmp_path / 'seg.mp3', b'mp3')
+    return [dict({'original_text': f'line {i}', 'translated_text': f'línea {i}', 'start': float(i), 'end': i + 0.5,
+                  'speaker': 0, 'audio_path': audio}, **fields) for i in range(count)]
+
+
+def _kept_audio(cache):
+    return sorted(os.listdir(cache._video_dir(URL) / 'audio'))
+
+
+def test_oldest_dubbed_segments_are_evicted_with_their_audio(tmp_path):
+    cache = RangeCache(cache_dir=tmp_path / 'ranges', max_segments=3)
+    segments = _dubbed(tmp_path, 5)
+
+    cache.add_dubbed_segments(URL, DUB_KEY, segments[:2], offset=0)
+    cache.add_dubbed_segments(URL, DUB_KEY, segments[2:], offset=0)
+
+    reused, pending = cache.match_dubbed_segments(
+        URL, DUB_KEY, [{'text': s['original_text'], 'start': s['start'], 'end': s['end'], 'speaker': 0} for s in segments],
+        0, str(tmp_path), 'job'
+    )
+    assert [s['translated_text'] for s in reused] == ['línea 2', 'línea 3', 'línea 4']
+    assert len(pending) == 2
+    assert len(_kept_audio(cache)) == 3
+
+
+def test_least_recent_settings_keys_are_evicted(tmp_path):
+    cache = RangeCache(cache_dir=tmp_path / 'ranges', max_dubs=2)
+    segments = _dubbed(tmp_path, 1)
+
+    for language in ('es', 'fr', 'de'):
+        cache.add_dubbed_segments(URL, DUB_KEY[:1] + [language] + DUB_KEY[2:], segments, offset=0)
+
+    segment = [{'text': 'line 0', 'start': 0.0, 'end': 0.5, 'speaker': 0}]
+    assert cache.match_dubbed_segments(URL, DUB_KEY, segment, 0, str(tmp_path), 'job')[0] == []
+    assert len(cache.match_dubbed_segments(URL, DUB_KEY[:1] + ['de'] + DUB_KEY[2:], segment, 0,
+                                           str(tmp_path), 'job')[0]) == 1
+    assert len(_kept_audio(cache)) == 2
+
+
+def test_failover_segments_are_not_kept(cache, tmp_path):
+    segments = _dubbed(tmp_path, 2)
+    segments[1]['tts_backend'] = 'tone'
+
+    cache.add_dubbed_segments(URL, DUB_KEY, segments, offset=0, backend='elevenlabs')
+
+    reused, pending = cache.match_dubbed_segments(
+        URL, DUB_KEY, [{'text': s['original_text'], 'start': s['start'], 'end': s['end'], 'speaker': 0} for s in segments],
+        0, str(tmp_path), 'job'
+    )
+    assert [s['original_text'] for s in reused] == ['line 0']
+    assert [s['text'] for s in pending] == ['line 1']
@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+
+from services.job_store import SQLiteJobStore
+from services.rate_limiter import ProviderRateLimiter
+
+
+def _limiters(tmp_path, count, requests_per_minute):
+    # One limiter per worker process, all on the same job store
+    store = SQLiteJobStore(str(tmp_path / 'jobs.db'))
+    return [ProviderRateLimiter('openai', requests_per_minute, store=store) for _ in range(count)]
+
+
+def test_processes_share_one_request_budget(tmp_path):
+    first, second = _limiters(tmp_path, 2, 3)
+
+    first.acquire('job-a')
+    first.acquire('job-a')
+    second.acquire('job-b')
+
+    # The minute's three requests are spent across both processes
+    assert second._take_shared(1) > 0
+    assert first._take_shared(1) > 0
+    assert first.granted + second.granted == 3
+
+
+def test_rate_limit_response_pauses_every_process(tmp_path):
+    first, second = _limiters(tmp_path, 2, 600)
+    error = SimpleNamespace(status_code=429, response=SimpleNamespace(headers={'retry-after': '1'}))
+
+    assert first.record_error(error)
+
+    assert second._take_shared(1) > 0
+
+
+def test_local_limiter_without_store(tmp_path):
+    limiter = ProviderRateLimiter('openai', 2)
+
+    limiter.acquire('job')
+    limiter.acquire('job')
+
+    assert limiter._take_local(1) > 0
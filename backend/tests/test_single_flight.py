@@ -0,0 +1,83 @@
+import threading
+import time
+
+import pytest
+
+from services.single_flight import SingleFlight, normalize_video_url
+
+
+@pytest.mark.parametrize('url', [
+    'https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+    'https://youtube.com/watch?v=dQw4w9WgXcQ&t=42s&si=abc',
+    'http://m.youtube.com/watch?feature=share&v=dQw4w9WgXcQ',
+    'https://youtu.be/dQw4w9WgXcQ?t=5',
+    'youtu.be/dQw4w9WgXcQ',
+    'https://www.youtube.com/shorts/dQw4w9WgXcQ',
+    'https://www.youtube.com/embed/dQw4w9WgXcQ',
+    'https://www.youtube-nocookie.com/embed/dQw4w9WgXcQ',
+])
+def test_youtube_urls_normalize_to_video_id(url):
+    assert normalize_video_url(url) == 'youtube:dQw4w9WgXcQ'
+
+
+def test_other_urls_keep_host_path_and_query():
+    assert normalize_video_url('https://www.example.com/videos/1/?q=2#frag') == 'example.com/videos/1?q=2'
+    assert normalize_video_url('http://example.com/videos/1') == 'example.com/videos/1'
+
+
+def _concurrently(group, key, fn, callers):
+    results = [None] * callers
+    errors = [None] * callers
+
+    def run(i):
+        try:
+            results[i] = group.do(key, fn)
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_concurrent_calls_run_once():
+    group = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def work():
+        calls.append(1)
+        release.wait()
+        return 'result'
+
+    threading.Timer(0.2, release.set).start()
+    results, errors = _concurrently(group, ('stage', 'key'), work, 4)
+
+    assert calls == [1]
+    assert errors == [None] * 4
+    assert sorted(shared for _, shared in results) == [False, True, True, True]
+    assert {result for result, _ in results} == {'result'}
+    assert group.in_flight() == 0
+
+
+def test_errors_reach_every_waiting_caller():
+    group = SingleFlight()
+
+    def work():
+        time.sleep(0.2)
+        raise ValueError('boom')
+
+    _, errors = _concurrently(group, 'key', work, 3)
+
+    assert all(isinstance(error, ValueError) for error in errors)
+
+
+def test_finished_calls_are_not_kept():
+    group = SingleFlight()
+    calls = []
+
+    assert group.do('key', lambda: calls.append(1) or len(calls)) == (1, False)
+    assert group.do('key', lambda: calls.append(1) or len(calls)) == (2, False)
@@ -0,0 +1,66 @@
+import json
+
+from services.translation_memory import TranslationMemory, normalize_text, shingles, jaccard
+
+
+def _memory(tmp_path, *entries):
+    memory = TranslationMemory(tmp_path / 'memory.jsonl')
+    for source, translation in entries:
+        memory.add(source, 'en', 'es', translation)
+    return memory
+
+
+def test_normalize_text_drops_noise():
+    assert normalize_text("Um, we shipped twenty-five builds!") == 'we shipped 25 builds'
+    assert normalize_text("uh... Hello") == 'hello'
+
+
+def test_exact_normalized_match_is_reusable(tmp_path):
+    memory = _memory(tmp_path, ("We shipped twenty five builds.", "Publicamos 25 versiones."))
+
+    similarity, source, translation, exact = memory.lookup("um, we shipped 25 builds", 'en', 'es')
+
+    assert exact and similarity == 1.0
+    assert translation == "Publicamos 25 versiones."
+    assert memory.get_stats()['reused'] == 1
+
+
+def test_similar_sentence_with_different_meaning_is_not_reusable(tmp_path):
+    memory = _memory(tmp_path, (
+        "The new software update is now available for every user on the platform today",
+        "La nueva actualización ya está disponible para todos los usuarios de la plataforma hoy"
+    ))
+
+    match = memory.lookup("The new software update is not available for every user on the platform today", 'en', 'es')
+
+    # Over 0.9 trigram similarity, but the meaning is the opposite: edit, never reuse
+    assert match is not None
+    similarity, _, _, exact = match
+    assert similarity > 0.9
+    assert not exact
+    assert memory.get_stats() == {'entries': 1, 'reused': 0, 'edits': 1, 'misses': 0}
+
+
+def test_unrelated_sentence_misses(tmp_path):
+    memory = _memory(tmp_path, ("We recommend this product", "Recomendamos este producto"))
+
+    assert memory.lookup("The weather is lovely today", 'en', 'es') is None
+    assert memory.lookup("We recommend this product", 'en', 'fr') is None
+    assert memory.get_stats()['misses'] == 2
+
+
+def test_entries_persist_and_newer_translation_wins(tmp_path):
+    memory = _memory(tmp_path, ("Good morning", "Buen día"), ("good morning!", "Buenos días"))
+
+    reloaded = TranslationMemory(tmp_path / 'memory.jsonl')
+
+    assert reloaded.lookup("Good morning", 'en', 'es')[2] == "Buenos días"
+    assert reloaded.get_stats()['entries'] == 1
+    with open(tmp_path / 'memory.jsonl', encoding='utf-8') as f:
+        assert len([json.loads(line) for line in f]) == 2
+
+
+def test_jaccard_of_shingles():
+    a = shingles(normalize_text("the quick brown fox"))
+    assert jaccard(a, a) == 1.0
+    assert jaccard(a, shingles("zzzz")) == 0.0
@@ -0,0 +1,186 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from services import tracing
+from services.adaptive_concurrency import AdaptiveConcurrency
+from services.translator import Translator, estimate_tokens
+from services.translation_memory import TranslationMemory
+
+
+def _reply(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def _items(request):
+    """Items of a JSON translation request (the array closing its prompt)"""
+    return json.loads(request['messages'][-1]['content'].rsplit('\n\n', 1)[1])
+
+
+def _translate_all(request):
+    return _reply(json.dumps({'translations': [
+        {'id': item['id'], 'text': f"es:{item['text']}"} for item in _items(request)
+    ]}))
+
+
+def _segments(*texts):
+    return [{'text': text, 'start': i * 2.0, 'end': i * 2.0 + 1.5, 'speaker': 0} for i, text in enumerate(texts)]
+
+
+@pytest.fixture
+def translator(monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    # Tracing off (the default): spans are the no-op span
+    monkeypatch.setattr(tracing, '_tracer', tracing.Tracer([]))
+    return Translator(use_cache=False, job_id='job')
+
+
+def _translate(translator, segments):
+    return translator.batch_translate_segments(
+        segments, 'es', use_async=False, parallel=False, fit_durations=False, context_window=False
+    )
+
+
+def test_batch_translation_with_tracing_off(translator):
+    requests = []
+
+    def call(request):
+        requests.append(request)
+        return _translate_all(request)
+
+    translator._call_openai = call
+    translated = _translate(translator, _segments('Hello there', 'How are you?'))
+
+    assert [s['translated_text'] for s in translated] == ['es:Hello there', 'es:How are you?']
+    assert [(s['start'], s['end']) for s in translated] == [(0.0, 1.5), (2.0, 3.5)]
+    assert len(requests) == 1
+
+
+class _CollectingExporter:
+    def __init__(self):
+        self.payloads = []
+
+    def export(self, payload):
+        self.payloads.append(payload)
+
+
+def test_batch_spans_count_requests_per_kind(translator, monkeypatch):
+    exporter = _CollectingExporter()
+    monkeypatch.setattr(tracing, '_tracer', tracing.Tracer([exporter]))
+    calls = []
+
+    def call(request):
+        calls.append(request)
+        # First reply drops the last item, which is requested again
+        reply = json.loads(_translate_all(request).choices[0].message.content)
+        if len(calls) == 1:
+            reply['translations'] = reply['translations'][:-1]
+        return _reply(json.dumps(reply))
+
+    translator._call_openai = call
+    tracing.start_trace('job')
+    _translate(translator, _segments('one', 'two'))
+    trace = tracing.get_tracer().traces['job']
+    tracing.end_trace('job')
+
+    batch_span, = [span for span in trace.spans if span.name == 'translation.batch']
+    assert batch_span.attributes['requests.translate'] == 2
+    assert batch_span.attributes['segments'] == 2
+    assert len(exporter.payloads) == 1
+
+
+def test_batch_translation_retries_only_missing_ids(translator):
+    requested = []
+
+    def call(request):
+        items = _items(request)
+        requested.append([item['id'] for item in items])
+        # First reply drops the last item
+        if len(requested) == 1:
+            items = items[:-1]
+        return _reply(json.dumps({'translations': [{'id': item['id'], 'text': f"es:{item['text']}"} for item in items]}))
+
+    translator._call_openai = call
+    translated = _translate(translator, _segments('one', 'two', 'three'))
+
+    assert requested == [[0, 1, 2], [2]]
+    assert [s['translated_text'] for s in translated] == ['es:one', 'es:two', 'es:three']
+
+
+def test_failed_requests_keep_original_text(translator):
+    def call(request):
+        raise RuntimeError('boom')
+
+    translator._call_openai = call
+    translated = _translate(translator, _segments('keep me'))
+
+    assert translated[0]['translated_text'] == 'keep me'
+
+
+def test_memory_near_match_goes_through_edit_request(translator, tmp_path):
+    translator.translation_memory = TranslationMemory(tmp_path / 'memory.jsonl')
+    translator.translation_memory.add(
+        "The new software update is now available for every user on the platform today", 'en', 'es',
+        "La nueva actualización ya está disponible para todos los usuarios de la plataforma hoy"
+    )
+    translator.translation_memory.add("Thank you", 'en', 'es', "Gracias")
+    models = []
+
+    def call(request):
+        models.append(request['model'])
+        return _translate_all(request)
+
+    translator._call_openai = call
+    source = "The new software update is not available for every user on the platform today"
+    translated = _translate(translator, _segments(source, "Thank you!"))
+
+    # The exact match is reused, the similar sentence is edited, not reused
+    assert translated[1]['translated_text'] == "Gracias"
+    assert translated[0]['translated_text'] == f"es:{source}"
+    assert models == [translator.edit_model]
+
+
+def test_estimate_tokens_counts_wide_characters():
+    assert estimate_tokens('a' * 40) == 11
+    assert estimate_tokens('日本語です') == 6
+
+
+def test_batches_are_packed_under_the_token_budget(translator):
+    segments = _segments(*['word ' * 20] * 10)
+    cost = translator._estimate_output_tokens(segments[0]['text'], 'es')
+
+    batches = translator._pack_batches(segments, 'es', token_budget=cost * 3, max_items=40)
+
+    assert [len(batch) for batch in batches] == [3, 3, 3, 1]
+    assert [s for batch in batches for s in batch] == segments
+
+
+def test_batches_respect_max_items_and_oversized_segments(translator):
+    assert [len(b) for b in translator._pack_batches(_segments(*['hi'] * 5), 'es', 10_000, max_items=2)] == [2, 2, 1]
+    # A segment over the budget still gets a batch of its own
+    assert [len(b) for b in translator._pack_batches(_segments('long ' * 500, 'hi'), 'es', 50, 40)] == [1, 1]
+
+
+def test_cjk_targets_pack_fewer_segments(translator):
+    segments = _segments(*['word ' * 20] * 12)
+
+    assert len(translator._pack_batches(segments, 'ja', 600, 40)) > len(translator._pack_batches(segments, 'es', 600, 40))
+
+
+def test_adaptive_concurrency_backs_off_and_recovers():
+    limiter = AdaptiveConcurrency('test', initial=4, maximum=8)
+
+    limiter.acquire()
+    limiter.release(rate_limited=True)
+    assert int(limiter.limit) == 2
+
+    limiter.acquire()
+    limiter.release(headers={'x-ratelimit-remaining-requests': '5', 'x-ratelimit-limit-requests': '100'})
+    assert int(limiter.limit) == 1
+
+    for _ in range(10):
+        limiter.acquire()
+        limiter.release(latency=0.5)
+    assert int(limiter.limit) > 1
+    assert limiter.in_flight == 0
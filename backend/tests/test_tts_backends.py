@@ -0,0 +1,124 @@
+from types import SimpleNamespace
+
+import elevenlabs
+import pytest
+
+from services import synthesizer as synthesizer_module
+from services import tts_backends
+from services.speech_rate import VoiceRateStats, chars_per_second
+from services.synthesizer import SpeechSynthesizer
+from services.tts_backends import get_tts_backend
+
+TEXT = 'The quick brown fox jumps over the lazy dog'
+
+
+@pytest.fixture(autouse=True)
+def raw_pcm(monkeypatch):
+    # Keep the tone generator's PCM (no ffmpeg needed): 2 bytes per sample
+    monkeypatch.setattr(tts_backends, 'encode_mp3', lambda pcm, sample_rate: pcm)
+
+
+def _seconds(audio):
+    return len(audio) / 2 / tts_backends.ToneTTSBackend.SAMPLE_RATE
+
+
+def test_tone_duration_follows_the_requested_language():
+    backend = get_tts_backend('tone')
+
+    english = _seconds(backend.synthesize(TEXT, 'tone-low', language='en'))
+    japanese = _seconds(backend.synthesize(TEXT, 'tone-low', language='ja'))
+
+    assert english == pytest.approx(len(TEXT) / chars_per_second('en'), abs=0.01)
+    assert japanese == pytest.approx(len(TEXT) / chars_per_second('ja'), abs=0.01)
+
+
+def test_tone_speed_shortens_audio():
+    backend = get_tts_backend('tone')
+
+    normal = _seconds(backend.synthesize(TEXT, 'tone-low', language='en'))
+    fast = _seconds(backend.synthesize(TEXT, 'tone-low', speed=1.25, language='en'))
+
+    assert fast == pytest.approx(normal / 1.25, abs=0.01)
+
+
+def test_synthesizer_passes_the_job_language(tmp_path):
+    synthesizer = SpeechSynthesizer(output_dir=str(tmp_path), job_id='job', backend='tone')
+    synthesizer.language_code = 'ja'
+
+    audio = synthesizer._backend_audio(TEXT, 'tone-low', None)
+
+    assert _seconds(audio) == pytest.approx(len(TEXT) / chars_per_second('ja'), abs=0.01)
+
+
+def test_speed_support_follows_the_voice_settings_fields(monkeypatch):
+    class OldVoiceSettings:
+        model_fields = {'stability': None, 'similarity_boost': None}
+
+    class NewVoiceSettings:
+        model_fields = {'stability': None, 'similarity_boost': None, 'speed': None}
+
+    monkeypatch.setattr(elevenlabs, 'VoiceSettings', OldVoiceSettings)
+    assert not tts_backends.elevenlabs_speed_supported()
+    monkeypatch.setattr(elevenlabs, 'VoiceSettings', NewVoiceSettings)
+    assert tts_backends.elevenlabs_speed_supported()
+
+
+def test_dropped_speed_is_neither_planned_nor_recorded(monkeypatch, tmp_path):
+    monkeypatch.setenv('ELEVENLABS_API_KEY', 'test-key')
+    monkeypatch.setattr(synthesizer_module, 'elevenlabs_speed_supported', lambda: False)
+    synthesizer = SpeechSynthesizer(output_dir=str(tmp_path), job_id='job')
+    synthesizer.voice_rates = VoiceRateStats(tmp_path / 'rates.json')
+    monkeypatch.setattr(synthesizer_module, 'mp3_duration', lambda size: 2.0)
+
+    # Far too much text for the slot: would otherwise ask for the maximum speed
+    assert synthesizer._plan_speed(TEXT * 3, 'voice', {'start': 0.0, 'end': 1.0}) is None
+    assert 'speed' not in vars(synthesizer._voice_settings(1.2))
+
+    synthesizer._record_rate(TEXT, 'voice', b'mp3', 1.2)
+
+    assert synthesizer.voice_rates.stats['voice:en']['seconds'] == 2.0
+
+
+def test_failover_segments_name_the_backend_that_spoke(monkeypatch, tmp_path):
+    monkeypatch.setenv('SYNTHESIS_MAX_ATTEMPTS', '1')
+    synthesizer = SpeechSynthesizer(output_dir=str(tmp_path), job_id='job', backend='piper')
+
+    class Unavailable:
+        name = 'piper'
+
+        def synthesize(self, *args, **kwargs):
+            raise RuntimeError('piper is not installed')
+
+    synthesizer.backend = Unavailable()
+    synthesizer.failover_backends = [get_tts_backend('tone')]
+
+    segment = synthesizer.synthesize_segment({'translated_text': TEXT, 'start': 0.0, 'end': 3.0},
+                                             'voice', str(tmp_path / 'segment.mp3'))
+
+    assert segment['tts_backend'] == 'tone'
+
+
+def test_incomplete_backend_fails_at_construction():
+    class SpeakOnly(tts_backends.TTSBackend):
+        name = 'speak-only'
+
+        def synthesize(self, text, voice_id, model=None, speed=None, language=None, job_id=None):
+            return b''
+
+    with pytest.raises(TypeError):
+        SpeakOnly()
+
+
+def test_failover_requests_queue_under_the_job(monkeypatch, tmp_path):
+    acquired = []
+    limiter = SimpleNamespace(acquire=lambda job_id, units: acquired.append(job_id),
+                              record_success=lambda: None, record_error=lambda error: None)
+    backend = object.__new__(tts_backends.ElevenLabsTTSBackend)
+    backend.rate_limiter = limiter
+    backend.client = SimpleNamespace(text_to_speech=SimpleNamespace(convert=lambda **kwargs: [b'mp3']))
+
+    synthesizer = SpeechSynthesizer(output_dir=str(tmp_path), job_id='job-42', backend='tone')
+    synthesizer.failover_backends = [backend]
+    synthesizer._failover(RuntimeError('tone failed'), TEXT, 'voice', None)
+
+    assert acquired == ['job-42']
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Pipeline worker processes for the production serving mode
+
+In production the HTTP API runs under gunicorn (gunicorn.conf.py) with
+JOB_EXECUTION=queue: it only validates requests and enqueues jobs in the
+shared job store (services/job_store.py). This script starts the pool of
+processes that claim and run those jobs, one job per process at a time,
+so pipeline work never competes with request handling for the GIL.
+
+Run it from the backend directory (paths in job results are relative) with
+the same job store as the API: JOB_STORE=sqlite and the same JOB_STORE_PATH
+on one host, or JOB_STORE=redis and the same JOB_REDIS_URL on several hosts
+(outputs/ must then be shared storage the API nodes can serve from).
+
+The store is also where the processes share the provider quotas
+(OPENAI_RPM, OPENAI_TPM, ELEVENLABS_RPM hold for all workers together) and
+publish their job, stage and API metrics for the API's /metrics.
+
+Usage:
+    python worker.py                   # one process per core
+    python worker.py --processes 4
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def run_process(poll_interval):
+    """Entry point of one worker process"""
+    # Set before job_manager is imported: its JobManager reads it at import time
+    os.environ['JOB_EXECUTION'] = 'queue'
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s [%(levelname)s] %(processName)s %(name)s: %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    from job_manager import job_manager
+    job_manager.run_worker(poll_interval=poll_interval)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run dubbing pipeline worker processes for JOB_EXECUTION=queue")
+    parser.add_argument('--processes', type=int, default=int(os.getenv('WORKER_PROCESSES', 0)) or os.cpu_count(),
+                        help="Worker processes (default: WORKER_PROCESSES or one per core)")
+    parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds between polls of an empty queue")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(name)s: %(message)s')
+    logger = logging.getLogger('worker')
+
+    # Fresh interpreters: no threads or model state inherited from the parent
+    context = multiprocessing.get_context('spawn')
+
+    def start(index):
+        process = context.Process(target=run_process, args=(args.poll_interval,), name=f'worker-{index}', daemon=True)
+        process.start()
+        return process
+
+    processes = [start(index) for index in range(args.processes)]
+    logger.info(f"[WORKER] Started {len(processes)} pipeline worker processes")
+
+    try:
+        while True:
+            time.sleep(5)
+            # Replace processes that died (their job is requeued once its lease expires)
+            for index, process in enumerate(processes):
+                if not process.is_alive():
+                    logger.warning(f"[WORKER] {process.name} exited with code {process.exitcode}, restarting")
+                    processes[index] = start(index)
+    except KeyboardInterrupt:
+        logger.info("[WORKER] Shutting down")
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -13,6 +13,8 @@ const statusSpan = document.getElementById('status');
 const progressSpan = document.getElementById('progress');
 const messageP = document.getElementById('message');
 const progressFill = document.getElementById('progressFill');
+const previewContainer = document.getElementById('previewContainer');
+const previewVideo = document.getElementById('previewVideo');
 
 const resultVideo = document.getElementById('resultVideo');
 const downloadBtn = document.getElementById('downloadBtn');
@@ -23,6 +25,8 @@ const jobsList = document.getElementById('jobsList');
 // State
 let currentJobId = null;
 let pollingInterval = null;
+let eventSource = null;
+let previewHls = null;
 
 // Event Listeners
 dubForm.addEventListener('submit', handleSubmit);
@@ -41,6 +45,7 @@ async function handleSubmit(e) {
     const startTime = document.getElementById('startTime').value;
     const endTime = document.getElementById('endTime').value;
     const useVoiceCloning = document.getElementById('useVoiceCloning').checked;
+    const progressive = document.getElementById('progressive').checked;
     
     try {
         submitBtn.disabled = true;
@@ -52,6 +57,7 @@ async function handleSubmit(e) {
             source_language: sourceLanguage,
             target_language: targetLanguage,
             use_voice_cloning: useVoiceCloning,
+            progressive: progressive,
         };
         
         // Add optional time parameters if provided
@@ -84,8 +90,8 @@ async function handleSubmit(e) {
         progressSection.classList.remove('hidden');
         resultSection.classList.add('hidden');
         
-        // Start polling for status
-        startPolling();
+        // Follow job progress
+        startProgressUpdates();
         
         // Scroll to progress section
         progressSection.scrollIntoView({ behavior: 'smooth' });
@@ -97,6 +103,109 @@ async function handleSubmit(e) {
     }
 }
 
+function startProgressUpdates() {
+    stopProgressUpdates();
+    
+    // Older browsers: fall back to polling
+    if (!window.EventSource) {
+        startPolling();
+        return;
+    }
+    
+    // Server-Sent Events: the server pushes every stage transition
+    eventSource = new EventSource(`${API_BASE_URL}/api/dub/${currentJobId}/events`);
+    
+    eventSource.addEventListener('progress', (e) => {
+        updateProgress(JSON.parse(e.data));
+        loadJobs();
+    });
+    
+    eventSource.addEventListener('segment', (e) => {
+        const data = JSON.parse(e.data);
+        messageP.textContent = `Synthesizing speech... ${data.completed}/${data.total} segments`;
+    });
+    
+    eventSource.addEventListener('region', (e) => {
+        const data = JSON.parse(e.data);
+        messageP.textContent = `Dubbed ${data.index + 1}/${data.regions} parts - you can start watching`;
+        startPreview(data.playlist_url);
+    });
+    
+    eventSource.addEventListener('completed', (e) => {
+        const data = JSON.parse(e.data);
+        stopProgressUpdates();
+        updateProgress(data);
+        showResult(data);
+        loadJobs();
+    });
+    
+    eventSource.addEventListener('failed', (e) => {
+        const data = JSON.parse(e.data);
+        stopProgressUpdates();
+        alert(`Job failed: ${data.message}`);
+        resetForm();
+        loadJobs();
+    });
+    
+    eventSource.onerror = () => {
+        // EventSource reconnects by itself unless the server refused the stream
+        if (eventSource && eventSource.readyState === EventSource.CLOSED) {
+            console.warn('Event stream closed, falling back to polling');
+            stopProgressUpdates();
+            startPolling();
+        }
+    };
+}
+
+function stopProgressUpdates() {
+    if (eventSource) {
+        eventSource.close();
+        eventSource = null;
+    }
+    if (pollingInterval) {
+        clearInterval(pollingInterval);
+        pollingInterval = null;
+    }
+}
+
+function startPreview(playlistUrl) {
+    // The playlist grows while the job runs: attach the player once
+    if (!playlistUrl || !previewContainer.classList.contains('hidden')) return;
+    
+    const url = `${API_BASE_URL}${playlistUrl}`;
+    if (previewVideo.canPlayType('application/vnd.apple.mpegurl')) {
+        previewVideo.src = url;
+    } else if (window.Hls && Hls.isSupported()) {
+        previewHls = new Hls();
+        previewHls.loadSource(url);
+        previewHls.attachMedia(previewVideo);
+    } else {
+        return;
+    }
+    previewContainer.classList.remove('hidden');
+}
+
+function stopPreview() {
+    if (previewHls) {
+        previewHls.destroy();
+        previewHls = null;
+    }
+    previewVideo.removeAttribute('src');
+    previewVideo.load();
+    previewContainer.classList.add('hidden');
+}
+
+function updateProgress(data) {
+    jobIdSpan.textContent = data.job_id;
+    statusSpan.textContent = data.status;
+    progressSpan.textContent = data.progress || 0;
+    messageP.textContent = data.message || '';
+    progressFill.style.width = `${data.progress || 0}%`;
+    
+    // Update status styling
+    statusSpan.className = `job-status ${data.status}`;
+}
+
 function startPolling() {
     if (pollingInterval) {
         clearInterval(pollingInterval);
@@ -122,14 +231,8 @@ async function checkJobStatus() {
         const data = await response.json();
         
         // Update UI
-        jobIdSpan.textContent = data.job_id;
-        statusSpan.textContent = data.status;
-        progressSpan.textContent = data.progress || 0;
-        messageP.textContent = data.message || '';
-        progressFill.style.width = `${data.progress || 0}%`;
-        
-        // Update status styling
-        statusSpan.className = `job-status ${data.status}`;
+        updateProgress(data);
+        startPreview(data.playlist_url);
         
         // Check if completed
         if (data.status === 'completed') {
@@ -150,6 +253,7 @@ async function checkJobStatus() {
 }
 
 function showResult(data) {
+    stopPreview();
     progressSection.classList.add('hidden');
     resultSection.classList.remove('hidden');
     
@@ -178,9 +282,8 @@ function resetForm() {
     resultSection.classList.add('hidden');
     currentJobId = null;
     
-    if (pollingInterval) {
-        clearInterval(pollingInterval);
-    }
+    stopProgressUpdates();
+    stopPreview();
     
     submitBtn.disabled = false;
     submitBtn.textContent = 'Start Dubbing';